@@ -6,11 +6,20 @@ import path from 'path';
 
 const execAsync = promisify(exec);
 
+// Renderer budgets sit inside the exec timeout, so a slow render degrades
+// (flat colours, shorter sources list) or fails cleanly instead of being killed.
+const EXEC_TIMEOUT_MS = 30000;
+const RENDER_TIME_BUDGET_S = 25;
+const RENDER_MEMORY_BUDGET_MIB = 512;
+const BUDGET_EXCEEDED_EXIT_CODE = 3;
+
 export async function POST(request: NextRequest) {
   const body = await request.json();
-  const { profileData } = body;
+  // Either parsed PDFProfileData, or raw markdown for the generator's --markdown mode
+  const { profileData, markdownInput } = body;
+  const input = markdownInput ?? profileData;
 
-  if (!profileData || !profileData.donorName) {
+  if (!input || !input.donorName) {
     return new Response(
       JSON.stringify({ error: 'Profile data with donorName is required' }),
       { status: 400, headers: { 'Content-Type': 'application/json' } }
@@ -18,21 +27,22 @@ export async function POST(request: NextRequest) {
   }
 
   const requestId = `${Date.now()}-${Math.random().toString(36).slice(2, 8)}`;
-  const safeName = profileData.donorName.replace(/\s+/g, '_').replace(/[^a-zA-Z0-9_-]/g, '');
+  const safeName = input.donorName.replace(/\s+/g, '_').replace(/[^a-zA-Z0-9_-]/g, '');
   const tmpInput = `/tmp/prospectai-pdf-${requestId}.json`;
   const tmpOutput = `/tmp/prospectai-pdf-${requestId}.pdf`;
 
   try {
     // Write profile data as JSON for Python to read
-    await writeFile(tmpInput, JSON.stringify(profileData));
+    await writeFile(tmpInput, JSON.stringify(input));
 
     // Run Python PDF generator
     const generatorPath = path.join(process.cwd(), 'src/lib/pdf/generator.py');
-    console.log(`[PDF] Generating PDF for ${profileData.donorName}...`);
+    console.log(`[PDF] Generating PDF for ${input.donorName}...`);
 
     const { stdout, stderr } = await execAsync(
-      `python3 "${generatorPath}" "${tmpInput}" "${tmpOutput}"`,
-      { timeout: 30000 }
+      `python3 "${generatorPath}" ${markdownInput ? '--markdown ' : ''}--time-budget ${RENDER_TIME_BUDGET_S} ` +
+        `--memory-budget ${RENDER_MEMORY_BUDGET_MIB} "${tmpInput}" "${tmpOutput}"`,
+      { timeout: EXEC_TIMEOUT_MS }
     );
 
     if (stdout) console.log(`[PDF] stdout: ${stdout}`);
@@ -40,7 +50,8 @@ export async function POST(request: NextRequest) {
 
     // Read and return PDF
     const pdfBuffer = await readFile(tmpOutput);
-    console.log(`[PDF] Generated ${pdfBuffer.length} bytes for ${profileData.donorName}`);
+    console.log(`[PDF] Generated ${pdfBuffer.length} bytes for ${input.donorName}`);
+    const fallbacks = stdout.match(/^\[PDF\] Fallbacks: (.*)$/m)?.[1] ?? '';
 
     // Cleanup temp files
     await unlink(tmpInput).catch(() => {});
@@ -51,6 +62,7 @@ export async function POST(request: NextRequest) {
         'Content-Type': 'application/pdf',
         'Content-Disposition': `attachment; filename="ProspectAI_${safeName}.pdf"`,
         'Cache-Control': 'no-cache',
+        ...(fallbacks ? { 'X-PDF-Fallbacks': fallbacks } : {}),
       },
     });
   } catch (error) {
@@ -60,6 +72,13 @@ export async function POST(request: NextRequest) {
     await unlink(tmpInput).catch(() => {});
     await unlink(tmpOutput).catch(() => {});
 
+    if ((error as { code?: number }).code === BUDGET_EXCEEDED_EXIT_CODE) {
+      return new Response(
+        JSON.stringify({ error: 'PDF is too large to render within the time and memory budget' }),
+        { status: 503, headers: { 'Content-Type': 'application/json' } }
+      );
+    }
+
     const message = error instanceof Error ? error.message : 'PDF generation failed';
     return new Response(
       JSON.stringify({ error: message }),
@@ -6,7 +6,8 @@ import { useSession, signOut } from 'next-auth/react';
 import ReactMarkdown from 'react-markdown';
 import remarkGfm from 'remark-gfm';
 import { downloadProfile, type DownloadableProfile } from '@/lib/download-document';
-import { parseProfileForPDF } from '@/lib/pdf/parse-profile';
+import { buildMarkdownInput, parseProfileForPDF } from '@/lib/pdf/parse-profile';
+import type { SectionConfidence } from '@/lib/confidence';
 import MeetingGuideRenderer from '@/components/MeetingGuideRenderer';
 
 interface Source {
@@ -24,6 +25,7 @@ interface ProfileData {
   profile: { profile: string; status: string; validationPasses: number };
   meetingGuide?: string;
   meetingGuideHtml?: string;
+  dimensionCoverage?: SectionConfidence[];
 }
 
 type Tab = 'persuasion-profile' | 'meeting-guide' | 'sources';
@@ -65,6 +67,10 @@ export default function ProfilePage() {
         if (profile.seedUrlsJson) {
           try { setSeedUrls(JSON.parse(profile.seedUrlsJson)); } catch { /* ignore */ }
         }
+        let dimensionCoverage: SectionConfidence[] | undefined;
+        if (profile.dimensionCoverage) {
+          try { dimensionCoverage = JSON.parse(profile.dimensionCoverage); } catch { /* ignore */ }
+        }
         setData({
           research: {
             rawMarkdown: profile.researchPackageJson || '',
@@ -73,6 +79,7 @@ export default function ProfilePage() {
           researchProfile: { rawMarkdown: profile.profileMarkdown },
           profile: { profile: profile.profileMarkdown, status: 'complete', validationPasses: 0 },
           meetingGuide: profile.meetingGuideMarkdown || undefined,
+          dimensionCoverage,
         });
         setIsLoading(false);
         return;
@@ -144,18 +151,32 @@ export default function ProfilePage() {
     setIsDownloading(true);
     try {
       const sources = extractSources();
-      const profileData = parseProfileForPDF(
+      // Let the generator parse the markdown itself when it can (v3 guides)
+      const markdownInput = buildMarkdownInput(
         donorName,
         fundraiserName,
         data.researchProfile.rawMarkdown,
         data.meetingGuide,
-        sources
+        sources,
+        data.dimensionCoverage
       );
+      const body = markdownInput
+        ? { markdownInput }
+        : {
+            profileData: parseProfileForPDF(
+              donorName,
+              fundraiserName,
+              data.researchProfile.rawMarkdown,
+              data.meetingGuide,
+              sources,
+              data.dimensionCoverage
+            ),
+          };
 
       const response = await fetch('/api/generate-pdf', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ profileData }),
+        body: JSON.stringify(body),
       });
 
       if (!response.ok) {
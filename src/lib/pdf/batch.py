@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Distributed batch rendering over a shared work directory.
+
+A quarterly re-render of every profile is more than one machine gets
+through in a night. Here any number of worker nodes (processes, on one
+machine or many) take jobs from a directory they all mount, with no server
+in between; a coordinator requeues the jobs of nodes that died and writes
+the index at the end. Nodes can be started or stopped at any time.
+
+Layout of the work directory:
+
+  pending/<id>.<n>.json       a job: {"id", "markdown", "linearize", "payload"}, whose claims have
+                              expired n times
+  claimed/<id>.<n>.<node>.json  a job a node is rendering, under lease
+  done/<id>.json              {"id", "status": "ok", "sha256", "output", "bytes", "node", "ms", "features"}
+  failed/<id>.json            the job plus "attempts", "status" ('budget', 'predicted', 'error' or
+                              'expired') and "error"
+  out/<sha256>.pdf            outputs, named by content
+  tmp/                        files being written, renamed into place when complete
+  index.json                  every job's record, written by the coordinator when all are finished
+
+  - Claiming is a rename of pending/<id>.<n>.json into claimed/; rename is
+    atomic, so when several nodes go for the same job exactly one succeeds
+    and the others move on to the next.
+  - A claim is leased for LEASE_SECONDS from the last change of its file
+    (the rename, then a renewal every LEASE_SECONDS / 4: the node touches
+    it while it renders). A node that stops renewing, because it crashed
+    or lost the mount, loses its jobs: the coordinator, or any idle
+    worker, renames expired claims back to pending/<id>.<n + 1>.json. The
+    count is in the name so that requeueing is that one rename, and a node
+    dying halfway through it cannot lose the job. A job whose claims have
+    expired MAX_ATTEMPTS times is claimed once more only to be moved to
+    failed/. A node that finds its lease was taken away records nothing
+    for the job: it belongs to whoever claims it next.
+  - Renders are deterministic (see generator.generate_pdf), so a job
+    rendered twice, by a node whose lease expired while it was still
+    working and by the node that reclaimed it, produces the same bytes.
+    Outputs are written by content hash, once; done/ records are replaced
+    whole. Identical payloads share one output.
+  - Every file written appears by rename from tmp/, so readers never see a
+    partial job, record or PDF.
+
+Leases go by file times set on the file server, compared with each node's
+clock: keep clocks within a small fraction of LEASE_SECONDS of each other.
+On one machine a local directory is all it needs.
+
+index.json doubles as training data for the render cost model (see
+cost_model.py fit), and with --cost-model a node refuses jobs the model
+predicts will exceed --time-budget or --heap-budget (peak Python
+allocations, which the model predicts). --memory-budget limits RSS growth
+while rendering, which the model does not predict.
+
+Outputs are linearized ("fast web view", see linearize.py) when submitted
+with --linearize. It is a property of the job rather than of the node, so
+whichever node renders it writes the same bytes.
+
+Usage: python3 batch.py submit WORKDIR [--linearize] PAYLOAD.json [...]
+       python3 batch.py work WORKDIR [--node NAME] [--stay] [--lease S] [--time-budget S] [--memory-budget MIB]
+                             [--cost-model MODEL.json [--heap-budget MIB]]
+       python3 batch.py coordinate WORKDIR [--lease S]
+       python3 batch.py status WORKDIR
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import re
+import signal
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cost_model  # noqa: E402
+import generator  # noqa: E402
+from render_governor import RenderGovernor, RenderBudgetExceeded  # noqa: E402
+
+
+LEASE_SECONDS = 60
+MAX_ATTEMPTS = 3            # claims that may expire before a job is given up on
+POLL_SECONDS = 0.5          # idle workers and the coordinator look for work this often
+
+_DIRS = ('pending', 'claimed', 'done', 'failed', 'out', 'tmp')
+_UNSAFE = re.compile(r'[^A-Za-z0-9_-]+')
+
+
+def _log(message):
+    print(message, flush=True)
+
+
+def _name(text):
+    """text made safe for a file name without dots, which separate id and node."""
+    return _UNSAFE.sub('_', text).strip('_') or 'job'
+
+
+class WorkDir:
+    """The shared work directory; see the module docstring."""
+
+    def __init__(self, root, lease=LEASE_SECONDS):
+        """lease: seconds a claim lasts unrenewed; the same on every node."""
+        self.root = root
+        self.lease = lease
+        for name in _DIRS:
+            os.makedirs(os.path.join(root, name), exist_ok=True)
+
+    def path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def _write(self, path, data):
+        """Write data (bytes) to path by rename from tmp/."""
+        tmp = self.path('tmp', f'{os.path.basename(path)}.{socket.gethostname()}.{os.getpid()}.'
+                               f'{threading.get_ident()}')
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _write_json(self, path, record):
+        self._write(path, json.dumps(record, ensure_ascii=False).encode('utf-8'))
+
+    def _read_json(self, path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _ids(self, state):
+        return sorted(name.split('.', 1)[0] for name in os.listdir(self.path(state)) if name.endswith('.json'))
+
+    def _pending(self):
+        """(id, attempts) of every pending job, by id."""
+        return sorted((job_id, int(attempts)) for job_id, attempts, _ in
+                      (name.split('.') for name in os.listdir(self.path('pending')) if name.endswith('.json')))
+
+    def counts(self):
+        return {state: len(self._ids(state)) for state in ('pending', 'claimed', 'done', 'failed')}
+
+    def unfinished(self):
+        counts = self.counts()
+        return counts['pending'] + counts['claimed']
+
+    # ─── Jobs ─────────────────────────────────────────────────────────────────
+
+    def submit(self, job_id, payload, markdown=False, linearize=False):
+        """Queue payload as job_id, to be rendered linearized if asked.
+
+        Returns False if that id is already queued or finished.
+        """
+        job_id = _name(job_id)
+        generator.parse_input(payload, markdown)     # malformed payloads are refused here
+        if (any(os.path.exists(self.path(state, f'{job_id}.json')) for state in ('done', 'failed'))
+                or job_id in self._ids('pending') or job_id in self._ids('claimed')):
+            return False
+        self._write_json(self.path('pending', f'{job_id}.0.json'),
+                         {'id': job_id, 'markdown': markdown, 'linearize': linearize, 'payload': payload})
+        return True
+
+    def _take(self, job_id, attempts, node):
+        """Claim pending job_id for node. Returns (job, claim path), or None if another node got it first."""
+        claimed = self.path('claimed', f'{job_id}.{attempts}.{node}.json')
+        try:
+            os.rename(self.path('pending', f'{job_id}.{attempts}.json'), claimed)
+        except FileNotFoundError:
+            return None
+        os.utime(claimed)
+        return dict(self._read_json(claimed), attempts=attempts), claimed
+
+    def _give_up(self, job, claimed):
+        self.fail(job, claimed, 'expired', f'lease expired {job["attempts"]} times')
+
+    def claim(self, node):
+        """Claim the first pending job for node. Returns (job, claim path), or None if none is left."""
+        for job_id, attempts in self._pending():
+            taken = self._take(job_id, attempts, node)
+            if taken is None:
+                continue
+            job, claimed = taken
+            if os.path.exists(self.path('done', f'{job_id}.json')):
+                os.unlink(claimed)  # finished by a node whose lease had expired
+            elif attempts >= MAX_ATTEMPTS:
+                self._give_up(job, claimed)     # left by a node that died giving up on it
+            else:
+                return job, claimed
+        return None
+
+    def release(self, job, claimed):
+        """Give a claimed job back, e.g. when a node is stopped."""
+        with contextlib.suppress(FileNotFoundError):
+            os.rename(claimed, self.path('pending', f'{job["id"]}.{job["attempts"]}.json'))
+
+    def finish(self, job, claimed, pdf, node, ms, features=None):
+        """Record a rendered job: its output by content hash, then its done/ record.
+
+        The record's ms and features are what cost_model.py fits to."""
+        digest = hashlib.sha256(pdf).hexdigest()
+        output = self.path('out', f'{digest}.pdf')
+        if not os.path.exists(output):
+            self._write(output, pdf)
+        self._write_json(self.path('done', f'{job["id"]}.json'), {
+            'id': job['id'], 'status': 'ok', 'sha256': digest, 'output': os.path.relpath(output, self.root),
+            'bytes': len(pdf), 'node': node, 'ms': round(ms, 1), 'features': features,
+        })
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(claimed)
+
+    def fail(self, job, claimed, status, error, node=None):
+        """Move a job to failed/ with why."""
+        self._write_json(self.path('failed', f'{job["id"]}.json'),
+                         dict(job, status=status, error=error, node=node))
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(claimed)
+
+    def reclaim(self):
+        """Requeue claims whose lease has expired. Returns the ids requeued or failed."""
+        reclaimed = []
+        now = time.time()
+        for name in os.listdir(self.path('claimed')):
+            claimed = self.path('claimed', name)
+            try:
+                st = os.stat(claimed)
+            except FileNotFoundError:
+                continue
+            if now - max(st.st_mtime, st.st_ctime) < self.lease:
+                continue
+            job_id, attempts, _ = name.split('.', 2)
+            attempts = int(attempts) + 1
+            # One rename: exactly one node requeues it, and it is never anywhere else in between
+            try:
+                os.rename(claimed, self.path('pending', f'{job_id}.{attempts}.json'))
+            except FileNotFoundError:
+                continue
+            if attempts >= MAX_ATTEMPTS:
+                taken = self._take(job_id, attempts, 'reclaim')
+                if taken:
+                    self._give_up(*taken)
+            reclaimed.append(job_id)
+        return reclaimed
+
+    def write_index(self):
+        """index.json: every finished job's record, by id. Returns it."""
+        index = {}
+        for state in ('done', 'failed'):
+            for job_id in self._ids(state):
+                record = self._read_json(self.path(state, f'{job_id}.json'))
+                record.pop('payload', None)
+                index[job_id] = record
+        self._write_json(self.path('index.json'), index)
+        return index
+
+
+# ─── Nodes ────────────────────────────────────────────────────────────────────
+
+class _Lease:
+    """Renews a claim while its job renders; .lost is set if it was taken away."""
+
+    def __init__(self, claimed, lease):
+        self.claimed = claimed
+        self.interval = lease / 4
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                os.utime(self.claimed)
+            except FileNotFoundError:
+                self.lost = True
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        # taken away since the last renewal
+        self.lost = self.lost or not os.path.exists(self.claimed)
+
+
+def render_job(job, time_budget=None, memory_budget=None, model=None, heap_budget=None):
+    """(PDF bytes, cost_model features) for a job; raises RenderBudgetExceeded past a budget.
+
+    With a CostModel, a job predicted to exceed time_budget or heap_budget
+    (bytes of peak Python allocations) raises PredictedOverBudget without
+    being rendered.
+    """
+    data = generator.parse_input(job['payload'], job['markdown'])
+    if model:
+        model.check(data, time_budget, heap_budget)
+    governor = None
+    if time_budget or memory_budget:
+        governor = RenderGovernor(time_budget=time_budget, memory_budget=memory_budget)
+    with contextlib.redirect_stdout(io.StringIO()):
+        pdf = generator.render_to_bytes(data, deterministic=True, governor=governor,
+                                        markdown=job['markdown'], linearize=job.get('linearize', False))
+    return pdf, cost_model.features(data)
+
+
+def work(workdir, node=None, stay=False, time_budget=None, memory_budget=None, model=None, log=_log,
+         heap_budget=None):
+    """Claim and render jobs until none are left (or, with stay, until stopped).
+
+    An idle node also requeues expired claims, so work continues while the
+    coordinator is down. Stopping a node (SIGTERM, Ctrl-C) gives its
+    current job back. With a CostModel, jobs predicted to exceed a budget
+    fail as 'predicted' without rendering. A job whose lease this node lost
+    is left to the node that has it now, unless this node rendered it.
+    Returns the number of jobs this node finished.
+    """
+    node = _name(node or f'{socket.gethostname()}-{os.getpid()}')
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator.ensure_fonts()
+    finished = 0
+    while True:
+        claim = workdir.claim(node)
+        if claim is None:
+            workdir.reclaim()
+            if not stay and not workdir.unfinished():
+                return finished
+            time.sleep(POLL_SECONDS)
+            continue
+
+        job, claimed = claim
+        try:
+            with _Lease(claimed, workdir.lease) as lease:
+                t = time.perf_counter()
+                pdf, feats = render_job(job, time_budget, memory_budget, model, heap_budget)
+                ms = (time.perf_counter() - t) * 1000
+        except RenderBudgetExceeded as e:
+            if not lease.lost:
+                status = 'predicted' if isinstance(e, cost_model.PredictedOverBudget) else 'budget'
+                workdir.fail(job, claimed, status, str(e), node)
+            log(f'[PDF] {job["id"]}: {e}{" (lease had expired, not recorded)" if lease.lost else ""}')
+            continue
+        except Exception as e:     # recorded, not fatal: the next job still runs
+            if not lease.lost:
+                workdir.fail(job, claimed, 'error', f'{type(e).__name__}: {e}', node)
+            log(f'[PDF] {job["id"]} failed: {e}{" (lease had expired, not recorded)" if lease.lost else ""}')
+            continue
+        except BaseException:
+            workdir.release(job, claimed)
+            raise
+        workdir.finish(job, claimed, pdf, node, ms, feats)
+        finished += 1
+        log(f'[PDF] {job["id"]} {ms:.0f} ms{" (lease had expired)" if lease.lost else ""}')
+
+
+def coordinate(workdir, log=_log):
+    """Requeue expired claims and report progress until every job is finished; then write index.json."""
+    last = None
+    while True:
+        for job_id in workdir.reclaim():
+            log(f'[PDF] {job_id}: lease expired, requeued')
+        counts = workdir.counts()
+        if counts != last:
+            log('[PDF] ' + ', '.join(f'{state} {n}' for state, n in counts.items()))
+            last = counts
+        if not counts['pending'] and not counts['claimed']:
+            break
+        time.sleep(POLL_SECONDS)
+    index = workdir.write_index()
+    log(f'[PDF] index.json: {len(index)} jobs')
+    return index
+
+
+def _stop_on_sigterm():
+    # SystemExit unwinds work(), which gives the current job back
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Render PDFs on several nodes from a shared work directory.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    submit = commands.add_parser('submit', help='queue payloads (job ids are the file names)')
+    submit.add_argument('workdir')
+    submit.add_argument('--linearize', action='store_true', help='render these jobs linearized ("fast web view")')
+    submit.add_argument('payloads', nargs='+', metavar='PAYLOAD.json',
+                        help='PDFProfileData, or markdown input (detected by profileMarkdown)')
+    worker = commands.add_parser('work', help='claim and render jobs')
+    worker.add_argument('workdir')
+    worker.add_argument('--node', help='node name (default: host-pid)')
+    worker.add_argument('--stay', action='store_true', help='keep waiting for new jobs when the queue is empty')
+    worker.add_argument('--time-budget', type=float, metavar='SECONDS', help='per-job wall-time budget')
+    worker.add_argument('--memory-budget', type=float, metavar='MIB', help='per-job RSS growth budget')
+    worker.add_argument('--cost-model', metavar='MODEL.json',
+                        help='refuse jobs this model predicts will exceed --time-budget or --heap-budget '
+                             '(see cost_model.py)')
+    worker.add_argument('--heap-budget', type=float, metavar='MIB',
+                        help='refuse jobs the cost model predicts will allocate more than this at peak')
+    coordinator = commands.add_parser('coordinate', help='requeue expired leases, then write index.json')
+    coordinator.add_argument('workdir')
+    status = commands.add_parser('status', help='print job counts')
+    status.add_argument('workdir')
+    for command in (worker, coordinator):
+        command.add_argument('--lease', type=float, default=LEASE_SECONDS, metavar='SECONDS',
+                             help='claim lease, the same on every node (default: %(default)s)')
+    args = parser.parse_args()
+    if getattr(args, 'heap_budget', None) and not args.cost_model:
+        parser.error('--heap-budget needs --cost-model')
+
+    workdir = WorkDir(args.workdir, getattr(args, 'lease', LEASE_SECONDS))
+    if args.command == 'submit':
+        queued = 0
+        for path in args.payloads:
+            with open(path) as f:
+                payload = json.load(f)
+            job_id = os.path.splitext(os.path.basename(path))[0]
+            try:
+                queued += workdir.submit(job_id, payload, markdown='profileMarkdown' in payload,
+                                         linearize=args.linearize)
+            except ValueError as e:
+                print(f'[PDF] {path}: {e}', file=sys.stderr)
+        print(f'[PDF] queued {queued} of {len(args.payloads)}')
+    elif args.command == 'work':
+        _stop_on_sigterm()
+        with contextlib.suppress(KeyboardInterrupt):
+            n = work(workdir, args.node, args.stay, args.time_budget,
+                     args.memory_budget * 2**20 if args.memory_budget else None,
+                     cost_model.CostModel.load(args.cost_model) if args.cost_model else None,
+                     heap_budget=args.heap_budget * 2**20 if args.heap_budget else None)
+            print(f'[PDF] rendered {n} jobs')
+    elif args.command == 'coordinate':
+        coordinate(workdir)
+    else:
+        print(json.dumps(workdir.counts()))
@@ -0,0 +1,979 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the PDF generator.
+
+Runs in-process against a synthetic corpus shaped like PDFProfileData, so
+numbers are comparable between machines and commits.
+
+Usage: python3 bench.py <benchmark> [--runs N]
+       python3 bench.py --list
+"""
+
+import argparse
+import concurrent.futures
+import contextlib
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from reportlab import rl_config
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import flate  # noqa: E402
+import font_subsets  # noqa: E402
+import generator  # noqa: E402
+import text_metrics  # noqa: E402
+
+
+# ─── Synthetic corpus ─────────────────────────────────────────────────────────
+
+_WORDS = (
+    'strategic donor meeting evidence pattern builder philanthropy network capital '
+    'decision trust signal institutional board civic leverage narrative commitment '
+    'democracy organizing community funding outcome relationship accountability'
+).split()
+
+
+def _sentence(rng, n):
+    return ' '.join(rng.choice(_WORDS) for _ in range(n)).capitalize() + '.'
+
+
+def _paragraph(rng, n):
+    return ' '.join(_sentence(rng, rng.randint(8, 20)) for _ in range(n))
+
+
+def synthetic_payload(sections=7, beats=5, sources=60, legacy=False, seed=0, name='Craig Newmark'):
+    """A deterministic PDFProfileData-shaped payload of the requested size."""
+    rng = random.Random(seed)
+    profile_sections = []
+    for i in range(sections):
+        paragraphs = []
+        for _ in range(5):
+            ptype = rng.choice(['text', 'text', 'insight', 'bold', 'bullet'])
+            content = _paragraph(rng, 3 if ptype == 'text' else 1)
+            if ptype == 'text':
+                content = '**Key:** ' + content
+            paragraphs.append({'type': ptype, 'content': content})
+        profile_sections.append({'title': f'{i + 1}. {_sentence(rng, 3)}', 'paragraphs': paragraphs})
+
+    if legacy:
+        meeting_guide = {
+            'format': 'legacy', 'donorName': name,
+            'donorRead': {'posture': _sentence(rng, 8), 'body': [_paragraph(rng, 3), _paragraph(rng, 2)]},
+            'lightsUp': [{'title': _sentence(rng, 3), 'body': _paragraph(rng, 2)} for _ in range(3)],
+            'shutsDown': [_sentence(rng, 8) for _ in range(4)],
+            'alignmentMap': {
+                'primary': {'title': _sentence(rng, 3), 'body': _paragraph(rng, 2)},
+                'secondary': [{'title': _sentence(rng, 2), 'body': _paragraph(rng, 1)}],
+                'fightOrBuild': _paragraph(rng, 1), 'handsOnWheel': _paragraph(rng, 1),
+                'fiveMinCollapse': _paragraph(rng, 1),
+            },
+            'meetingArc': {'intro': _paragraph(rng, 1), 'moves': [
+                {'number': str(k + 1), 'title': _sentence(rng, 3),
+                 'moveText': _paragraph(rng, 2), 'readText': _paragraph(rng, 1)}
+                for k in range(beats)
+            ]},
+            'readingRoom': {'working': [_sentence(rng, 5) for _ in range(4)],
+                            'stalling': [_sentence(rng, 5) for _ in range(3)]},
+            'resetMoves': [_sentence(rng, 8) for _ in range(3)],
+        }
+    else:
+        meeting_guide = {
+            'format': 'v3', 'donorName': name,
+            'setupGroups': [{'heading': _sentence(rng, 2), 'bullets': [_sentence(rng, 10) for _ in range(3)]}
+                            for _ in range(3)],
+            'beats': [{
+                'number': str(k + 1), 'title': _sentence(rng, 3), 'goal': _sentence(rng, 8),
+                'start': _paragraph(rng, 2), 'stay': _paragraph(rng, 2) + '\n\n' + _paragraph(rng, 2),
+                'stallingText': "When it's stalling: " + _sentence(rng, 10), 'continue': _paragraph(rng, 1),
+            } for k in range(beats)],
+            'tripwires': [{'name': _sentence(rng, 2), 'tell': _sentence(rng, 8), 'recovery': _sentence(rng, 10)}
+                          for _ in range(3)],
+            'oneLine': _sentence(rng, 15),
+        }
+
+    return {
+        'donorName': name,
+        'preparedFor': 'Jane Doe',
+        'date': 'October 19, 2026',
+        'sourceCount': sources,
+        'persuasionProfile': {'sections': profile_sections},
+        'meetingGuide': meeting_guide,
+        'sources': [{'url': f'https://www.example{k}.org/article/{k}', 'title': _sentence(rng, 6)}
+                    for k in range(sources)],
+    }
+
+
+# ─── Helpers ──────────────────────────────────────────────────────────────────
+
+def _timed(fn, runs):
+    """Median wall time in ms over runs (after one warm-up), and the last result."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn()
+        times = []
+        for _ in range(runs):
+            t = time.perf_counter()
+            result = fn()
+            times.append((time.perf_counter() - t) * 1000)
+    return statistics.median(times), result
+
+
+# ─── Benchmarks ───────────────────────────────────────────────────────────────
+
+def bench_patch_cover(args, tmp):
+    """Cover-only incremental update vs a full re-render."""
+    data = synthetic_payload(sections=12, beats=8, sources=120)
+    original = os.path.join(tmp, 'original.pdf')
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator.generate_pdf(data, original)
+    original_size = os.path.getsize(original)
+
+    updated = dict(data, preparedFor='Alex Rivera', date='November 2, 2026', sourceCount=121)
+    full_ms, _ = _timed(lambda: generator.generate_pdf(updated, os.path.join(tmp, 'full.pdf')), args.runs)
+    patch_ms, appended = _timed(
+        lambda: generator.patch_cover(updated, original, os.path.join(tmp, 'patched.pdf')), args.runs)
+    full_size = os.path.getsize(os.path.join(tmp, 'full.pdf'))
+
+    print(f'full re-render   {full_ms:8.1f} ms   {full_size:>8} bytes written')
+    print(f'cover patch      {patch_ms:8.1f} ms   {appended:>8} bytes appended '
+          f'({original_size + appended} total)')
+    print(f'speedup          {full_ms / patch_ms:8.1f}x   {appended / full_size:8.1%} of the bytes')
+
+
+def bench_stamp(args, tmp):
+    """Per-recipient copies: a full render each vs one layout plus a stamp each."""
+    data = synthetic_payload(sections=12, beats=8, sources=120)
+    recipients = [f'Fundraiser {i}' for i in range(args.recipients)]
+
+    def full():
+        return [generator.render_to_bytes(dict(data, preparedFor=name)) for name in recipients]
+
+    full_ms, pdfs = _timed(full, args.runs)
+    stamped_ms, copies = _timed(lambda: generator.render_for_recipients(data, recipients), args.runs)
+    layout_ms, _ = _timed(lambda: generator.render_for_recipients(data, []), args.runs)
+    per_copy = (stamped_ms - layout_ms) / len(recipients)
+
+    full_size = sum(len(pdf) for pdf in pdfs) / len(pdfs)
+    copy_size = sum(len(pdf) for pdf in copies.values()) / len(copies)
+    print(f'{len(recipients)} recipients')
+    print(f'full render each   {full_ms:8.1f} ms   {full_size:>9.0f} bytes per copy')
+    print(f'layout once        {layout_ms:8.1f} ms')
+    print(f'  + stamp each     {per_copy:8.1f} ms per copy   {copy_size:>9.0f} bytes per copy')
+    print(f'speedup            {full_ms / stamped_ms:8.1f}x')
+
+
+def _list_story(items, kind, styles):
+    """A sources-style or bullet list of items, as build_sources / _bullet_list would build it."""
+    if kind == 'bullets':
+        return generator._bullet_list(items, '\u2022', styles['bullet'])
+    return generator.build_sources(generator.parse_input({'donorName': '', 'sources': items}), styles)
+
+
+def _layout_list(story):
+    """Lay out and draw story in the content frame, without page decorations."""
+    buf = io.BytesIO()
+    doc = generator.SimpleDocTemplate(buf, pagesize=generator.letter, leftMargin=generator.MARGIN,
+                                      rightMargin=generator.MARGIN, topMargin=generator.MARGIN + 10,
+                                      bottomMargin=generator.MARGIN + 10)
+    doc.build(story)
+    return buf.getvalue()
+
+
+def bench_fastlist(args, tmp):
+    """FastList vs Platypus paragraphs for the sources list and long bullet lists."""
+    styles = generator.make_styles(generator.ensure_fonts())
+    rng = random.Random(0)
+    fast_block = generator.fast_block
+
+    def platypus(fn):
+        generator.fast_block = lambda runs, style: None
+        try:
+            return fn()
+        finally:
+            generator.fast_block = fast_block
+
+    data = synthetic_payload(sections=12, beats=8, sources=120)
+    fast_ms, _ = _timed(lambda: generator.render_to_bytes(data), args.runs)
+    slow_ms, _ = platypus(lambda: _timed(lambda: generator.render_to_bytes(data), args.runs))
+    print(f'{"":24} {"platypus":>10} {"fast path":>10} {"speedup":>8}')
+    print(f'{"full render, 50 sources":24} {slow_ms:7.1f} ms {fast_ms:7.1f} ms {slow_ms / fast_ms:7.2f}x')
+
+    # build_sources shows at most 50 entries, so long lists are timed at the flowable level
+    for kind, n in (('sources', 50), ('bullets', 200), ('bullets', 1000), ('bullets', 5000)):
+        if kind == 'sources':
+            items = data['sources'][:n]
+        else:
+            items = [_sentence(rng, rng.randint(6, 40)) for _ in range(n)]
+        fast_ms, _ = _timed(lambda: _layout_list(_list_story(items, kind, styles)), args.runs)
+        slow_ms, _ = platypus(lambda: _timed(lambda: _layout_list(_list_story(items, kind, styles)), args.runs))
+        print(f'{f"{n} {kind}":24} {slow_ms:7.1f} ms {fast_ms:7.1f} ms {slow_ms / fast_ms:7.2f}x')
+
+
+def _gradient_per_page(canvas, x, y, width, height):
+    """draw_gradient_bar as it was before the form XObject: 200 strips on every page."""
+    steps = 200
+    sw = width / steps
+    for i in range(steps):
+        canvas.setFillColor(generator._interpolate_gradient(i / steps, generator.GRADIENT_STOPS))
+        canvas.rect(x + i * sw, y, sw + 0.5, height, stroke=0, fill=1)
+
+
+def bench_canvas(args, tmp):
+    """Content stream size and write time, with and without redundant state/gradient operators."""
+    StateCanvas = generator.StateCanvas
+    gradient, save = generator.draw_gradient_bar, StateCanvas.save
+    save_ms = []
+
+    def timed_save(canv):
+        t = time.perf_counter()
+        save(canv)
+        save_ms.append((time.perf_counter() - t) * 1000)
+
+    def measure(data, lean):
+        StateCanvas.track = lean
+        generator.draw_gradient_bar = gradient if lean else _gradient_per_page
+        try:
+            rl_config.pageCompression = 0
+            raw = len(generator.render_to_bytes(data))
+            rl_config.pageCompression = 1
+            del save_ms[:]
+            render_ms, pdf = _timed(lambda: generator.render_to_bytes(data), args.runs)
+            return raw, len(pdf), render_ms, statistics.median(save_ms)
+        finally:
+            StateCanvas.track = True
+            generator.draw_gradient_bar = gradient
+            rl_config.pageCompression = 1
+
+    StateCanvas.save = timed_save
+    try:
+        print(f'{"":22} {"uncompressed":>22} {"compressed":>20} {"render":>18} {"save":>16}')
+        for label, data in (('v3, 60 sources', synthetic_payload()),
+                            ('legacy, 60 sources', synthetic_payload(legacy=True)),
+                            ('v3, 12 sections', synthetic_payload(sections=12, beats=8, sources=120))):
+            before, after = measure(data, False), measure(data, True)
+            print(f'{label:22} {before[0]:>9} -> {after[0]:>9} {before[1]:>8} -> {after[1]:>8} '
+                  f'{before[2]:6.1f} -> {after[2]:6.1f} ms {before[3]:5.1f} -> {after[3]:5.1f} ms')
+    finally:
+        StateCanvas.save = save
+
+
+def bench_flate(args, tmp):
+    """Stream compression at save: serial vs flate's thread pool, per level (output must match)."""
+    StateCanvas = generator.StateCanvas
+    save, save_ms = StateCanvas.save, []
+
+    def timed_save(canv):
+        t = time.perf_counter()
+        save(canv)
+        save_ms.append((time.perf_counter() - t) * 1000)
+
+    def measure(data, level, parallel):
+        StateCanvas.compress_level, StateCanvas.parallel_flate = level, parallel
+        del save_ms[:]
+        render_ms, pdf = _timed(lambda: generator.render_to_bytes(data, deterministic=True), args.runs)
+        return render_ms, statistics.median(save_ms), pdf
+
+    data = oversized_payload(4)
+    StateCanvas.save = timed_save
+    try:
+        print(f'{flate.WORKERS} compression threads, {os.cpu_count()} CPUs, '
+              f'streams >= {flate.MIN_PARALLEL} bytes go to the pool')
+        print(f'{"level":>5} {"size":>9} {"save, serial":>14} {"save, pool":>12} {"render":>20}  identical')
+        for level in (1, 6, 9):
+            serial_ms, serial_save, serial = measure(data, level, False)
+            pool_ms, pool_save, pooled = measure(data, level, True)
+            print(f'{level:>5} {len(pooled):>9} {serial_save:11.1f} ms {pool_save:9.1f} ms '
+                  f'{serial_ms:7.1f} -> {pool_ms:7.1f} ms  {serial == pooled}')
+    finally:
+        StateCanvas.save = save
+        StateCanvas.compress_level, StateCanvas.parallel_flate = None, True
+
+
+class _Sink:
+    """Binary output that discards what it is given, noting when the first bytes came."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.first = None
+        self.size = 0
+
+    def write(self, data):
+        if self.first is None:
+            self.first = time.perf_counter()
+        self.size += len(data)
+
+
+def _peak_mib(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def bench_incremental(args, tmp):
+    """Whole-file save vs writing each page as it is finished: first byte, total time, peak memory."""
+    print(f'{"":16} {"pages":>5} {"first byte":>20} {"total":>20} {"peak traced memory":>24}')
+    for sections in (7, 40, 120):
+        data = synthetic_payload(sections=sections, beats=8, sources=60)
+        pages = _page_count(generator.render_to_bytes(data))
+        whole_ms, _ = _timed(lambda: generator.render_to_bytes(data), args.runs)
+
+        def streamed():
+            sink = _Sink()
+            generator.stream_pdf(data, sink)
+            return (sink.first - sink.start) * 1000
+
+        stream_ms, first_ms = _timed(streamed, args.runs)
+        with contextlib.redirect_stdout(io.StringIO()):
+            whole_mib = _peak_mib(lambda: generator.render_to_bytes(data))
+            stream_mib = _peak_mib(lambda: generator.stream_pdf(data, _Sink()))
+        print(f'{f"{sections} sections":16} {pages:>5} {whole_ms:7.0f} -> {first_ms:6.0f} ms '
+              f'{whole_ms:7.0f} -> {stream_ms:6.0f} ms {whole_mib:9.1f} -> {stream_mib:5.1f} MiB')
+
+
+def bench_preview(args, tmp):
+    """Preview (cover + first content pages) vs full render: latency and page-estimate error."""
+    from preview import Preview
+    print(f'{"":22} {"full":>10} {"preview":>10} {"pages":>6} {"estimate":>9}')
+    for name, data in (('v3, 7 sections', synthetic_payload()),
+                       ('legacy, 7 sections', synthetic_payload(legacy=True)),
+                       ('v3, 15 sections', synthetic_payload(sections=15, beats=8, sources=120)),
+                       ('v3, 30 sections', synthetic_payload(sections=30, beats=8, sources=120))):
+        full_ms, pdf = _timed(lambda: generator.render_to_bytes(data), args.runs)
+        previews = []
+
+        def preview():
+            previews.append(Preview())
+            return generator.render_to_bytes(data, preview=previews[-1])
+
+        preview_ms, _ = _timed(preview, args.runs)
+        print(f'{name:22} {full_ms:7.1f} ms {preview_ms:7.1f} ms {_page_count(pdf):>6} '
+              f'{previews[-1].estimated_pages:>9}')
+
+
+def _cold_render_ms(draft):
+    """Wall time of a first render in a fresh process, font setup included."""
+    code = ('import sys, time; sys.path.insert(0, {here!r}); import bench, generator; '
+            'data = bench.synthetic_payload(); t = time.perf_counter(); '
+            'generator.render_to_bytes(data, draft={draft}); '
+            'print((time.perf_counter() - t) * 1000, file=sys.stderr)')
+    result = subprocess.run([sys.executable, '-c', code.format(here=os.path.dirname(os.path.abspath(__file__)),
+                                                              draft=draft)],
+                            capture_output=True, text=True, check=True)
+    return float(result.stderr.split()[-1])
+
+
+def bench_draft(args, tmp):
+    """Draft (base-14 fonts, no gradients or glows) vs branded renders: time and size."""
+    print(f'{"":20} {"branded":>21} {"draft":>21} {"pages":>9}')
+    for name, data in (('v3, 7 sections', synthetic_payload()),
+                       ('legacy, 7 sections', synthetic_payload(legacy=True)),
+                       ('v3, 30 sections', synthetic_payload(sections=30, beats=8, sources=120)),
+                       ('mixed script', mixed_script_payload())):
+        branded_ms, branded = _timed(lambda: generator.render_to_bytes(data), args.runs)
+        draft_ms, draft = _timed(lambda: generator.render_to_bytes(data, draft=True), args.runs)
+        print(f'{name:20} {branded_ms:7.1f} ms {len(branded):>7} B {draft_ms:7.1f} ms {len(draft):>7} B '
+              f'{_page_count(branded):>4} {_page_count(draft):>4}')
+    branded_cold = statistics.median(_cold_render_ms(False) for _ in range(3))
+    draft_cold = statistics.median(_cold_render_ms(True) for _ in range(3))
+    print(f'first render in a fresh process: branded {branded_cold:.0f} ms, draft {draft_cold:.0f} ms')
+
+
+def _ttfonts():
+    fonts = (generator.pdfmetrics.getFont(name) for name in generator.pdfmetrics.getRegisteredFontNames())
+    return [font for font in fonts if isinstance(font, generator.TTFont)]
+
+
+def _set_reused_subsets(enabled):
+    """Switch font_subsets on or off for every registered TTFont (fresh caches when on)."""
+    for font in _ttfonts():
+        font_subsets.uninstall(font)
+        if enabled:
+            font_subsets.install(font)
+
+
+def bench_subsets(args, tmp):
+    """Font subsets built per render vs seeded and reused (font_subsets): time, size, hits."""
+    generator.ensure_fonts()
+    quoted = synthetic_payload(seed=3)
+    for section in quoted['persuasionProfile']['sections']:
+        for para in section['paragraphs']:
+            para['content'] = f'\u201c{para["content"]}\u201d \u2014 it\u2019s\u2026'
+    corpus = (('ASCII + template', synthetic_payload()), ('curly quotes', quoted),
+              ('mixed script', mixed_script_payload()))
+
+    print(f'{"":18} {"render":>22} {"size":>26} {"subset hits":>12}')
+    try:
+        for name, data in corpus:
+            _set_reused_subsets(False)
+            base_ms, base = _timed(lambda: generator.render_to_bytes(data), args.runs)
+            _set_reused_subsets(True)
+            ms, pdf = _timed(lambda: generator.render_to_bytes(data), args.runs)
+            caches = {id(font.face): font.face.makeSubset for font in _ttfonts()}.values()
+            hits = sum(cache.hits for cache in caches)
+            calls = hits + sum(cache.misses for cache in caches)
+            print(f'{name:18} {base_ms:7.1f} -> {ms:6.1f} ms {len(base):>9} -> {len(pdf):>7} bytes '
+                  f'{hits:>5}/{calls}')
+    finally:
+        _set_reused_subsets(True)
+
+
+def _set_fast_widths(enabled):
+    """Switch text_metrics on or off for every registered TTFont (fresh caches when on)."""
+    for name in generator.pdfmetrics.getRegisteredFontNames():
+        font = generator.pdfmetrics.getFont(name)
+        text_metrics.decelerate(font)
+        if enabled:
+            text_metrics.accelerate(font)
+
+
+def _wrap_all(stories):
+    for story in stories:
+        for flowable in story:
+            flowable.wrap(generator.CONTENT_WIDTH, generator.PAGE_HEIGHT)
+
+
+def bench_metrics(args, tmp):
+    """Wrap time of the benchmark corpus with ReportLab's TTF widths vs text_metrics tables."""
+    styles = generator.make_styles(generator.ensure_fonts())
+    corpus = [synthetic_payload(seed=i, legacy=i % 3 == 0) for i in range(8)]
+    corpus.append(synthetic_payload(sections=12, beats=8, sources=120))
+    stories = [generator.build_story(data, styles) for data in corpus]
+    paragraphs = sum(isinstance(f, generator.Paragraph) for story in stories for f in story)
+
+    def cold():
+        _set_fast_widths(True)
+        _wrap_all(stories)
+
+    try:
+        _set_fast_widths(False)
+        base_ms, _ = _timed(lambda: _wrap_all(stories), args.runs)
+        render_base_ms, _ = _timed(lambda: generator.render_to_bytes(corpus[-1]), args.runs)
+        cold_ms, _ = _timed(cold, args.runs)
+        _set_fast_widths(True)
+        warm_ms, _ = _timed(lambda: _wrap_all(stories), args.runs)
+        render_ms, _ = _timed(lambda: generator.render_to_bytes(corpus[-1]), args.runs)
+    finally:
+        _set_fast_widths(True)
+
+    print(f'{len(corpus)} payloads, {paragraphs} paragraphs wrapped at {generator.CONTENT_WIDTH:.0f} pt')
+    print(f'wrap, ReportLab widths    {base_ms:8.1f} ms')
+    print(f'wrap, tables, cold cache  {cold_ms:8.1f} ms   {base_ms / cold_ms:5.2f}x')
+    print(f'wrap, tables, warm cache  {warm_ms:8.1f} ms   {base_ms / warm_ms:5.2f}x')
+    print(f'full render (largest)     {render_base_ms:8.1f} ms -> {render_ms:.1f} ms')
+
+
+def _render_digest(data):
+    return hashlib.sha256(generator.render_to_bytes(data, deterministic=True)).hexdigest()
+
+
+def bench_threads(args, tmp):
+    """render_to_bytes throughput on 1-16 threads (and processes, for contrast)."""
+    corpus = [synthetic_payload(seed=i, legacy=i % 3 == 0) for i in range(32)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = [_render_digest(d) for d in corpus]   # serial reference; also warms fonts
+
+    print(f'{len(corpus)} renders per run, {os.cpu_count()} CPUs')
+    print(f'{"workers":>8} {"threads r/s":>12} {"speedup":>8} {"identical":>10} {"procs r/s":>10} {"speedup":>8}')
+    base_threads = base_procs = None
+    for workers in (1, 2, 4, 8, 16):
+        with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+            t = time.perf_counter()
+            digests = list(pool.map(_render_digest, corpus))
+            thread_rate = len(corpus) / (time.perf_counter() - t)
+        with contextlib.redirect_stdout(io.StringIO()), \
+                concurrent.futures.ProcessPoolExecutor(workers) as pool:
+            list(pool.map(_render_digest, corpus[:workers]))   # spawn + font registration
+            t = time.perf_counter()
+            list(pool.map(_render_digest, corpus))
+            proc_rate = len(corpus) / (time.perf_counter() - t)
+        base_threads = base_threads or thread_rate
+        base_procs = base_procs or proc_rate
+        print(f'{workers:>8} {thread_rate:>12.1f} {thread_rate / base_threads:>7.2f}x '
+              f'{"yes" if digests == expected else "NO":>10} {proc_rate:>10.1f} {proc_rate / base_procs:>7.2f}x')
+
+
+def _retained_kib(make, copies=20):
+    """Memory held per object while copies of make() are alive, in KiB."""
+    tracemalloc.start()
+    held = [make() for _ in range(copies)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return size / copies / 1024
+
+
+def bench_input(args, tmp):
+    """Payloads queued as JSON dicts vs parsed ProfileData: memory per job, parse and story-build time."""
+    styles = generator.make_styles(generator.ensure_fonts())
+    print(f'{"":20} {"dict":>9} {"model":>9} {"parse":>8} {"story from dict":>16} {"from model":>11}')
+    for name, data in (('v3, 7 sections', synthetic_payload()),
+                       ('legacy, 7 sections', synthetic_payload(legacy=True)),
+                       ('v3, 30 sections', synthetic_payload(sections=30, beats=8, sources=120))):
+        body = json.dumps(data)
+        dict_kib = _retained_kib(lambda: json.loads(body))
+        model_kib = _retained_kib(lambda: generator.parse_input(json.loads(body)))
+        parse_ms, model = _timed(lambda: generator.parse_input(data), args.runs * 10)
+        dict_ms, _ = _timed(lambda: generator.build_story(data, styles), args.runs * 10)
+        model_ms, _ = _timed(lambda: generator.build_story(model, styles), args.runs * 10)
+        print(f'{name:20} {dict_kib:5.1f} KiB {model_kib:5.1f} KiB {parse_ms:5.2f} ms '
+              f'{dict_ms:13.2f} ms {model_ms:8.2f} ms')
+
+
+def _batch_nodes(workdir, count, lease):
+    here = os.path.dirname(os.path.abspath(__file__))
+    return [subprocess.Popen([sys.executable, os.path.join(here, 'batch.py'), 'work', workdir, '--node', f'n{i}',
+                              '--lease', str(lease)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            for i in range(count)]
+
+
+def bench_distributed(args, tmp):
+    """batch.py nodes on a shared work directory: throughput by node count, and a node killed mid-run."""
+    import batch
+    corpus = [synthetic_payload(seed=i, legacy=i % 3 == 0) for i in range(24)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = {f'j{i:02d}': _render_digest(data) for i, data in enumerate(corpus)}
+
+    def run(nodes, kill_after=None, lease=batch.LEASE_SECONDS):
+        workdir = batch.WorkDir(tempfile.mkdtemp(dir=tmp), lease)
+        for job_id, data in zip(expected, corpus):
+            workdir.submit(job_id, data)
+        t = time.perf_counter()
+        procs = _batch_nodes(workdir.root, nodes, lease)
+        if kill_after:
+            time.sleep(kill_after)
+            procs[0].kill()
+        with contextlib.redirect_stdout(io.StringIO()):
+            index = batch.coordinate(workdir)
+        for proc in procs:
+            proc.wait()
+        wall = time.perf_counter() - t
+        ok = all(index[job_id].get('sha256') == digest for job_id, digest in expected.items())
+        return len(corpus) / wall, ok
+
+    print(f'{len(corpus)} jobs, {os.cpu_count()} CPUs')
+    print(f'{"nodes":>6} {"jobs/s":>8} {"outputs match":>14}')
+    for nodes in (1, 2, 4):
+        rate, ok = run(nodes)
+        print(f'{nodes:>6} {rate:>8.1f} {"yes" if ok else "NO":>14}')
+    rate, ok = run(2, kill_after=1.5, lease=2)
+    print(f'2 nodes, one killed after 1.5 s (2 s lease): {rate:.1f} jobs/s, outputs match: {"yes" if ok else "NO"}')
+
+
+def _varied_payload(seed):
+    """A payload with random section, beat and source counts and text length, sometimes legacy,
+    with charts, or as markdown input. Returns (payload, markdown)."""
+    rng = random.Random(seed)
+    data = synthetic_payload(sections=rng.randint(2, 30), beats=rng.randint(1, 12),
+                             sources=rng.choice((0, 5, 20, 60, 120)), legacy=rng.random() < 0.3, seed=seed)
+    scale = rng.choice((0.3, 0.6, 1, 1, 2, 3))
+    for section in data['persuasionProfile']['sections']:
+        for para in section['paragraphs']:
+            words = para['content'].split()
+            para['content'] = ' '.join(words * int(scale) + words[:int(len(words) * (scale % 1))])
+    if rng.random() < 0.3:
+        data['charts'] = synthetic_charts(seed)
+    if not data['meetingGuide'].get('format') == 'legacy' and rng.random() < 0.2:
+        return synthetic_markdown(data), True
+    return data, False
+
+
+def _mean_completion(costs):
+    """Mean completion time of jobs run one after another in the given order."""
+    done = total = 0
+    for cost in costs:
+        done += cost
+        total += done
+    return total / len(costs)
+
+
+def bench_cost_model(args, tmp):
+    """Cost model fitted on recorded renders: held-out error for time and peak memory, and SJF gain."""
+    import cost_model
+    corpus = [_varied_payload(seed) for seed in range(args.cost_corpus)]
+    t = time.perf_counter()
+    records = [cost_model.record(data, markdown, runs=max(1, args.runs // 2)) for data, markdown in corpus]
+    print(f'{len(records)} payloads recorded in {time.perf_counter() - t:.0f} s')
+
+    held_out = records[::4]
+    train = [r for i, r in enumerate(records) if i % 4]
+    model = cost_model.CostModel.fit(train)
+    print(f'fitted on {len(train)}, tested on {len(held_out)} held out')
+    print(f'{"":10} {"range":>17} {"MAE":>9} {"MAPE":>7} {"p90 APE":>8} {"Spearman":>9}')
+    for target, unit in (('ms', 'ms'), ('peakMiB', 'MiB')):
+        e = cost_model.errors(model, held_out)[target]
+        values = [r[target] for r in held_out]
+        print(f'{target:10} {min(values):6.1f}-{max(values):6.1f} {unit:>3} {e["mae"]:5.1f} {unit:>3} '
+              f'{e["mape"]:6.1%} {e["p90ape"]:7.1%} {e["spearman"]:9.3f}')
+
+    actual = [r['ms'] for r in held_out]
+    predicted = [model.predict_features(r['features']).ms for r in held_out]
+    fifo = _mean_completion(actual)
+    sjf = _mean_completion([a for _, a in sorted(zip(predicted, actual))])
+    oracle = _mean_completion(sorted(actual))
+    print(f'mean completion of the held-out jobs on one worker: FIFO {fifo:.0f} ms, '
+          f'SJF by prediction {sjf:.0f} ms, SJF by actual time {oracle:.0f} ms')
+
+
+def _synthetic_uploads(tmp):
+    """A 12-megapixel camera photo and a large transparent logo."""
+    from PIL import Image, ImageDraw
+    photo = os.path.join(tmp, 'photo.jpg')
+    Image.merge('RGB', [Image.effect_noise((4000, 3000), s) for s in (40, 60, 80)]).save(photo, quality=95)
+    logo = os.path.join(tmp, 'logo.png')
+    img = Image.new('RGBA', (2000, 600), (0, 0, 0, 0))
+    ImageDraw.Draw(img).rounded_rectangle((100, 100, 1900, 500), 80, fill=(123, 45, 142, 255))
+    img.save(logo)
+    return photo, logo
+
+
+def bench_images(args, tmp):
+    """Cover photo/logo: raw uploads vs the downsampling, content-hashed image cache."""
+    import image_pipeline
+    photo, logo = _synthetic_uploads(tmp)
+    data = dict(synthetic_payload(), donorPhoto=photo, partnerLogo=logo)
+    image_pipeline.UPLOAD_DIR = tmp
+    cache_dir = os.path.join(tmp, 'image-cache')
+
+    prepare_image = generator.prepare_image
+    generator.prepare_image = lambda source, *a, **kw: source
+    try:
+        raw_ms, raw_pdf = _timed(lambda: generator.render_to_bytes(data), args.runs)
+    finally:
+        generator.prepare_image = prepare_image
+
+    def cold():
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        image_pipeline._memo.clear()
+        return generator.render_to_bytes(data)
+
+    generator.prepare_image = lambda *a, **kw: prepare_image(*a, cache_dir=cache_dir, **kw)
+    try:
+        cold_ms, _ = _timed(cold, args.runs)
+        warm_ms, pdf = _timed(lambda: generator.render_to_bytes(data), args.runs)
+    finally:
+        generator.prepare_image = prepare_image
+    text_ms, _ = _timed(lambda: generator.render_to_bytes(synthetic_payload()), args.runs)
+
+    print(f'no images        {text_ms:8.1f} ms')
+    print(f'raw uploads      {raw_ms:8.1f} ms   {len(raw_pdf):>9} bytes')
+    print(f'pipeline, cold   {cold_ms:8.1f} ms')
+    print(f'pipeline, warm   {warm_ms:8.1f} ms   {len(pdf):>9} bytes')
+
+
+_DIMENSION_LABELS = (
+    'Decision Making', 'Trust Calibration', 'Communication Style', 'Identity & Self-Concept',
+    'Values Hierarchy', 'Contradiction Patterns', 'Power Analysis', 'Influence Susceptibility',
+    'Time Orientation', 'Boundary Conditions', 'Emotional Triggers', 'Relationship Patterns',
+    'Risk Tolerance', 'Resource Philosophy', 'Commitment Patterns', 'Learning Style',
+    'Status & Recognition', 'Knowledge Areas', 'Retreat Patterns', 'Shame & Defense Triggers',
+    'Real-Time Interpersonal Tells',
+)
+
+
+def synthetic_charts(seed=0):
+    """Chart series shaped like parse-profile.ts buildChartData output."""
+    rng = random.Random(seed)
+    return {
+        'dimensions': [{'label': label, 'score': round(rng.uniform(1, 10), 1)} for label in _DIMENSION_LABELS],
+        'confidence': [{'label': f'{i + 1}. {_sentence(rng, 3)}', 'score': rng.randint(1, 10)} for i in range(7)],
+    }
+
+
+def bench_charts(args, tmp):
+    """Cost of the Evidence Base charts (radar + confidence bars) per render."""
+    data = synthetic_payload()
+    plain_ms, plain = _timed(lambda: generator.render_to_bytes(data), args.runs)
+    with_charts = dict(data, charts=synthetic_charts())
+    charts_ms, pdf = _timed(lambda: generator.render_to_bytes(with_charts), args.runs)
+    print(f'without charts   {plain_ms:8.1f} ms   {len(plain):>8} bytes')
+    print(f'with charts      {charts_ms:8.1f} ms   {len(pdf):>8} bytes   '
+          f'{pdf.count(b"/Subtype /Form")} form XObjects')
+    print(f'overhead         {charts_ms - plain_ms:8.1f} ms   {len(pdf) - len(plain):>8} bytes')
+
+
+def synthetic_markdown(data):
+    """Raw-markdown input (generator.py --markdown) carrying a v3 payload's content."""
+    profile = [f"# {data['donorName']} \u2014 Persuasion Profile", '']
+    prefix = {'insight': '> ', 'bold': '### ', 'bullet': '- '}
+    for section in data['persuasionProfile']['sections']:
+        profile += [f"## {section['title']}", '']
+        for para in section['paragraphs']:
+            profile += [prefix.get(para['type'], '') + para['content'], '']
+
+    mg = data['meetingGuide']
+    guide = [f"# MEETING GUIDE \u2014 {data['donorName']}", '', '### SETUP', '']
+    for group in mg['setupGroups']:
+        guide += [f"**{group['heading']}**"] + [f'- {b}' for b in group['bullets']] + ['']
+    guide += ['### THE ARC', '']
+    for beat in mg['beats']:
+        guide += [f"**Beat {beat['number']}: {beat['title']}**", f"*{beat['goal']}*", '',
+                  f"**START.** {beat['start']}", '', f"**STAY.** {beat['stay']}", beat['stallingText'], '',
+                  f"**CONTINUE.** {beat['continue']}", '', '---', '']
+    guide += ['### TRIPWIRES', '']
+    for tw in mg['tripwires']:
+        guide += [f"**{tw['name']}** *Tell:* {tw['tell']} *Recovery:* {tw['recovery']}"]
+    guide += ['', '### ONE LINE', '', mg['oneLine']]
+
+    return {
+        'donorName': data['donorName'], 'preparedFor': data['preparedFor'], 'date': data['date'],
+        'sources': data['sources'],
+        'profileMarkdown': '\n'.join(profile), 'meetingGuideMarkdown': '\n'.join(guide),
+    }
+
+
+# The route's side of a request, run by tsx: parseProfileForPDF (the old path)
+# or buildMarkdownInput (--markdown), JSON.stringify and the temp-file write.
+_ROUTE_SIDE_TS = """
+import {{ writeFileSync, readFileSync }} from 'node:fs';
+import {{ buildMarkdownInput, parseProfileForPDF }} from '{parse_profile}';
+
+const [input, outDir, runs] = process.argv.slice(2);
+const md = JSON.parse(readFileSync(input, 'utf8'));
+const args = [md.donorName, md.preparedFor, md.profileMarkdown, md.meetingGuideMarkdown, md.sources] as const;
+
+function timed(name: string, build: () => unknown): number {{
+  const times: number[] = [];
+  for (let i = 0; i <= Number(runs); i++) {{
+    const t = performance.now();
+    writeFileSync(`${{outDir}}/${{name}}.json`, JSON.stringify(build()));
+    if (i) times.push(performance.now() - t);   // the first run warms up
+  }}
+  return times.sort((a, b) => a - b)[Math.floor(times.length / 2)];
+}}
+
+console.log(JSON.stringify({{
+  parsed: timed('parsed', () => parseProfileForPDF(...args)),
+  markdown: timed('markdown', () => buildMarkdownInput(...args)),
+}}));
+"""
+
+
+def _route_side(md_input, tmp, runs):
+    """Median ms of the route's side per input kind ({'parsed', 'markdown'}) and the files it wrote,
+    or (None, reason) when tsx can't run parse-profile.ts here."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    work = tempfile.mkdtemp(dir=tmp)
+    script = os.path.join(work, 'route-side.ts')
+    with open(script, 'w') as f:
+        f.write(_ROUTE_SIDE_TS.format(parse_profile=os.path.join(here, 'parse-profile')))
+    md_path = os.path.join(work, 'input.json')
+    with open(md_path, 'w') as f:
+        f.write(md_input)
+    try:
+        result = subprocess.run(['npx', '--no-install', 'tsx', script, md_path, work, str(runs)],
+                                capture_output=True, text=True, timeout=300, cwd=here)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        return None, str(e)
+    if result.returncode:
+        lines = result.stderr.strip().splitlines() or ['tsx failed']
+        return None, next((line for line in lines if 'tsx' in line), lines[-1])
+    return json.loads(result.stdout.strip().splitlines()[-1]), work
+
+
+def bench_markdown(args, tmp):
+    """End to end per request: parse-profile.ts + JSON + generator load (old path) vs raw markdown input.
+
+    The route's side (parse or package, JSON.stringify, temp-file write) is
+    run by tsx on the same markdown; without tsx it is reported as not
+    timed, and the Python side (load, parse_input, story, render) is timed
+    on the equivalent synthetic payloads.
+    """
+    data = synthetic_payload(sections=12, beats=8, sources=120)
+    md_input = json.dumps(synthetic_markdown(data))
+    route, work = _route_side(md_input, tmp, args.runs * 10)
+    if route:
+        with open(os.path.join(work, 'parsed.json')) as f:
+            json_input = f.read()
+        with open(os.path.join(work, 'markdown.json')) as f:
+            md_input = f.read()
+    else:
+        json_input = json.dumps(data)
+    styles = generator.make_styles(generator.ensure_fonts())
+
+    def load(text, markdown):
+        return generator.parse_input(json.loads(text), markdown)
+
+    json_story_ms, story = _timed(lambda: generator.build_story(load(json_input, False), styles), args.runs * 10)
+    md_story_ms, md_story = _timed(
+        lambda: generator.build_story_from_markdown(load(md_input, True), styles), args.runs * 10)
+    json_ms, _ = _timed(lambda: generator.render_to_bytes(load(json_input, False)), args.runs)
+    md_ms, _ = _timed(lambda: generator.render_to_bytes(load(md_input, True)), args.runs)
+
+    def row(name, route_ms, story_ms, render_ms, flowables):
+        route_col = f'{route_ms:7.2f} ms' if route else f'{"n/a":>10}'
+        total = render_ms + (route_ms if route else 0)
+        print(f'{name:16} {route_col} {story_ms:9.2f} ms {render_ms:7.1f} ms {total:7.1f} ms {flowables:>10}')
+
+    print(f'{"":16} {"route side":>10} {"load+story":>12} {"render":>10} {"total":>10} {"flowables":>10}')
+    row('parse-profile.ts', route and route['parsed'], json_story_ms, json_ms, len(story))
+    row('markdown input', route and route['markdown'], md_story_ms, md_ms, len(md_story))
+    if route:
+        saved_route = route['parsed'] - route['markdown']
+        print(f'saved per request: {saved_route:.2f} ms route side, {json_ms - md_ms:.1f} ms render, '
+              f'{saved_route + json_ms - md_ms:.1f} ms end to end')
+    else:
+        print(f'saved per request: {json_ms - md_ms:.1f} ms render; route side not timed '
+              f'(parse-profile.ts needs tsx: {work})')
+
+
+LONG_WORD = 'Antidisestablishmentarianism' * 12    # wider than a line of any style
+
+
+def oversized_payload(scale, legacy=False, seed=0):
+    """A payload whose cards, callouts and titles are each taller than a page.
+
+    Callout and card text grows with scale (about a page of text per unit).
+    Both formats get an oversized insight callout and LONG_WORD in a
+    paragraph and a card title; v3 also gets an oversized stalling note,
+    STAY and One Line, legacy an oversized move card, alignment callout and
+    Reading the Room list.
+    """
+    rng = random.Random(seed)
+    data = synthetic_payload(legacy=legacy, seed=seed)
+    data['donorName'] = ' '.join(['Verylongname'] * 30 * scale)
+    sections = data['persuasionProfile']['sections']
+    sections[0]['paragraphs'].append({'type': 'insight', 'content': _paragraph(rng, 40 * scale)})
+    long_word_text = f'{_sentence(rng, 8)} {LONG_WORD} {_sentence(rng, 8)}'
+    sections[1]['paragraphs'].append({'type': 'text', 'content': long_word_text})
+    mg = data['meetingGuide']
+    if legacy:
+        moves = mg['meetingArc']['moves']
+        moves[0]['moveText'] = _paragraph(rng, 40 * scale)
+        moves[1]['readText'] = _paragraph(rng, 40 * scale)
+        moves[2]['title'] = LONG_WORD
+        mg['alignmentMap']['fightOrBuild'] = _paragraph(rng, 40 * scale)
+        mg['readingRoom']['working'] = [_sentence(rng, 5) for _ in range(40 * scale)]
+    else:
+        mg['beats'][0]['stallingText'] = "When it's stalling: " + _paragraph(rng, 40 * scale)
+        mg['beats'][1]['stay'] = _paragraph(rng, 20 * scale) + '\n\n' + _paragraph(rng, 20 * scale)
+        mg['beats'][2]['title'] = LONG_WORD
+        mg['oneLine'] = _paragraph(rng, 40 * scale)
+    return data
+
+
+def _page_count(pdf):
+    return len(re.findall(rb'/Type /Page[^s]', pdf))
+
+
+def bench_stress(args, tmp):
+    """Oversized titles, cards and callouts: layout succeeds and time grows linearly."""
+    print(f'{"":8} {"scale":>5} {"render":>10} {"pages":>6} {"ms/page":>8}')
+    for legacy in (False, True):
+        for scale in (1, 2, 4, 8):
+            data = oversized_payload(scale, legacy=legacy)
+            ms, pdf = _timed(lambda: generator.render_to_bytes(data), args.runs)
+            pages = _page_count(pdf)
+            print(f'{"legacy" if legacy else "v3":8} {scale:>5} {ms:7.1f} ms {pages:>6} {ms / pages:8.2f}')
+
+
+_OTHER_SCRIPTS = (
+    'Nguyễn', 'Thị', 'Phương', 'Thảo', 'Михаил', 'фонд', 'доверие', 'решение',
+    'Αλέξης', 'εμπιστοσύνη', 'Łukasz', 'Żółć',
+)
+
+
+def mixed_script_payload(seed=0):
+    """synthetic_payload with Vietnamese, Cyrillic and Greek words mixed into the text."""
+    rng = random.Random(seed)
+    data = synthetic_payload(seed=seed)
+    data['donorName'] = 'Nguyễn Thị Phương Thảo'
+    for section in data['persuasionProfile']['sections']:
+        for para in section['paragraphs']:
+            words = para['content'].split(' ')
+            for _ in range(len(words) // 6):
+                words.insert(rng.randrange(len(words)), rng.choice(_OTHER_SCRIPTS))
+            para['content'] = ' '.join(words)
+    data['meetingGuide']['oneLine'] = ' '.join(rng.choice(_OTHER_SCRIPTS) for _ in range(12))
+    return data
+
+
+def _paragraph_texts(data):
+    return [generator._md_inline_to_html(para['content'])
+            for section in data['persuasionProfile']['sections'] for para in section['paragraphs']]
+
+
+def bench_fonts(args, tmp):
+    """Font fallback: pure-Latin vs mixed-script text, and the coverage index."""
+    import font_fallback
+    from reportlab.platypus import Paragraph as PlainParagraph
+    styles = generator.make_styles(generator.ensure_fonts())
+    latin, mixed = synthetic_payload(), mixed_script_payload()
+
+    def build(cls, texts):
+        return [cls(text, styles['body']) for text in texts]
+
+    print(f'{"":14} {"paragraphs (no fallback)":>25} {"(with fallback)":>16} {"render":>10}')
+    for name, data in (('pure Latin', latin), ('mixed script', mixed)):
+        texts = _paragraph_texts(data) * 10
+        plain_ms, _ = _timed(lambda: build(PlainParagraph, texts), args.runs)
+        fallback_ms, _ = _timed(lambda: build(generator.Paragraph, texts), args.runs)
+        render_ms, _ = _timed(lambda: generator.render_to_bytes(data), args.runs)
+        print(f'{name:14} {plain_ms:22.2f} ms {fallback_ms:13.2f} ms {render_ms:7.1f} ms   '
+              f'({len(texts)} paragraphs)')
+
+    index_path = os.path.join(tmp, 'font-index.json')
+    build_ms, _ = _timed(lambda: font_fallback.build_index(index_path), args.runs)
+
+    def load():
+        font_fallback._chain = None
+        return font_fallback.load_chain(index_path)
+
+    chain = font_fallback.load_chain()
+    load_ms, _ = _timed(load, args.runs)
+    print(f'coverage index: built from cmaps {build_ms:.1f} ms, loaded {load_ms:.2f} ms '
+          f'(fallback chain here: {", ".join(chain) or "none installed"})')
+
+
+BENCHMARKS = {
+    'canvas': bench_canvas,
+    'draft': bench_draft,
+    'fastlist': bench_fastlist,
+    'flate': bench_flate,
+    'fonts': bench_fonts,
+    'stress': bench_stress,
+    'subsets': bench_subsets,
+    'markdown': bench_markdown,
+    'metrics': bench_metrics,
+    'charts': bench_charts,
+    'cost-model': bench_cost_model,
+    'distributed': bench_distributed,
+    'images': bench_images,
+    'input': bench_input,
+    'incremental': bench_incremental,
+    'patch-cover': bench_patch_cover,
+    'preview': bench_preview,
+    'stamp': bench_stamp,
+    'threads': bench_threads,
+}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='PDF generator benchmarks.')
+    parser.add_argument('benchmark', nargs='?', choices=sorted(BENCHMARKS))
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--list', action='store_true')
+    parser.add_argument('--recipients', type=int, default=10, help='copies for the stamp benchmark')
+    parser.add_argument('--cost-corpus', type=int, default=80, help='payloads for the cost-model benchmark')
+    args = parser.parse_args()
+
+    if args.list or not args.benchmark:
+        for name, fn in sorted(BENCHMARKS.items()):
+            print(f'{name:16} {fn.__doc__}')
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory(prefix='prospectai-bench-') as tmp:
+        BENCHMARKS[args.benchmark](args, tmp)
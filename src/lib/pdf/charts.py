@@ -0,0 +1,178 @@
+"""Vector chart flowables: behavioural-dimension radar and confidence bars.
+
+Each chart splits into a fixed part (grid, spokes, axis labels, bar tracks
+and ticks) and the data drawn over it. The fixed part is emitted once per
+document as a form XObject and placed with doForm wherever it is needed, so
+seven confidence bars share one track and a second radar with the same axes
+costs one "Do" operator. The geometry behind the forms (vertices, spoke
+directions) is computed once per process and cached by shape.
+"""
+
+import hashlib
+import math
+
+from reportlab.lib.colors import Color
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import Flowable
+
+from design_tokens import STONE, BODY_TEXT, LIGHT_GRAY
+
+
+SCALE_MAX = 10
+RADAR_RINGS = (2, 4, 6, 8, 10)
+RADAR_LABEL_SIZE = 6.5
+BAR_LABEL_SIZE = 8
+BAR_HEIGHT = 8
+BAR_ROW_HEIGHT = 18
+
+_geometry_cache = {}
+
+
+def _form_name(kind, *parts):
+    key = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()[:12]
+    return f'{kind}-{key}'
+
+
+def _radar_geometry(n, radius):
+    """Unit directions and ring vertices for an n-axis radar (cached)."""
+    key = ('radar', n, radius)
+    geometry = _geometry_cache.get(key)
+    if geometry is None:
+        # First axis points straight up, then clockwise.
+        directions = [(math.sin(2 * math.pi * i / n), math.cos(2 * math.pi * i / n)) for i in range(n)]
+        rings = [[(dx * radius * r / SCALE_MAX, dy * radius * r / SCALE_MAX) for dx, dy in directions]
+                 for r in RADAR_RINGS]
+        geometry = _geometry_cache[key] = (directions, rings)
+    return geometry
+
+
+def _polygon(canv, points, stroke=1, fill=0):
+    path = canv.beginPath()
+    path.moveTo(*points[0])
+    for x, y in points[1:]:
+        path.lineTo(x, y)
+    path.close()
+    canv.drawPath(path, stroke=stroke, fill=fill)
+
+
+class RadarChartFlowable(Flowable):
+    """Radar of 0-10 scores, one spoke per (label, score) axis."""
+
+    def __init__(self, axes, width, height, accent_color, font):
+        super().__init__()
+        self.labels = tuple(label for label, _ in axes)
+        self.scores = [max(0.0, min(SCALE_MAX, float(score))) for _, score in axes]
+        self.width = width
+        self.height = height
+        self.accent_color = accent_color
+        self.font = font
+        self.radius = min(width, height) / 2 - 24
+
+    def wrap(self, aW, aH):
+        return (self.width, self.height)
+
+    def _draw_grid(self, canv, directions, rings):
+        canv.setStrokeColor(STONE)
+        canv.setLineWidth(0.5)
+        for ring in rings:
+            _polygon(canv, ring)
+        for dx, dy in directions:
+            canv.line(0, 0, dx * self.radius, dy * self.radius)
+
+        canv.setFillColor(BODY_TEXT)
+        canv.setFont(self.font, RADAR_LABEL_SIZE)
+        label_radius = self.radius + 6
+        for label, (dx, dy) in zip(self.labels, directions):
+            x, y = dx * label_radius, dy * label_radius - RADAR_LABEL_SIZE / 3
+            if dx > 0.05:
+                canv.drawString(x, y, label)
+            elif dx < -0.05:
+                canv.drawRightString(x, y, label)
+            else:
+                canv.drawCentredString(x, y + (3 if dy > 0 else -3), label)
+
+        canv.setFillColor(LIGHT_GRAY)
+        canv.setFont(self.font, 5)
+        for r, ring in zip(RADAR_RINGS, rings):
+            canv.drawString(2, ring[0][1] + 1.5, str(r))
+
+    def draw(self):
+        canv = self.canv
+        directions, rings = _radar_geometry(len(self.labels), self.radius)
+        name = _form_name('radar', self.labels, self.radius, self.width, self.height, self.font)
+
+        canv.saveState()
+        canv.translate(self.width / 2, self.height / 2)
+        if not canv.hasForm(name):
+            canv.beginForm(name, -self.width / 2, -self.height / 2, self.width / 2, self.height / 2)
+            self._draw_grid(canv, directions, rings)
+            canv.endForm()
+        canv.doForm(name)
+
+        points = [(dx * self.radius * s / SCALE_MAX, dy * self.radius * s / SCALE_MAX)
+                  for (dx, dy), s in zip(directions, self.scores)]
+        c = self.accent_color
+        canv.setFillColor(Color(c.red, c.green, c.blue, 0.2))
+        canv.setStrokeColor(c)
+        canv.setLineWidth(1.2)
+        _polygon(canv, points, stroke=1, fill=1)
+        canv.setFillColor(c)
+        for x, y in points:
+            canv.circle(x, y, 1.6, stroke=0, fill=1)
+        canv.restoreState()
+
+
+class ConfidenceBarsFlowable(Flowable):
+    """Horizontal 0-10 bars, one row per (label, score)."""
+
+    def __init__(self, rows, width, accent_color, font, label_width=170):
+        super().__init__()
+        self.rows = [(label, max(0.0, min(SCALE_MAX, float(score)))) for label, score in rows]
+        self.width = width
+        self.accent_color = accent_color
+        self.font = font
+        self.label_width = label_width
+        self.track_width = width - label_width - 36
+
+    def wrap(self, aW, aH):
+        return (self.width, len(self.rows) * BAR_ROW_HEIGHT)
+
+    def _draw_track(self, canv):
+        canv.setFillColor(STONE)
+        canv.roundRect(0, 0, self.track_width, BAR_HEIGHT, BAR_HEIGHT / 2, stroke=0, fill=1)
+        canv.setStrokeColor(Color(1, 1, 1, 1))
+        canv.setLineWidth(0.75)
+        step = self.track_width / SCALE_MAX
+        for i in range(1, SCALE_MAX):
+            canv.line(i * step, 0, i * step, BAR_HEIGHT)
+
+    def draw(self):
+        canv = self.canv
+        name = _form_name('confidence-track', self.track_width)
+        if not canv.hasForm(name):
+            canv.beginForm(name, 0, 0, self.track_width, BAR_HEIGHT)
+            self._draw_track(canv)
+            canv.endForm()
+
+        step = self.track_width / SCALE_MAX
+        top = len(self.rows) * BAR_ROW_HEIGHT
+        for i, (label, score) in enumerate(self.rows):
+            y = top - (i + 1) * BAR_ROW_HEIGHT + (BAR_ROW_HEIGHT - BAR_HEIGHT) / 2
+
+            canv.setFillColor(BODY_TEXT)
+            canv.setFont(self.font, BAR_LABEL_SIZE)
+            text = label
+            while text and stringWidth(text, self.font, BAR_LABEL_SIZE) > self.label_width - 8:
+                text = text[:-2] + '…' if len(text) > 2 else ''
+            canv.drawString(0, y + 1, text)
+
+            canv.saveState()
+            canv.translate(self.label_width, y)
+            canv.doForm(name)
+            if score > 0:
+                canv.setFillColor(self.accent_color)
+                canv.roundRect(0, 0, max(BAR_HEIGHT, score * step), BAR_HEIGHT, BAR_HEIGHT / 2, stroke=0, fill=1)
+            canv.restoreState()
+
+            canv.setFillColor(LIGHT_GRAY)
+            canv.drawRightString(self.width, y + 1, f'{score:g}/{SCALE_MAX}')
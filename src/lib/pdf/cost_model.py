@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Render cost model: predicted render time and peak memory from a payload.
+
+Render time ranges from tens of milliseconds to seconds with the number of
+sections, beats and sources and the length of their text, and a queue that
+treats every job the same lets one long report hold up many short ones. A
+CostModel predicts a job's cost from cheap features of its parsed payload
+(see features), so a queue can:
+
+  - run the shortest jobs first (shortest_first);
+  - refuse jobs predicted to exceed their budget before spending any time
+    on them (CostModel.check raises PredictedOverBudget, a
+    RenderBudgetExceeded; the RenderGovernor still enforces the budget
+    while rendering).
+
+The model is linear in the features, one set of weights for time and one
+for memory, fitted by ridge-regularized least squares on standardized
+features from recorded metrics: JSON lines of {"features", "ms",
+"peakMiB"}, written by record() (or `cost_model.py record`), or the done/
+records of a batch run (batch.py), which carry features and ms. Records
+without peakMiB only count towards time. Predictions are floored at the
+smallest cost seen in fitting.
+
+Peak memory is the peak of Python allocations during the render
+(tracemalloc), which is where a render's memory goes; it is not RSS growth,
+which the governor's memory budget measures and which a warm process often
+serves from memory freed by earlier renders. So check takes its own heap
+budget for it, not the governor's memory budget.
+
+Usage: python3 cost_model.py record METRICS.jsonl PAYLOAD.json [...]
+       python3 cost_model.py fit MODEL.json METRICS.jsonl|INDEX.json [...]
+       python3 cost_model.py predict MODEL.json PAYLOAD.json [...]
+"""
+
+import argparse
+import collections
+import contextlib
+import dataclasses
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import generator  # noqa: E402
+from render_governor import RenderBudgetExceeded  # noqa: E402
+
+
+FEATURES = (
+    'sections', 'paragraphs', 'profile_chars',     # persuasion profile
+    'guide_items', 'guide_chars',                  # meeting guide: cards, beats, list items
+    'sources', 'source_chars',                     # sources shown (at most 50)
+    'chart_points', 'images', 'markdown',          # markdown: 1 for raw markdown input
+)
+RIDGE = 1e-3            # on standardized features
+SOURCES_SHOWN = 50      # build_sources' max_display
+
+Estimate = collections.namedtuple('Estimate', 'ms peak_mib')
+
+
+class PredictedOverBudget(RenderBudgetExceeded):
+    """A job's predicted cost exceeds its budget; raised before rendering."""
+
+
+# ─── Features ─────────────────────────────────────────────────────────────────
+
+def _walk(value):
+    """(objects, characters) in a model value: dataclass instances in it, and the length of its strings."""
+    if isinstance(value, str):
+        return 0, len(value)
+    if isinstance(value, tuple):
+        counts = [_walk(item) for item in value]
+        return sum(c[0] for c in counts), sum(c[1] for c in counts)
+    if dataclasses.is_dataclass(value):
+        counts = [_walk(getattr(value, field.name)) for field in dataclasses.fields(value)]
+        return 1 + sum(c[0] for c in counts), sum(c[1] for c in counts)
+    return 0, 0
+
+
+def features(data, markdown=False):
+    """The FEATURES of a payload (or its ProfileData), as a dict of numbers."""
+    data = generator.parse_input(data, markdown)
+    shown = data.sources[:SOURCES_SHOWN]
+    markdown = data.markdown
+    if markdown:
+        sections = data.profile_markdown.count('\n## ') + data.profile_markdown.startswith('## ')
+        paragraphs = data.profile_markdown.count('\n\n')
+        profile_chars = len(data.profile_markdown)
+        guide_items = data.meeting_guide_markdown.count('\n**')
+        guide_chars = len(data.meeting_guide_markdown)
+    else:
+        sections = len(data.sections)
+        paragraphs = sum(len(section.paragraphs) for section in data.sections)
+        profile_chars = _walk(data.sections)[1]
+        guide_items, guide_chars = _walk(data.meeting_guide)
+    return {
+        'sections': sections,
+        'paragraphs': paragraphs,
+        'profile_chars': profile_chars,
+        'guide_items': guide_items,
+        'guide_chars': guide_chars,
+        'sources': len(shown),
+        'source_chars': sum(len(source.title or source.url) + len(source.url) for source in shown),
+        'chart_points': len(data.charts.dimensions) + len(data.charts.confidence) if data.charts else 0,
+        'images': bool(data.donor_photo) + bool(data.partner_logo),
+        'markdown': int(markdown),
+    }
+
+
+# ─── Recording ────────────────────────────────────────────────────────────────
+
+def record(data, markdown=False, runs=3):
+    """Render data and return its metrics record: features, median ms over runs, peakMiB.
+
+    Time is measured without tracing, after one warm-up render; memory in
+    one more render under tracemalloc.
+    """
+    data = generator.parse_input(data, markdown)
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator.render_to_bytes(data, markdown=markdown)
+        times = []
+        for _ in range(runs):
+            t = time.perf_counter()
+            generator.render_to_bytes(data, markdown=markdown)
+            times.append((time.perf_counter() - t) * 1000)
+        tracemalloc.start()
+        try:
+            generator.render_to_bytes(data, markdown=markdown)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {'features': features(data, markdown), 'ms': round(statistics.median(times), 2),
+            'peakMiB': round(peak / 2**20, 3)}
+
+
+def load_records(path):
+    """Metrics records from a JSON lines file, or the records of a batch index.json."""
+    with open(path) as f:
+        text = f.read()
+    try:
+        index = json.loads(text)
+    except json.JSONDecodeError:
+        index = None
+    if isinstance(index, dict) and 'features' not in index:
+        records = index.values()
+    else:
+        records = (json.loads(line) for line in text.splitlines() if line.strip())
+    return [r for r in records if 'features' in r and 'ms' in r]
+
+
+# ─── Model ────────────────────────────────────────────────────────────────────
+
+def _solve(a, b):
+    """x with a x = b, a square and positive definite (Gaussian elimination, partial pivoting)."""
+    n = len(b)
+    m = [row[:] + [b[i]] for i, row in enumerate(a)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(m[r][col]))
+        m[col], m[pivot] = m[pivot], m[col]
+        for r in range(col + 1, n):
+            f = m[r][col] / m[col][col]
+            for c in range(col, n + 1):
+                m[r][c] -= f * m[col][c]
+    x = [0.0] * n
+    for r in range(n - 1, -1, -1):
+        x[r] = (m[r][n] - sum(m[r][c] * x[c] for c in range(r + 1, n))) / m[r][r]
+    return x
+
+
+def _fit_linear(rows, targets, ridge=RIDGE):
+    """(intercept, weights by feature) minimizing squared error plus ridge on standardized weights."""
+    n = len(rows)
+    means = [statistics.fmean(row[j] for row in rows) for j in range(len(FEATURES))]
+    scales = [statistics.pstdev(row[j] for row in rows) or 1.0 for j in range(len(FEATURES))]
+    z = [[(row[j] - means[j]) / scales[j] for j in range(len(FEATURES))] for row in rows]
+    mean_y = statistics.fmean(targets)
+    k = len(FEATURES)
+    gram = [[sum(zi[p] * zi[q] for zi in z) + (ridge * n if p == q else 0.0) for q in range(k)] for p in range(k)]
+    rhs = [sum(zi[p] * (y - mean_y) for zi, y in zip(z, targets)) for p in range(k)]
+    w = _solve(gram, rhs)
+    weights = {name: w[j] / scales[j] for j, name in enumerate(FEATURES)}
+    intercept = mean_y - sum(weights[name] * means[j] for j, name in enumerate(FEATURES))
+    return intercept, weights
+
+
+class CostModel:
+    """Predicts render time (ms) and peak memory (MiB) from payload features."""
+
+    def __init__(self, time_fit, memory_fit=None, floor=(0.0, 0.0), records=0):
+        self.time_fit = time_fit            # (intercept, {feature: weight})
+        self.memory_fit = memory_fit
+        self.floor = floor                  # smallest ms and MiB seen in fitting
+        self.records = records
+
+    @classmethod
+    def fit(cls, records, ridge=RIDGE):
+        """Fit to metrics records (see the module docstring)."""
+        if len(records) < 2:
+            raise ValueError(f'need at least 2 records to fit, got {len(records)}')
+        rows = [[r['features'].get(name, 0) for name in FEATURES] for r in records]
+        time_fit = _fit_linear(rows, [r['ms'] for r in records], ridge)
+        measured = [(row, r['peakMiB']) for row, r in zip(rows, records) if r.get('peakMiB') is not None]
+        memory_fit = None
+        if len(measured) >= 2:
+            memory_fit = _fit_linear([row for row, _ in measured], [mib for _, mib in measured], ridge)
+        floor = (min(r['ms'] for r in records), min((mib for _, mib in measured), default=0.0))
+        return cls(time_fit, memory_fit, floor, len(records))
+
+    def predict_features(self, feats):
+        def apply(fit, floor):
+            if fit is None:
+                return None
+            intercept, weights = fit
+            return max(floor, intercept + sum(w * feats.get(name, 0) for name, w in weights.items()))
+        return Estimate(apply(self.time_fit, self.floor[0]), apply(self.memory_fit, self.floor[1]))
+
+    def predict(self, data, markdown=False):
+        """Estimate(ms, peak_mib) for a payload or ProfileData; peak_mib is None without a memory fit."""
+        return self.predict_features(features(data, markdown))
+
+    def check(self, data, time_budget=None, heap_budget=None, markdown=False):
+        """Raise PredictedOverBudget if data is predicted to exceed a budget.
+
+        time_budget is in seconds; heap_budget is in bytes of peak Python
+        allocations, what peak_mib predicts (not the governor's RSS budget).
+        Returns the Estimate otherwise.
+        """
+        estimate = self.predict(data, markdown)
+        if time_budget and estimate.ms > time_budget * 1000:
+            raise PredictedOverBudget(f'predicted {estimate.ms / 1000:.1f}s, over the {time_budget:g}s budget')
+        if heap_budget and estimate.peak_mib is not None and estimate.peak_mib * 2**20 > heap_budget:
+            raise PredictedOverBudget(f'predicted {estimate.peak_mib:.0f} MiB peak heap, over the '
+                                      f'{heap_budget / 2**20:.0f} MiB heap budget')
+        return estimate
+
+    # ─── Persistence ──────────────────────────────────────────────────────────
+
+    def to_dict(self):
+        def fit(f):
+            return None if f is None else {'intercept': f[0], 'weights': f[1]}
+        return {'features': list(FEATURES), 'records': self.records, 'floor': {'ms': self.floor[0],
+                'peakMiB': self.floor[1]}, 'ms': fit(self.time_fit), 'peakMiB': fit(self.memory_fit)}
+
+    @classmethod
+    def from_dict(cls, d):
+        def fit(f):
+            return None if f is None else (f['intercept'], f['weights'])
+        return cls(fit(d['ms']), fit(d['peakMiB']), (d['floor']['ms'], d['floor']['peakMiB']), d['records'])
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def shortest_first(jobs, model, payload=lambda job: job, markdown=lambda job: False):
+    """jobs sorted by predicted render time, shortest first; ties keep their order.
+
+    payload(job) and markdown(job) get a job's payload (or ProfileData) and
+    its markdown flag.
+    """
+    return sorted(jobs, key=lambda job: model.predict(payload(job), markdown(job)).ms)
+
+
+def errors(model, records):
+    """Held-out error of model on records: {'ms': {...}, 'peakMiB': {...}}.
+
+    For each target: mean absolute error, mean absolute percentage error,
+    the 90th percentile of the absolute percentage error, and the Spearman
+    rank correlation of predicted and actual (what shortest-first depends on).
+    """
+    report = {}
+    for target, index in (('ms', 0), ('peakMiB', 1)):
+        pairs = [(model.predict_features(r['features'])[index], r[target])
+                 for r in records if r.get(target) is not None]
+        pairs = [(p, a) for p, a in pairs if p is not None]
+        if len(pairs) < 2:
+            continue
+        pct = sorted(abs(p - a) / a for p, a in pairs if a)
+        report[target] = {
+            'n': len(pairs),
+            'mae': statistics.fmean(abs(p - a) for p, a in pairs),
+            'mape': statistics.fmean(pct),
+            'p90ape': pct[min(len(pct) - 1, int(len(pct) * 0.9))],
+            'spearman': _spearman([p for p, _ in pairs], [a for _, a in pairs]),
+        }
+    return report
+
+
+def _ranks(values):
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2
+        i = j + 1
+    return ranks
+
+
+def _spearman(xs, ys):
+    rx, ry = _ranks(xs), _ranks(ys)
+    mx, my = statistics.fmean(rx), statistics.fmean(ry)
+    cov = sum((a - mx) * (b - my) for a, b in zip(rx, ry))
+    var = (sum((a - mx) ** 2 for a in rx) * sum((b - my) ** 2 for b in ry)) ** 0.5
+    return cov / var if var else 0.0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fit and apply the render cost model.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    rec = commands.add_parser('record', help='render payloads and append their metrics records')
+    rec.add_argument('metrics', metavar='METRICS.jsonl')
+    rec.add_argument('payloads', nargs='+', metavar='PAYLOAD.json')
+    rec.add_argument('--runs', type=int, default=3)
+    fit = commands.add_parser('fit', help='fit a model to metrics records')
+    fit.add_argument('model', metavar='MODEL.json')
+    fit.add_argument('metrics', nargs='+', metavar='METRICS.jsonl|INDEX.json')
+    predict = commands.add_parser('predict', help='predicted ms and peak MiB per payload')
+    predict.add_argument('model', metavar='MODEL.json')
+    predict.add_argument('payloads', nargs='+', metavar='PAYLOAD.json')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        with open(args.metrics, 'a') as out:
+            for path in args.payloads:
+                with open(path) as f:
+                    payload = json.load(f)
+                r = record(payload, markdown='profileMarkdown' in payload, runs=args.runs)
+                out.write(json.dumps(r) + '\n')
+                print(f'[PDF] {path}: {r["ms"]:.0f} ms, {r["peakMiB"]:.1f} MiB')
+    elif args.command == 'fit':
+        records = [r for path in args.metrics for r in load_records(path)]
+        model = CostModel.fit(records)
+        model.save(args.model)
+        print(f'[PDF] fitted to {len(records)} records: {args.model}')
+    else:
+        model = CostModel.load(args.model)
+        for path in args.payloads:
+            with open(path) as f:
+                payload = json.load(f)
+            estimate = model.predict(payload, markdown='profileMarkdown' in payload)
+            memory = f', {estimate.peak_mib:.1f} MiB' if estimate.peak_mib is not None else ''
+            print(f'{path}: {estimate.ms:.0f} ms{memory}')
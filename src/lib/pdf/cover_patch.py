@@ -0,0 +1,109 @@
+"""Incremental-update patching of the cover page.
+
+When only the cover fields change (preparedFor, date, sourceCount), there is
+no need to lay out the whole document again. The cover is rendered on its
+own, and its page object, content stream and fonts are appended to the
+existing file as a PDF incremental update, together with a refreshed
+document info dictionary. Every byte of the original file is left untouched;
+readers follow the new trailer's /Prev back to the old xref for the rest.
+
+The cover page keeps its object number and /Parent, so the page tree and
+every other page are shared with the original revision. The new cover
+brings its own font subsets, because the original subsets only cover the
+glyphs the old cover text needed.
+"""
+
+from reportlab.lib.utils import TimeStamp
+
+from pdf_objects import PdfFile, Ref, Name, PdfString, serialize
+
+
+def _pdf_date(deterministic):
+    """Current time (or ReportLab's invariant date) as a PDF date string."""
+    ts = TimeStamp(1 if deterministic else None)
+    text = "D:%04d%02d%02d%02d%02d%02d%+03d'%02d'" % (ts.YMDhms + (ts.dhh, ts.dmm))
+    return PdfString(b'(' + text.encode('ascii') + b')')
+
+
+def build_update(original, cover, info_updates=None, file_id=None, deterministic=False):
+    """Return the incremental-update bytes to append to original.
+
+    original, cover: bytes of the existing PDF and of a one-page cover render.
+    info_updates: extra /Info entries (str values) to set alongside /ModDate.
+    file_id: 16 bytes for the second /ID element (the first is kept).
+    """
+    old = PdfFile(original)
+    new = PdfFile(cover)
+    old_pages, _ = old.page_tree()
+    new_pages, new_nodes = new.page_tree()
+    old_cover = old_pages[0]
+    new_cover = new_pages[0]
+
+    size = old.trailer['Size']
+    closure = sorted(new.closure(new_cover, exclude=set(new_nodes)) - {new_cover})
+    mapping = {new_cover: old_cover}
+    mapping.update({num: size + i for i, num in enumerate(closure)})
+    mapping[new.objects[new_cover].value['Parent'].num] = old.objects[old_cover].value['Parent'].num
+
+    changed = {old_cover: new.objects[new_cover].to_bytes(old_cover, mapping)}
+    for num in closure:
+        changed[mapping[num]] = new.objects[num].to_bytes(mapping[num], mapping)
+
+    info_ref = old.trailer.get('Info')
+    if isinstance(info_ref, Ref):
+        info = dict(old.objects[info_ref.num].value)
+        info['ModDate'] = _pdf_date(deterministic)
+        for key, value in (info_updates or {}).items():
+            info[Name(key)] = PdfString(_pdf_text(value))
+        changed[info_ref.num] = b'%d 0 obj\n%s\nendobj\n' % (info_ref.num, serialize(info))
+
+    return incremental_update(original, old, changed, file_id)
+
+
+def incremental_update(original, old, changed, file_id=None):
+    """Bytes appending the objects in changed ({number: serialized object}) to original.
+
+    old is original parsed as a PdfFile. The new trailer keeps /Root, /Info
+    and the first /ID element; file_id (16 bytes) replaces the second.
+    """
+    size = old.trailer['Size']
+    info_ref = old.trailer.get('Info')
+    new_size = max(size, max(changed) + 1)
+    trailer = {Name('Size'): new_size, Name('Root'): old.trailer['Root']}
+    if info_ref is not None:
+        trailer[Name('Info')] = info_ref
+    if 'ID' in old.trailer:
+        first = old.trailer['ID'][0]
+        second = PdfString(b'<' + file_id.hex().encode() + b'>') if file_id else old.trailer['ID'][1]
+        trailer[Name('ID')] = [first, second]
+    trailer[Name('Prev')] = old.startxref
+
+    # Objects, then an xref with one subsection per run of consecutive numbers.
+    out = bytearray(b'' if original.endswith(b'\n') else b'\n')
+    offsets = {}
+    for num in sorted(changed):
+        offsets[num] = len(original) + len(out)
+        out += changed[num]
+
+    xref_offset = len(original) + len(out)
+    out += b'xref\n'
+    nums = sorted(offsets)
+    run_start = 0
+    for i in range(1, len(nums) + 1):
+        if i == len(nums) or nums[i] != nums[i - 1] + 1:
+            run = nums[run_start:i]
+            out += b'%d %d\n' % (run[0], len(run))
+            for num in run:
+                out += b'%010d 00000 n \n' % offsets[num]
+            run_start = i
+    out += b'trailer\n' + serialize(trailer) + b'\nstartxref\n%d\n%%%%EOF\n' % xref_offset
+    return bytes(out)
+
+
+def _pdf_text(text):
+    """Encode a str as a PDF literal string token."""
+    escaped = text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    try:
+        return b'(' + escaped.encode('latin-1') + b')'
+    except UnicodeEncodeError:
+        return b'<feff' + text.encode('utf-16-be').hex().encode() + b'>'
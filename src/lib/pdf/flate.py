@@ -0,0 +1,128 @@
+"""Parallel Flate compression of a document's streams.
+
+ReportLab deflates every page content stream, form and embedded font
+subset one after another while it writes the file, through one shared
+filter object (pdfdoc.PDFZCompress). zlib releases the GIL while it
+deflates, so those streams can be compressed side by side:
+
+  - precompress(doc), called just before the document is formatted (font
+    subsets have been made by then), collects the bytes each stream will
+    hand to the filter and starts deflating them on a shared thread pool;
+  - the shared filter's encode is replaced (install) by one that takes the
+    result for its input from the current thread's table of precompressed
+    streams, and deflates inline, as before, for anything not in it.
+
+The table is keyed by the exact input bytes and filled with the same zlib
+call, so the output is byte-identical to serial compression at the same
+level whatever was or wasn't precompressed. Streams that recur from one
+render to the next can be kept (keep): they are deflated the first time
+and reused after that, at each level.
+
+The level defaults to zlib's default (what ReportLab uses) and is set with
+PROSPECTAI_PDF_COMPRESS_LEVEL (0-9, -1 for the default) or LEVEL; the pool
+size with PROSPECTAI_PDF_COMPRESS_THREADS (one CPU, or 1, means serial).
+"""
+
+import concurrent.futures
+import os
+import threading
+import zlib
+
+from reportlab.pdfbase import pdfdoc
+
+
+LEVEL = int(os.environ.get('PROSPECTAI_PDF_COMPRESS_LEVEL', zlib.Z_DEFAULT_COMPRESSION))
+WORKERS = int(os.environ.get('PROSPECTAI_PDF_COMPRESS_THREADS', min(4, os.cpu_count() or 1)))
+MIN_PARALLEL = 4096   # bytes; smaller streams are deflated inline
+
+_local = threading.local()
+_lock = threading.Lock()
+_pool = None
+_installed = False
+_kept = {}      # streams that recur across renders -> {level: deflated}
+
+
+def _encode(text):
+    """PDFZCompress.encode, reading kept and precompressed streams when there are any."""
+    if isinstance(text, str):
+        text = text.encode('utf8')
+    levels = _kept.get(text)
+    if levels is not None:
+        level = getattr(_local, 'level', LEVEL)
+        deflated = levels.get(level)
+        if deflated is None:
+            deflated = levels[level] = zlib.compress(text, level)
+        return deflated
+    pending = getattr(_local, 'pending', None)
+    if pending:
+        future = pending.get(text)
+        if future is not None:
+            return future.result()
+    return zlib.compress(text, getattr(_local, 'level', LEVEL))
+
+
+def install():
+    """Route ReportLab's Flate filter through _encode (once per process)."""
+    global _installed
+    with _lock:
+        if not _installed:
+            pdfdoc.PDFZCompress.encode = _encode
+            _installed = True
+
+
+def _executor():
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = concurrent.futures.ThreadPoolExecutor(WORKERS, thread_name_prefix='pdf-flate')
+        return _pool
+
+
+def _flate_input(obj):
+    """The bytes ReportLab will pass to the Flate filter for obj, if it deflates it."""
+    if isinstance(obj, pdfdoc.PDFPage):
+        data = obj.stream if obj.compression and not obj.Contents else None
+    elif isinstance(obj, pdfdoc.PDFFormXObject):
+        data = obj.stream if obj.compression and not obj.Contents else None
+    elif isinstance(obj, pdfdoc.PDFStream):
+        # filters apply last to first, so Flate sees the raw content when it is last
+        filters = obj.filters
+        data = obj.content if filters and filters[-1] is pdfdoc.PDFZCompress \
+            and 'Filter' not in obj.dictionary.dict else None
+    else:
+        return None
+    return data.encode('utf8') if isinstance(data, str) else data
+
+
+def precompress(doc, level=None, parallel=True):
+    """Set this thread's Flate level for doc's next format() and, if parallel,
+    start deflating doc's streams in the background."""
+    install()
+    level = LEVEL if level is None else level
+    pending = {}
+    if parallel and WORKERS > 1:
+        pool = _executor()
+        for obj in list(doc.idToObject.values()):     # object order: first written, first submitted
+            data = _flate_input(obj)
+            if data and len(data) >= MIN_PARALLEL and data not in pending and data not in _kept:
+                pending[data] = pool.submit(zlib.compress, data, level)
+    _local.pending = pending
+    _local.level = level
+    return len(pending)
+
+
+def keep(data):
+    """Keep data's deflated form once made, for every later render that deflates it
+    (font programs, see font_subsets)."""
+    install()
+    _kept.setdefault(data, {})
+
+
+def forget(data):
+    _kept.pop(data, None)
+
+
+def release():
+    """Forget this thread's precompressed streams."""
+    _local.pending = None
+    _local.level = LEVEL
@@ -0,0 +1,317 @@
+"""Font fallback for characters the design fonts don't have.
+
+DMSans and InstrumentSerif cover Western European Latin only. Vietnamese
+diacritics, Cyrillic, Greek or CJK in a donor name or quote would render as
+boxes, so text is split into runs: each word stays in the style's font when
+that font has all of its characters, and otherwise moves to the first font
+in FALLBACK_CHAIN that has them (character by character if none has the
+whole word).
+
+Which code points a font covers comes from a coverage index rather than the
+fonts themselves:
+
+  - registered fonts (the design fonts) use the cmap ReportLab already
+    parsed when registering them;
+  - fallback fonts are described by an index file, built once by reading
+    their cmaps and reused by every later process until a font file or
+    font directory changes (so newly installed fonts are picked up). A
+    fallback font is only parsed and registered the first time a render
+    needs one of its glyphs.
+
+The index lives in the user's cache directory ($XDG_CACHE_HOME, or
+~/.cache, under prospectai/), or at PROSPECTAI_FONT_INDEX.
+
+Each font's coverage is compiled into one regex matching the characters it
+lacks, so pure-Latin text is checked in a single C-level search and costs
+next to nothing.
+
+Deployments add fonts (e.g. a CJK face) by installing them in public/fonts
+or a system font directory under one of the FALLBACK_CHAIN file names, or
+by listing font files in PROSPECTAI_FALLBACK_FONTS (os.pathsep-separated),
+which go ahead of the chain. Only TrueType-outline fonts (.ttf, or .ttc
+face 0) can be embedded by ReportLab.
+"""
+
+import contextlib
+import json
+import os
+import re
+import tempfile
+import threading
+
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.pdfmetrics import registerFont, stringWidth
+from reportlab.pdfbase.ttfonts import TTFont, TTFontFile
+from reportlab.platypus import Paragraph as _Paragraph
+
+
+INDEX_VERSION = 2
+
+# (registered name, candidate file names), tried in order.
+FALLBACK_CHAIN = (
+    ('NotoSans', ('NotoSans-Regular.ttf',)),
+    ('DejaVuSans', ('DejaVuSans.ttf',)),
+    ('NotoSansSC', ('NotoSansSC-Regular.ttf',)),
+    ('NotoSansJP', ('NotoSansJP-Regular.ttf',)),
+    ('DroidSansFallback', ('DroidSansFallbackFull.ttf', 'DroidSansFallback.ttf')),
+    ('WenQuanYiZenHei', ('wqy-zenhei.ttc',)),
+)
+
+FONT_DIRS = (
+    os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../../public/fonts')),
+    '/usr/share/fonts',
+    '/usr/local/share/fonts',
+    os.path.expanduser('~/.local/share/fonts'),
+    os.path.expanduser('~/.fonts'),
+    '/Library/Fonts',
+    '/System/Library/Fonts/Supplemental',
+)
+
+CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'prospectai')
+INDEX_PATH = os.environ.get('PROSPECTAI_FONT_INDEX', os.path.join(CACHE_DIR, 'font-index.json'))
+
+_lock = threading.Lock()
+_chain = None           # [(name, path, missing-regex)] once loaded
+_missing = {}           # font name -> regex matching characters it lacks
+_registered = set()     # fallback fonts registered with ReportLab so far
+_register_hook = None
+_local = threading.local()  # .disabled: fallback_disabled() is in effect on this thread
+
+_WORDS = re.compile(r'\s+|\S+')
+
+
+# ─── Coverage index ───────────────────────────────────────────────────────────
+
+def _ranges(code_points):
+    """Sorted code points as [[first, last], ...] runs."""
+    ranges = []
+    for cp in sorted(code_points):
+        if ranges and cp == ranges[-1][1] + 1:
+            ranges[-1][1] = cp
+        else:
+            ranges.append([cp, cp])
+    return ranges
+
+
+def _missing_regex(ranges):
+    """Regex matching any character outside the covered ranges (whitespace always passes)."""
+    covered = ''.join(f'\\U{a:08x}-\\U{b:08x}' for a, b in ranges)
+    return re.compile(f'[^\\s{covered}]')
+
+
+def _find_font_files():
+    """Chain entries as (name, path): env fonts first, then the first file found per entry."""
+    found = []
+    for path in filter(None, os.environ.get('PROSPECTAI_FALLBACK_FONTS', '').split(os.pathsep)):
+        if os.path.exists(path):
+            found.append((os.path.splitext(os.path.basename(path))[0], path))
+
+    wanted = {filename: name for name, filenames in FALLBACK_CHAIN for filename in filenames}
+    located = {}
+    for font_dir in FONT_DIRS:
+        for root, _, files in os.walk(font_dir):
+            for filename in files:
+                if filename in wanted and filename not in located:
+                    located[filename] = os.path.join(root, filename)
+    for name, filenames in FALLBACK_CHAIN:
+        path = next((located[f] for f in filenames if f in located), None)
+        if path:
+            found.append((name, path))
+    return found
+
+
+def _fingerprint(path):
+    st = os.stat(path)
+    return [st.st_size, int(st.st_mtime)]
+
+
+def _dirs_fingerprint():
+    """[path, mtime] of every font directory and subdirectory: installing or
+    removing a font changes the mtime of the directory holding it."""
+    dirs = []
+    for font_dir in FONT_DIRS:
+        for root, _, _ in os.walk(font_dir):
+            with contextlib.suppress(OSError):
+                dirs.append([root, os.stat(root).st_mtime_ns])
+    return dirs
+
+
+def build_index(path=None):
+    """Read the cmap of every fallback font found and write the coverage index."""
+    dirs = _dirs_fingerprint()
+    fonts = []
+    for name, font_path in _find_font_files():
+        try:
+            cmap = TTFontFile(font_path, subfontIndex=0).charToGlyph
+        except Exception as e:   # not TrueType outlines, or unreadable
+            print(f'[PDF] Skipping fallback font {font_path}: {e}')
+            continue
+        fonts.append({'name': name, 'path': font_path, 'stat': _fingerprint(font_path),
+                      'ranges': _ranges(cmap)})
+    index = {'version': INDEX_VERSION, 'env': os.environ.get('PROSPECTAI_FALLBACK_FONTS', ''),
+             'dirs': dirs, 'fonts': fonts}
+
+    path = path or INDEX_PATH
+    os.makedirs(os.path.dirname(path) or '.', mode=0o700, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.json')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp, path)
+    return index
+
+
+def _load_index(path):
+    try:
+        with open(path) as f:
+            index = json.load(f)
+        if (index.get('version') != INDEX_VERSION
+                or index.get('env') != os.environ.get('PROSPECTAI_FALLBACK_FONTS', '')
+                or index.get('dirs') != _dirs_fingerprint()
+                or any(_fingerprint(font['path']) != font['stat'] for font in index['fonts'])):
+            return None
+        return index
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def set_register_hook(hook):
+    """hook(font) is applied to each fallback TTFont when it is registered,
+    e.g. to make its subsetting thread-safe."""
+    global _register_hook
+    _register_hook = hook
+
+
+def load_chain(index_path=None):
+    """Names of the fallback fonts available, loading (or rebuilding) the index once."""
+    global _chain
+    if _chain is None:
+        with _lock:
+            if _chain is None:
+                path = index_path or INDEX_PATH
+                index = _load_index(path) or build_index(path)
+                _chain = [(font['name'], font['path'], _missing_regex(font['ranges']))
+                          for font in index['fonts']]
+    return [name for name, _, _ in _chain]
+
+
+def _missing_in(font_name):
+    """Regex of the characters font_name lacks, from its registered cmap."""
+    regex = _missing.get(font_name)
+    if regex is None:
+        font = pdfmetrics.getFont(font_name)
+        if isinstance(font, TTFont):
+            cmap = font.face.charToGlyph
+        else:   # base-14: WinAnsi
+            cmap = {ord(c) for c in bytes(range(32, 256)).decode('cp1252', 'ignore')}
+        regex = _missing[font_name] = _missing_regex(_ranges(cmap))
+    return regex
+
+
+def _use(name, path):
+    """Register a fallback font on first use."""
+    if name not in _registered:
+        with _lock:
+            if name not in _registered:
+                font = TTFont(name, path, subfontIndex=0)
+                registerFont(font)
+                if _register_hook:
+                    _register_hook(font)
+                _registered.add(name)
+    return name
+
+
+# ─── Runs ─────────────────────────────────────────────────────────────────────
+
+def _font_for(token):
+    for name, path, missing in _chain:
+        if not missing.search(token):
+            return _use(name, path)
+    return None
+
+
+@contextlib.contextmanager
+def fallback_disabled():
+    """Leave all text in its own font, on this thread, inside the block (draft
+    renders): no fallback font is read, and what the font lacks draws as missing."""
+    disabled = getattr(_local, 'disabled', False)
+    _local.disabled = True
+    try:
+        yield
+    finally:
+        _local.disabled = disabled
+
+
+def font_runs(text, font_name):
+    """Split text into [(font name, text)] runs that font_name plus the chain can draw."""
+    if getattr(_local, 'disabled', False):
+        return [(font_name, text)]
+    missing = _missing_in(font_name)
+    if not missing.search(text) or not load_chain():
+        return [(font_name, text)]
+
+    runs = []
+
+    def add(name, part):
+        if runs and runs[-1][0] == name:
+            runs[-1] = (name, runs[-1][1] + part)
+        else:
+            runs.append((name, part))
+
+    for token in _WORDS.findall(text):
+        if not missing.search(token):
+            add(font_name, token)
+            continue
+        name = _font_for(token)
+        if name:
+            add(name, token)
+            continue
+        for char in token:   # no single font has the whole word
+            add((not missing.search(char) and font_name) or _font_for(char) or font_name, char)
+    return runs
+
+
+def fallback_frags(frags):
+    """Paragraph frags with uncovered text moved into fallback-font frags."""
+    out = None
+    for i, frag in enumerate(frags):
+        text = getattr(frag, 'text', None)
+        runs = font_runs(text, frag.fontName) if text else None
+        if runs and (len(runs) > 1 or runs[0][0] != frag.fontName):
+            if out is None:
+                out = list(frags[:i])
+            out.extend(frag.clone(fontName=name, text=part) for name, part in runs)
+        elif out is not None:
+            out.append(frag)
+    return frags if out is None else out
+
+
+class Paragraph(_Paragraph):
+    """Platypus Paragraph whose text falls back to other fonts where needed."""
+
+    def _setup(self, text, style, bulletText, frags, cleaner):
+        super()._setup(text, style, bulletText, frags, cleaner)
+        self.frags = fallback_frags(self.frags)
+
+
+def draw_string(canv, x, y, text, font_name, size):
+    """canvas.drawString with fallback; leaves font_name/size set afterwards."""
+    runs = font_runs(text, font_name)
+    if len(runs) == 1 and runs[0][0] == font_name:
+        canv.drawString(x, y, text)
+        return
+    for name, part in runs:
+        canv.setFont(name, size)
+        canv.drawString(x, y, part)
+        x += stringWidth(part, name, size)
+    canv.setFont(font_name, size)
+
+
+def string_width(text, font_name, size):
+    """stringWidth of text as draw_string would draw it."""
+    return sum(stringWidth(part, name, size) for name, part in font_runs(text, font_name))
+
+
+def covers(text, font_name):
+    """Whether font_name alone has every character of text."""
+    return not _missing_in(font_name).search(text)
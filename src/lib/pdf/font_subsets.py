@@ -0,0 +1,119 @@
+"""TrueType subsets reused across renders.
+
+ReportLab embeds each TrueType face a document uses as subsets of at most
+256 characters, built at save time from the font file (makeSubset) and
+then deflated. Subset 0 always holds printable ASCII at its own codes;
+the non-ASCII characters a document uses fill codes 1-31 in the order
+they first appear. Nearly all of our text is ASCII plus the same handful
+of punctuation (dashes, curly quotes, bullets), but because the order
+differs from one document to the next, every render builds and deflates
+its own copy of what is almost always the same subset.
+
+install(font) makes that subset the same in every document and builds it
+once:
+
+  - every new document state of the font starts with COMMON_CHARS already
+    assigned to codes 1-31, in a fixed order, so a document whose
+    characters all fall within ASCII and COMMON_CHARS has exactly the
+    seeded subset 0; anything else gets the next free code, as before;
+  - makeSubset results are kept per face, keyed by the subset (the
+    precomputed seeded subset, and up to MAX_PROGRAMS others), and kept
+    programs are deflated once per level (flate.keep).
+
+The seeded characters are embedded whether a document uses them or not,
+at a few hundred bytes per face.
+"""
+
+import collections
+import threading
+import weakref
+
+import flate
+
+
+# Em and en dash, middle dot, bullet, curly quotes, ellipsis, and the accented
+# letters most often seen in names; at most 31, the codes subset 0 has free
+COMMON_CHARS = '\u2014\u2013\u00b7\u2022\u2018\u2019\u201c\u201d\u2026\u00e9\u00e8\u00e1\u00ed\u00f3\u00f1\u00fc\u00f6'
+MAX_PROGRAMS = 64       # per face, besides the precomputed one
+
+
+class _SeededStates(weakref.WeakKeyDictionary):
+    """TTFont.state that assigns the seed characters in each new document state."""
+
+    def __init__(self, font, seed):
+        super().__init__()
+        self.font = font
+        self.seed = seed
+
+    def __setitem__(self, doc, state):
+        super().__setitem__(doc, state)
+        if not state.frozen:
+            self.font.splitString(self.seed, doc)
+
+
+class _Doc:
+    """Stands in for a document while the seeded subset is precomputed."""
+
+
+class _SubsetCache:
+    """makeSubset with its results kept, most recently used last."""
+
+    def __init__(self, make_subset):
+        self.make_subset = make_subset
+        self.lock = threading.Lock()
+        self.pinned = {}
+        self.programs = collections.OrderedDict()
+        self.hits = self.misses = 0
+
+    def __call__(self, subset):
+        key = tuple(subset)
+        with self.lock:
+            program = self.pinned.get(key)
+            if program is None and key in self.programs:
+                program = self.programs[key]
+                self.programs.move_to_end(key)
+            if program is not None:
+                self.hits += 1
+                return program
+            self.misses += 1
+        program = self.make_subset(subset)
+        with self.lock:
+            self.programs[key] = program
+            flate.keep(program)
+            while len(self.programs) > MAX_PROGRAMS:
+                flate.forget(self.programs.popitem(last=False)[1])
+        return program
+
+    def pin(self, subset):
+        """Build subset now and keep it for good."""
+        program = self.make_subset(subset)
+        with self.lock:
+            self.pinned[tuple(subset)] = program
+            flate.keep(program)
+
+
+def install(font, seed=COMMON_CHARS):
+    """Seed font's document states with seed and reuse its subset programs; precomputes
+    the seeded subset. Once per font; faces shared between fonts are cached once."""
+    if isinstance(font.state, _SeededStates):
+        return
+    face = font.face
+    if not isinstance(face.makeSubset, _SubsetCache):
+        face.makeSubset = _SubsetCache(face.makeSubset)
+    font.state = _SeededStates(font, seed)
+
+    doc = _Doc()
+    font.splitString('', doc)
+    face.makeSubset.pin(font.state[doc].subsets[0])
+    del font.state[doc]
+
+
+def uninstall(font):
+    """Back to ReportLab's own states and subsetting (benchmarks)."""
+    if isinstance(font.state, _SeededStates):
+        font.state = weakref.WeakKeyDictionary()
+    cache = font.face.makeSubset
+    if isinstance(cache, _SubsetCache):
+        font.face.makeSubset = cache.make_subset
+        for program in list(cache.pinned.values()) + list(cache.programs.values()):
+            flate.forget(program)
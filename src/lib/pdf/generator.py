@@ -6,26 +6,63 @@ Generates a professionally designed PDF from profile JSON data.
 Content-agnostic layout engine that applies the DTW design system
 to whatever structured data the AI produces.
 
-Usage: python3 generator.py <input.json> <output.pdf>
+Usage: python3 generator.py [--profile] [--deterministic] [--linearize] [--markdown]
+                            [--time-budget SECONDS] [--memory-budget MIB] [--page-map JSON]
+                            [--compress-level 0-9] [--incremental] [--preview PAGES] [--draft]
+                            <input.json> <output.pdf|->
+       python3 generator.py [--deterministic] [--markdown] --recipient NAME [--recipient NAME ...]
+                            <input.json> <output.pdf>
+       python3 generator.py --patch-cover <existing.pdf> <input.json> <output.pdf>
 """
 
+import argparse
+import bisect
+import collections
+import contextlib
+import copy
+import datetime
+import hashlib
+import io
 import json
+import math
 import os
 import sys
 import re
+import threading
+import time
 
 from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, PageBreak, Flowable,
-    KeepTogether, BaseDocTemplate, Frame, PageTemplate, NextPageTemplate,
+    SimpleDocTemplate, Spacer, PageBreak, Flowable,
+    KeepTogether, BaseDocTemplate, Frame, PageTemplate, NextPageTemplate, Image,
 )
 from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
 from reportlab.lib.enums import TA_LEFT, TA_JUSTIFY, TA_CENTER, TA_RIGHT
+from reportlab.lib.fonts import tt2ps
 from reportlab.lib.units import inch
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.pdfmetrics import registerFont, registerFontFamily
+from reportlab.pdfbase.pdfmetrics import registerFont, registerFontFamily, stringWidth
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.colors import HexColor, Color
+from reportlab.pdfbase.pdfdoc import PDFText, DummyDoc
+from PIL.Image import DecompressionBombError
+
+from render_profiler import RenderProfiler
+from linearize import linearize_file, linearize as linearize_pdf
+from cover_patch import build_update
+from render_governor import RenderGovernor, RenderBudgetExceeded, BudgetCutoff
+from image_pipeline import prepare_image
+from charts import RadarChartFlowable, ConfidenceBarsFlowable
+from page_map import PageMap, mark_section
+from font_fallback import Paragraph, covers, draw_string, string_width, set_register_hook, fallback_disabled
+from stamp import Stamper
+from text_metrics import accelerate
+from state_canvas import StateCanvas
+from incremental import IncrementalCanvas
+from preview import Preview
+from profile_data import ProfileData, MeetingGuideV3, SetupGroup, Beat, Tripwire
+import flate
+import font_subsets
 
 # ─── Design tokens (inline to avoid import issues when run as script) ─────
 
@@ -41,6 +78,8 @@ PURPLE_LIGHT = HexColor('#D894E8')
 GREEN        = HexColor('#2D6A4F')
 GREEN_LIGHT  = HexColor('#40916C')
 CORAL        = HexColor('#E07A5F')
+GREEN_TINT   = HexColor('#E8F5E9')
+CORAL_TINT   = HexColor('#FBE9E7')
 
 GRADIENT_STOPS = [
     (0.0, PURPLE),
@@ -53,6 +92,9 @@ PAGE_WIDTH, PAGE_HEIGHT = letter
 MARGIN = 54  # 0.75in
 CONTENT_WIDTH = PAGE_WIDTH - 2 * MARGIN
 
+COVER_PHOTO_SIZE = 72           # donor photo, square
+COVER_LOGO_BOX = (120, 36)      # partner logo fits inside
+
 
 # ─── Font registration ────────────────────────────────────────────────────────
 
@@ -123,6 +165,83 @@ def register_fonts():
     return fonts_registered
 
 
+_font_lock = threading.Lock()
+_fonts = None
+
+
+def _serialize_subsetting(font):
+    """Make subsetting of a shared TTFont safe across concurrent renders.
+
+    TTFontFace.makeSubset walks the font file with a read cursor stored on the
+    face, so two documents saving at once would corrupt each other's subsets.
+    """
+    lock = threading.Lock()
+    make_subset = font.face.makeSubset
+
+    def locked_make_subset(subset):
+        with lock:
+            return make_subset(subset)
+
+    font.face.makeSubset = locked_make_subset
+
+
+def _prepare_font(font):
+    """Per-process setup of a registered TTFont: thread-safe subsetting, reused
+    subsets, fast widths."""
+    _serialize_subsetting(font)
+    font_subsets.install(font)
+    accelerate(font)
+
+
+def ensure_fonts():
+    """Register fonts once per process (thread-safe) and return availability.
+
+    Also resolves the base-14 fonts up front (with fast widths), since
+    pdfmetrics registers those lazily on first use.
+    """
+    global _fonts
+    if _fonts is None:
+        with _font_lock:
+            if _fonts is None:
+                fonts = register_fonts()
+                set_register_hook(_prepare_font)
+                # families can register one TTFont under several names; prepare it once
+                registered = map(pdfmetrics.getFont, pdfmetrics.getRegisteredFontNames())
+                for font in {id(font): font for font in registered}.values():
+                    if isinstance(font, TTFont):
+                        _prepare_font(font)
+                for name in pdfmetrics.standardFonts:
+                    accelerate(pdfmetrics.getFont(name))
+                _fonts = fonts
+    return _fonts
+
+
+DRAFT_FONTS = {'serif': False, 'sans': False}
+_draft_fonts = None
+
+
+def ensure_draft_fonts():
+    """Font availability for draft renders: the base-14 fonts only, resolved once
+    per process (thread-safe). No TrueType file is read."""
+    global _draft_fonts
+    if _draft_fonts is None:
+        with _font_lock:
+            if _draft_fonts is None:
+                for name in pdfmetrics.standardFonts:
+                    accelerate(pdfmetrics.getFont(name))
+                _draft_fonts = DRAFT_FONTS
+    return _draft_fonts
+
+
+def _render_styles(draft=False):
+    return make_styles(ensure_draft_fonts() if draft else ensure_fonts())
+
+
+def _text_fallback(draft=False):
+    """Context for a render's story build and layout: draft text never falls back."""
+    return fallback_disabled() if draft else contextlib.nullcontext()
+
+
 # ─── Style factory ────────────────────────────────────────────────────────────
 
 def make_styles(fonts):
@@ -303,14 +422,38 @@ def _interpolate_gradient(t, stops):
 
 
 def draw_gradient_bar(canvas, x, y, width, height):
-    """Draw gradient bar at specified position."""
+    """Draw gradient bar at specified position.
+
+    The 200 strips are drawn once per document into a form XObject and each
+    page shows the form, rather than repeating ~9 KB of operators per page.
+    """
     steps = 200
     sw = width / steps
-    for i in range(steps):
-        t = i / steps
-        color = _interpolate_gradient(t, GRADIENT_STOPS)
-        canvas.setFillColor(color)
-        canvas.rect(x + i * sw, y, sw + 0.5, height, stroke=0, fill=1)
+    name = 'GradientBar%gx%g' % (width, height)
+    if not canvas.hasForm(name):
+        canvas.beginForm(name, 0, 0, width + 0.5, height)
+        for i in range(steps):
+            t = i / steps
+            color = _interpolate_gradient(t, GRADIENT_STOPS)
+            canvas.setFillColor(color)
+            canvas.rect(i * sw, 0, sw + 0.5, height, stroke=0, fill=1)
+        canvas.endForm()
+    canvas.saveState()
+    canvas.translate(x, y)
+    canvas.doForm(name)
+    canvas.restoreState()
+
+
+def draw_accent_bar(canvas, doc, x, y, width, height):
+    """Gradient bar, or a flat one in draft mode or when the render governor is
+    short on budget."""
+    governor = getattr(doc, 'governor', None)
+    if getattr(doc, 'draft', False) or (governor and governor.degraded('flat-colours')):
+        canvas.setFillColor(GREEN)
+        canvas.rect(x, y, width, height, stroke=0, fill=1)
+        return False
+    draw_gradient_bar(canvas, x, y, width, height)
+    return True
 
 
 def draw_dark_page(canvas, doc):
@@ -319,8 +462,10 @@ def draw_dark_page(canvas, doc):
     canvas.setFillColor(CHARCOAL)
     canvas.rect(0, 0, PAGE_WIDTH, PAGE_HEIGHT, stroke=0, fill=1)
 
-    # Gradient bar at top
-    draw_gradient_bar(canvas, 0, PAGE_HEIGHT - 6, PAGE_WIDTH, 6)
+    # Gradient bar at top; the glows go too when it falls back to flat colour
+    if not draw_accent_bar(canvas, doc, 0, PAGE_HEIGHT - 6, PAGE_WIDTH, 6):
+        canvas.restoreState()
+        return
 
     # Subtle radial glows (approximated with circles)
     canvas.setFillColor(Color(0.482, 0.176, 0.557, 0.08))  # purple glow
@@ -338,7 +483,7 @@ def draw_content_page(canvas, doc):
     canvas.rect(0, 0, PAGE_WIDTH, PAGE_HEIGHT, stroke=0, fill=1)
 
     # Thin gradient bar at top
-    draw_gradient_bar(canvas, 0, PAGE_HEIGHT - 3, PAGE_WIDTH, 3)
+    draw_accent_bar(canvas, doc, 0, PAGE_HEIGHT - 3, PAGE_WIDTH, 3)
 
     # Footer
     canvas.setStrokeColor(STONE)
@@ -353,6 +498,365 @@ def draw_content_page(canvas, doc):
     canvas.restoreState()
 
 
+# ─── Splittable flowables ─────────────────────────────────────────────────────
+#
+# Titles, cards and callouts are each drawn as one flowable, so one that is
+# taller than a page frame (long model output) has to split across pages or
+# layout fails. Their paragraphs are broken into lines once; every part of a
+# split draws a range of those lines, so a callout running over n pages costs
+# one wrap, not n.
+
+MIN_SPLIT_LINES = 2   # fewest lines of a paragraph left behind or carried over
+
+
+class WrappedLines:
+    """A Paragraph broken into lines once, drawable a range of lines at a time."""
+
+    def __init__(self, para, width):
+        para.wrap(width, PAGE_HEIGHT)
+        self.para = para
+        self.count = len(para.blPara.lines)
+        self.leading = para.style.leading
+
+    def height(self, start=0, end=None):
+        return ((self.count if end is None else end) - start) * self.leading
+
+    def fit(self, start, avail):
+        """Number of lines from start that fit in avail points."""
+        return max(0, min(self.count - start, int((avail + 1e-6) // self.leading)))
+
+    def text(self, start=0, end=None):
+        """Plain text of lines [start, end)."""
+        blPara = self.para.blPara
+        lines = blPara.lines[start:end]
+        if blPara.kind == 0:
+            return ' '.join(' '.join(words) for _, words in lines)
+        return ' '.join(''.join(getattr(w, 'text', '') for w in line.words).strip() for line in lines)
+
+    def draw_on(self, canv, x, y, start=0, end=None):
+        end = self.count if end is None else end
+        if start == 0 and end == self.count:
+            self.para.drawOn(canv, x, y)
+            return
+        # Same lines, no re-wrap: a shallow copy with a slice of blPara.
+        part = copy.copy(self.para)
+        part.blPara = copy.copy(self.para.blPara)
+        part.blPara.lines = self.para.blPara.lines[start:end]
+        part.height = self.height(start, end)
+        part.bulletText = self.para.bulletText if start == 0 else None
+        part._JustifyLast = end < self.count
+        part.drawOn(canv, x, y)
+
+
+class LineStack:
+    """A vertical run of wrapped paragraphs and fixed-height rows.
+
+    Positions number the lines of every paragraph in order, with each fixed
+    row counting as one line, so a part of a split flowable is a position
+    range [lo, hi). segments is a list of (item, gap_after) where item is a
+    WrappedLines or the height of a fixed row.
+    """
+
+    def __init__(self, segments):
+        self.segments = []
+        pos = 0
+        for item, gap in segments:
+            n = item.count if isinstance(item, WrappedLines) else 1
+            self.segments.append((item, gap, pos, pos + n))
+            pos += n
+        self.count = pos
+
+    def _runs(self, lo, hi):
+        """(item, gap_after, first position, start, end) of each segment within [lo, hi)."""
+        runs = []
+        for item, gap, a, b in self.segments:
+            if a == b:
+                # An empty paragraph still keeps its gap, in the part where it falls.
+                if lo <= a < hi or a == hi == self.count:
+                    runs.append((item, gap, a, 0, 0))
+            elif a < hi and b > lo:
+                runs.append((item, gap, a, max(a, lo) - a, min(b, hi) - a))
+        return runs
+
+    @staticmethod
+    def _run_height(item, start, end):
+        return item.height(start, end) if isinstance(item, WrappedLines) else item
+
+    def height(self, lo=0, hi=None):
+        runs = self._runs(lo, self.count if hi is None else hi)
+        return (sum(self._run_height(item, start, end) for item, _, _, start, end in runs)
+                + sum(gap for _, gap, _, _, _ in runs[:-1]))
+
+    def fit(self, lo, avail):
+        """End position of the longest part starting at lo that fits in avail points.
+
+        Paragraphs break between lines, leaving at least MIN_SPLIT_LINES on
+        either side; fixed rows never break.
+        """
+        used = 0
+        for item, gap, a, start, end in self._runs(lo, self.count):
+            if isinstance(item, WrappedLines):
+                n = item.fit(start, avail - used)
+                if start + n < end:
+                    if end - (start + n) < MIN_SPLIT_LINES:
+                        n = end - start - MIN_SPLIT_LINES
+                    if n < MIN_SPLIT_LINES and n < end - start:
+                        n = 0
+                    return a + start + n
+            elif item > avail - used:
+                return a + start
+            used += self._run_height(item, start, end) + gap
+        return self.count
+
+    def text(self, lo=0, hi=None):
+        """Plain text of the paragraphs in [lo, hi), one per line."""
+        return '\n'.join(item.text(start, end) for item, _, _, start, end in self._runs(lo, self.count if hi is None else hi)
+                         if isinstance(item, WrappedLines) and end > start)
+
+    def draw(self, canv, x, y, lo=0, hi=None, draw_row=None):
+        """Draw positions [lo, hi) downwards from y; draw_row(canv, y) draws fixed rows."""
+        for item, gap, _, start, end in self._runs(lo, self.count if hi is None else hi):
+            h = self._run_height(item, start, end)
+            if isinstance(item, WrappedLines):
+                item.draw_on(canv, x, y - h, start, end)
+            elif draw_row:
+                draw_row(canv, y)
+            y -= h + gap
+
+
+def _must_split(flowable, height):
+    """Whether a flowable that doesn't fit should split rather than move on.
+
+    Only one that can't be moved whole to a fresh frame splits: it is at the
+    top of its frame already, or taller than the whole frame. Content that fits
+    on a page keeps moving to the next page as before.
+    """
+    frame = getattr(flowable, '_frame', None)
+    return frame is None or frame._atTop or height > frame._aH
+
+
+# ─── Fast-path lists ──────────────────────────────────────────────────────────
+#
+# The sources appendix and plain bullet lists are long runs of short,
+# single-style, left-aligned items. Going through Platypus they cost a
+# Paragraph (frag parsing, line breaking, a text object per line) plus a
+# Spacer and a frame placement per item. A FastList measures and breaks
+# every item's lines itself, splits between any two lines, and draws each
+# page's share as one text object.
+#
+# Builders only use it when every item qualifies (fast_block returns a
+# block): plain text with no inline markup, every glyph in the style's own
+# font (no fallback fonts) and a plain left-aligned style. Otherwise they
+# build the usual Paragraphs, so output only changes in the cases that are
+# already simple.
+
+def fast_block(runs, style):
+    """A FastList block of runs [(font name, text)] in style, or None if it needs Platypus."""
+    if (style.alignment != TA_LEFT or style.firstLineIndent or style.rightIndent
+            or getattr(style, 'autoLeading', '') or style.backColor or style.borderWidth):
+        return None
+    for font_name, text in runs:
+        if not covers(text, font_name):
+            return None
+    return runs, style
+
+
+def _split_word(text, line_width, max_width, font_name, size):
+    """Pieces of a word wider than a line, the first filling what is left of
+    the current line (Platypus' _splitWord)."""
+    pieces, piece = [], ''
+    for char in text:
+        char_width = stringWidth(char, font_name, size)
+        new_width = line_width + char_width
+        if new_width > max_width and (piece or char_width <= max_width):
+            pieces.append(piece)
+            new_width = char_width
+            piece = ''
+        piece += char
+        line_width = new_width
+    return pieces + [piece]
+
+
+def _break_lines(words, max_width, space_width, shrink):
+    """Greedy line breaks as Paragraph.breakLines makes them for one style.
+
+    words: [(font name, size, word, width)]. Returns [(words, width)]. A line
+    may run past max_width by the style's spaceShrinkage per space (it is
+    drawn with tighter word spacing), and a word wider than a whole line is
+    cut into pieces (splitLongWords), exactly as in Platypus.
+    """
+    lines, line, width = [], [], -space_width
+    queue = collections.deque((word, False) for word in words)
+    while queue:
+        word, piece = queue.popleft()
+        font_name, size, text, w = word
+        if w > max_width and not piece:
+            parts = _split_word(text, width + space_width, max_width, font_name, size)
+            parts = [(font_name, size, part, stringWidth(part, font_name, size)) for part in parts]
+            # The first piece ends the current line; the rest flow on as usual
+            if parts[0][2]:
+                line.append(parts[0])
+                width += space_width + parts[0][3]
+            lines.append((line, width))
+            line, width = [], -space_width
+            queue.extendleft((part, True) for part in reversed(parts[1:]))
+            continue
+        new_width = width + space_width + w
+        if new_width <= max_width + shrink * space_width * len(line) or not line:
+            line.append(word)
+            width = new_width
+        else:
+            lines.append((line, width))
+            line, width = [word], w
+    if line:
+        lines.append((line, width))
+    return lines
+
+
+class FastList(Flowable):
+    """A list of simple items, laid out and drawn without Platypus paragraphs.
+
+    items: [(blocks, gap_after, source)], where blocks are fast_block()
+    results drawn one under another, gap_after is extra space below the
+    item (a Spacer in the Paragraph version) and source, if not None, is the
+    item's index in the sources list for the page map.
+
+    Lines are laid out once, on the first wrap; the parts a split returns
+    share them and cover rows lo..hi.
+    """
+
+    def __init__(self, items, layout=None, lo=0, hi=None, top=0, trim=0):
+        super().__init__()
+        self.items = items
+        self._layout = layout      # (rows, offsets, ends), see _lay_out
+        self._lo, self._hi = lo, hi
+        self._top = top            # an item's Spacer carried over from the previous frame
+        self._trim = trim          # ... and taken off this part's last gap
+
+    def _lay_out(self, width):
+        """Rows [leading, gap, style, x, words, block, source, word_space, spacer], one per
+        line, plus each row's top offset and bottom offset (top + leading) from the first.
+
+        gap is the space below the row: its style's spaceAfter on a block's
+        last line, plus spacer (the item's gap_after) on an item's last line.
+        """
+        rows = []
+        block_id = 0
+        widths = {}
+
+        def width_of(word, font_name, size):
+            key = word, font_name, size
+            if key not in widths:
+                widths[key] = stringWidth(word, font_name, size)
+            return widths[key]
+
+        for blocks, gap_after, source in self.items:
+            first = len(rows)
+            for runs, style in blocks:
+                start = len(rows)
+                words = [(font_name, style.fontSize, word, width_of(word, font_name, style.fontSize))
+                         for font_name, text in runs for word in text.split()]
+                space_width = stringWidth(' ', style.fontName, style.fontSize)
+                max_width = width - style.leftIndent
+                for line, line_width in _break_lines(words, max_width, space_width, style.spaceShrinkage):
+                    word_space = (max_width - line_width) / (len(line) - 1) if (
+                        line_width > max_width and len(line) > 1) else 0
+                    rows.append([style.leading, 0, style, style.leftIndent, line, block_id, None, word_space, 0])
+                if len(rows) > start:
+                    rows[-1][1] = style.spaceAfter
+                block_id += 1
+            if len(rows) > first:
+                rows[first][6] = source
+                rows[-1][1] += gap_after
+                rows[-1][8] = gap_after
+
+        offsets, ends = [0], []
+        for leading, gap, *_ in rows:
+            ends.append(offsets[-1] + leading)
+            offsets.append(offsets[-1] + leading + gap)
+        return rows, offsets, ends
+
+    def wrap(self, availWidth, availHeight):
+        if self._layout is None:
+            self._layout = self._lay_out(availWidth)
+            self._hi = len(self._layout[0])
+        rows, offsets, _ = self._layout
+        lo, hi = self._lo, self._hi
+        self.width = availWidth
+        self.height = self._top + (offsets[hi] - offsets[lo] - rows[hi - 1][1] if hi > lo else 0)
+        return self.width, self.height
+
+    def getSpaceBefore(self):
+        return self._layout[0][self._lo][2].spaceBefore if self._layout and self._hi > self._lo else 0
+
+    def getSpaceAfter(self):
+        return self._layout[0][self._hi - 1][1] - self._trim if self._layout and self._hi > self._lo else 0
+
+    def split(self, availWidth, availHeight):
+        self.wrap(availWidth, availHeight)
+        rows, offsets, ends = self._layout
+        lo, hi = self._lo, self._hi
+        cut = bisect.bisect_right(ends, offsets[lo] + availHeight - self._top + 1e-6, lo, hi)
+        # Like Paragraph (allowOrphans=0): don't leave a block's first line behind alone
+        if lo < cut < hi and rows[cut][5] == rows[cut - 1][5] and (
+                cut - 1 == lo or rows[cut - 2][5] != rows[cut - 1][5]):
+            cut -= 1
+        if cut in (lo, hi):
+            return []
+        # An item's Spacer that doesn't fit below it moves to the next frame, as in Platypus
+        carried = rows[cut - 1][8]
+        if self._top + offsets[cut] - offsets[lo] <= availHeight + 1e-6:
+            carried = 0
+        return [FastList(self.items, self._layout, lo, cut, self._top, carried),
+                FastList(self.items, self._layout, cut, hi, carried)]
+
+    def _part(self):
+        return self._layout[0][self._lo:self._hi] if self._layout else []
+
+    @property
+    def page_map_sources(self):
+        return [row[6] for row in self._part() if row[6] is not None]
+
+    def plain_text(self):
+        blocks = []
+        previous = None
+        for row in self._part():
+            text = ' '.join(word[2] for word in row[4])
+            if row[5] == previous:
+                blocks[-1] += ' ' + text
+            else:
+                blocks.append(text)
+            previous = row[5]
+        return '\n'.join(blocks)
+
+    def draw(self):
+        text = self.canv.beginText()
+        font = color = None
+        top = self.height - self._top
+        for leading, gap, style, x, words, _, _, word_space, _ in self._part():
+            text.setTextOrigin(x, top - style.fontSize)
+            if style.textColor != color:
+                color = style.textColor
+                text.setFillColor(color)
+            if word_space:
+                text.setWordSpace(word_space)
+            # One textOut per run of words in the same font
+            run = []
+            for font_name, size, word, _ in words:
+                if (font_name, size) != font:
+                    if run:
+                        text.textOut(' '.join(run))
+                        run = ['']
+                    font = (font_name, size)
+                    text.setFont(font_name, size)
+                run.append(word)
+            text.textOut(' '.join(run))
+            if word_space:
+                text.setWordSpace(0)
+            top -= leading + gap
+        self.canv.drawText(text)
+
+
 # ─── Section title flowable ───────────────────────────────────────────────────
 
 def _spaced_text(text):
@@ -361,81 +865,141 @@ def _spaced_text(text):
     return '   '.join(' '.join(word) for word in words)
 
 
+class AccentLineFlowable(Flowable):
+    """Short accent-coloured rule above a heading."""
+
+    def __init__(self, color):
+        super().__init__()
+        self.color = color
+
+    def wrap(self, aW, aH):
+        return (40, 10)
+
+    def draw(self):
+        self.canv.setFillColor(self.color)
+        self.canv.rect(0, 4, 40, 2, stroke=0, fill=1)
+
+
 class SectionTitleFlowable(Flowable):
     """Two-line section title matching the app: small uppercase label + large serif name + thick divider."""
 
-    def __init__(self, label, name, width, styles):
+    def __init__(self, label, name, width, styles, stack=None, lo=0, hi=None):
         super().__init__()
+        self.label = label
         self.label_text = _spaced_text(label)
         self.name_text = name.upper()
         self.box_width = width
         self.styles = styles
-        self._label_para = None
-        self._name_para = None
-        self._lh = 0
-        self._nh = 0
+        self._stack = stack
+        self._lo = lo
+        self._hi = hi
         self._h = 0
+        if lo == 0:
+            mark_section(self, label)
 
     def wrap(self, aW, aH):
-        self._label_para = Paragraph(self.label_text, self.styles['title_label'])
-        _, self._lh = self._label_para.wrap(self.box_width, aH)
-        self._name_para = Paragraph(self.name_text, self.styles['title_name'])
-        _, self._nh = self._name_para.wrap(self.box_width, aH)
-        # label + gap(2) + name + gap(10) + divider(~2) + bottom margin(12)
-        self._h = self._lh + 2 + self._nh + 10 + 2 + 12
+        if self._stack is None:
+            label = WrappedLines(Paragraph(self.label_text, self.styles['title_label']), self.box_width)
+            name = WrappedLines(Paragraph(self.name_text, self.styles['title_name']), self.box_width)
+            # label + gap(2) + name + gap(10) + divider(~2) + bottom margin(12)
+            self._stack = LineStack([(label, 2), (name, 10), (2 + 12, 0)])
+            self._hi = self._stack.count
+        self._h = self._stack.height(self._lo, self._hi)
         return (self.box_width, self._h)
 
-    def draw(self):
-        c = self.canv
-        h = self._h
-        # Label at top
-        label_bottom = h - self._lh
-        self._label_para.drawOn(c, 0, label_bottom)
-        # Name: 2pt gap below label
-        name_bottom = label_bottom - 2 - self._nh
-        self._name_para.drawOn(c, 0, name_bottom)
-        # Thick divider: 10pt below name
-        divider_y = name_bottom - 10
+    def split(self, aW, aH):
+        self.wrap(aW, aH)
+        if not _must_split(self, self._h):
+            return []
+        cut = self._stack.fit(self._lo, aH)
+        if cut <= self._lo:
+            return []
+        return [SectionTitleFlowable(self.label, self.name_text, self.box_width, self.styles, self._stack, lo, hi)
+                for lo, hi in ((self._lo, cut), (cut, self._hi))]
+
+    def plain_text(self):
+        return self._stack.text(self._lo, self._hi) if self._stack else ''
+
+    def _draw_divider(self, c, y):
         c.setStrokeColor(CHARCOAL)
         c.setLineWidth(2)
-        c.line(0, divider_y, self.box_width, divider_y)
+        c.line(0, y, self.box_width, y)
+
+    def draw(self):
+        # Label at top, name 2pt below it, thick divider 10pt below the name
+        self._stack.draw(self.canv, 0, self._h, self._lo, self._hi, self._draw_divider)
 
 
 # ─── Content builders ─────────────────────────────────────────────────────────
-
-def build_cover_page(data, styles):
-    """Build cover page flowables."""
+#
+# Builders take the ProfileData of the payload (see parse_input).
+
+def _cover_image(source, width, height, fit):
+    """Image flowable for a cover upload, or None if it can't be read."""
+    try:
+        path = prepare_image(source, width, height, fit=fit)
+    except (OSError, ValueError, DecompressionBombError) as e:
+        print(f'[PDF] Skipping cover image: {e}')
+        return None
+    image = Image(path, width=width, height=height, kind='proportional' if fit == 'contain' else 'direct')
+    image.hAlign = 'LEFT'
+    return image
+
+
+def build_cover_page(data, styles, prepared_for=None):
+    """Build cover page flowables.
+
+    prepared_for: a flowable to put in place of the "Prepared for" line
+    (a PreparedForSlot when copies are stamped per recipient).
+    """
     elements = []
-    elements.append(Spacer(1, PAGE_HEIGHT * 0.35))
+    photo = data.donor_photo and _cover_image(data.donor_photo, COVER_PHOTO_SIZE, COVER_PHOTO_SIZE, 'cover')
+    logo = data.partner_logo and _cover_image(data.partner_logo, *COVER_LOGO_BOX, 'contain')
+
+    # The photo sits above the overline without moving the name down
+    if photo:
+        elements.append(Spacer(1, PAGE_HEIGHT * 0.35 - COVER_PHOTO_SIZE - 18))
+        elements.append(photo)
+        elements.append(Spacer(1, 18))
+    else:
+        elements.append(Spacer(1, PAGE_HEIGHT * 0.35))
 
     # Overline
     overline = 'P R O S P E C T A I   D O N O R   I N T E L L I G E N C E'
     elements.append(Paragraph(overline, styles['cover_overline']))
 
     # Donor name
-    elements.append(Paragraph(data['donorName'], styles['cover_name']))
+    elements.append(Paragraph(data.donor_name, styles['cover_name']))
 
     # Subtitle
     elements.append(Paragraph('Behavioral Profile &amp; Meeting Strategy', styles['cover_subtitle']))
 
     # Meta table
     meta_items = []
-    if data.get('preparedFor'):
-        meta_items.append(f"<b>Prepared for</b>  {data['preparedFor']}")
-    meta_items.append(f"<b>Date</b>  {data.get('date', '')}")
+    if prepared_for is None and data.prepared_for:
+        meta_items.append(f"<b>Prepared for</b>  {data.prepared_for}")
+    meta_items.append(f"<b>Date</b>  {data.date}")
     meta_items.append(f"<b>Classification</b>  Confidential \u2014 Internal Use Only")
-    meta_items.append(f"<b>Sources</b>  {data.get('sourceCount', 0)} verified references")
+    meta_items.append(f"<b>Sources</b>  {data.source_count} verified references")
 
+    if prepared_for is not None:
+        elements.append(prepared_for)
     for item in meta_items:
         elements.append(Paragraph(item, styles['cover_meta_value']))
 
-    # Footer at bottom
-    elements.append(Spacer(1, 80))
+    # Footer at bottom, with the partner logo just above it
+    if logo:
+        elements.append(Spacer(1, 80 - logo.drawHeight - 12))
+        elements.append(logo)
+        elements.append(Spacer(1, 12))
+    else:
+        elements.append(Spacer(1, 80))
     elements.append(Paragraph(
         'Generated by ProspectAI \u00b7 Confidential \u00b7 Internal Use Only',
         styles['cover_footer']
     ))
     elements.append(Paragraph('Democracy Takes Work', styles['cover_footer']))
+    mark_section(elements[0], 'Cover')
 
     # Note: no PageBreak here — the caller handles the transition
     # to the content template to avoid a blank page 2.
@@ -465,64 +1029,75 @@ def build_persuasion_profile(data, styles, accent_color=PURPLE):
     elements = []
 
     # Section title header (two-line: label + name + divider)
-    donor_name = data.get('donorName', '')
-    elements.append(SectionTitleFlowable('Persuasion Profile', donor_name, CONTENT_WIDTH, styles))
+    elements.append(SectionTitleFlowable('Persuasion Profile', data.donor_name, CONTENT_WIDTH, styles))
     elements.append(Spacer(1, 8))
 
-    sections = data.get('persuasionProfile', {}).get('sections', [])
-
-    for i, section in enumerate(sections):
-        # Accent line before each heading
-        class AccentLineFlowable(Flowable):
-            def __init__(self, color):
-                super().__init__()
-                self.color = color
-            def wrap(self, aW, aH):
-                return (40, 10)
-            def draw(self):
-                self.canv.setFillColor(self.color)
-                self.canv.rect(0, 4, 40, 2, stroke=0, fill=1)
-
+    for i, section in enumerate(data.sections):
         if i > 0:
             elements.append(Spacer(1, 12))
 
+        # Accent line before each heading
         elements.append(AccentLineFlowable(accent_color))
-        elements.append(Paragraph(section['title'], styles['heading']))
+        elements.append(Paragraph(section.title, styles['heading']))
 
-        for para in section.get('paragraphs', []):
-            ptype = para.get('type', 'text')
-            content = para.get('content', '')
+        for para in section.paragraphs:
+            elements.extend(_profile_paragraph(para.type, para.content, accent_color, styles))
 
-            # Convert markdown bold/italic to HTML tags
-            content = _md_inline_to_html(content)
+    return elements
 
-            if ptype == 'insight':
-                # Insight callout box
-                elements.append(Spacer(1, 4))
-                elements.append(_build_insight_box(content, accent_color, styles))
-                elements.append(Spacer(1, 4))
-            elif ptype == 'bold':
-                elements.append(Paragraph(content, styles['body_bold']))
-            elif ptype == 'bullet':
-                elements.append(Paragraph(
-                    f'\u2022  {content}', styles['profile_bullet']
-                ))
-            else:
-                elements.append(Paragraph(content, styles['body']))
 
+def _profile_paragraph(ptype, content, accent_color, styles):
+    """Flowables for one persuasion-profile paragraph of the given type."""
+    # Convert markdown bold/italic to HTML tags
+    content = _md_inline_to_html(content)
+
+    if ptype == 'insight':
+        # Insight callout box
+        return [Spacer(1, 4), _build_insight_box(content, accent_color, styles), Spacer(1, 4)]
+    elif ptype == 'bold':
+        return [Paragraph(content, styles['body_bold'])]
+    elif ptype == 'bullet':
+        return [Paragraph(f'\u2022  {content}', styles['profile_bullet'])]
+    return [Paragraph(content, styles['body'])]
+
+
+def build_evidence_charts(data, styles, accent_color=PURPLE):
+    """Build the evidence charts: dimension radar and per-section confidence bars."""
+    dimensions = data.charts.dimensions if data.charts else ()
+    confidence = data.charts.confidence if data.charts else ()
+    font = styles['body'].fontName
+    elements = [Spacer(1, 12)]
+
+    blocks = []
+    if len(dimensions) >= 3:
+        blocks.append([
+            Paragraph('Evidence confidence by behavioral dimension (0\u201310)', styles['body']),
+            RadarChartFlowable([(d.label, d.score) for d in dimensions],
+                               CONTENT_WIDTH, 300, accent_color, font),
+            Spacer(1, 10),
+        ])
+    if confidence:
+        blocks.append([
+            Paragraph('Structural confidence floor by section', styles['body']),
+            Spacer(1, 4),
+            ConfidenceBarsFlowable([(c.label, c.score) for c in confidence],
+                                   CONTENT_WIDTH, accent_color, font),
+        ])
+    if not blocks:
+        return []
+
+    # Heading stays with the first chart
+    blocks[0][:0] = [AccentLineFlowable(accent_color), Paragraph('Evidence Base', styles['heading'])]
+    elements.extend(KeepTogether(block) for block in blocks)
     return elements
 
 
 def build_meeting_guide(data, styles, accent_color=GREEN):
     """Build meeting guide content pages. Supports v3 and legacy formats."""
-    mg = data.get('meetingGuide', {})
-    donor_name = data.get('donorName', '')
-
-    # Detect v3 format
-    if mg.get('format') == 'v3':
-        return _build_meeting_guide_v3(mg, styles, accent_color, donor_name)
+    if isinstance(data.meeting_guide, MeetingGuideV3):
+        return _build_meeting_guide_v3(data.meeting_guide, styles, accent_color, data.donor_name)
 
-    return _build_meeting_guide_legacy(mg, styles, accent_color, donor_name)
+    return _build_meeting_guide_legacy(data.meeting_guide, styles, accent_color, data.donor_name)
 
 
 def _build_meeting_guide_v3(mg, styles, accent_color=GREEN, donor_name=''):
@@ -530,288 +1105,296 @@ def _build_meeting_guide_v3(mg, styles, accent_color=GREEN, donor_name=''):
     elements = []
 
     # Section title header (two-line: label + name + divider)
-    name = mg.get('donorName', '') or donor_name
+    name = mg.donor_name or donor_name
     elements.append(SectionTitleFlowable('Meeting Guide', name, CONTENT_WIDTH, styles))
     elements.append(Spacer(1, 8))
 
-    class AccentLineFlowable2(Flowable):
-        def __init__(self, color):
-            super().__init__()
-            self.color = color
-        def wrap(self, aW, aH):
-            return (40, 10)
-        def draw(self):
-            self.canv.setFillColor(self.color)
-            self.canv.rect(0, 4, 40, 2, stroke=0, fill=1)
-
     # Setup section
-    setup_groups = mg.get('setupGroups', [])
-    if setup_groups:
-        elements.append(AccentLineFlowable2(accent_color))
+    if mg.setup_groups:
+        elements.append(AccentLineFlowable(accent_color))
         elements.append(Paragraph('Setup', styles['heading']))
-        for group in setup_groups:
-            elements.append(Spacer(1, 6))
-            elements.append(Paragraph(
-                f"<b>{_md_inline_to_html(group.get('heading', ''))}</b>",
-                styles['body_bold']
-            ))
-            for bullet in group.get('bullets', []):
-                elements.append(Paragraph(
-                    f'\u2014  {_md_inline_to_html(bullet)}', styles['bullet']
-                ))
+        for group in mg.setup_groups:
+            elements.extend(_v3_setup_group(group, styles))
 
     # The Arc section (beats)
-    beats = mg.get('beats', [])
-    if beats:
+    if mg.beats:
         elements.append(Spacer(1, 16))
-        elements.append(AccentLineFlowable2(accent_color))
+        elements.append(AccentLineFlowable(accent_color))
         elements.append(Paragraph('The Arc', styles['heading']))
 
-        for beat in beats:
-            elements.append(Spacer(1, 10))
-            # Beat header
-            title_text = f"<b>Beat {beat.get('number', '')}:</b> {_md_inline_to_html(beat.get('title', ''))}"
-            elements.append(Paragraph(title_text, styles['card_title']))
-            if beat.get('goal'):
-                elements.append(Paragraph(
-                    f"<i>{_md_inline_to_html(beat['goal'])}</i>",
-                    styles['body_italic']
-                ))
-            elements.append(Spacer(1, 4))
-
-            # START phase
-            if beat.get('start'):
-                elements.append(Paragraph(
-                    f"<b>START.</b> {_md_inline_to_html(beat['start'])}",
-                    styles['body']
-                ))
-
-            # STAY phase
-            if beat.get('stay'):
-                stay_text = _md_inline_to_html(beat['stay'])
-                stay_text = stay_text.replace('\n\n', '<br/><br/>')
-                elements.append(Paragraph(
-                    f"<b>STAY.</b> {stay_text}",
-                    styles['body']
-                ))
-
-            # Stalling indicator
-            if beat.get('stallingText'):
-                elements.append(Spacer(1, 2))
-                elements.append(_build_insight_box(
-                    f"<b>Stalling:</b> {_md_inline_to_html(beat['stallingText'])}",
-                    CORAL, styles
-                ))
-
-            # CONTINUE phase
-            if beat.get('continue'):
-                elements.append(Paragraph(
-                    f"<b>CONTINUE.</b> {_md_inline_to_html(beat['continue'])}",
-                    styles['body']
-                ))
+        for beat in mg.beats:
+            elements.extend(_v3_beat(beat, styles))
 
     # Tripwires section
-    tripwires = mg.get('tripwires', [])
-    if tripwires:
+    if mg.tripwires:
         elements.append(Spacer(1, 16))
-        elements.append(AccentLineFlowable2(CORAL))
+        elements.append(AccentLineFlowable(CORAL))
         elements.append(Paragraph('Tripwires', styles['heading']))
 
-        for tw in tripwires:
-            elements.append(Spacer(1, 6))
-            elements.append(Paragraph(
-                f"<b>{_md_inline_to_html(tw.get('name', ''))}.</b>",
-                styles['body_bold']
-            ))
-            if tw.get('tell'):
-                elements.append(Paragraph(
-                    f"<i>Tell:</i> {_md_inline_to_html(tw['tell'])}",
-                    styles['body']
-                ))
-            if tw.get('recovery'):
-                elements.append(Paragraph(
-                    f"<i>Recovery:</i> {_md_inline_to_html(tw['recovery'])}",
-                    styles['body']
-                ))
+        for tw in mg.tripwires:
+            elements.extend(_v3_tripwire(tw, styles))
 
     # One Line section
-    one_line = mg.get('oneLine', '')
-    if one_line:
+    if mg.one_line:
         elements.append(Spacer(1, 16))
-        elements.append(AccentLineFlowable2(accent_color))
+        elements.append(AccentLineFlowable(accent_color))
         elements.append(Paragraph('One Line', styles['heading']))
         elements.append(Spacer(1, 4))
         elements.append(_build_insight_box(
-            f"<i>{_md_inline_to_html(one_line)}</i>",
+            f"<i>{_md_inline_to_html(mg.one_line)}</i>",
             accent_color, styles
         ))
 
     return elements
 
 
+def _v3_setup_group(group, styles):
+    """Flowables for one Setup group: bold heading and em-dash bullets."""
+    elements = [Spacer(1, 6), Paragraph(
+        f"<b>{_md_inline_to_html(group.heading)}</b>",
+        styles['body_bold']
+    )]
+    elements.extend(_bullet_list(group.bullets, '\u2014', styles['bullet']))
+    return elements
+
+
+def _v3_beat(beat, styles):
+    """Flowables for one beat of The Arc: header, goal, START/STAY/CONTINUE."""
+    elements = [Spacer(1, 10)]
+    # Beat header
+    title_text = f"<b>Beat {beat.number}:</b> {_md_inline_to_html(beat.title)}"
+    elements.append(Paragraph(title_text, styles['card_title']))
+    if beat.goal:
+        elements.append(Paragraph(
+            f"<i>{_md_inline_to_html(beat.goal)}</i>",
+            styles['body_italic']
+        ))
+    elements.append(Spacer(1, 4))
+
+    # START phase
+    if beat.start:
+        elements.append(Paragraph(
+            f"<b>START.</b> {_md_inline_to_html(beat.start)}",
+            styles['body']
+        ))
+
+    # STAY phase
+    if beat.stay:
+        stay_text = _md_inline_to_html(beat.stay)
+        stay_text = stay_text.replace('\n\n', '<br/><br/>')
+        elements.append(Paragraph(
+            f"<b>STAY.</b> {stay_text}",
+            styles['body']
+        ))
+
+    # Stalling indicator
+    if beat.stalling_text:
+        elements.append(Spacer(1, 2))
+        elements.append(_build_insight_box(
+            f"<b>Stalling:</b> {_md_inline_to_html(beat.stalling_text)}",
+            CORAL, styles
+        ))
+
+    # CONTINUE phase
+    if beat.continue_:
+        elements.append(Paragraph(
+            f"<b>CONTINUE.</b> {_md_inline_to_html(beat.continue_)}",
+            styles['body']
+        ))
+    return elements
+
+
+def _v3_tripwire(tw, styles):
+    """Flowables for one tripwire: name, tell and recovery."""
+    elements = [Spacer(1, 6), Paragraph(
+        f"<b>{_md_inline_to_html(tw.name)}.</b>",
+        styles['body_bold']
+    )]
+    if tw.tell:
+        elements.append(Paragraph(
+            f"<i>Tell:</i> {_md_inline_to_html(tw.tell)}",
+            styles['body']
+        ))
+    if tw.recovery:
+        elements.append(Paragraph(
+            f"<i>Recovery:</i> {_md_inline_to_html(tw.recovery)}",
+            styles['body']
+        ))
+    return elements
+
+
 def _build_meeting_guide_legacy(mg, styles, accent_color=GREEN, donor_name=''):
     """Build legacy meeting guide content pages."""
     elements = []
 
     # Section title header (two-line: label + name + divider)
-    name = mg.get('donorName', '') or donor_name
+    name = mg.donor_name or donor_name
     elements.append(SectionTitleFlowable('Meeting Guide', name, CONTENT_WIDTH, styles))
     elements.append(Spacer(1, 8))
 
-    class AccentLineFlowable2(Flowable):
-        def __init__(self, color):
-            super().__init__()
-            self.color = color
-        def wrap(self, aW, aH):
-            return (40, 10)
-        def draw(self):
-            self.canv.setFillColor(self.color)
-            self.canv.rect(0, 4, 40, 2, stroke=0, fill=1)
-
     # Donor Read
-    if mg.get('donorRead'):
-        elements.append(AccentLineFlowable2(accent_color))
+    if mg.donor_read:
+        elements.append(AccentLineFlowable(accent_color))
         elements.append(Paragraph('The Donor Read', styles['heading']))
-        if mg['donorRead'].get('posture'):
+        if mg.donor_read.posture:
             elements.append(Paragraph(
-                _md_inline_to_html(mg['donorRead']['posture']),
+                _md_inline_to_html(mg.donor_read.posture),
                 styles['body_bold']
             ))
-        for body in mg['donorRead'].get('body', []):
+        for body in mg.donor_read.body:
             elements.append(Paragraph(_md_inline_to_html(body), styles['body']))
 
     # Lights Up
-    if mg.get('lightsUp'):
+    if mg.lights_up:
         elements.append(Spacer(1, 12))
-        elements.append(AccentLineFlowable2(accent_color))
+        elements.append(AccentLineFlowable(accent_color))
         elements.append(Paragraph('What Lights Them Up', styles['heading']))
-        for item in mg['lightsUp']:
+        for item in mg.lights_up:
             elements.append(Paragraph(
-                f"<b>{_md_inline_to_html(item.get('title', ''))}</b>",
+                f"<b>{_md_inline_to_html(item.title)}</b>",
                 styles['body_bold']
             ))
-            elements.append(Paragraph(_md_inline_to_html(item.get('body', '')), styles['body']))
+            elements.append(Paragraph(_md_inline_to_html(item.body), styles['body']))
 
     # Shuts Down
-    if mg.get('shutsDown'):
+    if mg.shuts_down:
         elements.append(Spacer(1, 12))
-        elements.append(AccentLineFlowable2(CORAL))
+        elements.append(AccentLineFlowable(CORAL))
         elements.append(Paragraph('What Shuts Them Down', styles['heading']))
-        for item in mg['shutsDown']:
-            elements.append(Paragraph(f'\u2022  {_md_inline_to_html(item)}', styles['bullet']))
+        elements.extend(_bullet_list(mg.shuts_down, '\u2022', styles['bullet']))
 
     # Alignment Map
-    if mg.get('alignmentMap'):
-        am = mg['alignmentMap']
+    if mg.alignment_map:
+        am = mg.alignment_map
         elements.append(Spacer(1, 12))
-        elements.append(AccentLineFlowable2(accent_color))
+        elements.append(AccentLineFlowable(accent_color))
         elements.append(Paragraph('Alignment Map', styles['heading']))
 
-        if am.get('primary'):
+        if am.primary:
             elements.append(Paragraph(
-                f"<b>{_md_inline_to_html(am['primary'].get('title', ''))}</b>",
+                f"<b>{_md_inline_to_html(am.primary.title)}</b>",
                 styles['body_bold']
             ))
             elements.append(Paragraph(
-                _md_inline_to_html(am['primary'].get('body', '')), styles['body']
+                _md_inline_to_html(am.primary.body), styles['body']
             ))
 
-        for sec in am.get('secondary', []):
+        for sec in am.secondary:
             elements.append(Paragraph(
-                f"<b>{_md_inline_to_html(sec.get('title', ''))}</b>",
+                f"<b>{_md_inline_to_html(sec.title)}</b>",
                 styles['body_bold']
             ))
             elements.append(Paragraph(
-                _md_inline_to_html(sec.get('body', '')), styles['body']
+                _md_inline_to_html(sec.body), styles['body']
             ))
 
-        for key in ['fightOrBuild', 'handsOnWheel']:
-            if am.get(key):
+        for text in (am.fight_or_build, am.hands_on_wheel):
+            if text:
                 elements.append(Spacer(1, 4))
                 elements.append(_build_insight_box(
-                    _md_inline_to_html(am[key]), accent_color, styles
+                    _md_inline_to_html(text), accent_color, styles
                 ))
 
-        if am.get('fiveMinCollapse'):
+        if am.five_min_collapse:
             elements.append(Spacer(1, 8))
             elements.append(_build_insight_box(
-                '<b>5 MIN COLLAPSE:</b> ' + _md_inline_to_html(am['fiveMinCollapse']),
+                '<b>5 MIN COLLAPSE:</b> ' + _md_inline_to_html(am.five_min_collapse),
                 CORAL, styles
             ))
 
     # Meeting Arc
-    if mg.get('meetingArc'):
-        arc = mg['meetingArc']
+    if mg.meeting_arc:
+        arc = mg.meeting_arc
         elements.append(Spacer(1, 12))
-        elements.append(AccentLineFlowable2(accent_color))
+        elements.append(AccentLineFlowable(accent_color))
         elements.append(Paragraph('Meeting Arc', styles['heading']))
 
-        if arc.get('intro'):
-            elements.append(Paragraph(_md_inline_to_html(arc['intro']), styles['body']))
+        if arc.intro:
+            elements.append(Paragraph(_md_inline_to_html(arc.intro), styles['body']))
 
-        for move in arc.get('moves', []):
+        for move in arc.moves:
             elements.append(Spacer(1, 8))
             elements.append(_build_move_card(move, accent_color, styles))
 
     # Reading the Room
-    if mg.get('readingRoom'):
-        rr = mg['readingRoom']
+    if mg.reading_room:
+        rr = mg.reading_room
         elements.append(Spacer(1, 12))
-        elements.append(AccentLineFlowable2(accent_color))
+        elements.append(AccentLineFlowable(accent_color))
         elements.append(Paragraph('Reading the Room', styles['heading']))
         elements.append(_build_two_columns(
-            rr.get('working', []), rr.get('stalling', []), styles
+            rr.working, rr.stalling, styles
         ))
 
     # Reset Moves
-    if mg.get('resetMoves'):
+    if mg.reset_moves:
         elements.append(Spacer(1, 12))
-        elements.append(AccentLineFlowable2(CORAL))
+        elements.append(AccentLineFlowable(CORAL))
         elements.append(Paragraph('Reset Moves', styles['heading']))
-        for item in mg['resetMoves']:
-            elements.append(Paragraph(f'\u2022  {_md_inline_to_html(item)}', styles['bullet']))
+        elements.extend(_bullet_list(mg.reset_moves, '\u2022', styles['bullet']))
 
     return elements
 
 
-def build_sources(data, styles, accent_color=CORAL):
-    """Build sources list pages."""
-    elements = []
-    sources = data.get('sources', [])
+SOURCES_FALLBACK_LIMIT = 15
 
-    class AccentLineFlowable3(Flowable):
-        def __init__(self, color):
-            super().__init__()
-            self.color = color
-        def wrap(self, aW, aH):
-            return (40, 10)
-        def draw(self):
-            self.canv.setFillColor(self.color)
-            self.canv.rect(0, 4, 40, 2, stroke=0, fill=1)
 
-    elements.append(AccentLineFlowable3(accent_color))
+def build_sources(data, styles, accent_color=CORAL, governor=None):
+    """Build sources list pages.
+
+    With a governor, sources past SOURCES_FALLBACK_LIMIT are dropped when the
+    render is short on budget, either now or once layout reaches them.
+    """
+    elements = []
+    sources = data.sources
+
+    elements.append(mark_section(AccentLineFlowable(accent_color), 'Sources'))
     elements.append(Paragraph(
         f'{len(sources)} Research Sources', styles['heading']
     ))
     elements.append(Spacer(1, 8))
 
     max_display = 50
+    if governor and len(sources) > SOURCES_FALLBACK_LIMIT and governor.degraded('truncated-sources'):
+        max_display = SOURCES_FALLBACK_LIMIT
+    entries = []
     for i, source in enumerate(sources[:max_display]):
-        title = source.get('title', source.get('url', ''))
-        url = source.get('url', '')
+        title = source.url if source.title is None else source.title
+        url = source.url
         try:
             from urllib.parse import urlparse
             domain = urlparse(url).hostname or url
             domain = domain.replace('www.', '')
         except Exception:
             domain = url
-
-        elements.append(Paragraph(
-            f'<b>{i + 1}.</b>  {_escape_xml(title)}',
-            styles['source_title']
-        ))
-        elements.append(Paragraph(domain, styles['source_domain']))
-        elements.append(Spacer(1, 6))
+        entries.append((title, domain))
+
+    cutoff_at = None
+    title_style, domain_style = styles['source_title'], styles['source_domain']
+    number_font = tt2ps(title_style.fontName, 1, 0)
+    fast = [([fast_block([(number_font, f'{i + 1}.'), (title_style.fontName, title)], title_style),
+              fast_block([(domain_style.fontName, domain)], domain_style)], 6, i)
+            for i, (title, domain) in enumerate(entries)]
+    if all(all(blocks) for blocks, _, _ in fast):
+        # Sources past the limit get their own FastList, for the BudgetCutoff to skip
+        split_at = SOURCES_FALLBACK_LIMIT if governor else len(fast)
+        if fast[:split_at]:
+            elements.append(FastList(fast[:split_at]))
+        if fast[split_at:]:
+            cutoff_at = len(elements)
+            elements.append(FastList(fast[split_at:]))
+    else:
+        for i, (title, domain) in enumerate(entries):
+            if governor and i == SOURCES_FALLBACK_LIMIT:
+                cutoff_at = len(elements)
+            entry = Paragraph(
+                f'<b>{i + 1}.</b>  {_escape_xml(title)}',
+                title_style
+            )
+            entry.page_map_source = i
+            elements.append(entry)
+            elements.append(Paragraph(domain, domain_style))
+            elements.append(Spacer(1, 6))
 
     if len(sources) > max_display:
         elements.append(Spacer(1, 8))
@@ -820,6 +1403,16 @@ def build_sources(data, styles, accent_color=CORAL):
             styles['source_domain']
         ))
 
+    if cutoff_at is not None:
+        elements.insert(cutoff_at, BudgetCutoff(
+            'truncated-sources',
+            skip=len(elements) - cutoff_at,
+            replacement=[Spacer(1, 8), Paragraph(
+                f'+ {len(sources) - SOURCES_FALLBACK_LIMIT} additional sources',
+                styles['source_domain']
+            )],
+        ))
+
     return elements
 
 
@@ -828,34 +1421,48 @@ def build_sources(data, styles, accent_color=CORAL):
 def _build_insight_box(text, accent_color, styles):
     """Build an insight callout box as a Table flowable."""
     class InsightBoxFlowable(Flowable):
-        def __init__(self, text, accent, width):
+        def __init__(self, text, accent, width, stack=None, lo=0, hi=None):
             super().__init__()
             self.text = text
             self.accent = accent
             self.box_width = width
-            self._para = None
+            self._stack = stack
+            self._lo = lo
+            self._hi = hi
             self._h = 0
 
         def wrap(self, aW, aH):
-            sans_italic = 'DMSans-Italic' if 'DMSans-Italic' in self.canv.getAvailableFonts() else 'Helvetica-Oblique' if hasattr(self, 'canv') else 'Helvetica-Oblique'
-            style = ParagraphStyle(
-                'ib', fontName='DMSans-Italic',
-                fontSize=10.5, leading=15, textColor=BODY_TEXT,
-            )
-            inner = self.box_width - 24
-            self._para = Paragraph(self.text, style)
-            w, h = self._para.wrap(inner, aH)
-            self._h = h + 16
+            if self._stack is None:
+                style = ParagraphStyle(
+                    'ib', fontName=styles['insight'].fontName,
+                    fontSize=10.5, leading=15, textColor=BODY_TEXT,
+                )
+                inner = self.box_width - 24
+                self._stack = LineStack([(WrappedLines(Paragraph(self.text, style), inner), 0)])
+                self._hi = self._stack.count
+            self._h = self._stack.height(self._lo, self._hi) + 16
             return (self.box_width, self._h)
 
+        def split(self, aW, aH):
+            self.wrap(aW, aH)
+            if not _must_split(self, self._h):
+                return []
+            cut = self._stack.fit(self._lo, aH - 16)
+            if cut <= self._lo:
+                return []
+            return [InsightBoxFlowable(self.text, self.accent, self.box_width, self._stack, lo, hi)
+                    for lo, hi in ((self._lo, cut), (cut, self._hi))]
+
+        def plain_text(self):
+            return self._stack.text(self._lo, self._hi) if self._stack else ''
+
         def draw(self):
             c = self.canv
             c.setFillColor(PARCHMENT)
             c.roundRect(0, 0, self.box_width, self._h, 4, stroke=0, fill=1)
             c.setFillColor(self.accent)
             c.rect(0, 0, 3.5, self._h, stroke=0, fill=1)
-            if self._para:
-                self._para.drawOn(c, 16, 8)
+            self._stack.draw(c, 16, self._h - 8, self._lo, self._hi)
 
     return InsightBoxFlowable(text, accent_color, CONTENT_WIDTH)
 
@@ -863,39 +1470,69 @@ def _build_insight_box(text, accent_color, styles):
 def _build_move_card(move, accent_color, styles):
     """Build a meeting move card as a Flowable."""
     class MoveCardFlowable(Flowable):
-        def __init__(self, move_data, accent, width):
+        def __init__(self, move_data, accent, width, stack=None, lo=0, hi=None):
             super().__init__()
             self.move_data = move_data
             self.accent = accent
             self.card_width = width
+            self._stack = stack
+            self._lo = lo
+            self._hi = hi
             self._h = 0
-            self._title_p = None
-            self._move_p = None
-            self._read_p = None
+
+        def _pad_top(self):
+            # The accent strip tops the first part only; continuations are plain cards.
+            return 3 + 14 if self._lo == 0 else 14
 
         def wrap(self, aW, aH):
-            inner = self.card_width - 32
-            sans = 'DMSans'
-            sans_bold = 'DMSans-Bold'
-            sans_italic = 'DMSans-Italic'
-
-            ts = ParagraphStyle('mt', fontName=sans_bold, fontSize=11, leading=15, textColor=CHARCOAL)
-            self._title_p = Paragraph(
-                f"{self.move_data.get('number', '')}. {_md_inline_to_html(self.move_data.get('title', ''))}",
-                ts
-            )
-            _, th = self._title_p.wrap(inner, aH)
+            if self._stack is None:
+                inner = self.card_width - 32
+                sans = styles['body'].fontName
+                sans_bold = styles['body_bold'].fontName
+                sans_italic = styles['body_italic'].fontName
+
+                ts = ParagraphStyle('mt', fontName=sans_bold, fontSize=11, leading=15, textColor=CHARCOAL)
+                title = Paragraph(
+                    f"{self.move_data.number}. {_md_inline_to_html(self.move_data.title)}",
+                    ts
+                )
+                ms = ParagraphStyle('mm', fontName=sans, fontSize=9, leading=13, textColor=BODY_TEXT)
+                move = Paragraph(_md_inline_to_html(self.move_data.move_text), ms)
+                rs = ParagraphStyle('mr', fontName=sans_italic, fontSize=9, leading=13, textColor=BODY_TEXT)
+                read = Paragraph(_md_inline_to_html(self.move_data.read_text), rs)
+
+                # title, 8, move text, 12, divider + "THE READ" label (26), read text
+                self._stack = LineStack([
+                    (WrappedLines(title, inner), 8),
+                    (WrappedLines(move, inner), 12),
+                    (26, 0),
+                    (WrappedLines(read, inner), 0),
+                ])
+                self._hi = self._stack.count
+            self._h = self._pad_top() + self._stack.height(self._lo, self._hi) + 13
+            return (self.card_width, self._h)
 
-            ms = ParagraphStyle('mm', fontName=sans, fontSize=9, leading=13, textColor=BODY_TEXT)
-            self._move_p = Paragraph(_md_inline_to_html(self.move_data.get('moveText', '')), ms)
-            _, mh = self._move_p.wrap(inner, aH)
+        def split(self, aW, aH):
+            self.wrap(aW, aH)
+            if not _must_split(self, self._h):
+                return []
+            cut = self._stack.fit(self._lo, aH - self._pad_top() - 13)
+            if cut <= self._lo:
+                return []
+            return [MoveCardFlowable(self.move_data, self.accent, self.card_width, self._stack, lo, hi)
+                    for lo, hi in ((self._lo, cut), (cut, self._hi))]
 
-            rs = ParagraphStyle('mr', fontName=sans_italic, fontSize=9, leading=13, textColor=BODY_TEXT)
-            self._read_p = Paragraph(_md_inline_to_html(self.move_data.get('readText', '')), rs)
-            _, rh = self._read_p.wrap(inner, aH)
+        def plain_text(self):
+            return self._stack.text(self._lo, self._hi) if self._stack else ''
 
-            self._h = 3 + 14 + th + 8 + mh + 12 + 1 + 12 + 12 + rh + 14
-            return (self.card_width, self._h)
+        def _draw_read_label(self, c, y):
+            c.setStrokeColor(STONE)
+            c.setLineWidth(0.5)
+            c.line(16, y, self.card_width - 16, y)
+
+            c.setFont('DMSans-Bold' if 'DMSans-Bold' in c.getAvailableFonts() else 'Helvetica-Bold', 7.5)
+            c.setFillColor(LIGHT_GRAY)
+            c.drawString(16, y - 12, 'THE READ')
 
         def draw(self):
             c = self.canv
@@ -907,65 +1544,101 @@ def _build_move_card(move, accent_color, styles):
             c.setFillColor(WHITE)
             c.roundRect(0, 0, w, h, 4, stroke=1, fill=1)
 
-            c.setFillColor(self.accent)
-            c.rect(0, h - 3, w, 3, stroke=0, fill=1)
-
-            y = h - 3 - 14
-            if self._title_p:
-                _, th = self._title_p.wrap(w - 32, 1000)
-                self._title_p.drawOn(c, 16, y - th)
-                y -= th + 8
+            if self._lo == 0:
+                c.setFillColor(self.accent)
+                c.rect(0, h - 3, w, 3, stroke=0, fill=1)
 
-            if self._move_p:
-                _, mh = self._move_p.wrap(w - 32, 1000)
-                self._move_p.drawOn(c, 16, y - mh)
-                y -= mh + 12
-
-            c.setStrokeColor(STONE)
-            c.setLineWidth(0.5)
-            c.line(16, y, w - 16, y)
-            y -= 12
+            self._stack.draw(c, 16, h - self._pad_top(), self._lo, self._hi, self._draw_read_label)
 
-            c.setFont('DMSans-Bold' if 'DMSans-Bold' in c.getAvailableFonts() else 'Helvetica-Bold', 7.5)
-            c.setFillColor(LIGHT_GRAY)
-            c.drawString(16, y, 'THE READ')
-            y -= 14
+    return MoveCardFlowable(move, accent_color, CONTENT_WIDTH)
 
-            if self._read_p:
-                _, rh = self._read_p.wrap(w - 32, 1000)
-                self._read_p.drawOn(c, 16, y - rh)
 
-    return MoveCardFlowable(move, accent_color, CONTENT_WIDTH)
+def _wrap_text(text, font_name, size, width):
+    """text broken into lines no wider than width (long words are cut)."""
+    words = [(font_name, size, word, string_width(word, font_name, size)) for word in text.split()]
+    lines = _break_lines(words, width, stringWidth(' ', font_name, size), 0)
+    return [' '.join(word for _, _, word, _ in line) for line, _ in lines] or ['']
 
 
 def _build_two_columns(working, stalling, styles):
     """Build two-column Working/Stalling signals."""
     class TwoColFlowable(Flowable):
-        def __init__(self, working_items, stalling_items, width):
+        # Row i holds working[i] and stalling[i]; an item too long for its
+        # column continues on further lines, indented past its mark.
+        ROW_PITCH = 16
+        LINE_PITCH = 11
+
+        def __init__(self, working_items, stalling_items, width, lo=0, hi=None, layout=None):
             super().__init__()
             self.working = working_items
             self.stalling = stalling_items
             self.box_width = width
+            self.sans = styles['body'].fontName
+            self._lo = lo
+            self._hi = max(len(working_items), len(stalling_items)) if hi is None else hi
+            self._layout = layout      # (working lines, stalling lines, row heights), see _lay_out
             self._h = 0
 
+        def _lay_out(self):
+            sans = self.sans
+            width = (self.box_width - 12) / 2 - 20
+            indent = string_width('\u2713  ', sans, 8)
+
+            def lines(mark, item):
+                text = f'{mark}  {item}'
+                if string_width(text, sans, 8) <= width:
+                    return [text]
+                first, *rest = _wrap_text(text, sans, 8, width)
+                return [first] + [line for part in rest for line in _wrap_text(part, sans, 8, width - indent)]
+
+            working_lines = [lines('\u2713', item) for item in self.working]
+            stalling_lines = [lines('\u2717', item) for item in self.stalling]
+            heights = []
+            for i in range(max(len(working_lines), len(stalling_lines))):
+                n = max(len(column[i]) if i < len(column) else 1 for column in (working_lines, stalling_lines))
+                heights.append(self.ROW_PITCH + (n - 1) * self.LINE_PITCH)
+            return working_lines, stalling_lines, heights
+
         def wrap(self, aW, aH):
-            max_items = max(len(self.working), len(self.stalling), 1)
-            self._h = 28 + max_items * 16 + 12
+            if self._layout is None:
+                self._layout = self._lay_out()
+            rows = sum(self._layout[2][self._lo:self._hi]) or self.ROW_PITCH
+            self._h = 28 + rows + 12
             return (self.box_width, self._h)
 
+        def split(self, aW, aH):
+            # Split between rows; each part repeats the column headers.
+            self.wrap(aW, aH)
+            cut, used = self._lo, 0
+            for height in self._layout[2][self._lo:self._hi]:
+                if used + height > aH - 28 - 12:
+                    break
+                cut += 1
+                used += height
+            if not _must_split(self, self._h) or cut - self._lo < MIN_SPLIT_LINES:
+                return []
+            return [TwoColFlowable(self.working, self.stalling, self.box_width, lo, hi, self._layout)
+                    for lo, hi in ((self._lo, cut), (cut, self._hi))]
+
+        def plain_text(self):
+            return '\n'.join([f'\u2713 {item}' for item in self.working[self._lo:self._hi]] +
+                             [f'\u2717 {item}' for item in self.stalling[self._lo:self._hi]])
+
         def draw(self):
             c = self.canv
             w = self.box_width
             h = self._h
             col_w = (w - 12) / 2
 
-            c.setFillColor(HexColor('#E8F5E9'))
+            c.setFillColor(GREEN_TINT)
             c.roundRect(0, 0, col_w, h, 4, stroke=0, fill=1)
-            c.setFillColor(HexColor('#FBE9E7'))
+            c.setFillColor(CORAL_TINT)
             c.roundRect(col_w + 12, 0, col_w, h, 4, stroke=0, fill=1)
 
             sans_bold = 'DMSans-Bold' if 'DMSans-Bold' in c.getAvailableFonts() else 'Helvetica-Bold'
-            sans = 'DMSans' if 'DMSans' in c.getAvailableFonts() else 'Helvetica'
+            sans = self.sans
+            working_lines, stalling_lines, heights = self._layout
+            indent = string_width('\u2713  ', sans, 8)
 
             c.setFont(sans_bold, 8)
             c.setFillColor(GREEN)
@@ -974,19 +1647,13 @@ def _build_two_columns(working, stalling, styles):
             c.drawString(col_w + 22, h - 18, 'STALLING')
 
             c.setFont(sans, 8)
-            y = h - 34
-            c.setFillColor(HexColor('#2D6A4F'))
-            for item in self.working:
-                text = f'\u2713  {item}'[:55]
-                c.drawString(10, y, text)
-                y -= 16
-
-            y = h - 34
-            c.setFillColor(HexColor('#E07A5F'))
-            for item in self.stalling:
-                text = f'\u2717  {item}'[:55]
-                c.drawString(col_w + 22, y, text)
-                y -= 16
+            for x, color, column in ((10, GREEN, working_lines), (col_w + 22, CORAL, stalling_lines)):
+                c.setFillColor(color)
+                y = h - 34
+                for lines, height in zip(column[self._lo:self._hi], heights[self._lo:self._hi]):
+                    for k, line in enumerate(lines):
+                        draw_string(c, x + (indent if k else 0), y - k * self.LINE_PITCH, line, sans, 8)
+                    y -= height
 
     return TwoColFlowable(working, stalling, CONTENT_WIDTH)
 
@@ -1019,23 +1686,397 @@ def _md_inline_to_html(text):
     return text
 
 
+def _bullet_list(items, marker, style):
+    """Bullet paragraphs for markdown items; one FastList when none has inline markup."""
+    blocks = [fast_block([(style.fontName, f'{marker} {item}')], style)
+              if _md_inline_to_html(item) == _escape_xml(item) else None for item in items]
+    if blocks and all(blocks):
+        return [FastList([([block], 0, None) for block in blocks])]
+    return [Paragraph(f'{marker}  {_md_inline_to_html(item)}', style) for item in items]
+
+
+# ─── Markdown input ───────────────────────────────────────────────────────────
+#
+# The same layout, built straight from the LLM's markdown instead of the
+# PDFProfileData JSON that parse-profile.ts produces. Each document is read
+# once, top to bottom, and flowables are emitted as soon as a paragraph (or,
+# for the meeting guide, a ### section) is complete, so there is no parsed
+# intermediate structure and each string is converted to markup exactly once.
+# The parsing rules mirror parse-profile.ts; for the same markdown both paths
+# lay out the same document. Legacy (pre-v3) meeting guides are only
+# supported through the JSON path.
+
+_MD_H1 = re.compile(r'^#\s+')
+_MD_H2 = re.compile(r'^##\s+(.+)')
+_MD_H3 = re.compile(r'^###\s+(.+)')
+_MD_BULLET = re.compile(r'^[-*]\s+(.+)')
+_MD_GUIDE_HEADER = re.compile(r'^#{1,3}\s+MEETING GUIDE\s*[\u2014\u2013-]+\s*(.+)$', re.I)
+_MD_V3_SETUP = re.compile(r'^###\s+SETUP$', re.I | re.M)
+_MD_V3_ARC = re.compile(r'^###\s+THE ARC$', re.I | re.M)
+_MD_SETUP_HEADING = re.compile(r'^\*\*(.+?)\.?\*\*\s*$')
+_MD_BEAT = re.compile(r'\*\*Beat\s+(\d+)[:\s\u00b7\u2013-]+\s*(.+?)\.*\*\*', re.I)
+_MD_BEAT_GOAL = re.compile(r'^\*([^*].+?)\*\s*$', re.M)
+_MD_BEAT_START = re.compile(r'\*\*START\.\*\*\s*([\s\S]*?)(?=\*\*STAY\.\*\*|\Z)')
+_MD_BEAT_STAY = re.compile(r'\*\*STAY\.\*\*\s*([\s\S]*?)(?=\*\*CONTINUE\.\*\*|\Z)')
+_MD_BEAT_CONTINUE = re.compile(r'\*\*CONTINUE\.\*\*\s*([\s\S]*?)(?=\*\*Beat\s+\d|---\s*\Z|\Z)')
+_MD_STALLING = re.compile(r"(?:When it's stalling|When it\u2019s stalling)[:\s]*(.*?)$", re.I | re.M)
+_MD_TRIPWIRE = re.compile(r'^\*\*(.+?)\.?\*\*\s*\*Tell:\*\s*(.+?)\s*\*Recovery:\*\s*(.+)$')
+_MD_TELL = re.compile(r'^\*Tell:\*\s*(.+)$')
+_MD_RECOVERY = re.compile(r'^\*Recovery:\*\s*(.+)$')
+
+
+def is_v3_meeting_guide(markdown):
+    """Same test as parse-profile.ts isV3MeetingGuide."""
+    return bool(_MD_V3_SETUP.search(markdown) and _MD_V3_ARC.search(markdown))
+
+
+def _clean_profile_title(title):
+    title = re.sub(r'^\d+\.\s*', '', title.strip())
+    title = title.replace('*', '').strip()
+    return re.sub(r'\s*\u2014\s*MOST IMPORTANT\.?', '', title, flags=re.I)
+
+
+def iter_profile_markdown(markdown, styles, accent_color=PURPLE, donor_name=''):
+    """Persuasion profile flowables straight from markdown, one paragraph at a time.
+
+    ## headings open sections, ### subheadings become bold paragraphs,
+    - / * lines bullets, > paragraphs insight boxes; text before the first
+    section is dropped.
+    """
+    yield SectionTitleFlowable('Persuasion Profile', donor_name, CONTENT_WIDTH, styles)
+    yield Spacer(1, 8)
+
+    sections = 0
+    paragraph = []
+
+    def flush():
+        text = ' '.join(paragraph).strip()
+        paragraph.clear()
+        if not text or not sections:
+            return []
+        if text.startswith('>'):
+            return _profile_paragraph('insight', re.sub(r'^>\s*', '', text, flags=re.M), accent_color, styles)
+        return _profile_paragraph('text', text, accent_color, styles)
+
+    for line in markdown.split('\n'):
+        # Dispatch on the first character so plain text lines skip the regexes
+        if line.startswith('#'):
+            if _MD_H1.match(line) and not line.startswith('##'):
+                continue
+
+            h2 = _MD_H2.match(line)
+            if h2:
+                yield from flush()
+                if sections:
+                    yield Spacer(1, 12)
+                sections += 1
+                yield AccentLineFlowable(accent_color)
+                yield Paragraph(_clean_profile_title(h2.group(1)), styles['heading'])
+                continue
+
+            h3 = _MD_H3.match(line)
+            if h3 and sections:
+                yield from flush()
+                yield from _profile_paragraph('bold', h3.group(1).strip(), accent_color, styles)
+                continue
+
+        stripped = line.strip()
+        if not stripped:
+            yield from flush()
+            continue
+
+        bullet = stripped[0] in '-*' and _MD_BULLET.match(stripped)
+        if bullet and sections:
+            yield from flush()
+            yield from _profile_paragraph('bullet', bullet.group(1).strip(), accent_color, styles)
+            continue
+
+        paragraph.append(line)
+
+    yield from flush()
+
+
+def _md_setup_groups(body):
+    heading = bullets = None
+    for line in body.split('\n'):
+        trimmed = line.strip()
+        if not trimmed or trimmed == '---':
+            continue
+        match = _MD_SETUP_HEADING.match(trimmed)
+        if match:
+            if heading is not None:
+                yield SetupGroup(heading, tuple(bullets))
+            heading, bullets = match.group(1), []
+        elif trimmed.startswith('- ') and heading is not None:
+            bullets.append(trimmed[2:])
+    if heading is not None:
+        yield SetupGroup(heading, tuple(bullets))
+
+
+def _md_beats(body):
+    starts = list(_MD_BEAT.finditer(body))
+    for i, match in enumerate(starts):
+        content = body[match.start():starts[i + 1].start() if i + 1 < len(starts) else len(body)]
+        goal = _MD_BEAT_GOAL.search(content)
+        start = _MD_BEAT_START.search(content)
+        stay = _MD_BEAT_STAY.search(content)
+        cont = _MD_BEAT_CONTINUE.search(content)
+
+        stay_text = stay.group(1).strip() if stay else ''
+        stalling_text = ''
+        stalling = _MD_STALLING.search(stay_text)
+        if stalling:
+            stalling_text = stalling.group(0).strip()
+            stay_text = stay_text[:stay_text.index(stalling.group(0))].strip()
+
+        yield Beat(
+            number=match.group(1),
+            title=match.group(2).strip(),
+            goal=goal.group(1) if goal else '',
+            start=start.group(1).strip().replace('\n', ' ') if start else '',
+            stay=re.sub(r'\n{2,}', '\n\n', stay_text),
+            stalling_text=stalling_text,
+            continue_=cont.group(1).strip().replace('\n', ' ') if cont else '',
+        )
+
+
+def _md_tripwires(body):
+    lines = body.split('\n')
+    for i, line in enumerate(lines):
+        trimmed = line.strip()
+        trip = _MD_TRIPWIRE.match(trimmed)
+        if trip:
+            yield Tripwire(trip.group(1).strip(), trip.group(2).strip(), trip.group(3).strip())
+            continue
+        name = _MD_SETUP_HEADING.match(trimmed)
+        if name:
+            tell = recovery = ''
+            for following in lines[i + 1:i + 5]:
+                following = following.strip()
+                if following.startswith('**') or following.startswith('### '):
+                    break
+                m = _MD_TELL.match(following)
+                if m:
+                    tell = m.group(1).strip()
+                    continue
+                m = _MD_RECOVERY.match(following)
+                if m:
+                    recovery = m.group(1).strip()
+            if tell or recovery:
+                yield Tripwire(name.group(1).strip(), tell, recovery)
+
+
+def iter_meeting_guide_markdown(markdown, styles, accent_color=GREEN, donor_name=''):
+    """v3 meeting guide flowables straight from markdown, one ### section at a time."""
+    name = None
+    titled = False
+
+    def title():
+        nonlocal titled
+        if not titled:
+            titled = True
+            yield SectionTitleFlowable('Meeting Guide', name or donor_name, CONTENT_WIDTH, styles)
+            yield Spacer(1, 8)
+
+    def section_flowables(heading, lines):
+        body = '\n'.join(lines).strip()
+        heading = heading.upper().strip()
+        if heading == 'SETUP':
+            items, render, label, color = _md_setup_groups(body), _v3_setup_group, 'Setup', accent_color
+        elif heading == 'THE ARC':
+            items, render, label, color = _md_beats(body), _v3_beat, 'The Arc', accent_color
+        elif heading == 'TRIPWIRES':
+            items, render, label, color = _md_tripwires(body), _v3_tripwire, 'Tripwires', CORAL
+        elif heading == 'ONE LINE':
+            first = next((l.strip() for l in body.split('\n') if l.strip()), '')
+            if first:
+                yield Spacer(1, 16)
+                yield AccentLineFlowable(accent_color)
+                yield Paragraph('One Line', styles['heading'])
+                yield Spacer(1, 4)
+                yield _build_insight_box(f'<i>{_md_inline_to_html(first)}</i>', accent_color, styles)
+            return
+        else:
+            return
+
+        for n, item in enumerate(items):
+            if n == 0:
+                if heading != 'SETUP':
+                    yield Spacer(1, 16)
+                yield AccentLineFlowable(color)
+                yield Paragraph(label, styles['heading'])
+            yield from render(item, styles)
+
+    heading, lines = None, []
+    for line in markdown.split('\n'):
+        if not line.startswith('#'):
+            if heading is not None:
+                lines.append(line)
+            continue
+        if name is None:
+            header = _MD_GUIDE_HEADER.match(line)
+            if header:
+                name = header.group(1).strip()
+        h3 = _MD_H3.match(line)
+        if h3:
+            yield from title()
+            if heading is not None:
+                yield from section_flowables(heading, lines)
+            heading, lines = h3.group(1).strip(), []
+        elif heading is not None:
+            lines.append(line)
+
+    yield from title()
+    if heading is not None:
+        yield from section_flowables(heading, lines)
+
+
+def _today():
+    today = datetime.date.today()
+    return f'{today:%B} {today.day}, {today.year}'
+
+
+def build_story_from_markdown(data, styles, governor=None, prepared_for=None, preview=None):
+    """Build the full story from raw markdown input.
+
+    data: donorName, preparedFor, date (defaults to today), sources,
+    profileMarkdown, meetingGuideMarkdown, plus the optional cover images
+    and charts of PDFProfileData; or its parse_input(data, markdown=True).
+    """
+    data = parse_input(data, markdown=True)
+    guide = data.meeting_guide_markdown
+    return _assemble_story(
+        data, styles, governor,
+        iter_profile_markdown(data.profile_markdown, styles, PURPLE, data.donor_name),
+        iter_meeting_guide_markdown(guide, styles, GREEN, data.donor_name) if guide else None,
+        prepared_for, preview,
+    )
+
+
+def parse_input(data, markdown=False):
+    """The ProfileData for a payload (PDFProfileData, or raw markdown input with
+    markdown=True), validated once; a ProfileData is returned as is, and
+    its own markdown flag picks the builder (see _story_builder).
+
+    Raises ValueError for malformed payloads, and for markdown input whose
+    meeting guide isn't v3 (see profile_data.py).
+    """
+    if isinstance(data, ProfileData):
+        return data
+    if not markdown:
+        return ProfileData.parse(data)
+    data = ProfileData.parse_markdown(data, today=_today())
+    if data.meeting_guide_markdown and not is_v3_meeting_guide(data.meeting_guide_markdown):
+        raise ValueError('legacy meeting guides need the JSON input (parse-profile.ts)')
+    return data
+
+
+def _story_builder(data):
+    """build_story, or build_story_from_markdown for a ProfileData parsed from markdown input."""
+    return build_story_from_markdown if data.markdown else build_story
+
+
+# ─── Deterministic output ─────────────────────────────────────────────────────
+
+
+def _deterministic_canvasmaker(digest, canvas_class=StateCanvas):
+    """Canvas factory that pins the trailer /ID to the payload digest.
+
+    The document is built with invariant=1, so ReportLab already fixes
+    CreationDate/ModDate to 2000-01-01T00:00:00Z and drops object comments;
+    this replaces the remaining per-run value, the file identifier.
+    """
+    def make_canvas(*args, **kwargs):
+        canv = canvas_class(*args, **kwargs)
+        file_id = PDFText(bytes.fromhex(digest)[:16], enc='raw').format(DummyDoc())
+        canv._doc._ID = b'\n[' + file_id + file_id + b']\n'
+        return canv
+    return make_canvas
+
+
+def _file_digest(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
 # ─── Main PDF builder ─────────────────────────────────────────────────────────
 
-def generate_pdf(data, output_path):
-    """Generate a PDF from structured profile data."""
-    fonts = register_fonts()
-    styles = make_styles(fonts)
+def build_story(data, styles, governor=None, prepared_for=None, preview=None):
+    """Build the full document story: cover, profile, meeting guide, sources.
 
-    # Create document with custom page templates
+    A governor, if given, is checked between sections and decides how much
+    of the sources list to keep. prepared_for replaces the cover's
+    "Prepared for" line (see build_cover_page). A preview leaves the
+    sources out (see preview.py). data is a PDFProfileData payload or its
+    parse_input.
+    """
+    data = parse_input(data)
+    meeting_guide = None
+    if data.meeting_guide is not None:
+        meeting_guide = build_meeting_guide(data, styles, GREEN)
+
+    return _assemble_story(data, styles, governor,
+                           build_persuasion_profile(data, styles, PURPLE), meeting_guide, prepared_for, preview)
+
+
+def _assemble_story(data, styles, governor, profile, meeting_guide, prepared_for=None, preview=None):
+    """Cover, profile, charts, meeting guide (if any) and sources, in page order.
+
+    profile and meeting_guide are iterables of flowables; they are consumed
+    in order, so generators stream straight into the story. With a Preview
+    the sources are handed to it instead of joining the story.
+    """
+    story = []
+
+    # ─── Cover page (dark) ───
+    story.extend(build_cover_page(data, styles, prepared_for))
+
+    # ─── Section 1: Persuasion Profile ───
+    # Content starts directly (no section cover page — saves a blank page)
+    story.append(NextPageTemplate('content'))
+    story.append(PageBreak())
+
+    # Profile content
+    story.extend(profile)
+    story.extend(build_evidence_charts(data, styles, PURPLE))
+    if governor:
+        governor.checkpoint('persuasion profile')
+
+    # ─── Section 2: Meeting Guide ───
+    # No section cover page — content starts directly to avoid a blank divider page.
+    if meeting_guide is not None:
+        story.append(PageBreak())
+        story.extend(meeting_guide)
+        if governor:
+            governor.checkpoint('meeting guide')
+
+    # ─── Section 3: Sources ───
+    # Content starts directly (no section cover page — saves a blank page)
+    sources = [NextPageTemplate('content'), PageBreak()]
+    sources.extend(build_sources(data, styles, CORAL, governor))
+    if preview:
+        preview.appendix = sources      # only counted towards the page estimate
+    else:
+        story.extend(sources)
+
+    return story
+
+
+def _make_doc(data, output, deterministic=False, draft=False):
+    """Create the document with its dark (cover) and content page templates."""
     doc = BaseDocTemplate(
-        output_path,
+        output,
         pagesize=letter,
         leftMargin=MARGIN,
         rightMargin=MARGIN,
         topMargin=MARGIN + 10,
         bottomMargin=MARGIN,
-        title=f"{data['donorName']} — ProspectAI Donor Intelligence",
+        title=f"{data.donor_name} — ProspectAI Donor Intelligence",
         author='ProspectAI / Democracy Takes Work',
+        invariant=1 if deterministic else None,
     )
 
     # Frames
@@ -1049,54 +2090,452 @@ def generate_pdf(data, output_path):
     content_template = PageTemplate(id='content', frames=[content_frame], onPage=draw_content_page)
 
     doc.addPageTemplates([dark_template, content_template])
+    doc.draft = draft
+    return doc
 
-    # Build story
-    story = []
 
-    # ─── Cover page (dark) ───
-    story.extend(build_cover_page(data, styles))
+def _build_doc(doc, story, data, deterministic=False, incremental=False):
+    canvas_class = IncrementalCanvas if incremental else StateCanvas
+    if deterministic:
+        doc.build(story, canvasmaker=_deterministic_canvasmaker(data.digest, canvas_class))
+    else:
+        doc.build(story, canvasmaker=canvas_class)
+
+
+def render_cover_pdf(data, deterministic=False, markdown=False):
+    """Render only the cover page, as a one-page PDF (bytes); markdown as for render_to_bytes."""
+    data = parse_input(data, markdown)
+    styles = make_styles(ensure_fonts())
+    buf = io.BytesIO()
+    doc = _make_doc(data, buf, deterministic)
+    _build_doc(doc, build_cover_page(data, styles), data, deterministic)
+    return buf.getvalue()
+
+
+def render_to_bytes(data, deterministic=False, linearize=False, governor=None, markdown=False, page_map=None,
+                    preview=None, draft=False):
+    """Render a PDF in memory and return its bytes.
+
+    Safe to call concurrently from multiple threads: fonts are registered
+    once per process under a lock, and everything else a render touches
+    (styles, flowables, document, canvas) is created per call.
+
+    A RenderGovernor enforces time/memory budgets; read governor.fallbacks
+    afterwards for the cheaper layouts it chose. A PageMap is filled in
+    during layout (see page_map.py). With markdown=True, data is raw
+    markdown input (see build_story_from_markdown). A Preview stops after
+    the cover and its first pages; read preview.estimated_pages afterwards
+    (see preview.py). draft=True renders in base-14 fonts, unbranded (see
+    generate_pdf).
+    """
+    data = parse_input(data, markdown)
+    if governor:
+        governor.start()
+    styles = _render_styles(draft)
+    buf = io.BytesIO()
+    doc = _make_doc(data, buf, deterministic, draft)
+    if governor:
+        governor.instrument(doc)
+    if page_map:
+        page_map.instrument(doc)
+    if preview:
+        preview.instrument(doc)
+    with _text_fallback(draft):
+        story = _story_builder(data)(data, styles, governor, preview=preview)
+        _build_doc(doc, story, data, deterministic)
+    pdf = buf.getvalue()
+    if linearize:
+        pdf = linearize_pdf(pdf)
+    return pdf
+
+
+def stream_pdf(data, out, deterministic=False, governor=None, markdown=False, page_map=None, draft=False):
+    """Render a PDF into a binary file object, writing each page as it is finished.
+
+    Pages reach out (a pipe, socket or HTTP response body) while later ones
+    are still being laid out, and only their offsets are kept in memory
+    (see incremental.py). If the governor raises RenderBudgetExceeded part
+    of a file has already been written; the caller has to discard it.
+    Returns the number of bytes written.
+    """
+    data = parse_input(data, markdown)
+    if governor:
+        governor.start()
+    styles = _render_styles(draft)
+    doc = _make_doc(data, out, deterministic, draft)
+    if governor:
+        governor.instrument(doc)
+    if page_map:
+        page_map.instrument(doc)
+    with _text_fallback(draft):
+        story = _story_builder(data)(data, styles, governor)
+        _build_doc(doc, story, data, deterministic, incremental=True)
+    return doc.canv._writer.offset
+
+
+def generate_pdf(data, output_path, profile=False, deterministic=False, linearize=False, governor=None,
+                 markdown=False, page_map_path=None, incremental=False, preview=None, draft=False):
+    """Generate a PDF from structured profile data.
+
+    data is the PDFProfileData payload, or a ProfileData already parsed from
+    one (see parse_input); a malformed payload raises ValueError before any
+    layout.
+
+    With profile=True, CPU, stack, memory and onPage timings for this render
+    are written next to the PDF (see render_profiler.py).
+
+    With deterministic=True, identical payloads produce byte-identical files
+    in any process: dates are fixed, the file ID is derived from the payload
+    digest, and resources are emitted in story order. Returns the SHA-256 of
+    the output in that mode so callers can use it as a cache key / ETag.
+
+    With linearize=True the file is rewritten for fast web view, so the
+    cover renders before the rest of the download arrives (see linearize.py).
+
+    With a governor, the render switches to cheaper layouts as its budgets
+    run low and raises RenderBudgetExceeded once they run out (see
+    render_governor.py). Fallbacks taken are printed and left in
+    governor.fallbacks.
+
+    With markdown=True, data holds the raw profile and meeting-guide markdown
+    rather than PDFProfileData, and the story is built from it in one pass
+    (see build_story_from_markdown).
+
+    With page_map_path, a JSON sidecar recording each section's and
+    heading's pages, every page's plain text and the source URLs is written
+    there from the layout itself (see page_map.py).
+
+    With incremental=True each page is written to output_path as soon as it
+    is finished instead of all at the end (see incremental.py); this cannot
+    be combined with linearize.
+
+    With a Preview, only the cover and its first content pages are laid out,
+    without the sources, each noting the estimated length of the full
+    report, which is printed and left in preview.estimated_pages (see
+    preview.py).
+
+    With draft=True (internal QA, bulk exports) the report is set in the
+    standard PDF fonts, Helvetica and Times, in the same page layout: no
+    TrueType file is read or embedded, text the base-14 fonts cannot show
+    is not moved to fallback fonts, and the gradient bars and glows are
+    left out.
+    """
+    if incremental and linearize:
+        raise ValueError('incremental output cannot be linearized')
+    if incremental and preview:
+        raise ValueError('a preview cannot be written incrementally')
+    data = parse_input(data, markdown)
+    profiler = RenderProfiler(output_path) if profile else None
+    if profiler:
+        profiler.start()
+    try:
+        if governor:
+            governor.start()
+
+        styles = _render_styles(draft)
+
+        doc = _make_doc(data, output_path, deterministic, draft)
+        if profiler:
+            profiler.instrument(doc)
+        if governor:
+            governor.instrument(doc)
+        page_map = PageMap() if page_map_path else None
+        if page_map:
+            page_map.instrument(doc)
+        if preview:
+            preview.instrument(doc)
+
+        with _text_fallback(draft):
+            story = _story_builder(data)(data, styles, governor, preview=preview)
+
+            # Build
+            _build_doc(doc, story, data, deterministic, incremental)
+        if linearize:
+            linearize_file(output_path)
+        print(f'[PDF] Generated: {output_path}')
+        if page_map:
+            page_map.write(page_map_path, data)
+            print(f'[PDF] Page map: {page_map_path}')
+        if governor and governor.fallbacks:
+            print(f'[PDF] Fallbacks: {", ".join(governor.fallbacks)}')
+        if preview:
+            print(f'[PDF] {preview.notice()}')
+    finally:
+        # also after a failed render: it is usually the slow or budget-exceeding one
+        if profiler:
+            profiler.stop()
+            profiler.write_report()
+
+    if deterministic:
+        digest = _file_digest(output_path)
+        print(f'[PDF] sha256: {digest}')
+        return digest
+
+
+# ─── Cover patching ───────────────────────────────────────────────────────────
+
+def patch_cover(data, pdf_path, output_path=None, deterministic=False, markdown=False):
+    """Update the cover fields of an existing PDF without re-rendering it.
+
+    Only the cover is laid out again; its page, content stream and fonts plus
+    a refreshed info dictionary are appended as an incremental update (see
+    cover_patch.py). Writes to output_path, or appends in place when omitted.
+    With markdown=True, data is raw markdown input, as for the render being
+    patched. Returns the number of bytes appended.
+    """
+    data = parse_input(data, markdown)
+    t0 = time.perf_counter()
+    with open(pdf_path, 'rb') as f:
+        original = f.read()
+
+    cover = render_cover_pdf(data, deterministic)
+    update = build_update(
+        original, cover,
+        info_updates={'Title': f"{data.donor_name} — ProspectAI Donor Intelligence"},
+        file_id=bytes.fromhex(data.digest)[:16],
+        deterministic=deterministic,
+    )
 
-    # ─── Section 1: Persuasion Profile ───
-    # Content starts directly (no section cover page — saves a blank page)
-    story.append(NextPageTemplate('content'))
-    story.append(PageBreak())
+    if output_path and os.path.abspath(output_path) != os.path.abspath(pdf_path):
+        with open(output_path, 'wb') as f:
+            f.write(original)
+            f.write(update)
+    else:
+        output_path = pdf_path
+        with open(pdf_path, 'ab') as f:
+            f.write(update)
 
-    # Profile content
-    story.extend(build_persuasion_profile(data, styles, PURPLE))
+    elapsed = (time.perf_counter() - t0) * 1000
+    print(f'[PDF] Patched cover: {output_path} (+{len(update)} bytes, {elapsed:.0f} ms)')
+    return len(update)
 
-    # ─── Section 2: Meeting Guide ───
-    # No section cover page — content starts directly to avoid a blank divider page.
-    if data.get('meetingGuide') and (
-        data['meetingGuide'].get('format') == 'v3' or
-        data['meetingGuide'].get('donorRead') or
-        data['meetingGuide'].get('meetingArc') or
-        data['meetingGuide'].get('lightsUp')
-    ):
-        story.append(PageBreak())
-        story.extend(build_meeting_guide(data, styles, GREEN))
 
-    # ─── Section 3: Sources ───
-    # Content starts directly (no section cover page — saves a blank page)
-    story.append(NextPageTemplate('content'))
-    story.append(PageBreak())
-    story.extend(build_sources(data, styles, CORAL))
+# ─── Per-recipient copies ─────────────────────────────────────────────────────
 
-    # Build
-    doc.build(story)
-    print(f'[PDF] Generated: {output_path}')
+class PreparedForSlot(Flowable):
+    """Blank cover line where each recipient's "Prepared for" is stamped.
 
+    Takes the space a one-line Paragraph in style would, and remembers where
+    it was drawn so the overlays can put the text there (see stamp.py).
+    """
 
-# ─── CLI entry point ──────────────────────────────────────────────────────────
+    def __init__(self, style):
+        super().__init__()
+        self.style = style
+        self.position = None
 
-if __name__ == '__main__':
-    if len(sys.argv) != 3:
-        print('Usage: python3 generator.py <input.json> <output.pdf>')
-        sys.exit(1)
+    def wrap(self, availWidth, availHeight):
+        self.width, self.height = availWidth, self.style.leading
+        return self.width, self.height
+
+    def getSpaceBefore(self):
+        return self.style.spaceBefore
+
+    def getSpaceAfter(self):
+        return self.style.spaceAfter
 
-    input_path = sys.argv[1]
-    output_path = sys.argv[2]
+    def drawOn(self, canvas, x, y, _sW=0):
+        self.position = (x, y)
 
-    with open(input_path, 'r') as f:
+    def draw(self):
+        pass
+
+
+def _draw_watermark(canvas, text, font_name, color):
+    """text across the page diagonal, in a low-alpha colour."""
+    diagonal = math.hypot(PAGE_WIDTH, PAGE_HEIGHT)
+    size = min(40, diagonal * 0.75 / string_width(text, font_name, 1))
+    canvas.saveState()
+    canvas.translate(PAGE_WIDTH / 2, PAGE_HEIGHT / 2)
+    canvas.rotate(math.degrees(math.atan2(PAGE_HEIGHT, PAGE_WIDTH)))
+    canvas.setFillColor(color)
+    canvas.setFont(font_name, size)
+    draw_string(canvas, -string_width(text, font_name, size) / 2, -size * 0.35, text, font_name, size)
+    canvas.restoreState()
+
+
+def render_stamp_overlay(recipient, slot, styles, deterministic=False):
+    """Two-page overlay for one recipient: cover (name + watermark), then other pages (watermark)."""
+    fonts = ensure_fonts()
+    bold = 'DMSans-Bold' if fonts['sans'] else 'Helvetica-Bold'
+    mark = f'CONFIDENTIAL \u00b7 PREPARED FOR {recipient.upper()}'
+    buf = io.BytesIO()
+    canvas = StateCanvas(buf, pagesize=letter, invariant=1 if deterministic else None)
+
+    _draw_watermark(canvas, mark, bold, Color(1, 1, 1, 0.05))
+    if slot.position:
+        line = Paragraph(f'<b>Prepared for</b>  {_escape_xml(recipient)}', slot.style)
+        _, height = line.wrap(slot.width, PAGE_HEIGHT)
+        x, y = slot.position
+        line.drawOn(canvas, x, y + slot.height - height)
+    canvas.showPage()
+
+    _draw_watermark(canvas, mark, bold, Color(CHARCOAL.red, CHARCOAL.green, CHARCOAL.blue, 0.06))
+    canvas.showPage()
+    canvas.save()
+    return buf.getvalue()
+
+
+def render_for_recipients(data, recipients, deterministic=False, markdown=False):
+    """Lay the document out once and return {recipient: PDF bytes}.
+
+    The full render happens once, with a blank "Prepared for" line; each
+    copy is that render plus an appended overlay carrying the recipient's
+    name and a confidentiality watermark on every page (see stamp.py), so
+    a copy costs milliseconds. The payload's preparedFor is ignored. In
+    deterministic mode each copy's file ID is derived from the payload
+    digest and the recipient. Raises ValueError if a recipient is listed
+    twice.
+    """
+    repeated = sorted({r for r in recipients if recipients.count(r) > 1})
+    if repeated:
+        raise ValueError(f'recipients listed more than once: {", ".join(repeated)}')
+    data = parse_input(data, markdown)
+    styles = make_styles(ensure_fonts())
+    slot = PreparedForSlot(styles['cover_meta_value'])
+    buf = io.BytesIO()
+    doc = _make_doc(data, buf, deterministic)
+    story = _story_builder(data)(data, styles, prepared_for=slot)
+    _build_doc(doc, story, data, deterministic)
+
+    stamper = Stamper(buf.getvalue())
+    digest = data.digest
+    copies = {}
+    for recipient in recipients:
+        overlay = render_stamp_overlay(recipient, slot, styles, deterministic)
+        file_id = hashlib.sha256(f'{digest}:{recipient}'.encode('utf-8')).digest()[:16]
+        copies[recipient] = stamper.stamp(overlay, file_id)
+    return copies
+
+
+def _recipient_file_names(recipients):
+    """A distinct file-name part per recipient: the name's ASCII letters, digits, _ and -, spaces as _.
+
+    Names that reduce to the same part (compared ignoring case, for
+    case-insensitive file systems) or to nothing get their 1-based position
+    in recipients appended.
+    """
+    names = []
+    taken = set()
+    for i, recipient in enumerate(recipients, 1):
+        name = re.sub(r'[^a-zA-Z0-9_-]', '', re.sub(r'\s+', '_', recipient)).strip('_')
+        if not name or name.lower() in taken:
+            name = f'{name}_{i}' if name else str(i)
+            while name.lower() in taken:
+                name += f'_{i}'
+        taken.add(name.lower())
+        names.append(name)
+    return names
+
+
+def generate_recipient_pdfs(data, output_path, recipients, deterministic=False, markdown=False):
+    """Write one copy per recipient next to output_path (<stem>_<Name>.pdf). Returns the paths.
+
+    File names are made distinct (see _recipient_file_names), so no copy
+    overwrites another.
+    """
+    t0 = time.perf_counter()
+    copies = render_for_recipients(data, recipients, deterministic, markdown)
+    stem, ext = os.path.splitext(output_path)
+    paths = []
+    for (recipient, pdf), safe_name in zip(copies.items(), _recipient_file_names(list(copies))):
+        path = f'{stem}_{safe_name}{ext or ".pdf"}'
+        with open(path, 'wb') as f:
+            f.write(pdf)
+        paths.append(path)
+        print(f'[PDF] Generated: {path}')
+    elapsed = (time.perf_counter() - t0) * 1000
+    print(f'[PDF] {len(paths)} recipient copies in {elapsed:.0f} ms')
+    return paths
+
+
+# ─── CLI entry point ──────────────────────────────────────────────────────────
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a ProspectAI donor PDF.')
+    parser.add_argument('input_path', help='profile JSON (PDFProfileData, or raw markdown with --markdown)')
+    parser.add_argument('output_path', help='PDF to write')
+    parser.add_argument('--profile', action='store_true',
+                        help='write cProfile stats, collapsed stacks and a hotspot summary next to the PDF')
+    parser.add_argument('--deterministic', action='store_true',
+                        help='byte-identical output for identical input (fixed dates, payload-derived file ID)')
+    parser.add_argument('--linearize', action='store_true',
+                        help='write a linearized ("fast web view") PDF')
+    parser.add_argument('--patch-cover', metavar='EXISTING_PDF',
+                        help='append an incremental update with a re-rendered cover instead of a full render')
+    parser.add_argument('--markdown', action='store_true',
+                        help='input holds profileMarkdown/meetingGuideMarkdown instead of parsed sections')
+    parser.add_argument('--time-budget', type=float, metavar='SECONDS',
+                        help='wall-time budget; cheaper layouts kick in as it runs low')
+    parser.add_argument('--memory-budget', type=float, metavar='MIB',
+                        help='memory growth budget; cheaper layouts kick in as it runs low')
+    parser.add_argument('--page-map', metavar='JSON',
+                        help='also write a page-map sidecar (section pages, page text, sources) here')
+    parser.add_argument('--recipient', action='append', metavar='NAME',
+                        help='lay out once and write a stamped copy per recipient (repeatable); '
+                             'output_path names the copies (<stem>_<NAME>.pdf)')
+    parser.add_argument('--compress-level', type=int, choices=range(-1, 10), metavar='0-9',
+                        help='Flate level for page, form and font streams (default: zlib default, '
+                             'or PROSPECTAI_PDF_COMPRESS_LEVEL)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='write each page as soon as it is finished; with output_path "-" the PDF '
+                             'streams to stdout')
+    parser.add_argument('--draft', action='store_true',
+                        help='base-14 fonts, nothing embedded, no gradients or glows (QA, bulk exports)')
+    parser.add_argument('--preview', type=int, metavar='PAGES',
+                        help='lay out only the cover and the first PAGES content pages, noting the '
+                             'estimated length of the full report')
+    args = parser.parse_args()
+    if args.incremental and (args.linearize or args.patch_cover or args.recipient):
+        parser.error('--incremental cannot be combined with --linearize, --patch-cover or --recipient')
+    if args.preview is not None and (args.incremental or args.patch_cover or args.recipient):
+        parser.error('--preview cannot be combined with --incremental, --patch-cover or --recipient')
+    if args.draft and (args.patch_cover or args.recipient):
+        parser.error('--draft cannot be combined with --patch-cover or --recipient')
+    if args.recipient and (args.linearize or args.page_map or args.time_budget or args.memory_budget
+                           or args.profile):
+        parser.error('--recipient cannot be combined with --linearize, --page-map, --time-budget, '
+                     '--memory-budget or --profile')
+    if args.recipient and len(set(args.recipient)) < len(args.recipient):
+        parser.error('each --recipient must be named once')
+    if args.compress_level is not None:
+        flate.LEVEL = args.compress_level
+
+    with open(args.input_path, 'r') as f:
         data = json.load(f)
 
-    generate_pdf(data, output_path)
+    if args.patch_cover:
+        patch_cover(data, args.patch_cover, args.output_path, deterministic=args.deterministic,
+                    markdown=args.markdown)
+        sys.exit(0)
+
+    if args.recipient:
+        generate_recipient_pdfs(data, args.output_path, args.recipient,
+                                deterministic=args.deterministic, markdown=args.markdown)
+        sys.exit(0)
+
+    governor = None
+    if args.time_budget or args.memory_budget:
+        governor = RenderGovernor(
+            time_budget=args.time_budget,
+            memory_budget=args.memory_budget * 2**20 if args.memory_budget else None,
+        )
+
+    try:
+        if args.incremental and args.output_path == '-':
+            # stdout carries the PDF; progress lines go to stderr
+            out = sys.stdout.buffer
+            with contextlib.redirect_stdout(sys.stderr):
+                stream_pdf(data, out, deterministic=args.deterministic,
+                           governor=governor, markdown=args.markdown, draft=args.draft)
+                if governor and governor.fallbacks:
+                    print(f'[PDF] Fallbacks: {", ".join(governor.fallbacks)}')
+        else:
+            generate_pdf(data, args.output_path, profile=args.profile, deterministic=args.deterministic,
+                         linearize=args.linearize, governor=governor, markdown=args.markdown,
+                         page_map_path=args.page_map, incremental=args.incremental,
+                         preview=Preview(args.preview) if args.preview is not None else None,
+                         draft=args.draft)
+    except RenderBudgetExceeded as e:
+        print(f'[PDF] {e}', file=sys.stderr)
+        sys.exit(3)
@@ -0,0 +1,164 @@
+"""Image stage for the cover: donor photo and partner logo.
+
+Uploads arrive at whatever resolution the user's camera produced. Embedding
+them as-is would put megabytes of pixels nobody can see into every PDF and
+make ReportLab decode and re-compress them on every render. Instead each
+image is:
+
+  - downsampled to the pixels actually printed (box size in points x DPI,
+    never upscaled), cropped to fill or fitted inside the box;
+  - re-encoded as baseline JPEG (photos), which ReportLab passes through
+    untouched as DCTDecode, or as optimised PNG (anything with transparency
+    or few colours, e.g. logos), which ends up Flate-compressed;
+  - stored under a content hash of (source bytes, box, DPI, fit) in a cache
+    directory shared by all renders and processes.
+
+Because the result is a file path named by its content hash, canvas.drawImage
+registers it once per document however many pages draw it.
+
+The payload comes from the client, so sources are untrusted: a source is
+either a base64 data: URL or a file inside the upload directory
+(PROSPECTAI_UPLOAD_DIR; without it no paths are read). Neither may decode
+to more than MAX_SOURCE_BYTES, which is checked before reading, and
+images over MAX_PIXELS are refused before they are decoded.
+"""
+
+import base64
+import hashlib
+import io
+import math
+import os
+import tempfile
+import threading
+
+from PIL import Image as PILImage, ImageOps
+
+
+DEFAULT_DPI = 150
+JPEG_QUALITY = 85
+PALETTE_MAX_COLORS = 256
+PIPELINE_VERSION = 1   # bump to invalidate cached outputs
+MAX_SOURCE_BYTES = 25 * 2**20
+MAX_PIXELS = 50_000_000    # a 48 MP phone photo fits
+
+PILImage.MAX_IMAGE_PIXELS = MAX_PIXELS
+
+UPLOAD_DIR = os.environ.get('PROSPECTAI_UPLOAD_DIR')
+
+CACHE_DIR = os.environ.get(
+    'PROSPECTAI_IMAGE_CACHE', os.path.join(tempfile.gettempdir(), 'prospectai-image-cache'))
+
+_memo = {}
+_memo_lock = threading.Lock()
+
+
+def read_source(source, upload_dir=None):
+    """Bytes of an image given as a data: URL or a path inside the upload directory.
+
+    Raises ValueError for any other source and for one over MAX_SOURCE_BYTES.
+    """
+    if source.startswith('data:'):
+        header, _, payload = source.partition(',')
+        if not header.endswith(';base64'):
+            raise ValueError('only base64 data URLs are supported')
+        if len(payload) // 4 * 3 > MAX_SOURCE_BYTES:
+            raise ValueError(f'image data URL is over {MAX_SOURCE_BYTES // 2**20} MiB')
+        return base64.b64decode(payload)
+
+    upload_dir = upload_dir or UPLOAD_DIR
+    if not upload_dir:
+        raise ValueError('image paths are not accepted without an upload directory')
+    root = os.path.realpath(upload_dir)
+    path = os.path.realpath(os.path.join(root, source))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError('image path is outside the upload directory')
+    if not os.path.isfile(path):    # opening a FIFO or device could block or never end
+        raise ValueError('image path is not a regular file')
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size > MAX_SOURCE_BYTES:
+            raise ValueError(f'image file is over {MAX_SOURCE_BYTES // 2**20} MiB')
+        return f.read(MAX_SOURCE_BYTES)
+
+
+def _target_pixels(width_pt, height_pt, dpi):
+    return max(1, math.ceil(width_pt / 72 * dpi)), max(1, math.ceil(height_pt / 72 * dpi))
+
+
+def _has_alpha(img):
+    if img.mode in ('RGBA', 'LA'):
+        return img.getextrema()[-1][0] < 255
+    return img.mode == 'P' and 'transparency' in img.info
+
+
+def _is_flat(img):
+    """Few distinct colours: logos, line art. Compresses better losslessly."""
+    return img.convert('RGB').getcolors(PALETTE_MAX_COLORS) is not None
+
+
+def _process(raw, width_pt, height_pt, dpi, fit):
+    """Downsample and re-encode. Returns (bytes, extension)."""
+    img = PILImage.open(io.BytesIO(raw))
+    if img.width * img.height > MAX_PIXELS:
+        # PIL itself only refuses at twice MAX_IMAGE_PIXELS
+        raise PILImage.DecompressionBombError(
+            f'image is {img.width}x{img.height} pixels, over the limit of {MAX_PIXELS}')
+    img = ImageOps.exif_transpose(img)
+    target = _target_pixels(width_pt, height_pt, dpi)
+
+    if fit == 'cover':
+        # Crop to the box's aspect ratio and shrink to it; a source smaller
+        # than the box is only cropped, never enlarged.
+        scale = max(target[0] / img.width, target[1] / img.height)
+        if scale > 1:
+            target = (max(1, round(target[0] / scale)), max(1, round(target[1] / scale)))
+        img = ImageOps.fit(img, target, method=PILImage.LANCZOS)
+    else:
+        img = img.copy()
+        img.thumbnail(target, PILImage.LANCZOS)
+
+    out = io.BytesIO()
+    if _has_alpha(img) or _is_flat(img):
+        img = img.convert('RGBA' if _has_alpha(img) else 'RGB')
+        img.save(out, 'PNG', optimize=True)
+        return out.getvalue(), '.png'
+    img.convert('RGB').save(out, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+    return out.getvalue(), '.jpg'
+
+
+def prepare_image(source, width_pt, height_pt, dpi=DEFAULT_DPI, fit='contain', cache_dir=None,
+                  upload_dir=None):
+    """Return the path of a print-ready copy of source for a width_pt x height_pt box.
+
+    fit: 'cover' crops to fill the box, 'contain' fits inside it. Processed
+    images are cached on disk by content hash, and the path is memoised per
+    process, so repeated renders with the same upload do no image work.
+    Raises ValueError or OSError for a source that is refused or can't be
+    read, and PIL.Image.DecompressionBombError for one with too many pixels.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    raw = read_source(source, upload_dir)
+    key = hashlib.sha256(raw)
+    key.update(f'|{width_pt:.2f}x{height_pt:.2f}@{dpi}|{fit}|v{PIPELINE_VERSION}'.encode())
+    digest = key.hexdigest()
+
+    with _memo_lock:
+        path = _memo.get((cache_dir, digest))
+    if path and os.path.exists(path):
+        return path
+
+    for ext in ('.jpg', '.png'):
+        path = os.path.join(cache_dir, digest + ext)
+        if os.path.exists(path):
+            break
+    else:
+        data, ext = _process(raw, width_pt, height_pt, dpi, fit)
+        os.makedirs(cache_dir, exist_ok=True)
+        path = os.path.join(cache_dir, digest + ext)
+        fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=ext)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)   # atomic: concurrent writers produce the same bytes
+
+    with _memo_lock:
+        _memo[(cache_dir, digest)] = path
+    return path
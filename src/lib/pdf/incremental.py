@@ -0,0 +1,186 @@
+"""Incremental PDF writing: each page goes to the output as it is finished.
+
+ReportLab keeps every page, content stream and image in the document until
+canvas.save(), then formats the whole file in one go. For a long report
+that means memory grows with the page count and the client sees nothing
+until the end.
+
+IncrementalWriter writes the file front to back instead:
+
+  - the header goes out first;
+  - when a page is finished (showPage) the page object is formatted, along
+    with everything it pulls in while formatting (its content stream) and
+    any images and forms registered since the last page, and written;
+    those objects are then dropped from the document, keeping only their
+    object numbers and byte offsets for the xref table;
+  - at save() what can still change while pages are being added is
+    written: the page tree, fonts (subsets are only known once every page
+    is drawn), annotations, outlines, info and catalog; then the xref
+    table and the trailer.
+
+Object numbers are assigned exactly as ReportLab assigns them, and the
+xref table does not care in which order objects appear in the file, so
+the result is an ordinary single-revision PDF with the same objects as a
+normal save, just laid out differently. Linearized output needs the whole
+file and is not available in this mode.
+"""
+
+from reportlab.pdfbase import pdfdoc
+
+import flate
+from state_canvas import StateCanvas
+
+
+_PAGE_OBJECTS = (pdfdoc.PDFStream, pdfdoc.PDFFormXObject, pdfdoc.PDFImageXObject)
+
+
+class _Written(pdfdoc.PDFObject):
+    """Stands in for an object that is already in the output."""
+
+    def format(self, document):
+        raise ValueError('object was already written by the incremental writer')
+
+
+_WRITTEN = _Written()
+
+
+class IncrementalWriter:
+    """Writes a ReportLab PDFDocument to out page by page."""
+
+    def __init__(self, doc, out, compress_level=None, parallel_flate=True):
+        self.doc = doc
+        self.out = out
+        self.compress_level = compress_level
+        self.parallel_flate = parallel_flate
+        self.offset = 0
+        self.written = set()
+        self.pages = 0          # pages written so far
+        self.seen = 0           # object numbers looked at so far
+        self.version = doc._pdfVersion
+        doc.encrypt.prepare(doc)
+        self._emit(pdfdoc.PDFFile(self.version).format(doc))
+
+    def _emit(self, data):
+        self.out.write(data)
+        self.offset += len(data)
+
+    def _write(self, oid):
+        doc = self.doc
+        data = pdfdoc.PDFIndirectObject(oid, doc.idToObject[oid]).format(doc)
+        doc.idToOffset[oid] = self.offset
+        self._emit(data)
+        self.written.add(oid)
+
+    def flush(self):
+        """Write the pages finished since the last flush. Returns bytes written so far."""
+        doc = self.doc
+        flate.precompress(doc, self.compress_level, parallel=False)
+        try:
+            for page in doc.Pages.pages[self.pages:]:
+                self._write(page.__InternalName__)
+                # the page keeps its name for the page tree, not its content
+                page.stream = page.Contents = page.Resources = None
+            self.pages = len(doc.Pages.pages)
+            # content streams numbered while formatting, images and forms drawn on these pages
+            while self.seen < doc.objectcounter:
+                self.seen += 1
+                oid = doc.numberToId[self.seen]
+                obj = doc.idToObject[oid]
+                if oid not in self.written and isinstance(obj, _PAGE_OBJECTS):
+                    self._write(oid)
+                    if isinstance(obj, pdfdoc.PDFStream) and not isinstance(obj, pdfdoc.PDFFormXObject):
+                        doc.idToObject[oid] = _WRITTEN
+        finally:
+            flate.release()
+        if hasattr(self.out, 'flush'):
+            self.out.flush()
+        return self.offset
+
+    def finish(self, canvas):
+        """Write everything else, then the xref table and trailer."""
+        doc = self.doc
+        # what PDFDocument.GetPDFData does before formatting
+        for font in doc.delayedFonts:
+            font.addObjects(doc)
+        doc.info.invariant = doc.invariant
+        doc.info.digest(doc.signature)
+        catalog = doc.Catalog
+        doc.Reference(catalog)
+        doc.Reference(doc.info)
+        doc.Outlines.prepare(doc, canvas)
+        if doc.Outlines.ready < 0:
+            catalog.Outlines = None
+        if doc._pdfVersion > self.version:
+            # the header went out before anything raised the version
+            catalog.Version = pdfdoc.PDFName('%d.%d' % doc._pdfVersion)
+            catalog.__NoDefault__ = catalog.__NoDefault__ + ['Version']
+        encrypt = doc.encrypt.info()
+        encrypt_ref = doc.Reference(encrypt) if encrypt else None
+
+        flate.precompress(doc, self.compress_level, self.parallel_flate)
+        try:
+            number = 1
+            while number in doc.numberToId:     # formatting can register more objects
+                oid = doc.numberToId[number]
+                if oid not in self.written:
+                    self._write(oid)
+                number += 1
+        finally:
+            flate.release()
+
+        count = len(doc.numberToId)
+        xref = pdfdoc.PDFCrossReferenceTable()
+        xref.addsection(0, [doc.numberToId[n] for n in range(1, count + 1)])
+        startxref = self.offset
+        self._emit(xref.format(doc))
+        trailer = pdfdoc.PDFTrailer(
+            startxref=startxref,
+            Size=count + 1,
+            Root=doc.Reference(catalog),
+            Info=doc.Reference(doc.info),
+            Encrypt=encrypt_ref,
+            ID=doc.ID(),
+        )
+        self._emit(trailer.format(doc))
+        if hasattr(self.out, 'flush'):
+            self.out.flush()
+        return self.offset
+
+
+class IncrementalCanvas(StateCanvas):
+    """StateCanvas that writes each page to its output as soon as it is shown.
+
+    The output (the canvas filename) may be a path or a binary file object
+    such as a socket or pipe; on_flush(bytes_so_far) is called after each
+    page, e.g. to report progress.
+    """
+
+    on_flush = None
+
+    def __init__(self, filename, *args, **kwargs):
+        super().__init__(filename, *args, **kwargs)
+        self._writer = None
+        self._owned = None
+
+    def _output(self):
+        if self._writer is None:
+            out = self._filename
+            if not hasattr(out, 'write'):
+                out = self._owned = open(out, 'wb')
+            self._writer = IncrementalWriter(self._doc, out, self.compress_level, self.parallel_flate)
+        return self._writer
+
+    def showPage(self):
+        super().showPage()
+        written = self._output().flush()
+        if self.on_flush:
+            self.on_flush(written)
+
+    def save(self):
+        if len(self._code):
+            self.showPage()
+        try:
+            self._output().finish(self)
+        finally:
+            if self._owned:
+                self._owned.close()
@@ -0,0 +1,467 @@
+"""Linearized ("fast web view") output for generated PDFs.
+
+Rewrites a finished PDF so the catalog, first page and everything it needs
+come first, followed by the remaining pages in order, with the hint stream
+and linearization dictionary described in ISO 32000-1 Annex F. Viewers can
+render the cover as soon as its bytes arrive instead of waiting for the
+trailer at the end of the file.
+
+Layout written (Annex F part numbers):
+
+  1  header
+  2  linearization dictionary
+  3  first-page xref + trailer (/Prev -> main xref)
+  4  document catalog
+  5  primary hint stream (page offset + shared object tables)
+  6  first page: its page object, then every object it uses
+  7  remaining pages, each page object followed by its private objects
+  8  objects shared between pages 2..N that page 1 doesn't use
+  9  everything else (page tree, document info, ...)
+ 11  main xref + trailer
+
+All offsets inside the hint tables are written as if the hint stream were
+absent, as the spec requires. Works on any PDF the generator writes
+(classic xref table, no object streams), including combined documents.
+
+Usage:
+  python3 linearize.py <input.pdf> <output.pdf>
+  python3 linearize.py --check <file.pdf>
+"""
+
+import sys
+import zlib
+
+from pdf_objects import PdfFile, serialize, parse_value, _next_token
+
+
+NUM_WIDTH = 10  # fixed-width numbers in part 2/3 so offsets settle in one pass
+
+
+# ─── Bit packing ──────────────────────────────────────────────────────────────
+
+class _BitWriter:
+    def __init__(self):
+        self._out = bytearray()
+        self._acc = 0
+        self._nbits = 0
+
+    def write(self, value, nbits):
+        if nbits == 0:
+            return
+        if value < 0 or value >= (1 << nbits):
+            raise ValueError(f'{value} does not fit in {nbits} bits')
+        self._acc = (self._acc << nbits) | value
+        self._nbits += nbits
+        while self._nbits >= 8:
+            self._nbits -= 8
+            self._out.append((self._acc >> self._nbits) & 0xFF)
+        self._acc &= (1 << self._nbits) - 1
+
+    def flush(self):
+        """Pad to the next byte boundary."""
+        if self._nbits:
+            self._out.append((self._acc << (8 - self._nbits)) & 0xFF)
+            self._acc = self._nbits = 0
+
+    def getvalue(self):
+        self.flush()
+        return bytes(self._out)
+
+
+class _BitReader:
+    def __init__(self, data, pos=0):
+        self._data = data
+        self._bit = pos * 8
+
+    def read(self, nbits):
+        value = 0
+        for _ in range(nbits):
+            byte = self._data[self._bit >> 3]
+            value = (value << 1) | ((byte >> (7 - (self._bit & 7))) & 1)
+            self._bit += 1
+        return value
+
+    def align(self):
+        self._bit = (self._bit + 7) & ~7
+
+
+def _nbits(value):
+    return value.bit_length()
+
+
+# ─── Hint tables ──────────────────────────────────────────────────────────────
+
+def _page_offset_table(pages, first_page_offset):
+    """pages: list of dicts with nobjects, length, shared (list of shared-table indexes)."""
+    min_nobjects = min(p['nobjects'] for p in pages)
+    max_nobjects = max(p['nobjects'] for p in pages)
+    min_length = min(p['length'] for p in pages)
+    max_length = max(p['length'] for p in pages)
+    max_shared = max(len(p['shared']) for p in pages)
+    max_ident = max((i for p in pages for i in p['shared']), default=0)
+
+    nb_nobjects = _nbits(max_nobjects - min_nobjects)
+    nb_length = _nbits(max_length - min_length)
+    nb_nshared = _nbits(max_shared)
+    nb_ident = _nbits(max_ident)
+
+    w = _BitWriter()
+    w.write(min_nobjects, 32)
+    w.write(first_page_offset, 32)
+    w.write(nb_nobjects, 16)
+    w.write(min_length, 32)
+    w.write(nb_length, 16)
+    w.write(0, 32)            # least content stream offset (Acrobat writes 0)
+    w.write(0, 16)
+    w.write(min_length, 32)   # content stream length: same as page length
+    w.write(nb_length, 16)
+    w.write(nb_nshared, 16)
+    w.write(nb_ident, 16)
+    w.write(0, 16)            # fractional position numerator bits
+    w.write(1, 16)            # denominator
+
+    # Each item is written for every page, then padded to a byte boundary.
+    for p in pages:
+        w.write(p['nobjects'] - min_nobjects, nb_nobjects)
+    w.flush()
+    for p in pages:
+        w.write(p['length'] - min_length, nb_length)
+    w.flush()
+    for p in pages:
+        w.write(len(p['shared']), nb_nshared)
+    w.flush()
+    for p in pages:
+        for ident in p['shared']:
+            w.write(ident, nb_ident)
+    w.flush()
+    # Shared object numerators and content stream offsets use 0 bits per entry.
+    for p in pages:
+        w.write(p['length'] - min_length, nb_length)
+    w.flush()
+    return w.getvalue()
+
+
+def _shared_object_table(groups, nfirst, first_shared_num, first_shared_offset):
+    """groups: byte length of each shared group (one object each)."""
+    min_length = min(groups) if groups else 0
+    max_length = max(groups) if groups else 0
+    nb_length = _nbits(max_length - min_length)
+
+    w = _BitWriter()
+    w.write(first_shared_num, 32)
+    w.write(first_shared_offset, 32)
+    w.write(nfirst, 32)
+    w.write(len(groups), 32)
+    w.write(0, 16)            # objects per group - 1 always 0
+    w.write(min_length, 32)
+    w.write(nb_length, 16)
+    for length in groups:
+        w.write(length - min_length, nb_length)
+    w.flush()
+    for _ in groups:
+        w.write(0, 1)         # no MD5 signatures
+    w.flush()
+    return w.getvalue()
+
+
+# ─── Writer ───────────────────────────────────────────────────────────────────
+
+def _partition(pdf):
+    pages, tree_nodes = pdf.page_tree()
+    root = pdf.root_num
+    structural = set(pages) | set(tree_nodes) | {root}
+
+    users = {}
+    closures = []
+    for i, page in enumerate(pages):
+        closure = pdf.closure(page, exclude=structural - {page})
+        closure.discard(page)
+        closures.append(closure)
+        for num in closure:
+            users.setdefault(num, set()).add(i)
+
+    part6 = [pages[0]] + sorted(closures[0])
+    in_first = set(part6)
+    part7 = []
+    page_groups = []
+    shared = set()
+    for i in range(1, len(pages)):
+        private = sorted(n for n in closures[i] if users[n] == {i} and n not in in_first)
+        shared.update(n for n in closures[i] if len(users[n]) > 1 and n not in in_first)
+        page_groups.append([pages[i]] + private)
+        part7.extend(page_groups[-1])
+    part8 = sorted(shared)
+    placed = in_first | set(part7) | shared | {root}
+    part9 = sorted(n for n in pdf.objects if n not in placed)
+    return pages, closures, part6, page_groups, part7, part8, part9
+
+
+def linearize(data):
+    """Return a linearized copy of the PDF in data (bytes)."""
+    pdf = PdfFile(data)
+    pages, closures, part6, page_groups, part7, part8, part9 = _partition(pdf)
+
+    # Main xref section: parts 7-9 numbered from 1. First-page section follows.
+    mapping = {}
+    for num in part7 + part8 + part9:
+        mapping[num] = len(mapping) + 1
+    nmain = len(mapping) + 1
+    lin_num = nmain
+    mapping[pdf.root_num] = nmain + 1
+    hint_num = nmain + 2
+    for i, num in enumerate(part6):
+        mapping[num] = nmain + 3 + i
+    total = nmain + 3 + len(part6)
+
+    body = {old: pdf.objects[old].to_bytes(mapping[old], mapping) for old in pdf.objects}
+
+    header = b'%PDF-' + pdf.version.encode('latin-1') + b'\n%\xe2\xe3\xcf\xd3\n'
+    trailer_extra = b''
+    if 'Info' in pdf.trailer:
+        trailer_extra += b' /Info ' + serialize(pdf.trailer['Info'], mapping)
+    if 'ID' in pdf.trailer:
+        trailer_extra += b' /ID ' + serialize(pdf.trailer['ID'], mapping)
+
+    def lin_dict(L, h_off, h_len, E, T):
+        return (b'%d 0 obj\n<< /Linearized 1 /L %*d /H [ %*d %*d ] /O %*d /E %*d /N %*d /T %*d >>\nendobj\n'
+                % (lin_num, NUM_WIDTH, L, NUM_WIDTH, h_off, NUM_WIDTH, h_len, NUM_WIDTH, mapping[pages[0]],
+                   NUM_WIDTH, E, NUM_WIDTH, len(pages), NUM_WIDTH, T))
+
+    first_nums = [lin_num, nmain + 1, hint_num] + [mapping[n] for n in part6]
+
+    def first_xref(offsets, prev):
+        entries = b''.join(b'%010d 00000 n \n' % offsets[n] for n in range(lin_num, total))
+        return (b'xref\n%d %d\n' % (lin_num, len(first_nums)) + entries
+                + b'trailer\n<< /Size %d /Root %d 0 R%s /Prev %*d >>\nstartxref\n0\n%%%%EOF\n'
+                % (total, nmain + 1, trailer_extra, NUM_WIDTH, prev))
+
+    catalog = body[pdf.root_num]
+    part2_len = len(lin_dict(0, 0, 0, 0, 0))
+    part3_len = len(first_xref({n: 0 for n in range(lin_num, total)}, 0))
+    hint_offset = len(header) + part2_len + part3_len + len(catalog)
+
+    # Lay out everything after the hint stream as if it were absent.
+    layout = []  # (new num, bytes) after the hint stream, in file order
+    layout += [(mapping[n], body[n]) for n in part6]
+    layout += [(mapping[n], body[n]) for n in part7 + part8 + part9]
+    adjusted = {}
+    pos = hint_offset
+    for num, chunk in layout:
+        adjusted[num] = pos
+        pos += len(chunk)
+    end_of_objects = pos
+
+    # Hint tables
+    shared_index = {old: i for i, old in enumerate(part6)}
+    for i, old in enumerate(part8):
+        shared_index[old] = len(part6) + i
+    page_entries = [{
+        'nobjects': len(part6),
+        'length': sum(len(body[n]) for n in part6),
+        'shared': [],
+    }]
+    for i, group in enumerate(page_groups, start=1):
+        page_entries.append({
+            'nobjects': len(group),
+            'length': sum(len(body[n]) for n in group),
+            'shared': sorted(shared_index[n] for n in closures[i] if n in shared_index),
+        })
+    page_table = _page_offset_table(page_entries, adjusted[mapping[pages[0]]])
+    shared_table = _shared_object_table(
+        [len(body[n]) for n in part6 + part8], len(part6),
+        mapping[part8[0]] if part8 else 0, adjusted[mapping[part8[0]]] if part8 else 0,
+    )
+    hint_data = zlib.compress(page_table + shared_table)
+    hint = (b'%d 0 obj\n<< /Filter /FlateDecode /Length %d /S %d >>\nstream\n'
+            % (hint_num, len(hint_data), len(page_table)) + hint_data + b'\nendstream\nendobj\n')
+
+    # Real offsets
+    offsets = {lin_num: len(header), nmain + 1: len(header) + part2_len + part3_len, hint_num: hint_offset}
+    for num, at in adjusted.items():
+        offsets[num] = at + len(hint)
+    first_xref_offset = len(header) + part2_len
+    main_xref_offset = end_of_objects + len(hint)
+    end_of_first_page = offsets[mapping[part6[-1]]] + len(body[part6[-1]])
+
+    main_xref = (b'xref\n0 %d\n0000000000 65535 f \n' % nmain
+                 + b''.join(b'%010d 00000 n \n' % offsets[n] for n in range(1, nmain))
+                 + b'trailer\n<< /Size %d >>\nstartxref\n%d\n%%%%EOF\n' % (nmain, first_xref_offset))
+    T = main_xref_offset + len(b'xref\n0 %d' % nmain)
+    L = main_xref_offset + len(main_xref)
+
+    out = [
+        header,
+        lin_dict(L, hint_offset, len(hint), end_of_first_page, T),
+        first_xref(offsets, main_xref_offset),
+        catalog,
+        hint,
+    ]
+    out += [chunk for _, chunk in layout]
+    out.append(main_xref)
+    result = b''.join(out)
+    assert len(result) == L
+    return result
+
+
+def linearize_file(input_path, output_path=None):
+    """Linearize a PDF on disk, in place unless output_path is given."""
+    with open(input_path, 'rb') as f:
+        data = f.read()
+    result = linearize(data)
+    with open(output_path or input_path, 'wb') as f:
+        f.write(result)
+    return len(result)
+
+
+# ─── Checker ──────────────────────────────────────────────────────────────────
+
+def check_linearization(data):
+    """Validate the linearization dictionary and hint tables of a PDF.
+
+    Returns a list of problems; an empty list means the file is consistent.
+    """
+    problems = []
+    pos = data.index(b'\n') + 1   # past the %PDF-x.y header
+    _, _, _, pos = _next_token(data, pos)
+    _, _, _, pos = _next_token(data, pos)
+    _, _, _, pos = _next_token(data, pos)
+    lin, _ = parse_value(data, pos)
+    if not isinstance(lin, dict) or 'Linearized' not in lin:
+        return ['first object is not a linearization dictionary']
+
+    if lin['L'] != len(data):
+        problems.append(f"/L {lin['L']} != file length {len(data)}")
+
+    pdf = PdfFile(data)
+    pages, _ = pdf.page_tree()
+    if lin['N'] != len(pages):
+        problems.append(f"/N {lin['N']} != page count {len(pages)}")
+    if lin['O'] != pages[0]:
+        problems.append(f"/O {lin['O']} is not the first page object {pages[0]}")
+    if data[lin['T']:lin['T'] + 1] not in (b'\n', b'\r', b' ') \
+            or not data[lin['T']:].lstrip().startswith(b'0000000000 65535 f'):
+        problems.append('/T does not point at the main xref table')
+
+    h_off, h_len = lin['H'][0], lin['H'][1]
+    hint_obj = None
+    for obj in pdf.objects.values():
+        if obj.offset == h_off:
+            hint_obj = obj
+    if hint_obj is None or hint_obj.stream_raw is None:
+        return problems + ['/H does not point at a hint stream object']
+    offsets = sorted(o.offset for o in pdf.objects.values()) + [data.rindex(b'\nxref\n') + 1]
+    next_offset = {a: b for a, b in zip(offsets, offsets[1:])}
+    if next_offset[h_off] - h_off != h_len:
+        problems.append('/H length does not match the hint stream object')
+
+    hints = zlib.decompress(hint_obj.stream_data())
+    by_num = {num: obj.offset for num, obj in pdf.objects.items()}
+
+    def adjusted(offset):
+        return offset + h_len if offset >= h_off else offset
+
+    def span(first_num, count):
+        start = by_num.get(first_num)
+        if start is None:
+            return None
+        total = 0
+        for num in range(first_num, first_num + count):
+            if num not in by_num:
+                return None
+            total += next_offset[by_num[num]] - by_num[num]
+        return total
+
+    # Page offset hint table
+    r = _BitReader(hints)
+    min_nobjects = r.read(32)
+    first_page_offset = r.read(32)
+    nb_nobjects = r.read(16)
+    min_length = r.read(32)
+    nb_length = r.read(16)
+    r.read(32)
+    nb_content_offset = r.read(16)
+    r.read(32)
+    nb_content_length = r.read(16)
+    nb_nshared = r.read(16)
+    nb_ident = r.read(16)
+    nb_numerator = r.read(16)
+    r.read(16)
+
+    npages = len(pages)
+    nobjects = [r.read(nb_nobjects) + min_nobjects for _ in range(npages)]
+    r.align()
+    lengths = [r.read(nb_length) + min_length for _ in range(npages)]
+    r.align()
+    nshared = [r.read(nb_nshared) for _ in range(npages)]
+    r.align()
+    idents = [[r.read(nb_ident) for _ in range(n)] for n in nshared]
+    r.align()
+    for n in nshared:
+        for _ in range(n):
+            r.read(nb_numerator)
+    r.align()
+    for _ in range(npages):
+        r.read(nb_content_offset)
+    r.align()
+    for _ in range(npages):
+        r.read(nb_content_length)
+    r.align()
+
+    if adjusted(first_page_offset) != by_num[pages[0]]:
+        problems.append('page offset table: first page offset mismatch')
+    if nshared[0]:
+        problems.append('page offset table: page 1 lists shared objects')
+    for i, page in enumerate(pages):
+        actual = span(page, nobjects[i])
+        if actual != lengths[i]:
+            problems.append(f'page offset table: page {i + 1} length {lengths[i]} != actual {actual}')
+
+    # Shared object hint table
+    r = _BitReader(hints, pdf.objects[hint_obj.num].value['S'])
+    first_shared_num = r.read(32)
+    first_shared_offset = r.read(32)
+    nfirst = r.read(32)
+    ntotal = r.read(32)
+    nb_group_objects = r.read(16)
+    min_group = r.read(32)
+    nb_group = r.read(16)
+    group_lengths = [r.read(nb_group) + min_group for _ in range(ntotal)]
+    r.align()
+    signatures = [r.read(1) for _ in range(ntotal)]
+    r.align()
+    group_objects = [r.read(nb_group_objects) + 1 for _ in range(ntotal)]
+
+    if nfirst != nobjects[0]:
+        problems.append(f'shared table: {nfirst} first-page entries, page 1 has {nobjects[0]} objects')
+    if any(signatures):
+        problems.append('shared table: MD5 signatures are not supported')
+    if ntotal > nfirst and adjusted(first_shared_offset) != by_num.get(first_shared_num):
+        problems.append('shared table: first shared object offset mismatch')
+    for ident in (i for page in idents for i in page):
+        if ident >= ntotal:
+            problems.append(f'page offset table: shared identifier {ident} out of range')
+    num = pages[0]
+    for i in range(ntotal):
+        if i == nfirst:
+            num = first_shared_num
+        actual = span(num, group_objects[i])
+        if actual != group_lengths[i]:
+            problems.append(f'shared table: group {i} length {group_lengths[i]} != actual {actual}')
+        num += group_objects[i]
+
+    return problems
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3 and sys.argv[1] == '--check':
+        with open(sys.argv[2], 'rb') as f:
+            issues = check_linearization(f.read())
+        for issue in issues:
+            print(f'[PDF] {issue}')
+        print(f'[PDF] {sys.argv[2]}: ' + ('linearization OK' if not issues else f'{len(issues)} problem(s)'))
+        sys.exit(1 if issues else 0)
+    if len(sys.argv) != 3:
+        print('Usage: python3 linearize.py <input.pdf> <output.pdf> | --check <file.pdf>')
+        sys.exit(1)
+    size = linearize_file(sys.argv[1], sys.argv[2])
+    print(f'[PDF] Linearized: {sys.argv[2]} ({size} bytes)')
@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Load generator for the PDF renderer, shaped like the generate-pdf route.
+
+Replays a mix of payloads (synthetic, or a directory of real request
+bodies) at a given concurrency and reports throughput, latency percentiles,
+CPU per render and peak memory, so a container can be sized by the
+concurrency at which p99 latency stops meeting its target.
+
+Every request follows the route's contract: the payload is written to
+/tmp/prospectai-pdf-<id>.json, the renderer writes /tmp/prospectai-pdf-<id>.pdf
+under the route's time and memory budgets (exit code 3 when exceeded), and
+both files are read back and removed. Modes differ in how renders get a
+process:
+
+  cli     one `python3 generator.py` per request through a shell, exactly
+          as route.ts execs it today;
+  worker  long-lived warm processes (--workers, default the concurrency),
+          each taking one request at a time as a line on its stdin pipe and
+          answering on stdout;
+  batch   requests are grouped --batch-size at a time into a manifest and
+          each group is rendered by one process; a request's latency runs
+          from its group's start to its own result.
+
+cli and worker run --concurrency closed-loop clients (each sends its next
+request when the last one returns); batch runs --concurrency groups at a
+time.
+
+CPU per render is the CPU time of all renderer processes (startup
+included) divided by the renders. Memory is sampled from /proc: the
+largest single renderer RSS and the largest total RSS of all of them.
+
+Usage: python3 loadtest.py [--mode cli|worker|batch] [--concurrency 1,2,4,8]
+                           [--requests N] [--corpus DIR] [--p99-target MS] [--json OUT]
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import contextlib
+import io
+import itertools
+import json
+import os
+import queue
+import random
+import resource
+import shlex
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import bench  # noqa: E402
+
+
+GENERATOR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'generator.py')
+
+# Mirrors src/app/api/generate-pdf/route.ts
+EXEC_TIMEOUT_S = 30
+RENDER_TIME_BUDGET_S = 25
+RENDER_MEMORY_BUDGET_MIB = 512
+BUDGET_EXCEEDED_EXIT_CODE = 3
+
+# (kind, weight): most requests are ordinary v3 guides
+PAYLOAD_MIX = (
+    ('v3', 50),
+    ('legacy', 20),
+    ('charts', 10),
+    ('markdown', 10),
+    ('oversized', 10),
+)
+
+MEMORY_SAMPLE_INTERVAL = 0.02
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+Request = collections.namedtuple('Request', 'index kind body markdown')
+Result = collections.namedtuple('Result', 'kind status latency_ms')
+
+
+# ─── Payloads ─────────────────────────────────────────────────────────────────
+
+def _synthetic(kind, seed):
+    if kind == 'legacy':
+        return bench.synthetic_payload(legacy=True, seed=seed), False
+    if kind == 'charts':
+        return dict(bench.synthetic_payload(seed=seed), charts=bench.synthetic_charts(seed)), False
+    if kind == 'markdown':
+        return bench.synthetic_markdown(bench.synthetic_payload(seed=seed)), True
+    if kind == 'oversized':
+        return bench.oversized_payload(1, seed=seed), False
+    return bench.synthetic_payload(sections=random.Random(seed).randint(5, 12), seed=seed), False
+
+
+def make_requests(count, seed=0, corpus=None):
+    """count requests drawn from PAYLOAD_MIX, or cycling through corpus/*.json."""
+    if corpus:
+        paths = sorted(os.path.join(corpus, name) for name in os.listdir(corpus) if name.endswith('.json'))
+        if not paths:
+            raise SystemExit(f'no .json payloads in {corpus}')
+        requests = []
+        for i, path in zip(range(count), itertools.cycle(paths)):
+            with open(path) as f:
+                body = f.read()
+            # Route bodies carry profileData or markdownInput; bare payloads are accepted too
+            data = json.loads(body)
+            markdown = 'markdownInput' in data or 'profileMarkdown' in data
+            data = data.get('markdownInput') or data.get('profileData') or data
+            requests.append(Request(i, os.path.basename(path), json.dumps(data), markdown))
+        return requests
+
+    rng = random.Random(seed)
+    kinds, weights = zip(*PAYLOAD_MIX)
+    cache = {}
+    requests = []
+    for i in range(count):
+        kind = rng.choices(kinds, weights)[0]
+        variant = rng.randrange(8)   # a few distinct payloads per kind
+        if (kind, variant) not in cache:
+            data, markdown = _synthetic(kind, seed * 100 + variant)
+            cache[kind, variant] = json.dumps(data), markdown
+        requests.append(Request(i, kind, *cache[kind, variant]))
+    return requests
+
+
+# ─── Renderer side (worker and batch processes) ───────────────────────────────
+
+def serve(lines, out):
+    """Render one `input<TAB>output<TAB>markdown` request per line, answering `status` lines."""
+    import generator
+    from render_governor import RenderGovernor, RenderBudgetExceeded
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator.ensure_fonts()
+    out.write('ready\n')
+    out.flush()
+    for line in iter(lines.readline, ''):
+        input_path, output_path, markdown = line.rstrip('\n').split('\t')
+        try:
+            with open(input_path) as f:
+                data = generator.parse_input(json.load(f), markdown == '1')
+            governor = RenderGovernor(time_budget=RENDER_TIME_BUDGET_S,
+                                      memory_budget=RENDER_MEMORY_BUDGET_MIB * 2**20)
+            with contextlib.redirect_stdout(io.StringIO()):
+                generator.generate_pdf(data, output_path, governor=governor, markdown=markdown == '1')
+            status = 'ok'
+        except RenderBudgetExceeded:
+            status = 'budget'
+        except Exception as e:   # reported, not fatal: the next request still runs
+            print(f'[PDF] Render failed: {e}', file=sys.stderr)
+            status = 'error'
+        out.write(status + '\n')
+        out.flush()
+
+
+# ─── Client side ──────────────────────────────────────────────────────────────
+
+class _Files:
+    """The route's temp-file pair for one request."""
+
+    def __init__(self, request):
+        request_id = f'{int(time.time() * 1000)}-{os.getpid()}-{request.index}'
+        tmp = tempfile.gettempdir()
+        self.input = os.path.join(tmp, f'prospectai-pdf-{request_id}.json')
+        self.output = os.path.join(tmp, f'prospectai-pdf-{request_id}.pdf')
+        with open(self.input, 'w') as f:
+            f.write(request.body)
+
+    def collect(self, status):
+        """Read the PDF back like the route does, then clean up. Returns the final status."""
+        if status == 'ok':
+            try:
+                with open(self.output, 'rb') as f:
+                    f.read()
+            except OSError:
+                status = 'error'
+        for path in (self.input, self.output):
+            with contextlib.suppress(OSError):
+                os.unlink(path)
+        return status
+
+
+def _exit_status(code):
+    return 'ok' if code == 0 else 'budget' if code == BUDGET_EXCEEDED_EXIT_CODE else 'error'
+
+
+def _serve_command():
+    return [sys.executable, os.path.abspath(__file__), '--serve']
+
+
+class CliMode:
+    """One shell + generator.py process per request, as route.ts does it."""
+
+    def start(self, workers):
+        pass
+
+    def render(self, request):
+        files = _Files(request)
+        command = (f'python3 {shlex.quote(GENERATOR_PATH)} {"--markdown " if request.markdown else ""}'
+                   f'--time-budget {RENDER_TIME_BUDGET_S} --memory-budget {RENDER_MEMORY_BUDGET_MIB} '
+                   f'{shlex.quote(files.input)} {shlex.quote(files.output)}')
+        try:
+            code = subprocess.run(command, shell=True, capture_output=True, timeout=EXEC_TIMEOUT_S).returncode
+            status = _exit_status(code)
+        except subprocess.TimeoutExpired:
+            status = 'timeout'
+        return files.collect(status)
+
+    def stop(self):
+        pass
+
+
+class WorkerMode:
+    """Warm renderer processes fed one request at a time over a pipe."""
+
+    def start(self, workers):
+        self._procs = [subprocess.Popen(_serve_command(), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL, text=True)
+                       for _ in range(workers)]
+        self._idle = queue.Queue()
+        for proc in self._procs:
+            if proc.stdout.readline().strip() != 'ready':
+                raise RuntimeError('worker failed to start')
+            self._idle.put(proc)
+
+    def render(self, request):
+        files = _Files(request)
+        proc = self._idle.get()
+        try:
+            proc.stdin.write(f'{files.input}\t{files.output}\t{int(request.markdown)}\n')
+            proc.stdin.flush()
+            status = proc.stdout.readline().strip() or 'error'
+        finally:
+            self._idle.put(proc)
+        return files.collect(status)
+
+    def stop(self):
+        for proc in self._procs:
+            proc.stdin.close()
+        for proc in self._procs:
+            proc.wait()
+
+
+def _run_clients(mode, requests, concurrency):
+    """Closed loop: concurrency clients, each sending its next request when the last returns."""
+    pending = queue.Queue()
+    for request in requests:
+        pending.put(request)
+    results = []
+    lock = threading.Lock()
+
+    def client():
+        while True:
+            try:
+                request = pending.get_nowait()
+            except queue.Empty:
+                return
+            t = time.perf_counter()
+            status = mode.render(request)
+            with lock:
+                results.append(Result(request.kind, status, (time.perf_counter() - t) * 1000))
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def _run_batches(requests, concurrency, batch_size):
+    """concurrency renderer processes at a time, each given a manifest of batch_size requests."""
+    def run_batch(batch):
+        files = [_Files(request) for request in batch]
+        manifest = ''.join(f'{f.input}\t{f.output}\t{int(r.markdown)}\n' for f, r in zip(files, batch))
+        t = time.perf_counter()
+        proc = subprocess.Popen(_serve_command(), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, text=True)
+        proc.stdin.write(manifest)
+        proc.stdin.close()
+        proc.stdout.readline()   # ready
+        results = []
+        for request, f in zip(batch, files):
+            status = proc.stdout.readline().strip() or 'error'
+            results.append(Result(request.kind, f.collect(status), (time.perf_counter() - t) * 1000))
+        proc.wait()
+        return results
+
+    batches = [requests[i:i + batch_size] for i in range(0, len(requests), batch_size)]
+    with concurrent.futures.ThreadPoolExecutor(concurrency) as pool:
+        return [result for batch in pool.map(run_batch, batches) for result in batch]
+
+
+# ─── Measurement ──────────────────────────────────────────────────────────────
+
+def _descendants(pid):
+    children = []
+    try:
+        for tid in os.listdir(f'/proc/{pid}/task'):
+            with open(f'/proc/{pid}/task/{tid}/children') as f:
+                children.extend(int(c) for c in f.read().split())
+    except OSError:
+        return []
+    return children + [d for child in children for d in _descendants(child)]
+
+
+def _rss(pid):
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        return 0
+
+
+class MemorySampler:
+    """Peak RSS of the largest renderer process and of all of them together."""
+
+    def __init__(self):
+        self.peak_process = self.peak_total = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        me = os.getpid()
+        while not self._stop.wait(MEMORY_SAMPLE_INTERVAL):
+            sizes = [_rss(pid) for pid in _descendants(me)]
+            if sizes:
+                self.peak_process = max(self.peak_process, max(sizes))
+                self.peak_total = max(self.peak_total, sum(sizes))
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def _children_cpu():
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _percentile(values, p):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    k = (len(values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def run(mode_name, requests, concurrency, args):
+    """Run requests at one concurrency level and return the summary dict."""
+    mode = {'cli': CliMode, 'worker': WorkerMode}.get(mode_name, CliMode)()
+    cpu0 = _children_cpu()
+    with MemorySampler() as memory:
+        t = time.perf_counter()
+        mode.start(args.workers or concurrency)
+        startup = time.perf_counter() - t
+        t = time.perf_counter()
+        if mode_name == 'batch':
+            results = _run_batches(requests, concurrency, args.batch_size)
+        else:
+            results = _run_clients(mode, requests, concurrency)
+        wall = time.perf_counter() - t
+        mode.stop()
+    cpu = _children_cpu() - cpu0
+
+    latencies = [r.latency_ms for r in results]
+    by_kind = collections.defaultdict(list)
+    for r in results:
+        by_kind[r.kind].append(r.latency_ms)
+    return {
+        'mode': mode_name,
+        'concurrency': concurrency,
+        'requests': len(results),
+        'wallSeconds': wall,
+        'startupSeconds': startup,
+        'throughput': len(results) / wall,
+        'latencyMs': {f'p{p}': _percentile(latencies, p) for p in (50, 95, 99)} | {'max': max(latencies)},
+        'cpuMsPerRender': cpu * 1000 / len(results),
+        'peakProcessMiB': memory.peak_process / 2**20,
+        'peakTotalMiB': memory.peak_total / 2**20,
+        'outcomes': dict(collections.Counter(r.status for r in results)),
+        'p50ByKindMs': {kind: statistics.median(values) for kind, values in sorted(by_kind.items())},
+    }
+
+
+# ─── Report ───────────────────────────────────────────────────────────────────
+
+def print_report(summaries, p99_target=None):
+    print(f'{"conc":>5} {"req/s":>7} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"cpu/render":>11} '
+          f'{"peak proc":>10} {"peak total":>11}  outcomes')
+    for s in summaries:
+        lat = s['latencyMs']
+        outcomes = ' '.join(f'{k}={v}' for k, v in sorted(s['outcomes'].items()))
+        print(f'{s["concurrency"]:>5} {s["throughput"]:>7.2f} {lat["p50"]:>8.0f} {lat["p95"]:>8.0f} '
+              f'{lat["p99"]:>8.0f} {s["cpuMsPerRender"]:>8.0f} ms {s["peakProcessMiB"]:>6.0f} MiB '
+              f'{s["peakTotalMiB"]:>7.0f} MiB  {outcomes}')
+    last = summaries[-1]
+    print('p50 by payload at concurrency %d: %s' % (
+        last['concurrency'], ', '.join(f'{k} {v:.0f} ms' for k, v in last['p50ByKindMs'].items())))
+    if p99_target:
+        ok = [s['concurrency'] for s in summaries
+              if s['latencyMs']['p99'] <= p99_target and set(s['outcomes']) == {'ok'}]
+        print(f'highest concurrency with p99 <= {p99_target:.0f} ms: {max(ok) if ok else "none"}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load-test the PDF renderer the way the generate-pdf route calls it.')
+    parser.add_argument('--mode', choices=('cli', 'worker', 'batch'), default='cli')
+    parser.add_argument('--concurrency', default='1,2,4', help='comma-separated levels to run in turn')
+    parser.add_argument('--requests', type=int, default=40, help='requests per level')
+    parser.add_argument('--workers', type=int, help='worker processes (worker mode; default: the concurrency)')
+    parser.add_argument('--batch-size', type=int, default=8, help='requests per process (batch mode)')
+    parser.add_argument('--corpus', metavar='DIR', help='replay the .json request bodies in DIR instead of the mix')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--p99-target', type=float, metavar='MS', help='report the highest level meeting it')
+    parser.add_argument('--json', metavar='OUT', help='also write the summaries here')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(sys.stdin, sys.stdout)
+        sys.exit(0)
+
+    requests = make_requests(args.requests, args.seed, args.corpus)
+    mix = collections.Counter(r.kind for r in requests)
+    print(f'[PDF] {args.mode} mode, {len(requests)} requests per level '
+          f'({", ".join(f"{k} {v}" for k, v in sorted(mix.items()))}), {os.cpu_count()} CPUs')
+    summaries = [run(args.mode, requests, int(level), args) for level in args.concurrency.split(',')]
+    print_report(summaries, args.p99_target)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summaries, f, indent=1)
@@ -0,0 +1,151 @@
+"""Page map: a JSON sidecar describing what each page of a render holds.
+
+Search indexes generated PDFs, and extracting text from the finished files
+is slow and loses the document structure. A PageMap is filled in while
+doc.build lays the story out, from the flowables as they land on pages:
+
+  - sections, and the headings inside them, with their page ranges;
+  - the plain text of every page, with character offsets;
+  - every source from the input, with the page it is listed on.
+
+Offsets count characters in the concatenation of all page texts in page
+order, so a search hit maps back to its page (pages[i].offset) and to the
+section or heading it falls under (their offset/endOffset).
+
+Flowables take part through a few plain attributes, so builders only tag
+what they already create:
+
+  - page_map_section: starts a section with this title (see mark_section);
+  - page_map_source: index into the input's sources list (page_map_sources
+    for a flowable listing several);
+  - plain_text(): text of a custom flowable; Paragraphs need nothing.
+
+Paragraphs in a heading style are headings: 'heading' at level 1 and
+'card_title' (meeting-guide beats) at level 2.
+"""
+
+import bisect
+import json
+
+from reportlab.platypus import Paragraph
+
+
+PAGE_MAP_VERSION = 1
+HEADING_LEVELS = {'heading': 1, 'card_title': 2}
+
+
+def mark_section(flowable, title):
+    """Tag flowable as the start of the section called title. Returns it."""
+    flowable.page_map_section = title
+    return flowable
+
+
+def paragraph_text(paragraph):
+    """Plain text of a Paragraph, or of the second part of a split one (whose
+    frags hold their text as words, so getPlainText() has nothing)."""
+    return paragraph.getPlainText() or ' '.join(
+        word for frag in paragraph.frags for word in getattr(frag, 'words', ()))
+
+
+def _plain_text(flowable):
+    plain_text = getattr(flowable, 'plain_text', None)
+    if plain_text:
+        return plain_text()
+    if isinstance(flowable, Paragraph):
+        return paragraph_text(flowable)
+    return ''
+
+
+class PageMap:
+    """Collects the page map of one render; see the module docstring."""
+
+    def __init__(self):
+        self._pages = []      # per page: list of text blocks
+        self._lengths = []    # per page: characters so far, '\n' between blocks
+        self._marks = []      # (level, title, page, offset within page); level 0 is a section
+        self._source_pages = {}
+
+    def instrument(self, doc):
+        """Record every flowable after it is drawn; also exposes doc.page_map."""
+        after_flowable = doc.afterFlowable
+
+        def mapped_after_flowable(flowable):
+            self.record(doc.page, flowable)
+            return after_flowable(flowable)
+
+        doc.afterFlowable = mapped_after_flowable
+        doc.page_map = self
+
+    def record(self, page, flowable):
+        while len(self._pages) < page:
+            self._pages.append([])
+            self._lengths.append(0)
+        blocks = self._pages[page - 1]
+        text = _plain_text(flowable).strip()
+        at = self._lengths[page - 1] + (1 if blocks and text else 0)
+
+        section = getattr(flowable, 'page_map_section', None)
+        if section:
+            self._marks.append((0, section, page, at))
+        level = HEADING_LEVELS.get(flowable.style.name) if isinstance(flowable, Paragraph) else None
+        if level and text:
+            self._marks.append((level, text, page, at))
+        source = getattr(flowable, 'page_map_source', None)
+        if source is not None:
+            self._source_pages.setdefault(source, page)
+        for source in getattr(flowable, 'page_map_sources', ()):
+            self._source_pages.setdefault(source, page)
+
+        if text:
+            blocks.append(text)
+            self._lengths[page - 1] = at + len(text)
+
+    # ─── Output ───────────────────────────────────────────────────────────────
+
+    def to_dict(self, data):
+        """The sidecar for a render of data, a ProfileData (its donor name and sources)."""
+        texts = ['\n'.join(blocks) for blocks in self._pages]
+        offsets = []
+        total = 0
+        for text in texts:
+            offsets.append(total)
+            total += len(text)
+
+        def page_of(offset):
+            return max(1, bisect.bisect_right(offsets, offset))
+
+        # A section or heading runs until the next one at its level or above.
+        marks = [(level, title, page, offsets[page - 1] + at) for level, title, page, at in self._marks]
+        entries = []
+        for i, (level, title, page, start) in enumerate(marks):
+            end = next((m[3] for m in marks[i + 1:] if m[0] <= level), total)
+            entries.append((level, {
+                'title': title,
+                'startPage': page,
+                'endPage': max(page, page_of(end - 1)) if end > start else page,
+                'offset': start,
+                'endOffset': end,
+            }))
+
+        sections = []
+        for level, entry in entries:
+            if level == 0:
+                sections.append(dict(entry, headings=[]))
+            elif sections:
+                sections[-1]['headings'].append(dict(entry, level=level))
+
+        return {
+            'version': PAGE_MAP_VERSION,
+            'donorName': data.donor_name,
+            'pageCount': len(texts),
+            'sections': sections,
+            'pages': [{'page': i + 1, 'offset': offsets[i], 'length': len(text), 'text': text}
+                      for i, text in enumerate(texts)],
+            'sources': [{'index': i + 1, 'title': source.title or '', 'url': source.url,
+                         'page': self._source_pages.get(i)}
+                        for i, source in enumerate(data.sources)],
+        }
+
+    def write(self, path, data):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(data), f, ensure_ascii=False, indent=1)
@@ -8,6 +8,9 @@
  * Content-agnostic: handles whatever sections the AI produces.
  */
 
+import type { SectionConfidence } from '../confidence';
+import { getDimensionById } from '../dimensions';
+
 interface Source {
   url: string;
   title: string;
@@ -63,6 +66,33 @@ export interface PDFProfileData {
   };
   meetingGuide: MeetingGuideData | null;
   sources: Source[];
+  /** Cover images: a base64 data: URL, or a file path inside PROSPECTAI_UPLOAD_DIR. */
+  donorPhoto?: string;
+  partnerLogo?: string;
+  charts?: PDFChartData;
+}
+
+/**
+ * Raw input for generator.py --markdown: the markdown is parsed in the same
+ * pass that lays out the PDF, so parsing here and the PDFProfileData JSON
+ * are skipped. Legacy (non-v3) meeting guides still need parseProfileForPDF.
+ */
+export interface PDFMarkdownInput {
+  donorName: string;
+  preparedFor: string;
+  date: string;
+  sources: Source[];
+  profileMarkdown: string;
+  meetingGuideMarkdown?: string;
+  charts?: PDFChartData;
+}
+
+/** Chart series for the PDF's Evidence Base page, all on a 0-10 scale. */
+export interface PDFChartData {
+  /** Per-dimension evidence confidence, drawn as a radar */
+  dimensions: { label: string; score: number }[];
+  /** Per-section structural confidence floors, drawn as bars */
+  confidence: { label: string; score: number }[];
 }
 
 /**
@@ -73,24 +103,74 @@ export function parseProfileForPDF(
   preparedFor: string,
   profileMarkdown: string,
   meetingGuideMarkdown: string | undefined,
-  sources: Source[]
+  sources: Source[],
+  dimensionCoverage?: SectionConfidence[]
 ): PDFProfileData {
-  const date = new Date().toLocaleDateString('en-US', {
-    year: 'numeric',
-    month: 'long',
-    day: 'numeric',
-  });
-
   return {
     donorName,
     preparedFor,
-    date,
+    date: todayForPDF(),
     sourceCount: sources.length,
     persuasionProfile: {
       sections: parsePersuasionProfile(profileMarkdown),
     },
     meetingGuide: meetingGuideMarkdown ? parseMeetingGuide(meetingGuideMarkdown) : null,
     sources,
+    ...(dimensionCoverage?.length ? { charts: buildChartData(dimensionCoverage) } : {}),
+  };
+}
+
+/**
+ * Package the markdown for generator.py --markdown, or return null when the
+ * meeting guide is in the legacy format and must go through parseProfileForPDF.
+ */
+export function buildMarkdownInput(
+  donorName: string,
+  preparedFor: string,
+  profileMarkdown: string,
+  meetingGuideMarkdown: string | undefined,
+  sources: Source[],
+  dimensionCoverage?: SectionConfidence[]
+): PDFMarkdownInput | null {
+  if (meetingGuideMarkdown && !isV3MeetingGuide(meetingGuideMarkdown)) return null;
+
+  return {
+    donorName,
+    preparedFor,
+    date: todayForPDF(),
+    sources,
+    profileMarkdown,
+    ...(meetingGuideMarkdown ? { meetingGuideMarkdown } : {}),
+    ...(dimensionCoverage?.length ? { charts: buildChartData(dimensionCoverage) } : {}),
+  };
+}
+
+function todayForPDF(): string {
+  return new Date().toLocaleDateString('en-US', {
+    year: 'numeric',
+    month: 'long',
+    day: 'numeric',
+  });
+}
+
+/**
+ * Flatten the stored confidence computation (confidence.ts) into chart series.
+ * A dimension feeding several sections has the same score in each, so it
+ * appears once on the radar, in canonical dimension order.
+ */
+function buildChartData(coverage: SectionConfidence[]): PDFChartData {
+  const byDim = new Map<number, number>();
+  for (const section of coverage) {
+    for (const d of section.dimensionDetails) {
+      byDim.set(d.dimId, d.dimConfidence);
+    }
+  }
+
+  return {
+    dimensions: Array.from(byDim.entries())
+      .sort(([a], [b]) => a - b)
+      .map(([dimId, score]) => ({ label: getDimensionById(dimId)?.label ?? `Dimension ${dimId}`, score })),
+    confidence: coverage.map(s => ({ label: `${s.section}. ${s.sectionName}`, score: s.floor })),
   };
 }
 
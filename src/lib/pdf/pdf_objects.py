@@ -0,0 +1,379 @@
+"""Minimal PDF object reader for post-processing ReportLab output.
+
+Just enough of the PDF syntax to read back files the generator wrote (classic
+xref tables, optionally chained with /Prev, no object streams), walk the page
+tree and re-emit objects under new numbers. Object bodies are kept as raw bytes
+and only indirect references are rewritten, so everything else — including
+stream data — passes through untouched.
+"""
+
+import re
+from collections import namedtuple
+
+
+WHITESPACE = b'\x00\t\n\x0c\r '
+DELIMITERS = b'()<>[]{}/%'
+
+_NUMBER = re.compile(rb'[+-]?(\d+\.?\d*|\.\d+)')
+_STARTXREF = re.compile(rb'startxref\s+(\d+)')
+
+
+class PdfError(Exception):
+    """Raised when a file is not something this reader understands."""
+
+
+Ref = namedtuple('Ref', 'num gen')
+
+
+class Name(str):
+    """A PDF name, stored without the leading slash."""
+
+
+class PdfString(bytes):
+    """A literal or hex string, stored as its raw token (delimiters included)."""
+
+
+# ─── Lexer ────────────────────────────────────────────────────────────────────
+
+def _skip_ws(data, pos):
+    n = len(data)
+    while pos < n:
+        c = data[pos]
+        if c in WHITESPACE:
+            pos += 1
+        elif c == 0x25:  # '%' comment runs to end of line
+            while pos < n and data[pos] not in b'\r\n':
+                pos += 1
+        else:
+            break
+    return pos
+
+
+def _next_token(data, pos):
+    """Return (kind, value, start, end) for the token at or after pos."""
+    pos = _skip_ws(data, pos)
+    if pos >= len(data):
+        return ('eof', None, pos, pos)
+    c = data[pos]
+
+    if c == 0x2F:  # '/'
+        end = pos + 1
+        while end < len(data) and data[end] not in WHITESPACE and data[end] not in DELIMITERS:
+            end += 1
+        return ('name', Name(data[pos + 1:end].decode('latin-1')), pos, end)
+
+    if c == 0x28:  # '(' literal string, balanced parens with backslash escapes
+        depth, end = 0, pos
+        while end < len(data):
+            ch = data[end]
+            if ch == 0x5C:
+                end += 2
+                continue
+            if ch == 0x28:
+                depth += 1
+            elif ch == 0x29:
+                depth -= 1
+                if depth == 0:
+                    end += 1
+                    break
+            end += 1
+        return ('string', PdfString(data[pos:end]), pos, end)
+
+    if c == 0x3C:  # '<'
+        if data[pos + 1:pos + 2] == b'<':
+            return ('<<', None, pos, pos + 2)
+        end = data.index(b'>', pos) + 1
+        return ('string', PdfString(data[pos:end]), pos, end)
+
+    if c == 0x3E and data[pos + 1:pos + 2] == b'>':
+        return ('>>', None, pos, pos + 2)
+
+    if c in b'[]{}':
+        return (chr(c), None, pos, pos + 1)
+
+    m = _NUMBER.match(data, pos)
+    if m and (m.end() == len(data) or data[m.end()] in WHITESPACE or data[m.end()] in DELIMITERS):
+        text = m.group(0)
+        value = float(text) if b'.' in text else int(text)
+        return ('number', value, pos, m.end())
+
+    end = pos
+    while end < len(data) and data[end] not in WHITESPACE and data[end] not in DELIMITERS:
+        end += 1
+    return ('keyword', data[pos:end].decode('latin-1'), pos, end)
+
+
+def parse_value(data, pos):
+    """Parse one PDF value starting at pos. Returns (value, end)."""
+    kind, value, start, end = _next_token(data, pos)
+
+    if kind == 'number' and isinstance(value, int):
+        k2, v2, _, e2 = _next_token(data, end)
+        if k2 == 'number' and isinstance(v2, int):
+            k3, v3, _, e3 = _next_token(data, e2)
+            if k3 == 'keyword' and v3 == 'R':
+                return Ref(value, v2), e3
+        return value, end
+
+    if kind == '<<':
+        result = {}
+        pos = end
+        while True:
+            kind, key, _, end = _next_token(data, pos)
+            if kind == '>>':
+                return result, end
+            if kind != 'name':
+                raise PdfError(f'expected name in dictionary at offset {pos}')
+            result[key], pos = parse_value(data, end)
+
+    if kind == '[':
+        result = []
+        pos = end
+        while True:
+            kind, _, _, end = _next_token(data, pos)
+            if kind == ']':
+                return result, end
+            item, pos = parse_value(data, pos)
+            result.append(item)
+
+    if kind == 'keyword':
+        return {'true': True, 'false': False, 'null': None}.get(value, value), end
+
+    if kind in ('number', 'name', 'string'):
+        return value, end
+
+    raise PdfError(f'unexpected {kind!r} at offset {start}')
+
+
+def iter_refs(value, skip_keys=()):
+    """Yield every Ref inside a parsed value, not descending into skip_keys."""
+    if isinstance(value, Ref):
+        yield value
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            if key not in skip_keys:
+                yield from iter_refs(item, skip_keys)
+    elif isinstance(value, list):
+        for item in value:
+            yield from iter_refs(item, skip_keys)
+
+
+def renumber(raw, mapping):
+    """Rewrite every `N G R` in raw object syntax through mapping {old: new}."""
+    out = []
+    last = pos = 0
+    window = []  # (kind, value, start, end) of the last two tokens
+    while True:
+        tok = _next_token(raw, pos)
+        if tok[0] == 'eof':
+            break
+        if tok[0] == 'keyword' and tok[1] == 'R' and len(window) == 2 \
+                and window[0][0] == window[1][0] == 'number' \
+                and isinstance(window[0][1], int) and window[0][1] in mapping:
+            start = window[0][2]
+            out.append(raw[last:start])
+            out.append(b'%d 0 R' % mapping[window[0][1]])
+            last = tok[3]
+            window = []
+        else:
+            window = (window + [tok])[-2:]
+        pos = tok[3]
+    out.append(raw[last:])
+    return b''.join(out)
+
+
+def serialize(value, mapping=None):
+    """Serialize a parsed value back to PDF syntax, renumbering refs via mapping."""
+    if isinstance(value, Ref):
+        num = mapping.get(value.num, value.num) if mapping else value.num
+        return b'%d %d R' % (num, value.gen)
+    if isinstance(value, Name):
+        return b'/' + value.encode('latin-1')
+    if isinstance(value, PdfString):
+        return bytes(value)
+    if isinstance(value, bool):
+        return b'true' if value else b'false'
+    if value is None:
+        return b'null'
+    if isinstance(value, int):
+        return b'%d' % value
+    if isinstance(value, float):
+        return (b'%.6f' % value).rstrip(b'0').rstrip(b'.')
+    if isinstance(value, dict):
+        return b'<< ' + b' '.join(
+            b'/' + k.encode('latin-1') + b' ' + serialize(v, mapping) for k, v in value.items()
+        ) + b' >>'
+    if isinstance(value, list):
+        return b'[ ' + b' '.join(serialize(v, mapping) for v in value) + b' ]'
+    if isinstance(value, str):
+        return value.encode('latin-1')
+    raise PdfError(f'cannot serialize {type(value).__name__}')
+
+
+# ─── File reader ──────────────────────────────────────────────────────────────
+
+class PdfObject:
+    """One indirect object: parsed value plus the raw bytes to re-emit it."""
+
+    __slots__ = ('num', 'gen', 'value', 'raw', 'stream_raw', 'offset')
+
+    def __init__(self, num, gen, value, raw, stream_raw, offset):
+        self.num = num
+        self.gen = gen
+        self.value = value
+        self.raw = raw                # bytes of the object's value (dictionary etc.)
+        self.stream_raw = stream_raw  # b'stream\n...endstream' or None
+        self.offset = offset
+
+    def stream_data(self):
+        """Raw (still encoded) stream bytes, without the stream/endstream keywords."""
+        if self.stream_raw is None:
+            return None
+        start = 6  # len(b'stream')
+        if self.stream_raw[start:start + 2] == b'\r\n':
+            start += 2
+        else:
+            start += 1
+        return self.stream_raw[start:start + self.value['Length']]
+
+    def to_bytes(self, num, mapping):
+        """Serialize as object `num`, rewriting refs through mapping."""
+        parts = [b'%d 0 obj\n' % num, renumber(self.raw, mapping)]
+        if self.stream_raw is not None:
+            parts.append(b'\n')
+            parts.append(self.stream_raw)
+        parts.append(b'\nendobj\n')
+        return b''.join(parts)
+
+
+class PdfFile:
+    """Objects, trailer and page order of a parsed PDF."""
+
+    def __init__(self, data):
+        self.data = data
+        header_end = data.index(b'\n') + 1
+        self.version = data[5:header_end].strip().decode('latin-1')
+        self.xref_offsets = {}
+        self.trailer = {}
+        self.startxref = self._find_startxref()
+        self._read_xref_chain(self.startxref)
+        self.objects = {}
+        for num, offset in self.xref_offsets.items():
+            if offset is not None:
+                self.objects[num] = self._read_object(num, offset)
+
+    def _find_startxref(self):
+        tail = self.data[-1024:]
+        matches = list(_STARTXREF.finditer(tail))
+        if not matches:
+            raise PdfError('no startxref found')
+        return int(matches[-1].group(1))
+
+    def _read_xref_chain(self, offset):
+        seen = set()
+        while offset is not None and offset not in seen:
+            seen.add(offset)
+            trailer = self._read_xref_table(offset)
+            for key, value in trailer.items():
+                self.trailer.setdefault(key, value)
+            offset = trailer.get('Prev')
+        self.trailer.pop('Prev', None)
+
+    def _read_xref_table(self, offset):
+        data = self.data
+        kind, value, _, pos = _next_token(data, offset)
+        if kind != 'keyword' or value != 'xref':
+            raise PdfError(f'expected xref table at offset {offset} (xref streams are not supported)')
+        while True:
+            kind, value, start, end = _next_token(data, pos)
+            if kind == 'keyword' and value == 'trailer':
+                trailer, _ = parse_value(data, end)
+                return trailer
+            first = value
+            _, count, _, pos = _next_token(data, end)
+            pos = _skip_ws(data, pos)
+            for i in range(count):
+                entry = data[pos:pos + 20]
+                pos += 20
+                num = first + i
+                if num in self.xref_offsets or num == 0:
+                    continue  # newer sections are read first
+                if entry[17:18] == b'n':
+                    self.xref_offsets[num] = int(entry[:10])
+                else:
+                    self.xref_offsets[num] = None
+            pos = _skip_ws(data, pos)
+
+    def _read_object(self, num, offset):
+        data = self.data
+        _, onum, _, pos = _next_token(data, offset)
+        _, gen, _, pos = _next_token(data, pos)
+        kind, kw, _, pos = _next_token(data, pos)
+        if onum != num or kw != 'obj':
+            raise PdfError(f'object {num} not found at offset {offset}')
+        value_start = _skip_ws(data, pos)
+        value, value_end = parse_value(data, value_start)
+        raw = data[value_start:value_end]
+
+        stream_raw = None
+        kind, kw, kw_start, kw_end = _next_token(data, value_end)
+        if kind == 'keyword' and kw == 'stream':
+            length = value['Length']
+            if isinstance(length, Ref):
+                length = self._resolve_length(length)
+                value['Length'] = length
+            body = kw_end + (2 if data[kw_end:kw_end + 2] == b'\r\n' else 1)
+            end = data.index(b'endstream', body + length) + len(b'endstream')
+            stream_raw = data[kw_start:end]
+        return PdfObject(num, gen, value, raw, stream_raw, offset)
+
+    def _resolve_length(self, ref):
+        offset = self.xref_offsets[ref.num]
+        _, _, _, pos = _next_token(self.data, offset)
+        _, _, _, pos = _next_token(self.data, pos)
+        _, _, _, pos = _next_token(self.data, pos)
+        value, _ = parse_value(self.data, pos)
+        return value
+
+    # ─── Structure ────────────────────────────────────────────────────────────
+
+    def get(self, ref):
+        """Resolve a Ref (or pass a direct value through)."""
+        if isinstance(ref, Ref):
+            obj = self.objects.get(ref.num)
+            return obj.value if obj else None
+        return ref
+
+    @property
+    def root_num(self):
+        return self.trailer['Root'].num
+
+    def page_tree(self):
+        """Return (page object numbers in order, page tree node numbers)."""
+        pages, nodes = [], []
+
+        def walk(ref):
+            node = self.get(ref)
+            if node.get('Type') == 'Pages' or 'Kids' in node:
+                nodes.append(ref.num)
+                for kid in node.get('Kids', []):
+                    walk(kid)
+            else:
+                pages.append(ref.num)
+
+        walk(self.get(self.trailer['Root'])['Pages'])
+        return pages, nodes
+
+    def closure(self, num, exclude, skip_keys=('Parent',)):
+        """Object numbers reachable from num, not entering exclude or skip_keys."""
+        seen = {num}
+        stack = [num]
+        while stack:
+            obj = self.objects.get(stack.pop())
+            if obj is None:
+                continue
+            for ref in iter_refs(obj.value, skip_keys):
+                if ref.num not in seen and ref.num not in exclude and ref.num in self.objects:
+                    seen.add(ref.num)
+                    stack.append(ref.num)
+        return seen
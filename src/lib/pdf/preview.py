@@ -0,0 +1,209 @@
+"""Preview renders: the cover and the first few content pages, fast.
+
+A preview lays out the story only until it has filled the cover and
+pages content pages, then empties what is left of the story so doc.build
+ends there; the sources appendix is left out of the story altogether (see
+_assemble_story). The rest of the report still has to be counted, so the
+preview can say how long the full document will be, and laying it out is
+exactly the cost being avoided. Instead the remaining flowables, and the
+appendix, are measured cheaply and paginated roughly:
+
+  - Paragraphs (nearly all of the layout time) are not wrapped: their
+    plain text is measured in the style's font in one stringWidth call,
+    and its words, at their average width, are packed into lines of the
+    frame width;
+  - every other flowable (cards, charts, lists, spacers) is wrapped, which
+    is cheap for them, and its real height used;
+  - flowables fill frames of the current frame's size as the frames would
+    place them (see estimate_pages): a PageBreak starts a new page, and
+    one that doesn't fit what is left of a frame splits there if it can or
+    moves to the next frame whole.
+
+The estimate is doc.page at the cutoff plus the pages counted that way. Each
+preview page shows "Preview · first n of about N pages" in its footer,
+drawn from one form that is defined once the estimate is known (a form may
+be used before it is defined), and the same line goes into the document
+subject. Read estimated_pages afterwards.
+"""
+
+import collections
+import math
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import KeepTogether, PageBreak, Paragraph
+
+from design_tokens import LIGHT_GRAY
+from page_map import paragraph_text
+
+
+PREVIEW_PAGES = 2      # content pages after the cover
+NOTICE_FORM = 'PreviewNotice'
+
+
+class _Frame:
+    """Stands in for the frame a flowable is split in (see generator._must_split)."""
+
+    def __init__(self, height, at_top):
+        self._aH = height
+        self._atTop = at_top
+
+
+def _paragraph_lines(paragraph, width):
+    """Estimated line count of paragraph at width, without wrapping it: its
+    words, all at their average width, packed into lines."""
+    style = paragraph.style
+    line_width = max(width - style.leftIndent - style.rightIndent, 1)
+    text = paragraph_text(paragraph)
+    words = len(text.split())
+    text_width = stringWidth(text, style.fontName, style.fontSize)
+    space = stringWidth(' ', style.fontName, style.fontSize)
+    word_width = (text_width - space * (words - 1)) / words if words else 0
+    if word_width > line_width:     # words cut across lines
+        return max(1, math.ceil(text_width / line_width))
+    return max(1, math.ceil(words / int((line_width + space) / (word_width + space))))
+
+
+def _height(flowable, width, height):
+    """Estimated height of flowable in a frame width x height, spacing included."""
+    if isinstance(flowable, KeepTogether):
+        # wraps its content on a canvas, which the estimate doesn't have
+        return sum(_height(f, width, height) for f in flowable._content)
+    if isinstance(flowable, Paragraph):
+        used = _paragraph_lines(flowable, width) * flowable.style.leading
+    else:
+        used = flowable.wrap(width, height)[1]
+    return used + flowable.getSpaceBefore() + flowable.getSpaceAfter()
+
+
+def _split_paragraph(paragraph, lines, avail):
+    """Estimated lines of paragraph (lines long) that fit in avail, as
+    Paragraph.split decides (never a lone first line); 0 moves it on whole."""
+    fit = int(avail / paragraph.style.leading)
+    if fit <= 1 and lines > 1:
+        return 0
+    return min(fit, lines)
+
+
+def estimate_pages(flowables, width, height):
+    """Rough number of pages flowables take, starting on a fresh page.
+
+    Placed the way the frames place them: a flowable that doesn't fit what
+    is left of a frame splits there if it can, and otherwise moves to the
+    next frame whole. Paragraphs split between estimated lines, keeping at
+    least two on the first frame; other flowables are split by their own
+    split() (cheap for them), so their split rules, minimum line counts
+    and the padding repeated on each part are counted.
+    """
+    pages = 0
+    used = 0
+    queue = collections.deque(flowables)
+
+    def next_frame():
+        nonlocal pages, used
+        pages += 1
+        used = 0
+
+    while queue:
+        flowable = queue.popleft()
+        if isinstance(flowable, PageBreak):
+            if used:
+                next_frame()
+            continue
+        space_before = flowable.getSpaceBefore() if used else 0   # dropped at the top of a frame
+        if isinstance(flowable, KeepTogether):
+            h = _height(flowable, width, height) - flowable.getSpaceBefore() + space_before
+            if used + h <= height:
+                used += h
+            elif h - space_before <= height:
+                next_frame()
+                used = h - space_before
+            else:
+                queue.extendleft(reversed(flowable._content))
+            continue
+        if isinstance(flowable, Paragraph):
+            leading = flowable.style.leading
+            lines = _paragraph_lines(flowable, width)
+            while lines:
+                fit = _split_paragraph(flowable, lines, height - used - space_before)
+                if fit == lines:
+                    used += space_before + lines * leading + flowable.getSpaceAfter()
+                    break
+                if fit == 0 and not used:
+                    fit = min(lines, max(1, int(height / leading)))
+                if fit:
+                    lines -= fit
+                next_frame()
+                space_before = 0
+            continue
+        h = _height(flowable, width, height) - flowable.getSpaceBefore() + space_before
+        if used + h <= height:
+            used += h
+            continue
+        flowable._frame = _Frame(height, not used)
+        parts = flowable.split(width, height - used - space_before)
+        if len(parts) > 1:
+            used += space_before + parts[0].wrap(width, height - used - space_before)[1]
+            next_frame()
+            queue.extendleft(reversed(parts[1:]))
+        elif used:
+            next_frame()
+            queue.appendleft(flowable)
+        else:
+            used = h        # too tall, and won't split: it runs on
+            while used > height:
+                pages += 1
+                used -= height
+    return pages + (1 if used else 0)
+
+
+class Preview:
+    """Cuts a render short after pages content pages; see the module docstring."""
+
+    def __init__(self, pages=PREVIEW_PAGES):
+        self.pages = pages
+        self.appendix = []          # flowables left out of the story (the sources)
+        self.estimated_pages = None
+        self.shown_pages = None
+
+    def instrument(self, doc):
+        """Stop doc.build after the preview pages; also exposes doc.preview."""
+        handle_flowable = doc.handle_flowable
+        handle_page_end = doc.handle_pageEnd
+        story = []
+
+        def previewed_handle_flowable(flowables):
+            if not story and flowables is not doc._hanging:
+                story.append(flowables)     # the list doc.build consumes
+            return handle_flowable(flowables)
+
+        def previewed_handle_page_end():
+            if self.estimated_pages is None:
+                remaining = story[0] if story else []
+                if doc.page >= 1 + self.pages or not remaining:
+                    self._finish(doc, remaining)
+                    del remaining[:]        # the build ends with this page
+            doc.canv.doForm(NOTICE_FORM)
+            return handle_page_end()
+
+        doc.handle_flowable = previewed_handle_flowable
+        doc.handle_pageEnd = previewed_handle_page_end
+        doc.preview = self
+
+    def _finish(self, doc, remaining):
+        frame = doc.frame
+        width = frame._width - frame._leftPadding - frame._rightPadding
+        height = frame._height - frame._topPadding - frame._bottomPadding
+        self.shown_pages = doc.page
+        self.estimated_pages = doc.page + estimate_pages(list(remaining) + self.appendix, width, height)
+        self._define_notice(doc.canv, doc.pagesize[0])
+
+    def notice(self):
+        return f'Preview · first {self.shown_pages} of about {self.estimated_pages} pages'
+
+    def _define_notice(self, canv, page_width):
+        canv.setSubject(self.notice())
+        canv.beginForm(NOTICE_FORM, 0, 0, page_width, 36)
+        canv.setFont('DMSans' if 'DMSans' in canv.getAvailableFonts() else 'Helvetica', 7.5)
+        canv.setFillColor(LIGHT_GRAY)
+        canv.drawCentredString(page_width / 2, 24, self.notice())
+        canv.endForm()
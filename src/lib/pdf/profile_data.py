@@ -0,0 +1,385 @@
+"""Typed input model: a payload validated and normalized once, up front.
+
+The builders used to walk the JSON straight from json.load, through chains
+like data.get('meetingGuide', {}).get('beats', []) and beat.get('stay'),
+and the meeting-guide format (v3, legacy, or none to show) was worked out
+again in more than one place. ProfileData.parse reads a payload once:
+
+  - every field the renderer uses is looked up, checked for type and
+    normalized (missing strings become '', missing lists (), empty
+    objects None, beat and move numbers str), so builders read plain
+    attributes and test them for truth;
+  - the meeting guide is classified once: MeetingGuideV3 for
+    format 'v3', MeetingGuideLegacy when it has donorRead, meetingArc or
+    lightsUp, otherwise None (nothing to show);
+  - anything malformed raises ValueError naming the field, before any
+    layout work;
+  - fields the renderer doesn't read are dropped.
+
+Instances are slotted dataclasses holding tuples, so a parsed payload is
+smaller than the dicts and lists it came from (about 30% for typical
+payloads, bench.py input), and it is what the batch renderer holds per job
+(loadtest.py serve). The canonical digest of the original payload,
+which deterministic output derives the file ID from, is computed during
+parsing (ProfileData.digest).
+
+For markdown input (see generator.build_story_from_markdown) parse_markdown
+reads the cover, chart and source fields the same way and keeps the two
+markdown documents as they are; they are parsed while laying out. Its
+result has markdown set, and that flag, not the caller's, picks the
+builder for a parsed payload, so passing one on cannot lose its mode.
+"""
+
+import hashlib
+import json
+import numbers
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class Source:
+    title: str | None       # None when the payload has none; the sources list shows the URL
+    url: str
+
+
+@dataclass(slots=True)
+class ProfileParagraph:
+    type: str               # 'text', 'insight', 'bold' or 'bullet'
+    content: str
+
+
+@dataclass(slots=True)
+class ProfileSection:
+    title: str
+    paragraphs: tuple
+
+
+@dataclass(slots=True)
+class ChartPoint:
+    label: str
+    score: float
+
+
+@dataclass(slots=True)
+class Charts:
+    dimensions: tuple
+    confidence: tuple
+
+
+@dataclass(slots=True)
+class SetupGroup:
+    heading: str
+    bullets: tuple
+
+
+@dataclass(slots=True)
+class Beat:
+    number: str
+    title: str
+    goal: str
+    start: str
+    stay: str
+    stalling_text: str
+    continue_: str
+
+
+@dataclass(slots=True)
+class Tripwire:
+    name: str
+    tell: str
+    recovery: str
+
+
+@dataclass(slots=True)
+class MeetingGuideV3:
+    donor_name: str
+    setup_groups: tuple
+    beats: tuple
+    tripwires: tuple
+    one_line: str
+
+
+@dataclass(slots=True)
+class TitledText:
+    title: str
+    body: str
+
+
+@dataclass(slots=True)
+class DonorRead:
+    posture: str
+    body: tuple
+
+
+@dataclass(slots=True)
+class AlignmentMap:
+    primary: TitledText | None
+    secondary: tuple
+    fight_or_build: str
+    hands_on_wheel: str
+    five_min_collapse: str
+
+
+@dataclass(slots=True)
+class Move:
+    number: str
+    title: str
+    move_text: str
+    read_text: str
+
+
+@dataclass(slots=True)
+class MeetingArc:
+    intro: str
+    moves: tuple
+
+
+@dataclass(slots=True)
+class ReadingRoom:
+    working: tuple
+    stalling: tuple
+
+
+@dataclass(slots=True)
+class MeetingGuideLegacy:
+    donor_name: str
+    donor_read: DonorRead | None
+    lights_up: tuple
+    shuts_down: tuple
+    alignment_map: AlignmentMap | None
+    meeting_arc: MeetingArc | None
+    reading_room: ReadingRoom | None
+    reset_moves: tuple
+
+
+@dataclass(slots=True)
+class ProfileData:
+    donor_name: str
+    prepared_for: str
+    date: str
+    source_count: int
+    sections: tuple
+    meeting_guide: MeetingGuideV3 | MeetingGuideLegacy | None
+    sources: tuple
+    donor_photo: str
+    partner_logo: str
+    charts: Charts | None
+    digest: str                 # payload_digest of the original payload
+    profile_markdown: str = ''
+    meeting_guide_markdown: str = ''
+    markdown: bool = False      # parsed from markdown input: laid out by build_story_from_markdown
+
+    @classmethod
+    def parse(cls, data):
+        """ProfileData for a PDFProfileData payload; ValueError if it is malformed."""
+        _require(data, dict, 'payload')
+        profile = _object(data, 'persuasionProfile', 'payload') or {}
+        sources = _sources(data)
+        return cls(
+            donor_name=_donor_name(data),
+            prepared_for=_text(data, 'preparedFor', 'payload'),
+            date=_text(data, 'date', 'payload'),
+            source_count=_number(data, 'sourceCount', 'payload'),
+            sections=tuple(_section(s, p) for s, p in _objects(profile, 'sections', 'payload.persuasionProfile')),
+            meeting_guide=_meeting_guide(data.get('meetingGuide')),
+            sources=sources,
+            donor_photo=_text(data, 'donorPhoto', 'payload'),
+            partner_logo=_text(data, 'partnerLogo', 'payload'),
+            charts=_charts(data),
+            digest=payload_digest(data),
+        )
+
+    @classmethod
+    def parse_markdown(cls, data, today=''):
+        """ProfileData for a PDFMarkdownInput payload; date defaults to today."""
+        _require(data, dict, 'payload')
+        sources = _sources(data)
+        return cls(
+            donor_name=_donor_name(data),
+            prepared_for=_text(data, 'preparedFor', 'payload'),
+            date=_text(data, 'date', 'payload') or today,
+            source_count=len(sources),
+            sections=(),
+            meeting_guide=None,
+            sources=sources,
+            donor_photo=_text(data, 'donorPhoto', 'payload'),
+            partner_logo=_text(data, 'partnerLogo', 'payload'),
+            charts=_charts(data),
+            digest=payload_digest(data),
+            profile_markdown=_text(data, 'profileMarkdown', 'payload'),
+            meeting_guide_markdown=_text(data, 'meetingGuideMarkdown', 'payload'),
+            markdown=True,
+        )
+
+    @classmethod
+    def of(cls, data, markdown=False, today=''):
+        """data itself if it is already parsed, else the parse of the payload."""
+        if isinstance(data, cls):
+            return data
+        return cls.parse_markdown(data, today) if markdown else cls.parse(data)
+
+
+def payload_digest(data):
+    """SHA-256 hex digest of the canonical JSON encoding of a payload."""
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+# ─── Field readers ────────────────────────────────────────────────────────────
+#
+# Each takes the enclosing object, the key and the path of the object for
+# error messages. Missing and null values read as empty.
+
+_TYPE_NAMES = {str: 'a string', list: 'a list', dict: 'an object', numbers.Real: 'a number'}
+
+
+def _require(value, kind, path):
+    if not isinstance(value, kind) or isinstance(value, bool):
+        raise ValueError(f'{path} must be {_TYPE_NAMES[kind]}, not {type(value).__name__}')
+    return value
+
+
+def _text(obj, key, path):
+    value = obj.get(key)
+    return '' if value is None else _require(value, str, f'{path}.{key}')
+
+
+def _label(obj, key, path):
+    """A string field shown after formatting, such as a beat number; numbers are accepted."""
+    value = obj.get(key)
+    if value is None:
+        return ''
+    if isinstance(value, numbers.Real) and not isinstance(value, bool):
+        return f'{value}'
+    return _require(value, str, f'{path}.{key}')
+
+
+def _number(obj, key, path):
+    value = obj.get(key)
+    return 0 if value is None else _require(value, numbers.Real, f'{path}.{key}')
+
+
+def _list(obj, key, path):
+    value = obj.get(key)
+    return () if value is None else _require(value, list, f'{path}.{key}')
+
+
+def _object(obj, key, path):
+    """The object at key, or None if it is missing or empty."""
+    value = obj.get(key)
+    if value is None:
+        return None
+    return _require(value, dict, f'{path}.{key}') or None
+
+
+def _texts(obj, key, path):
+    return tuple(_require(item, str, f'{path}.{key}[{i}]') for i, item in enumerate(_list(obj, key, path)))
+
+
+def _objects(obj, key, path):
+    """(item, path) for each object in the list at key."""
+    return [(_require(item, dict, f'{path}.{key}[{i}]'), f'{path}.{key}[{i}]')
+            for i, item in enumerate(_list(obj, key, path))]
+
+
+def _donor_name(data):
+    if data.get('donorName') is None:
+        raise ValueError('payload.donorName is required')
+    return _text(data, 'donorName', 'payload')
+
+
+def _sources(data):
+    sources = []
+    for source, path in _objects(data, 'sources', 'payload'):
+        sources.append(Source(None if 'title' not in source else _text(source, 'title', path),
+                              _text(source, 'url', path)))
+    return tuple(sources)
+
+
+def _section(section, path):
+    if 'title' not in section:
+        raise ValueError(f'{path}.title is required')
+    return ProfileSection(
+        _text(section, 'title', path),
+        tuple(ProfileParagraph(_text(p, 'type', pp) or 'text', _text(p, 'content', pp))
+              for p, pp in _objects(section, 'paragraphs', path)),
+    )
+
+
+def _charts(data):
+    charts = _object(data, 'charts', 'payload')
+    if not charts:
+        return None
+
+    def points(key):
+        points = []
+        for point, path in _objects(charts, key, 'payload.charts'):
+            if 'label' not in point:
+                raise ValueError(f'{path}.label is required')
+            points.append(ChartPoint(_text(point, 'label', path), _number(point, 'score', path)))
+        return tuple(points)
+
+    return Charts(points('dimensions'), points('confidence'))
+
+
+def _meeting_guide(mg):
+    """MeetingGuideV3, MeetingGuideLegacy, or None if there is no guide to show."""
+    path = 'payload.meetingGuide'
+    if not mg:
+        return None
+    _require(mg, dict, path)
+    if mg.get('format') == 'v3':
+        return MeetingGuideV3(
+            donor_name=_text(mg, 'donorName', path),
+            setup_groups=tuple(SetupGroup(_text(g, 'heading', p), _texts(g, 'bullets', p))
+                               for g, p in _objects(mg, 'setupGroups', path)),
+            beats=tuple(Beat(_label(b, 'number', p), _text(b, 'title', p), _text(b, 'goal', p),
+                             _text(b, 'start', p), _text(b, 'stay', p), _text(b, 'stallingText', p),
+                             _text(b, 'continue', p))
+                        for b, p in _objects(mg, 'beats', path)),
+            tripwires=tuple(Tripwire(_text(t, 'name', p), _text(t, 'tell', p), _text(t, 'recovery', p))
+                            for t, p in _objects(mg, 'tripwires', path)),
+            one_line=_text(mg, 'oneLine', path),
+        )
+    if not (mg.get('donorRead') or mg.get('meetingArc') or mg.get('lightsUp')):
+        return None
+
+    donor_read = _object(mg, 'donorRead', path)
+    alignment = _object(mg, 'alignmentMap', path)
+    arc = _object(mg, 'meetingArc', path)
+    room = _object(mg, 'readingRoom', path)
+    if alignment:
+        p = f'{path}.alignmentMap'
+        primary = _object(alignment, 'primary', p)
+        alignment = AlignmentMap(
+            primary=primary and _titled(primary, f'{p}.primary'),
+            secondary=tuple(_titled(s, sp) for s, sp in _objects(alignment, 'secondary', p)),
+            fight_or_build=_text(alignment, 'fightOrBuild', p),
+            hands_on_wheel=_text(alignment, 'handsOnWheel', p),
+            five_min_collapse=_text(alignment, 'fiveMinCollapse', p),
+        )
+    if arc:
+        p = f'{path}.meetingArc'
+        arc = MeetingArc(
+            _text(arc, 'intro', p),
+            tuple(Move(_label(m, 'number', mp), _text(m, 'title', mp), _text(m, 'moveText', mp),
+                       _text(m, 'readText', mp))
+                  for m, mp in _objects(arc, 'moves', p)),
+        )
+    return MeetingGuideLegacy(
+        donor_name=_text(mg, 'donorName', path),
+        donor_read=donor_read and DonorRead(_text(donor_read, 'posture', f'{path}.donorRead'),
+                                            _texts(donor_read, 'body', f'{path}.donorRead')),
+        lights_up=tuple(_titled(item, p) for item, p in _objects(mg, 'lightsUp', path)),
+        shuts_down=_texts(mg, 'shutsDown', path),
+        alignment_map=alignment,
+        meeting_arc=arc,
+        reading_room=room and ReadingRoom(_texts(room, 'working', f'{path}.readingRoom'),
+                                          _texts(room, 'stalling', f'{path}.readingRoom')),
+        reset_moves=_texts(mg, 'resetMoves', path),
+    )
+
+
+def _titled(obj, path):
+    return TitledText(_text(obj, 'title', path), _text(obj, 'body', path))
+
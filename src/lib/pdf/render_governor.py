@@ -0,0 +1,161 @@
+"""Per-job wall-time and memory budgets for a render.
+
+The route kills the generator after 30 s, which leaves the user with a 500
+and no PDF. A RenderGovernor lets the renderer notice trouble before that:
+
+  - Builders and the document's flowable loop call checkpoint() at safe
+    points. Past the hard budget it raises RenderBudgetExceeded, so the
+    caller gets a clean error instead of a killed process.
+  - Past the soft threshold (a fraction of either budget), degraded(name)
+    starts returning True and the renderer switches to cheaper layouts:
+    flat colours instead of gradients and glows, a shorter sources list.
+    Each fallback taken is recorded in .fallbacks, in order.
+
+Degradation is sticky: once a render crosses the soft threshold it stays
+degraded, so later pages do not flip back to the full design.
+
+Memory is the growth of the process RSS since start(). With several renders
+on threads in one process that figure is shared between them; give each
+job its own process when the memory budget must be exact.
+"""
+
+import os
+import resource
+import sys
+import time
+
+from reportlab.platypus import Flowable
+
+
+SOFT_THRESHOLD = 0.6            # fraction of a budget at which fallbacks start
+MEMORY_SAMPLE_INTERVAL = 0.01   # read RSS at most every 10ms
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def _rss_bytes():
+    """Current resident set size (peak RSS where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class RenderBudgetExceeded(Exception):
+    """Raised at a checkpoint once a render has used up a budget."""
+
+
+class BudgetCutoff(Flowable):
+    """Story marker: under budget pressure, replace the next `skip` flowables.
+
+    Zero-size and never drawn; RenderGovernor.instrument() consumes it. Lets
+    a builder lay out the full content normally but decide at layout time,
+    when the real cost is known, to swap a tail for something cheaper.
+    """
+
+    def __init__(self, fallback, skip, replacement):
+        super().__init__()
+        self.fallback = fallback
+        self.skip = skip
+        self.replacement = replacement
+
+    def wrap(self, aW, aH):
+        return (0, 0)
+
+    def draw(self):
+        pass
+
+
+class RenderGovernor:
+    """Tracks one render against its time and memory budgets."""
+
+    def __init__(self, time_budget=None, memory_budget=None, soft_threshold=SOFT_THRESHOLD):
+        """time_budget in seconds, memory_budget in bytes; None disables either."""
+        self.time_budget = time_budget
+        self.memory_budget = memory_budget
+        self.soft_threshold = soft_threshold
+        self.fallbacks = []
+        self._degraded = False
+        self._t0 = None
+        self._rss0 = 0
+        self._rss = 0
+        self._rss_at = 0.0
+
+    def start(self):
+        self._t0 = time.perf_counter()
+        if self.memory_budget:
+            self._rss0 = self._rss = _rss_bytes()
+            self._rss_at = self._t0
+        return self
+
+    # ─── Measurements ─────────────────────────────────────────────────────────
+
+    def elapsed(self):
+        return time.perf_counter() - self._t0 if self._t0 is not None else 0.0
+
+    def memory_used(self):
+        if not self.memory_budget:
+            return 0
+        now = time.perf_counter()
+        if now - self._rss_at >= MEMORY_SAMPLE_INTERVAL:
+            self._rss = _rss_bytes()
+            self._rss_at = now
+        return max(0, self._rss - self._rss0)
+
+    def pressure(self):
+        """Largest fraction of any budget used so far (0.0 when unlimited)."""
+        if self._t0 is None:
+            self.start()
+        used = 0.0
+        if self.time_budget:
+            used = self.elapsed() / self.time_budget
+        if self.memory_budget:
+            used = max(used, self.memory_used() / self.memory_budget)
+        return used
+
+    # ─── Safe points ──────────────────────────────────────────────────────────
+
+    def checkpoint(self, where=''):
+        """Raise RenderBudgetExceeded if a budget has run out."""
+        if self.pressure() >= 1.0:
+            raise RenderBudgetExceeded(
+                f'render budget exceeded{" in " + where if where else ""}: '
+                f'{self.elapsed():.1f}s elapsed, {self.memory_used() / 2**20:.0f} MiB used'
+                f' (fallbacks: {", ".join(self.fallbacks) or "none"})'
+            )
+
+    def degraded(self, fallback):
+        """True if the cheaper alternative named `fallback` should be used.
+
+        Records the fallback the first time it is taken.
+        """
+        if not self._degraded and self.pressure() >= self.soft_threshold:
+            self._degraded = True
+        if self._degraded and fallback not in self.fallbacks:
+            self.fallbacks.append(fallback)
+        return self._degraded
+
+    def instrument(self, doc):
+        """Check the budget before every flowable and honour BudgetCutoff markers.
+
+        Also exposes the governor as doc.governor for the onPage callbacks.
+        """
+        handle_flowable = doc.handle_flowable
+
+        def governed_handle_flowable(flowables):
+            self.checkpoint(f'page {doc.page}')
+            if flowables and isinstance(flowables[0], BudgetCutoff):
+                cutoff = flowables.pop(0)
+                if self.degraded(cutoff.fallback):
+                    flowables[:cutoff.skip] = cutoff.replacement
+                return None
+            return handle_flowable(flowables)
+
+        doc.handle_flowable = governed_handle_flowable
+        doc.governor = self
+
+    def summary(self):
+        return (f'{self.elapsed() * 1000:.0f} ms, {self.memory_used() / 2**20:.0f} MiB, '
+                f'fallbacks: {", ".join(self.fallbacks) or "none"}')
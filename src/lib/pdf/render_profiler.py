@@ -0,0 +1,159 @@
+"""Opt-in deep profiling for a single PDF render.
+
+Enabled with ``generator.py --profile``. Captures, next to the output PDF:
+
+  <output>.prof            cProfile stats (load with pstats / snakeviz)
+  <output>.collapsed       sampled stacks in collapsed format (flamegraph.pl, speedscope)
+  <output>.profile.txt     short summary: top hotspots, memory peaks by flowable
+                           type, time spent in each onPage callback
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+
+
+SAMPLE_INTERVAL = 0.001  # 1ms stack sampling
+TOP_N = 15
+
+
+class RenderProfiler:
+    """Collects CPU, stack, memory and page-callback data for one render."""
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self._cprofile = cProfile.Profile()
+        self._stacks = Counter()
+        self._sampling = False
+        self._sampler = None
+        self._target_ident = None
+        self._flowable_peaks = defaultdict(int)
+        self._flowable_counts = Counter()
+        self._onpage_times = defaultdict(float)
+        self._onpage_calls = Counter()
+        self._wall = 0.0
+        self._peak = 0
+        self._t0 = 0.0
+
+    # ─── Lifecycle ────────────────────────────────────────────────────────────
+
+    def start(self):
+        tracemalloc.start()
+        self._target_ident = threading.get_ident()
+        self._sampling = True
+        self._sampler = threading.Thread(target=self._sample_loop, name='pdf-profile-sampler', daemon=True)
+        self._sampler.start()
+        self._t0 = time.perf_counter()
+        self._cprofile.enable()
+
+    def stop(self):
+        self._cprofile.disable()
+        self._wall = time.perf_counter() - self._t0
+        self._sampling = False
+        if self._sampler:
+            self._sampler.join()
+        self._note_peak()
+        tracemalloc.stop()
+
+    def _note_peak(self):
+        # The peak is reset before each flowable, so the render's peak is
+        # the largest of the peaks read since start.
+        _, peak = tracemalloc.get_traced_memory()
+        self._peak = max(self._peak, peak)
+
+    # ─── Instrumentation ──────────────────────────────────────────────────────
+
+    def instrument(self, doc):
+        """Wrap the document's flowable handling and page callbacks."""
+        handle_flowable = doc.handle_flowable
+
+        def profiled_handle_flowable(flowables):
+            kind = type(flowables[0]).__name__ if flowables else 'None'
+            self._note_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            try:
+                return handle_flowable(flowables)
+            finally:
+                _, peak = tracemalloc.get_traced_memory()
+                self._peak = max(self._peak, peak)
+                self._flowable_peaks[kind] = max(self._flowable_peaks[kind], peak - before)
+                self._flowable_counts[kind] += 1
+
+        doc.handle_flowable = profiled_handle_flowable
+
+        for template in doc.pageTemplates:
+            template.onPage = self._timed_callback(template.id, template.onPage)
+
+    def _timed_callback(self, template_id, callback):
+        name = f'{template_id}:{getattr(callback, "__name__", "onPage")}'
+
+        def timed(canvas, doc):
+            t = time.perf_counter()
+            try:
+                return callback(canvas, doc)
+            finally:
+                self._onpage_times[name] += time.perf_counter() - t
+                self._onpage_calls[name] += 1
+
+        return timed
+
+    def _sample_loop(self):
+        while self._sampling:
+            frame = sys._current_frames().get(self._target_ident)
+            if frame is not None:
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                    frame = frame.f_back
+                self._stacks[';'.join(reversed(stack))] += 1
+            time.sleep(SAMPLE_INTERVAL)
+
+    # ─── Output ───────────────────────────────────────────────────────────────
+
+    def write_report(self):
+        """Write stats files next to the PDF and print the summary."""
+        self._cprofile.dump_stats(self.output_path + '.prof')
+
+        with open(self.output_path + '.collapsed', 'w') as f:
+            for stack, count in self._stacks.most_common():
+                f.write(f'{stack} {count}\n')
+
+        summary = self.summary()
+        with open(self.output_path + '.profile.txt', 'w') as f:
+            f.write(summary)
+
+        print(summary, end='')
+        print(f'[PDF] Profile written next to {self.output_path} (.prof, .collapsed, .profile.txt)')
+
+    def summary(self):
+        out = io.StringIO()
+        out.write(f'Render profile: {self.output_path}\n')
+        out.write(f'  wall time      {self._wall * 1000:.1f} ms (includes profiling overhead)\n')
+        out.write(f'  traced peak    {self._peak / 1024:.0f} KiB\n')
+        out.write(f'  stack samples  {sum(self._stacks.values())}\n\n')
+
+        out.write(f'Top {TOP_N} hotspots by own time:\n')
+        stats = pstats.Stats(self._cprofile, stream=io.StringIO())
+        rows = sorted(stats.stats.items(), key=lambda kv: kv[1][2], reverse=True)[:TOP_N]
+        for (filename, line, func), (_, ncalls, tottime, cumtime, _) in rows:
+            out.write(f'  {tottime * 1000:8.1f} ms own  {cumtime * 1000:8.1f} ms cum  '
+                      f'{ncalls:>8} calls  {func} ({os.path.basename(filename)}:{line})\n')
+
+        out.write('\nPeak allocation while handling each flowable type:\n')
+        for kind, peak in sorted(self._flowable_peaks.items(), key=lambda kv: kv[1], reverse=True):
+            out.write(f'  {peak / 1024:8.1f} KiB  x{self._flowable_counts[kind]:<5} {kind}\n')
+
+        out.write('\nonPage callbacks:\n')
+        for name, total in sorted(self._onpage_times.items(), key=lambda kv: kv[1], reverse=True):
+            calls = self._onpage_calls[name]
+            out.write(f'  {total * 1000:8.1f} ms total  {total * 1000 / calls:6.2f} ms/page  x{calls:<4} {name}\n')
+
+        return out.getvalue()
@@ -0,0 +1,116 @@
+"""Per-recipient stamping of a finished render.
+
+A profile sent to several fundraisers differs only in the "Prepared for"
+line and the confidentiality watermark, so the document is laid out once
+with an empty slot where that line goes, and each copy is made by
+overlaying a small recipient-specific PDF on it:
+
+  - the overlay has two pages, one for the cover (name in the slot plus a
+    watermark in cover colours) and one for every other page (watermark
+    only), and is rendered with a plain canvas in a few milliseconds;
+  - each overlay page becomes a Form XObject, and every base page is
+    rewritten to draw its original content wrapped in q/Q and then the
+    form;
+  - the changed page objects, the two wrapper streams and the forms with
+    their fonts are appended to the base file as an incremental update
+    (see cover_patch.incremental_update), so the base bytes are shared by
+    every copy and never re-encoded.
+
+The base file is parsed once per batch (Stamper); each copy only parses its
+own overlay.
+"""
+
+from pdf_objects import PdfFile, Ref, Name, serialize
+from cover_patch import incremental_update
+
+
+STAMP_NAME = Name('ProspectAIStamp')
+
+_WRAP_OPEN = b'q\n'
+_WRAP_CLOSE = b'Q\n/' + STAMP_NAME.encode('latin-1') + b' Do\n'
+
+
+def _stream_object(num, value, data, mapping=None):
+    value = dict(value)
+    value[Name('Length')] = len(data)
+    return b'%d 0 obj\n%s\nstream\n%s\nendstream\nendobj\n' % (num, serialize(value, mapping), data)
+
+
+class Stamper:
+    """A base PDF, parsed once, that overlays are stamped onto."""
+
+    def __init__(self, base):
+        self.base = base
+        self.pdf = PdfFile(base)
+        self.pages, _ = self.pdf.page_tree()
+
+    def _resources(self, page):
+        """The page's /Resources as a dict that can take one more /XObject entry."""
+        resources = dict(self.pdf.get(page.get('Resources')) or {})
+        xobjects = resources.get('XObject')
+        resources[Name('XObject')] = dict(self.pdf.get(xobjects) or {})
+        return resources
+
+    def stamp(self, overlay, file_id=None):
+        """Bytes of the base PDF with overlay drawn over it.
+
+        overlay: a PDF whose first page is drawn over the cover and whose
+        second page (or first, if it has one) over every other page.
+        file_id: 16 bytes for the second /ID element of the copy.
+        """
+        old = self.pdf
+        new = PdfFile(overlay)
+        overlay_pages, overlay_nodes = new.page_tree()
+
+        size = old.trailer['Size']
+        changed = {}
+        mapping = {}
+        next_num = size
+
+        def allocate():
+            nonlocal next_num
+            next_num += 1
+            return next_num - 1
+
+        # Everything the overlay pages use (content, fonts, graphics states)
+        closure = set()
+        for page in overlay_pages[:2]:
+            closure |= new.closure(page, exclude=set(overlay_nodes)) - {page}
+        contents = {new.objects[page].value['Contents'].num for page in overlay_pages[:2]}
+        for num in sorted(closure - contents):
+            mapping[num] = allocate()
+        for num in sorted(closure - contents):
+            changed[mapping[num]] = new.objects[num].to_bytes(mapping[num], mapping)
+
+        # One Form XObject per overlay page, holding that page's content
+        forms = []
+        for page in overlay_pages[:2]:
+            value = new.objects[page].value
+            content = new.objects[value['Contents'].num]
+            form = {
+                Name('Type'): Name('XObject'),
+                Name('Subtype'): Name('Form'),
+                Name('BBox'): value['MediaBox'],
+                Name('Resources'): value['Resources'],
+            }
+            if 'Filter' in content.value:
+                form[Name('Filter')] = content.value['Filter']
+            num = allocate()
+            changed[num] = _stream_object(num, form, content.stream_data(), mapping)
+            forms.append(num)
+
+        wrap_open, wrap_close = allocate(), allocate()
+        changed[wrap_open] = _stream_object(wrap_open, {}, _WRAP_OPEN)
+        changed[wrap_close] = _stream_object(wrap_close, {}, _WRAP_CLOSE)
+
+        for i, num in enumerate(self.pages):
+            page = dict(old.objects[num].value)
+            original = page['Contents']
+            page[Name('Contents')] = [Ref(wrap_open, 0)] + (
+                original if isinstance(original, list) else [original]) + [Ref(wrap_close, 0)]
+            resources = self._resources(page)
+            resources['XObject'][STAMP_NAME] = Ref(forms[0 if i == 0 else -1], 0)
+            page[Name('Resources')] = resources
+            changed[num] = b'%d 0 obj\n%s\nendobj\n' % (num, serialize(page))
+
+        return self.base + incremental_update(self.base, old, changed, file_id)
@@ -0,0 +1,170 @@
+"""A Canvas that leaves out state operators which would change nothing.
+
+The page callbacks and custom flowables set fill and stroke colour, line
+width and font before everything they draw, mostly to values that are
+already in effect, and ReportLab writes an operator for every call. Over a
+long profile that is thousands of redundant "rg", "RG", "w" and
+"BT .. Tf .. TL ET" operators in the content streams, all of which are
+joined, compressed and written.
+
+StateCanvas remembers the last operator it wrote for each of those four
+states and drops a new one that is textually identical. What it remembers
+follows the PDF graphics state:
+
+  - saveState/restoreState (q/Q) push and pop it;
+  - a new page, a form and the page preamble start from nothing known;
+  - a text object that set its own colour or font (Paragraph lines,
+    drawString with fallback fonts) makes that state unknown again, since
+    its operators stay in effect after ET.
+
+TrueType fonts are selected inside each text object rather than by
+setFont: ReportLab writes "/F2+0 8 Tf 9.6 TL" at the start of every text
+object, because it does not know which subset is in effect. The canvas
+records the subset the last text object left selected and starts the next
+text object with it when the font, size and leading match, so a run of
+drawString calls in one font selects it once.
+
+Only the colour operator itself is dropped; alpha still goes through
+ReportLab's ExtGState handling, which already skips repeats. Everything
+else about the canvas (its Python-side state, metrics, forms) is unchanged,
+so the page looks the same; only the content streams are shorter.
+"""
+
+from reportlab.pdfbase.pdfmetrics import getFont
+from reportlab.pdfgen.canvas import Canvas
+
+import flate
+
+
+_STATES = ('fill', 'stroke', 'width', 'font')
+
+
+class StateCanvas(Canvas):
+    """Canvas that skips fill/stroke colour, line width and font operators
+    that repeat the one already in effect."""
+
+    track = True      # False writes every operator, as Canvas does (benchmarks)
+    compress_level = None   # Flate level for save(); None uses flate.LEVEL
+    parallel_flate = True   # False deflates serially, as Canvas does (benchmarks)
+
+    def __init__(self, *args, **kwargs):
+        self._written = dict.fromkeys(_STATES)
+        self._written_stack = []
+        self.skipped = 0
+        super().__init__(*args, **kwargs)
+
+    def _forget(self):
+        self._written = dict.fromkeys(_STATES)
+
+    def _dedupe(self, state, start):
+        """Drop the operator appended at start if it repeats the last one written."""
+        code = self._code
+        if len(code) <= start:
+            return
+        op = code[start]
+        if self.track and op == self._written[state]:
+            del code[start]
+            self.skipped += 1
+        else:
+            self._written[state] = op
+
+    # ── tracked operators ──
+
+    def setFillColor(self, aColor, alpha=None):
+        start = len(self._code)
+        super().setFillColor(aColor, alpha)
+        self._dedupe('fill', start)
+
+    def setStrokeColor(self, aColor, alpha=None):
+        start = len(self._code)
+        super().setStrokeColor(aColor, alpha)
+        self._dedupe('stroke', start)
+
+    def setFillGray(self, gray, alpha=None):
+        start = len(self._code)
+        super().setFillGray(gray, alpha)
+        self._dedupe('fill', start)
+
+    def setStrokeGray(self, gray, alpha=None):
+        start = len(self._code)
+        super().setStrokeGray(gray, alpha)
+        self._dedupe('stroke', start)
+
+    def setLineWidth(self, width):
+        start = len(self._code)
+        super().setLineWidth(width)
+        self._dedupe('width', start)
+
+    def setFont(self, psfontname, size, leading=None):
+        start = len(self._code)
+        super().setFont(psfontname, size, leading)
+        self._dedupe('font', start)
+
+    # ── graphics state bookkeeping ──
+
+    def saveState(self):
+        super().saveState()
+        self._written_stack.append(self._written.copy())
+
+    def restoreState(self):
+        super().restoreState()
+        self._written = self._written_stack.pop()
+
+    def beginText(self, x=0, y=0, direction=None):
+        text = super().beginText(x, y, direction)
+        font = self._written['font']
+        if self.track and isinstance(font, tuple) and \
+                font[:3] == (text._fontname, text._fontsize, text._leading):
+            text._curSubset = font[3]   # that subset is already selected
+        return text
+
+    def drawText(self, aTextObject):
+        super().drawText(aTextObject)
+        state = aTextObject.__dict__
+        if '_fillColorObj' in state:
+            self._written['fill'] = None
+        if '_strokeColorObj' in state:
+            self._written['stroke'] = None
+        font = (state['_fontname'], state['_fontsize'], state['_leading'])
+        if getFont(font[0])._dynamicFont and state['_curSubset'] >= 0:
+            self._written['font'] = font + (state['_curSubset'],)
+        elif font != (self._fontname, self._fontsize, self._leading):
+            self._written['font'] = None
+
+    def _make_preamble(self):
+        super()._make_preamble()
+        self._forget()
+
+    def _startPage(self):
+        super()._startPage()
+        self._forget()
+        self._written_stack = []
+
+    def beginForm(self, *args, **kwargs):
+        self._written_stack.append(self._written)
+        self._forget()
+        super().beginForm(*args, **kwargs)
+
+    def endForm(self, *args, **kwargs):
+        super().endForm(*args, **kwargs)
+        self._written = self._written_stack.pop()
+
+    # ── output ──
+
+    def save(self):
+        """Write the document, deflating its streams in parallel (see flate)."""
+        doc = self._doc
+        format_serial = doc.format
+
+        def format_parallel():
+            flate.precompress(doc, self.compress_level, self.parallel_flate)
+            try:
+                return format_serial()
+            finally:
+                flate.release()
+
+        doc.format = format_parallel
+        try:
+            super().save()
+        finally:
+            del doc.format
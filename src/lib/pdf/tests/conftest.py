@@ -0,0 +1,40 @@
+"""Shared fixtures for the PDF generator tests.
+
+Run from src/lib/pdf:  python3 -m pytest tests
+
+Payloads come from the synthetic corpus in bench.py, so tests and
+benchmarks exercise the same shapes. Tests that read text back out of a
+PDF use PyMuPDF when it is installed and are skipped otherwise; it is not
+needed to render.
+"""
+
+import os
+import re
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bench  # noqa: E402
+
+
+@pytest.fixture
+def payload():
+    return bench.synthetic_payload()
+
+
+@pytest.fixture
+def legacy_payload():
+    return bench.synthetic_payload(legacy=True)
+
+
+def page_count(pdf):
+    return len(re.findall(rb'/Type /Page[^s]', pdf))
+
+
+def pdf_pages_text(pdf):
+    """Text of each page of pdf, via PyMuPDF (the test is skipped without it)."""
+    pymupdf = pytest.importorskip('pymupdf')
+    with pymupdf.open(stream=pdf, filetype='pdf') as doc:
+        return [page.get_text() for page in doc]
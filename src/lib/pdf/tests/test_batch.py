@@ -0,0 +1,131 @@
+import hashlib
+import os
+
+import pytest
+
+import batch
+import bench
+import generator
+from linearize import check_linearization
+
+
+def _workdir(tmp_path, lease=batch.LEASE_SECONDS, jobs=('a', 'b')):
+    workdir = batch.WorkDir(str(tmp_path), lease)
+    for job_id in jobs:
+        assert workdir.submit(job_id, bench.synthetic_payload(sections=1, beats=1, sources=1))
+    return workdir
+
+
+def _files(workdir, state):
+    return sorted(os.listdir(workdir.path(state)))
+
+
+def test_render_and_index(tmp_path):
+    workdir = _workdir(tmp_path)
+    assert not workdir.submit('a', {'donorName': 'A'})
+    with pytest.raises(ValueError):
+        workdir.submit('c', {})
+    assert batch.work(workdir, 'n1', log=lambda message: None) == 2
+    index = batch.coordinate(workdir, log=lambda message: None)
+    assert sorted(index) == ['a', 'b'] and {r['status'] for r in index.values()} == {'ok'}
+    pdf = generator.render_to_bytes(bench.synthetic_payload(sections=1, beats=1, sources=1), deterministic=True)
+    digest = hashlib.sha256(pdf).hexdigest()
+    assert index['a']['sha256'] == digest
+    assert _files(workdir, 'out') == [f'{digest}.pdf']    # identical payloads share one output
+    assert _files(workdir, 'tmp') == _files(workdir, 'pending') == _files(workdir, 'claimed') == []
+
+
+def test_expired_claim_requeued_in_one_rename(tmp_path, monkeypatch):
+    workdir = _workdir(tmp_path, lease=0, jobs=['a'])
+    job, claimed = workdir.claim('n1')
+    assert os.path.basename(claimed) == 'a.0.n1.json' and job['attempts'] == 0
+    renames = []
+    real_rename = os.rename
+    monkeypatch.setattr(os, 'rename', lambda src, dst: renames.append(dst) or real_rename(src, dst))
+    assert workdir.reclaim() == ['a']
+    assert renames == [workdir.path('pending', 'a.1.json')]
+    assert _files(workdir, 'tmp') == _files(workdir, 'claimed') == []
+    job, claimed = workdir.claim('n2')
+    assert job['attempts'] == 1 and os.path.basename(claimed) == 'a.1.n2.json'
+    workdir.release(job, claimed)
+    assert _files(workdir, 'pending') == ['a.1.json']
+
+
+def test_given_up_after_max_attempts(tmp_path):
+    workdir = _workdir(tmp_path, lease=0, jobs=['a'])
+    for _ in range(batch.MAX_ATTEMPTS):
+        assert workdir.claim('n1')
+        assert workdir.reclaim() == ['a']
+    assert _files(workdir, 'pending') == _files(workdir, 'claimed') == []
+    record = workdir.write_index()['a']
+    assert (record['status'], record['attempts']) == ('expired', batch.MAX_ATTEMPTS)
+
+
+def test_node_dying_while_giving_up(tmp_path, monkeypatch):
+    workdir = _workdir(tmp_path, lease=0, jobs=['a'])
+    for _ in range(batch.MAX_ATTEMPTS - 1):
+        workdir.claim('n1')
+        workdir.reclaim()
+    workdir.claim('n1')
+
+    def crash(*args, **kwargs):
+        raise SystemExit
+    monkeypatch.setattr(batch.WorkDir, 'fail', crash)
+    with pytest.raises(SystemExit):
+        workdir.reclaim()
+    assert _files(workdir, 'claimed') == [f'a.{batch.MAX_ATTEMPTS}.reclaim.json']
+    monkeypatch.undo()
+    # the next reclaim finds the job again and finishes giving up on it
+    assert workdir.reclaim() == ['a']
+    assert workdir.write_index()['a']['status'] == 'expired'
+
+
+def test_lost_lease_records_no_failure(tmp_path, monkeypatch):
+    workdir = _workdir(tmp_path, lease=0, jobs=['a'])
+    logged = []
+    render_job = batch.render_job
+
+    def taken_away_then_fail(job, *args):
+        if job['attempts'] == 0:
+            workdir.reclaim()       # another node requeues the claim while this one renders
+            raise RuntimeError('render failed')
+        return render_job(job, *args)
+    monkeypatch.setattr(batch, 'render_job', taken_away_then_fail)
+    assert batch.work(workdir, 'n1', log=logged.append) == 1
+    assert _files(workdir, 'failed') == []
+    assert workdir.write_index()['a']['status'] == 'ok'
+    assert 'not recorded' in logged[0]
+
+
+def test_error_recorded(tmp_path, monkeypatch):
+    workdir = _workdir(tmp_path, jobs=['a'])
+    monkeypatch.setattr(batch, 'render_job', lambda job, *args: 1 / 0)
+    assert batch.work(workdir, 'n1', log=lambda message: None) == 0
+    record = workdir.write_index()['a']
+    assert (record['status'], record['node']) == ('error', 'n1')
+    assert record['error'].startswith('ZeroDivisionError')
+
+
+def test_markdown_job(tmp_path, payload):
+    md = bench.synthetic_markdown(payload)
+    workdir = batch.WorkDir(str(tmp_path))
+    assert workdir.submit('md', md, markdown=True)
+    batch.work(workdir, 'n1', log=lambda message: None)
+    record = workdir.write_index()['md']
+    with open(workdir.path(record['output']), 'rb') as f:
+        assert f.read() == generator.render_to_bytes(md, markdown=True, deterministic=True)
+
+
+def test_linearized_job(tmp_path, payload):
+    workdir = batch.WorkDir(str(tmp_path))
+    assert workdir.submit('plain', payload)
+    assert workdir.submit('fast', payload, linearize=True)
+    batch.work(workdir, 'n1', log=lambda message: None)
+    index = workdir.write_index()
+    outputs = {}
+    for job_id in index:
+        with open(workdir.path(index[job_id]['output']), 'rb') as f:
+            outputs[job_id] = f.read()
+    assert outputs['fast'] == generator.render_to_bytes(payload, deterministic=True, linearize=True)
+    assert check_linearization(outputs['fast']) == []
+    assert check_linearization(outputs['plain']) != []
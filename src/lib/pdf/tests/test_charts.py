@@ -0,0 +1,35 @@
+import bench
+import generator
+from conftest import pdf_pages_text
+
+
+def _text(data):
+    return '\n'.join(pdf_pages_text(generator.render_to_bytes(data)))
+
+
+def test_radar_and_bars(payload):
+    payload['charts'] = bench.synthetic_charts()
+    pdf = generator.render_to_bytes(payload)
+    text = '\n'.join(pdf_pages_text(pdf))
+    assert 'Evidence Base' in text
+    assert 'Evidence confidence by behavioral dimension' in text
+    assert 'Structural confidence floor by section' in text
+    for point in payload['charts']['dimensions'][:3] + payload['charts']['confidence'][:3]:
+        assert point['label'] in text
+    # the radar grid and bar track are forms placed with Do, not redrawn
+    assert pdf.count(b'/Subtype /Form') >= 2
+
+
+def test_bars_only_under_three_dimensions(payload):
+    charts = bench.synthetic_charts()
+    payload['charts'] = dict(charts, dimensions=charts['dimensions'][:2])
+    text = _text(payload)
+    assert 'Evidence Base' in text
+    assert 'by behavioral dimension' not in text
+    assert 'Structural confidence floor by section' in text
+
+
+def test_no_charts(payload):
+    assert 'Evidence Base' not in _text(payload)
+    payload['charts'] = {'dimensions': [], 'confidence': []}
+    assert 'Evidence Base' not in _text(payload)
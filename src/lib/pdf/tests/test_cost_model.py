@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+import batch
+import bench
+import cost_model
+import generator
+from conftest import page_count
+from cost_model import CostModel, PredictedOverBudget
+
+
+def _records():
+    """Records linear in the features: ms = 10 + sections, peakMiB = 2 + sources / 10."""
+    records = []
+    for sections, sources in [(1, 0), (5, 20), (10, 5), (20, 50), (30, 10), (2, 40)]:
+        feats = dict.fromkeys(cost_model.FEATURES, 0)
+        feats.update(sections=sections, paragraphs=3 * sections, sources=sources)
+        records.append({'features': feats, 'ms': 10 + sections, 'peakMiB': 2 + sources / 10})
+    return records
+
+
+def test_fit_recovers_linear_costs():
+    model = CostModel.fit(_records())
+    feats = dict.fromkeys(cost_model.FEATURES, 0)
+    feats.update(sections=15, paragraphs=45, sources=30)
+    estimate = model.predict_features(feats)
+    assert estimate.ms == pytest.approx(25, rel=0.01) and estimate.peak_mib == pytest.approx(5, rel=0.01)
+    # floored at the cheapest record
+    assert model.predict_features(dict.fromkeys(cost_model.FEATURES, 0)).ms == 11
+
+
+def test_time_only_records():
+    records = [{k: v for k, v in r.items() if k != 'peakMiB'} for r in _records()]
+    assert CostModel.fit(records).predict_features(records[0]['features']).peak_mib is None
+    with pytest.raises(ValueError):
+        CostModel.fit(records[:1])
+
+
+def test_save_load(tmp_path):
+    model = CostModel.fit(_records())
+    model.save(tmp_path / 'model.json')
+    loaded = CostModel.load(tmp_path / 'model.json')
+    assert loaded.to_dict() == json.loads(json.dumps(model.to_dict()))
+    assert loaded.predict_features(_records()[3]['features']) == model.predict_features(_records()[3]['features'])
+
+
+def test_check_budgets(payload):
+    model = CostModel.fit(_records())
+    estimate = model.predict(payload)
+    assert model.check(payload) == estimate
+    assert model.check(payload, estimate.ms / 1000 * 2, estimate.peak_mib * 2**20 * 2) == estimate
+    with pytest.raises(PredictedOverBudget, match='s budget'):
+        model.check(payload, time_budget=estimate.ms / 1000 / 2)
+    with pytest.raises(PredictedOverBudget, match='MiB heap budget'):
+        model.check(payload, heap_budget=estimate.peak_mib * 2**20 / 2)
+
+
+def test_load_records_from_index(tmp_path):
+    workdir = batch.WorkDir(str(tmp_path))
+    for i in range(3):
+        workdir.submit(f'j{i}', bench.synthetic_payload(sections=1 + i, beats=1, sources=1))
+    batch.work(workdir, 'n1', log=lambda message: None)
+    index = batch.coordinate(workdir, log=lambda message: None)
+    records = cost_model.load_records(workdir.path('index.json'))
+    assert len(records) == len(index) == 3
+    assert [r['features']['sections'] for r in sorted(records, key=lambda r: r['id'])] == [1, 2, 3]
+    assert CostModel.fit(records).predict_features(records[0]['features']).peak_mib is None
+
+
+def test_heap_budget_is_not_the_memory_budget(tmp_path):
+    """The governor's RSS budget does not refuse jobs by predicted heap; the heap budget does."""
+    fitted = CostModel.fit(_records())
+    model = CostModel(fitted.time_fit, (1024.0, {}), fitted.floor)     # every job: 1 GiB peak heap
+    workdir = batch.WorkDir(str(tmp_path))
+    data = bench.synthetic_payload(sections=1, beats=1, sources=1)
+    workdir.submit('a', data)
+    assert batch.work(workdir, 'n1', memory_budget=512 * 2**20, model=model, log=lambda message: None) == 1
+    workdir.submit('b', data)
+    assert batch.work(workdir, 'n1', model=model, heap_budget=512 * 2**20, log=lambda message: None) == 0
+    record = workdir.write_index()['b']
+    assert record['status'] == 'predicted' and 'heap budget' in record['error']
+
+
+def test_shortest_first():
+    model = CostModel.fit(_records())
+    jobs = [bench.synthetic_payload(sections=n, beats=1, sources=1) for n in (8, 2, 5)]
+    ordered = cost_model.shortest_first(jobs, model)
+    assert [len(job['persuasionProfile']['sections']) for job in ordered] == [2, 5, 8]
+
+
+def test_markdown_record_renders_markdown(payload, monkeypatch):
+    md = bench.synthetic_markdown(payload)
+    render_to_bytes = generator.render_to_bytes
+    rendered = []
+    monkeypatch.setattr(generator, 'render_to_bytes',
+                        lambda *args, **kwargs: rendered.append(render_to_bytes(*args, **kwargs)) or rendered[-1])
+    record = cost_model.record(md, markdown=True, runs=1)
+    assert record['features']['markdown'] == 1
+    expected = page_count(render_to_bytes(md, markdown=True))
+    assert [page_count(pdf) for pdf in rendered] == [expected] * 3
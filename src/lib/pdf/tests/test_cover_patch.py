@@ -0,0 +1,56 @@
+import pytest
+
+import bench
+import generator
+from conftest import page_count, pdf_pages_text
+
+
+def test_patch_appends_an_update(payload, tmp_path):
+    path = tmp_path / 'report.pdf'
+    original = generator.render_to_bytes(payload, deterministic=True)
+    path.write_bytes(original)
+
+    changed = dict(payload, donorName='Ada Lovelace', preparedFor='Someone Else')
+    appended = generator.patch_cover(changed, str(path), deterministic=True)
+    patched = path.read_bytes()
+
+    assert patched[:len(original)] == original
+    assert len(patched) == len(original) + appended
+    assert patched.count(b'%%EOF') == original.count(b'%%EOF') + 1
+
+
+def test_patch_changes_only_the_cover(payload, tmp_path):
+    path = tmp_path / 'report.pdf'
+    original = generator.render_to_bytes(payload)
+    path.write_bytes(original)
+    output = tmp_path / 'patched.pdf'
+    generator.patch_cover(dict(payload, preparedFor='Someone Else'), str(path), str(output))
+
+    before, after = pdf_pages_text(original), pdf_pages_text(output.read_bytes())
+    assert len(after) == len(before) == page_count(original)
+    assert 'Someone Else' in after[0] and 'Someone Else' not in before[0]
+    assert after[1:] == before[1:]
+    assert path.read_bytes() == original
+
+
+def test_patch_updates_the_title(payload, tmp_path):
+    pymupdf = pytest.importorskip('pymupdf')
+    path = tmp_path / 'report.pdf'
+    path.write_bytes(generator.render_to_bytes(payload))
+    generator.patch_cover(dict(payload, donorName='Ada Lovelace'), str(path))
+    with pymupdf.open(path) as doc:
+        assert doc.metadata['title'].startswith('Ada Lovelace')
+
+
+def test_patch_markdown_render(payload, tmp_path):
+    md = bench.synthetic_markdown(payload)
+    path = tmp_path / 'report.pdf'
+    original = generator.render_to_bytes(md, markdown=True)
+    path.write_bytes(original)
+    output = tmp_path / 'patched.pdf'
+    generator.patch_cover(dict(md, preparedFor='Someone Else'), str(path), str(output), markdown=True)
+    before, after = pdf_pages_text(original), pdf_pages_text(output.read_bytes())
+    assert 'Someone Else' in after[0]
+    # the source count comes from the markdown input's sources, as in the render
+    assert f'{len(md["sources"])} verified' in ' '.join(after[0].split())
+    assert after[0].replace('Someone Else', 'Jane Doe').split() == before[0].split()
@@ -0,0 +1,41 @@
+import hashlib
+import json
+import os
+import subprocess
+import sys
+
+import generator
+
+PDF_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_identical_payloads_give_identical_bytes(payload):
+    first = generator.render_to_bytes(payload, deterministic=True)
+    assert generator.render_to_bytes(payload, deterministic=True) == first
+    assert b'/CreationDate' in first
+
+
+def test_output_depends_on_payload(payload):
+    other = dict(payload, preparedFor='Someone Else')
+    assert generator.render_to_bytes(payload, deterministic=True) != \
+        generator.render_to_bytes(other, deterministic=True)
+
+
+def test_identical_across_processes(payload, tmp_path):
+    input_path = tmp_path / 'in.json'
+    input_path.write_text(json.dumps(payload))
+    digests = []
+    for seed in ('1', '2'):
+        output = tmp_path / f'out{seed}.pdf'
+        subprocess.run([sys.executable, 'generator.py', str(input_path), str(output), '--deterministic'],
+                       cwd=PDF_DIR, env=dict(os.environ, PYTHONHASHSEED=seed), check=True,
+                       stdout=subprocess.DEVNULL)
+        digests.append(hashlib.sha256(output.read_bytes()).hexdigest())
+    assert digests[0] == digests[1]
+    assert digests[0] == hashlib.sha256(generator.render_to_bytes(payload, deterministic=True)).hexdigest()
+
+
+def test_generate_pdf_returns_file_digest(payload, tmp_path):
+    output = tmp_path / 'out.pdf'
+    digest = generator.generate_pdf(payload, str(output), deterministic=True)
+    assert digest == hashlib.sha256(output.read_bytes()).hexdigest()
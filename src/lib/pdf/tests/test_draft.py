@@ -0,0 +1,71 @@
+import os
+import re
+import subprocess
+import sys
+from collections import Counter
+
+import pytest
+
+import bench
+import font_fallback
+import generator
+from conftest import pdf_pages_text
+
+BASE14 = {
+    'Courier', 'Courier-Bold', 'Courier-BoldOblique', 'Courier-Oblique',
+    'Helvetica', 'Helvetica-Bold', 'Helvetica-BoldOblique', 'Helvetica-Oblique',
+    'Times-Roman', 'Times-Bold', 'Times-BoldItalic', 'Times-Italic', 'Symbol', 'ZapfDingbats',
+}
+CASES = {
+    'v3': lambda: bench.synthetic_payload(),
+    'legacy': lambda: bench.synthetic_payload(legacy=True),
+    'charts': lambda: dict(bench.synthetic_payload(), charts=bench.synthetic_charts()),
+    'mixed script': bench.mixed_script_payload,
+}
+
+
+def _fonts(pdf):
+    return set(re.findall(rb'/BaseFont /([\w+-]+)', pdf))
+
+
+@pytest.mark.parametrize('case', CASES)
+def test_base14_fonts_only(case):
+    pdf = generator.render_to_bytes(CASES[case](), draft=True)
+    assert {font.decode() for font in _fonts(pdf)} <= BASE14
+    assert b'/FontFile' not in pdf
+
+
+def _words(pdf):
+    return Counter(re.findall(r'\w+', '\n'.join(pdf_pages_text(pdf))))
+
+
+def test_same_text_as_branded(payload):
+    assert _words(generator.render_to_bytes(payload, draft=True)) == _words(generator.render_to_bytes(payload))
+
+
+def test_markdown_draft(payload):
+    pdf = generator.render_to_bytes(bench.synthetic_markdown(payload), markdown=True, draft=True)
+    assert {font.decode() for font in _fonts(pdf)} <= BASE14
+
+
+def test_no_truetype_file_read(tmp_path):
+    # a fresh process, so no font was registered before the draft render
+    code = (
+        'import sys\n'
+        'opened = []\n'
+        'sys.addaudithook(lambda event, args: event == "open" and str(args[0]).endswith((".ttf", ".ttc"))'
+        ' and opened.append(args[0]))\n'
+        'import bench, generator\n'
+        'generator.generate_pdf(bench.mixed_script_payload(), sys.argv[1], draft=True)\n'
+        'print(opened)\n')
+    result = subprocess.run([sys.executable, '-c', code, str(tmp_path / 'draft.pdf')], capture_output=True,
+                            text=True, check=True, cwd=os.path.dirname(os.path.abspath(generator.__file__)))
+    assert result.stdout.strip().splitlines()[-1] == '[]'
+
+
+def test_fallback_back_after_draft():
+    generator.render_to_bytes(bench.mixed_script_payload(), draft=True)
+    if not font_fallback.load_chain():
+        pytest.skip('no fallback font installed')
+    runs = font_fallback.font_runs('Nguyễn', 'Helvetica')
+    assert runs != [('Helvetica', 'Nguyễn')]
@@ -0,0 +1,67 @@
+"""The fast-path lists must place every word where the Platypus paragraphs would."""
+
+import random
+
+import pytest
+from reportlab.lib.enums import TA_CENTER
+
+import bench
+import generator
+
+
+@pytest.fixture
+def styles():
+    return generator.make_styles(generator.ensure_fonts())
+
+
+@pytest.fixture
+def platypus(monkeypatch):
+    """Call fn with the fast path turned off."""
+    def run(fn):
+        with monkeypatch.context() as m:
+            m.setattr(generator, 'fast_block', lambda runs, style: None)
+            return fn()
+    return run
+
+
+def _word_positions(pdf):
+    pymupdf = pytest.importorskip('pymupdf')
+    with pymupdf.open(stream=pdf, filetype='pdf') as doc:
+        return [[(round(w[0], 1), round(w[1], 1), w[4]) for w in page.get_text('words')] for page in doc]
+
+
+def _sources(rng, n):
+    titles = [bench._sentence(rng, rng.randint(3, 30)) for _ in range(n)]
+    titles[3] = 'https://www.example.org/' + 'very-long-path-segment/' * 8
+    titles[7] = bench.LONG_WORD
+    return [{'url': f'https://www.example{k}.org/a/{k}', 'title': title} for k, title in enumerate(titles)]
+
+
+@pytest.mark.parametrize('kind', ['sources', 'bullets'])
+def test_list_matches_platypus(kind, styles, platypus):
+    rng = random.Random(7)
+    if kind == 'sources':
+        items = _sources(rng, 50)
+    else:
+        items = [bench._sentence(rng, rng.randint(6, 40)) for _ in range(300)]
+
+    def layout():
+        return bench._layout_list(bench._list_story(items, kind, styles))
+
+    assert _word_positions(layout()) == _word_positions(platypus(layout))
+
+
+@pytest.mark.parametrize('legacy', [False, True], ids=['v3', 'legacy'])
+def test_render_matches_platypus(legacy, platypus):
+    data = bench.synthetic_payload(sections=12, beats=8, sources=120, legacy=legacy)
+    fast = generator.render_to_bytes(data)
+    assert _word_positions(fast) == _word_positions(platypus(lambda: generator.render_to_bytes(data)))
+
+
+def test_fast_block_only_for_simple_text(styles):
+    body = styles['bullet']
+    assert generator.fast_block([(body.fontName, 'Plain text')], body)
+    # a glyph the style's font lacks goes through Platypus and the fallback fonts
+    assert generator.fast_block([(body.fontName, 'Nguyễn')], body) is None
+    centred = body.clone('centred', alignment=TA_CENTER)
+    assert generator.fast_block([(centred.fontName, 'Plain text')], centred) is None
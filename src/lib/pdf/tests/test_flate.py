@@ -0,0 +1,88 @@
+import concurrent.futures
+import zlib
+
+import pytest
+
+import bench
+import flate
+import generator
+from state_canvas import StateCanvas
+
+
+@pytest.fixture(scope='module')
+def big():
+    return bench.oversized_payload(2)
+
+
+@pytest.fixture
+def submitted(monkeypatch):
+    """Streams handed to the pool by each precompress call."""
+    counts = []
+    precompress = flate.precompress
+
+    def counting(doc, level=None, parallel=True):
+        counts.append(precompress(doc, level, parallel))
+        return counts[-1]
+
+    monkeypatch.setattr(flate, 'precompress', counting)
+    return counts
+
+
+def _render(data, monkeypatch, level, parallel):
+    monkeypatch.setattr(StateCanvas, 'compress_level', level)
+    monkeypatch.setattr(StateCanvas, 'parallel_flate', parallel)
+    return generator.render_to_bytes(data, deterministic=True)
+
+
+@pytest.mark.parametrize('level', [1, 6, 9])
+def test_parallel_equals_serial(big, level, monkeypatch, submitted):
+    if flate.WORKERS < 2:
+        monkeypatch.setattr(flate, 'WORKERS', 2)
+    serial = _render(big, monkeypatch, level, False)
+    pooled = _render(big, monkeypatch, level, True)
+    assert submitted[0] == 0 and submitted[1] > 0
+    assert pooled == serial
+
+
+def test_level_applies(big, monkeypatch):
+    assert len(_render(big, monkeypatch, 1, True)) > len(_render(big, monkeypatch, 9, True))
+    default = _render(big, monkeypatch, None, True)
+    assert default == _render(big, monkeypatch, zlib.Z_DEFAULT_COMPRESSION, False)
+
+
+def test_one_worker_is_serial(payload, monkeypatch, submitted):
+    monkeypatch.setattr(flate, 'WORKERS', 1)
+    pdf = _render(payload, monkeypatch, None, True)
+    assert submitted == [0]
+    assert pdf == _render(payload, monkeypatch, None, False)
+
+
+def test_levels_per_thread():
+    # the level is per thread, so concurrent renders at different levels don't mix
+    data = bytes(range(256)) * 64
+    flate.install()
+
+    def deflate(level):
+        flate._local.level = level
+        try:
+            return {flate._encode(data) for _ in range(20)}
+        finally:
+            flate.release()
+
+    levels = [1, 9] * 4
+    with concurrent.futures.ThreadPoolExecutor(4) as pool:
+        for level, deflated in zip(levels, pool.map(deflate, levels)):
+            assert deflated == {zlib.compress(data, level)}
+
+
+def test_kept_streams():
+    data = b'font program ' * 1000
+    flate.keep(data)
+    try:
+        flate._local.level = 9
+        assert flate._encode(data) == zlib.compress(data, 9)
+        assert flate._kept[data] == {9: zlib.compress(data, 9)}
+    finally:
+        flate.release()
+        flate.forget(data)
+    assert data not in flate._kept
@@ -0,0 +1,77 @@
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+import bench
+import font_fallback
+import generator
+from conftest import pdf_pages_text
+
+PDF_DIR = os.path.dirname(os.path.abspath(generator.__file__))
+FONTS = font_fallback.FONT_DIRS[0]     # public/fonts
+
+
+@pytest.fixture
+def font_dir(tmp_path, monkeypatch):
+    """An empty font directory standing in for the system ones."""
+    fonts = tmp_path / 'fonts'
+    fonts.mkdir()
+    monkeypatch.setattr(font_fallback, 'FONT_DIRS', (str(fonts),))
+    monkeypatch.delenv('PROSPECTAI_FALLBACK_FONTS', raising=False)
+    return fonts
+
+
+def _install(font_dir, filename):
+    package = font_dir / 'noto'
+    package.mkdir(exist_ok=True)
+    shutil.copy(os.path.join(FONTS, 'DMSans-Regular.ttf'), package / filename)
+
+
+def test_index_reused_until_fonts_change(font_dir, tmp_path):
+    path = str(tmp_path / 'index.json')
+    assert font_fallback.build_index(path)['fonts'] == []
+    assert font_fallback._load_index(path) is not None
+
+    _install(font_dir, 'NotoSans-Regular.ttf')
+    assert font_fallback._load_index(path) is None
+    index = font_fallback.build_index(path)
+    assert [font['name'] for font in index['fonts']] == ['NotoSans']
+    assert font_fallback._load_index(path) == index
+
+    os.remove(font_dir / 'noto' / 'NotoSans-Regular.ttf')
+    assert font_fallback._load_index(path) is None
+
+
+def test_index_in_user_cache_dir(tmp_path):
+    env = {k: v for k, v in os.environ.items() if k != 'PROSPECTAI_FONT_INDEX'}
+    script = 'import font_fallback; print(font_fallback.INDEX_PATH)'
+
+    def index_path(**extra):
+        return subprocess.run([sys.executable, '-c', script], env=dict(env, **extra), cwd=PDF_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+
+    assert index_path(XDG_CACHE_HOME=str(tmp_path)) == str(tmp_path / 'prospectai' / 'font-index.json')
+    assert index_path(XDG_CACHE_HOME='', HOME=str(tmp_path)) == str(
+        tmp_path / '.cache' / 'prospectai' / 'font-index.json')
+
+
+def test_latin_stays_in_its_font():
+    text = 'Persuasion profile for Craig Newmark'
+    assert font_fallback.font_runs(text, 'Helvetica') == [('Helvetica', text)]
+
+
+def test_mixed_script_falls_back():
+    if not font_fallback.load_chain():
+        pytest.skip('no fallback font installed')
+    runs = font_fallback.font_runs('Meeting Nguyễn Thị Phương Thảo today', 'Helvetica')
+    assert ''.join(part for _, part in runs) == 'Meeting Nguyễn Thị Phương Thảo today'
+    assert runs[0] == ('Helvetica', 'Meeting ')
+    assert any(name != 'Helvetica' and 'ễ' in part for name, part in runs)
+
+    data = bench.mixed_script_payload()
+    text = ' '.join(' '.join(pdf_pages_text(generator.render_to_bytes(data))).split())
+    assert data['donorName'] in text
+    assert data['meetingGuide']['oneLine'].split()[0] in text
@@ -0,0 +1,61 @@
+import pytest
+
+import bench
+import flate
+import font_subsets
+import generator
+
+
+def _caches():
+    return list({id(font.face): font.face.makeSubset for font in bench._ttfonts()}.values())
+
+
+def _quoted():
+    data = bench.synthetic_payload(seed=3)
+    for section in data['persuasionProfile']['sections']:
+        for para in section['paragraphs']:
+            para['content'] = f'\u201c{para["content"]}\u201d \u2014 it\u2019s\u2026 Jos\u00e9'
+    return data
+
+
+def _pixels(pdf):
+    pymupdf = pytest.importorskip('pymupdf')
+    with pymupdf.open(stream=pdf, filetype='pdf') as doc:
+        return [page.get_pixmap(dpi=50).samples for page in doc]
+
+
+def test_common_text_reuses_the_seeded_subset():
+    generator.ensure_fonts()
+    generator.render_to_bytes(_quoted())
+    before = [(cache.hits, cache.misses) for cache in _caches()]
+    generator.render_to_bytes(_quoted())
+    after = [(cache.hits, cache.misses) for cache in _caches()]
+    assert sum(h for h, _ in after) > sum(h for h, _ in before)
+    assert [m for _, m in after] == [m for _, m in before]
+
+
+@pytest.mark.parametrize('case', ['ascii', 'quoted', 'mixed'])
+def test_same_pages_as_reportlab(case):
+    data = {'ascii': bench.synthetic_payload, 'quoted': _quoted, 'mixed': bench.mixed_script_payload}[case]()
+    reused = generator.render_to_bytes(data, deterministic=True)
+    bench._set_reused_subsets(False)
+    try:
+        own = generator.render_to_bytes(data, deterministic=True)
+    finally:
+        bench._set_reused_subsets(True)
+    assert _pixels(reused) == _pixels(own)
+
+
+def test_programs_evicted(monkeypatch):
+    monkeypatch.setattr(font_subsets, 'MAX_PROGRAMS', 2)
+    cache = font_subsets._SubsetCache(lambda subset: b'program %r' % bytes(subset))
+    cache.pin([1])
+    for subset in ([2], [3], [2], [4]):
+        cache(subset)
+    assert cache.hits == 1 and cache.misses == 3
+    assert list(cache.programs) == [(2,), (4,)]
+    assert cache([1]) == b'program b\'\\x01\''
+    assert b"program b'\\x03'" not in flate._kept
+    for program in list(cache.programs.values()) + list(cache.pinned.values()):
+        assert program in flate._kept
+        flate.forget(program)
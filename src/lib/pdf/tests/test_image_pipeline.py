@@ -0,0 +1,93 @@
+import base64
+import io
+import os
+
+import pytest
+from PIL import Image
+
+import generator
+import image_pipeline
+from conftest import pdf_pages_text
+
+
+def _png(size=(400, 300), color=(40, 90, 160)):
+    out = io.BytesIO()
+    Image.new('RGB', size, color).save(out, 'PNG')
+    return out.getvalue()
+
+
+def _data_url(raw):
+    return 'data:image/png;base64,' + base64.b64encode(raw).decode('ascii')
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    upload_dir = tmp_path / 'uploads'
+    upload_dir.mkdir()
+    monkeypatch.setattr(image_pipeline, 'UPLOAD_DIR', str(upload_dir))
+    monkeypatch.setattr(image_pipeline, 'CACHE_DIR', str(tmp_path / 'cache'))
+    image_pipeline._memo.clear()
+    return upload_dir
+
+
+def test_data_url(uploads):
+    path = image_pipeline.prepare_image(_data_url(_png()), 100, 75)
+    assert path.startswith(image_pipeline.CACHE_DIR)
+    assert image_pipeline.prepare_image(_data_url(_png()), 100, 75) == path
+
+
+def test_path_inside_the_upload_dir(uploads):
+    (uploads / 'photo.png').write_bytes(_png())
+    assert image_pipeline.read_source('photo.png') == _png()
+    assert image_pipeline.read_source(str(uploads / 'photo.png')) == _png()
+
+
+@pytest.mark.parametrize('source', ['/dev/zero', '/etc/passwd', '../outside.png', 'link.png'])
+def test_paths_outside_the_upload_dir_are_refused(uploads, source):
+    (uploads.parent / 'outside.png').write_bytes(_png())
+    os.symlink(uploads.parent / 'outside.png', uploads / 'link.png')
+    with pytest.raises(ValueError):
+        image_pipeline.read_source(source)
+
+
+def test_special_files_are_refused(uploads):
+    os.mkfifo(uploads / 'pipe.png')
+    with pytest.raises(ValueError, match='regular file'):
+        image_pipeline.read_source('pipe.png')
+
+
+def test_paths_are_refused_without_an_upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_pipeline, 'UPLOAD_DIR', None)
+    (tmp_path / 'photo.png').write_bytes(_png())
+    with pytest.raises(ValueError, match='upload directory'):
+        image_pipeline.read_source(str(tmp_path / 'photo.png'))
+
+
+def test_oversized_sources_are_refused(uploads, monkeypatch):
+    monkeypatch.setattr(image_pipeline, 'MAX_SOURCE_BYTES', 1000)
+    (uploads / 'photo.png').write_bytes(b'\0' * 1001)
+    with pytest.raises(ValueError, match='over'):
+        image_pipeline.read_source('photo.png')
+    with pytest.raises(ValueError, match='over'):
+        image_pipeline.read_source(_data_url(b'\0' * 1100))
+
+
+def test_too_many_pixels(uploads, monkeypatch):
+    monkeypatch.setattr(image_pipeline, 'MAX_PIXELS', 400 * 300 - 1)
+    with pytest.raises(Image.DecompressionBombError):
+        image_pipeline.prepare_image(_data_url(_png()), 100, 75)
+
+
+def test_refused_images_are_left_off_the_cover(payload, uploads, monkeypatch):
+    monkeypatch.setattr(image_pipeline, 'MAX_PIXELS', 100)
+    payload.update(donorPhoto='/dev/zero', partnerLogo=_data_url(_png()))
+    pdf = generator.render_to_bytes(payload)
+    assert b'/Subtype /Image' not in pdf
+    assert payload['donorName'] in pdf_pages_text(pdf)[0]
+
+
+def test_images_on_the_cover(payload, uploads):
+    (uploads / 'photo.png').write_bytes(_png((800, 800), (200, 60, 60)))
+    payload.update(donorPhoto='photo.png', partnerLogo=_data_url(_png()))
+    pdf = generator.render_to_bytes(payload)
+    assert pdf.count(b'/Subtype /Image') == 2
@@ -0,0 +1,65 @@
+import io
+import re
+
+import pytest
+
+import bench
+import generator
+from conftest import pdf_pages_text
+from incremental import IncrementalCanvas
+
+
+def _streamed(data, **kwargs):
+    out = io.BytesIO()
+    size = generator.stream_pdf(data, out, **kwargs)
+    pdf = out.getvalue()
+    assert size == len(pdf)
+    return pdf
+
+
+def _check_xref(pdf):
+    """Every xref entry points at its object, and startxref at the table."""
+    startxref = int(re.search(rb'startxref\s+(\d+)', pdf).group(1))
+    assert pdf[startxref:].startswith(b'xref')
+    count = int(re.match(rb'xref\s+0 (\d+)', pdf[startxref:]).group(1))
+    entries = re.findall(rb'(\d{10}) \d{5} n', pdf[startxref:])
+    assert len(entries) == count - 1
+    for number, offset in enumerate(entries, 1):
+        assert re.match(rb'%d 0 obj' % number, pdf[int(offset):]), number
+
+
+@pytest.mark.parametrize('legacy', [False, True], ids=['v3', 'legacy'])
+def test_same_document(legacy):
+    data = bench.synthetic_payload(legacy=legacy)
+    data['charts'] = bench.synthetic_charts()
+    streamed = _streamed(data)
+    _check_xref(streamed)
+    assert pdf_pages_text(streamed) == pdf_pages_text(generator.render_to_bytes(data))
+
+
+def test_pages_written_as_finished(monkeypatch):
+    data = bench.synthetic_payload(sections=20)
+    flushes = []
+    monkeypatch.setattr(IncrementalCanvas, 'on_flush', lambda canvas, written: flushes.append(written))
+    pdf = _streamed(data)
+    pages = len(pdf_pages_text(pdf))
+    assert len(flushes) == pages
+    assert flushes == sorted(set(flushes))
+    # most of the file is out before the fonts and xref at the end
+    assert flushes[-1] > len(pdf) / 2
+
+
+def test_deterministic():
+    data = bench.synthetic_payload()
+    assert _streamed(data, deterministic=True) == _streamed(data, deterministic=True)
+
+
+def test_generate_pdf_incremental(payload, tmp_path):
+    output = tmp_path / 'out.pdf'
+    generator.generate_pdf(payload, str(output), incremental=True)
+    _check_xref(output.read_bytes())
+    assert pdf_pages_text(output.read_bytes()) == pdf_pages_text(generator.render_to_bytes(payload))
+    with pytest.raises(ValueError):
+        generator.generate_pdf(payload, str(output), incremental=True, linearize=True)
+    with pytest.raises(ValueError):
+        generator.generate_pdf(payload, str(output), incremental=True, preview=2)
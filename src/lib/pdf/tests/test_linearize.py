@@ -0,0 +1,46 @@
+import pytest
+
+import bench
+import generator
+from conftest import pdf_pages_text
+from linearize import check_linearization, linearize
+
+
+@pytest.fixture
+def patched(payload, tmp_path):
+    original = tmp_path / 'original.pdf'
+    original.write_bytes(generator.render_to_bytes(payload))
+    output = tmp_path / 'patched.pdf'
+    generator.patch_cover(dict(payload, preparedFor='Someone Else'), str(original), str(output))
+    return output.read_bytes()
+
+
+def test_plain(payload):
+    assert check_linearization(generator.render_to_bytes(payload, linearize=True)) == []
+
+
+def test_legacy(legacy_payload):
+    assert check_linearization(generator.render_to_bytes(legacy_payload, linearize=True)) == []
+
+
+def test_charts(payload):
+    payload['charts'] = bench.synthetic_charts()
+    assert check_linearization(generator.render_to_bytes(payload, linearize=True)) == []
+
+
+def test_stamped(payload):
+    for pdf in generator.render_for_recipients(payload, ['Ann Lee', 'Bob']).values():
+        assert check_linearization(linearize(pdf)) == []
+
+
+def test_patched(patched):
+    assert check_linearization(linearize(patched)) == []
+
+
+def test_patched_keeps_the_new_cover(patched):
+    assert 'Someone Else' in pdf_pages_text(linearize(patched))[0]
+
+
+def test_checker_catches_a_wrong_length(payload):
+    pdf = generator.render_to_bytes(payload, linearize=True)
+    assert check_linearization(pdf + b'\n') != []
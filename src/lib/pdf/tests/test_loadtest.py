@@ -0,0 +1,81 @@
+import argparse
+import io
+import json
+
+import pytest
+
+import bench
+import generator
+import loadtest
+from conftest import page_count
+
+
+def test_requests_follow_the_mix():
+    requests = loadtest.make_requests(200)
+    assert [r.index for r in requests] == list(range(200))
+    assert {r.kind for r in requests} == {kind for kind, _ in loadtest.PAYLOAD_MIX}
+    assert all(r.markdown == (r.kind == 'markdown') for r in requests)
+    assert requests == loadtest.make_requests(200)
+
+
+def test_corpus_route_bodies(tmp_path):
+    (tmp_path / 'a.json').write_text(json.dumps({'profileData': {'donorName': 'A'}}))
+    (tmp_path / 'b.json').write_text(json.dumps({'markdownInput': '# B'}))
+    requests = loadtest.make_requests(3, corpus=str(tmp_path))
+    assert [(r.kind, json.loads(r.body), r.markdown) for r in requests] == [
+        ('a.json', {'donorName': 'A'}, False), ('b.json', '# B', True), ('a.json', {'donorName': 'A'}, False)]
+
+
+def test_percentile():
+    assert loadtest._percentile([], 99) == 0.0
+    assert loadtest._percentile([3, 1, 2], 50) == 2
+    assert loadtest._percentile(list(range(101)), 99) == 99
+    assert loadtest._percentile([0, 10], 95) == pytest.approx(9.5)
+
+
+def test_serve(payload, tmp_path):
+    good, bad = tmp_path / 'good.json', tmp_path / 'bad.json'
+    good.write_text(json.dumps(payload))
+    bad.write_text('{"donorName": ')
+    lines = io.StringIO(f'{good}\t{tmp_path / "good.pdf"}\t0\n{bad}\t{tmp_path / "bad.pdf"}\t0\n')
+    out = io.StringIO()
+    loadtest.serve(lines, out)
+    # a failed request is answered and the next one still runs
+    assert out.getvalue() == 'ready\nok\nerror\n'
+    assert (tmp_path / 'good.pdf').read_bytes().startswith(b'%PDF')
+
+
+def test_serve_markdown(payload, tmp_path):
+    md = bench.synthetic_markdown(payload)
+    (tmp_path / 'md.json').write_text(json.dumps(md))
+    out = io.StringIO()
+    loadtest.serve(io.StringIO(f'{tmp_path / "md.json"}\t{tmp_path / "md.pdf"}\t1\n'), out)
+    assert out.getvalue() == 'ready\nok\n'
+    assert page_count((tmp_path / 'md.pdf').read_bytes()) == \
+        page_count(generator.render_to_bytes(md, markdown=True))
+
+
+def _direct_pages(request):
+    return page_count(generator.render_to_bytes(json.loads(request.body), markdown=request.markdown))
+
+
+@pytest.mark.parametrize('mode', ['worker', 'batch'])
+def test_run(mode, monkeypatch):
+    requests = loadtest.make_requests(4)
+    assert any(r.markdown for r in requests)
+    pages = {}
+    collect = loadtest._Files.collect
+
+    def counting_collect(files, status):
+        with open(files.output, 'rb') as f:
+            pages[files.input] = page_count(f.read())
+        return collect(files, status)
+    monkeypatch.setattr(loadtest._Files, 'collect', counting_collect)
+    args = argparse.Namespace(workers=None, batch_size=2)
+    summary = loadtest.run(mode, requests, 2, args)
+    assert summary['requests'] == 4
+    assert summary['outcomes'] == {'ok': 4}
+    # every request rendered in full, markdown ones as markdown
+    assert sorted(pages.values()) == sorted(_direct_pages(r) for r in requests)
+    assert summary['latencyMs']['p50'] <= summary['latencyMs']['p99'] <= summary['latencyMs']['max']
+    assert summary['peakProcessMiB'] > 0
@@ -0,0 +1,49 @@
+import collections
+import re
+
+import pytest
+
+import bench
+import generator
+from conftest import page_count, pdf_pages_text
+
+
+def _words(pdf):
+    return collections.Counter(re.findall(r'[A-Za-z]+', '\n'.join(pdf_pages_text(pdf))))
+
+
+def test_same_report_as_parsed_input():
+    data = bench.synthetic_payload(sections=4, beats=3)
+    parsed = generator.render_to_bytes(data)
+    raw = generator.render_to_bytes(bench.synthetic_markdown(data), markdown=True)
+    assert page_count(raw) == page_count(parsed)
+    # section numbers and trailing periods are normalised the way parse-profile.ts does
+    assert _words(raw) == _words(parsed)
+
+
+def test_story_is_built_in_one_pass(payload, monkeypatch):
+    styles = generator.make_styles(generator.ensure_fonts())
+    converted = collections.Counter()
+    to_html = generator._md_inline_to_html
+    monkeypatch.setattr(generator, '_md_inline_to_html', lambda text: converted.update([text]) or to_html(text))
+
+    def no_json_payload(*args):
+        raise AssertionError('markdown input went through the PDFProfileData parse')
+    monkeypatch.setattr(generator.ProfileData, 'parse', no_json_payload)
+    story = generator.build_story_from_markdown(bench.synthetic_markdown(payload), styles)
+    # every piece of text is converted once, as it is laid out
+    assert converted and max(converted.values()) == 1
+    assert any(isinstance(f, generator.AccentLineFlowable) for f in story)
+
+
+def test_date_defaults_to_today(payload):
+    data = bench.synthetic_markdown(payload)
+    del data['date']
+    assert generator.parse_input(data, markdown=True).date == generator._today()
+
+
+def test_legacy_guides_are_refused():
+    data = bench.synthetic_markdown(bench.synthetic_payload())
+    data['meetingGuideMarkdown'] = '# MEETING GUIDE\n\n## THE DONOR READ\n\nPosture.'
+    with pytest.raises(ValueError, match='legacy'):
+        generator.parse_input(data, markdown=True)
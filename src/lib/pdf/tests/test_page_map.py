@@ -0,0 +1,89 @@
+import json
+import re
+from collections import Counter
+
+import bench
+import generator
+from conftest import page_count, pdf_pages_text
+from page_map import PageMap
+
+
+def _mapped(data):
+    page_map = PageMap()
+    pdf = generator.render_to_bytes(data, page_map=page_map)
+    return pdf, page_map.to_dict(generator.parse_input(data))
+
+
+def _words(text):
+    return Counter(re.findall(r'\w+', text.replace('’', "'")))
+
+
+def test_pages_match_the_pdf(payload):
+    pdf, page_map = _mapped(payload)
+    assert page_map['pageCount'] == page_count(pdf) == len(page_map['pages'])
+
+    offset = 0
+    for page, text in zip(page_map['pages'], pdf_pages_text(pdf)):
+        assert page['offset'] == offset and page['length'] == len(page['text'])
+        offset += page['length']
+        # every word the map puts on a page is drawn on that page
+        assert not _words(page['text']) - _words(text), f"page {page['page']}"
+
+
+def test_sections_and_headings(payload):
+    pdf, page_map = _mapped(payload)
+    pages = pdf_pages_text(pdf)
+    sections = page_map['sections']
+    assert [s['title'] for s in sections] == ['Cover', 'Persuasion Profile', 'Meeting Guide', 'Sources']
+    assert sections[0]['startPage'] == 1
+    assert sections[-1]['endPage'] == page_map['pageCount']
+    for before, after in zip(sections, sections[1:]):
+        assert before['endOffset'] == after['offset']
+        assert before['endPage'] <= after['startPage']
+
+    profile = sections[1]
+    assert [h['title'] for h in profile['headings']] == [s['title'] for s in payload['persuasionProfile']['sections']]
+    for section in sections:
+        for heading in section['headings']:
+            assert section['offset'] <= heading['offset'] < heading['endOffset'] <= section['endOffset']
+            assert not _words(heading['title']) - _words(pages[heading['startPage'] - 1])
+
+
+def test_sources(payload):
+    pdf, page_map = _mapped(payload)
+    pages = pdf_pages_text(pdf)
+    sources = page_map['sources']
+    assert [s['url'] for s in sources] == [s['url'] for s in payload['sources']]
+    for source in sources:
+        if source['page'] is None:
+            # past the 50 the appendix lists
+            assert source['index'] > 50
+            assert all(source['url'] not in text for text in pages)
+        else:
+            # the page an entry starts on; its host name may fall on the next
+            assert f"{source['index']}. {source['title']}" in pages[source['page'] - 1]
+
+
+def test_pdf_unchanged(payload):
+    pdf = generator.render_to_bytes(payload, deterministic=True, page_map=PageMap())
+    assert pdf == generator.render_to_bytes(payload, deterministic=True)
+
+
+def test_sidecar_written(payload, tmp_path):
+    output = tmp_path / 'out.pdf'
+    sidecar = tmp_path / 'out.json'
+    generator.generate_pdf(payload, str(output), page_map_path=str(sidecar))
+    page_map = json.loads(sidecar.read_text())
+    assert page_map['donorName'] == payload['donorName']
+    assert page_map['pageCount'] == page_count(output.read_bytes())
+
+
+def test_split_paragraphs_mapped():
+    # the cover name and callouts of an oversized payload run over several pages
+    data = bench.oversized_payload(1)
+    pdf, page_map = _mapped(data)
+    for page, text in zip(page_map['pages'], pdf_pages_text(pdf)):
+        drawn = _words(text) - _words(f"ProspectAI Confidential {page['page']}")
+        # LONG_WORD is mapped whole but drawn in pieces
+        drawn = Counter({word: n for word, n in drawn.items() if len(word) < 12 or word not in bench.LONG_WORD})
+        assert not drawn - _words(page['text']), f"page {page['page']}"
@@ -0,0 +1,52 @@
+import pytest
+
+import bench
+import generator
+from conftest import page_count, pdf_pages_text
+from preview import Preview
+
+
+def _preview(data, pages=2):
+    preview = Preview(pages)
+    return generator.render_to_bytes(data, preview=preview), preview
+
+
+CASES = {
+    'v3': lambda: bench.synthetic_payload(),
+    'legacy': lambda: bench.synthetic_payload(legacy=True),
+    'v3, 30 sections': lambda: bench.synthetic_payload(sections=30, beats=8, sources=120),
+    'charts': lambda: dict(bench.synthetic_payload(), charts=bench.synthetic_charts()),
+    'oversized': lambda: bench.oversized_payload(2),
+    'oversized legacy': lambda: bench.oversized_payload(2, legacy=True),
+    'oversized x4': lambda: bench.oversized_payload(4),
+}
+
+
+@pytest.mark.parametrize('case', CASES)
+def test_estimate_within_a_page(case):
+    data = CASES[case]()
+    _, preview = _preview(data)
+    assert abs(preview.estimated_pages - page_count(generator.render_to_bytes(data))) <= 1
+
+
+def test_first_pages_only(payload):
+    pdf, preview = _preview(payload)
+    full = pdf_pages_text(generator.render_to_bytes(payload))
+    pages = pdf_pages_text(pdf)
+    assert len(pages) == preview.shown_pages == 3
+    notice = f'Preview · first 3 of about {preview.estimated_pages} pages'
+    assert preview.notice() == notice
+    for shown, page in zip(pages, full):
+        assert notice in shown
+        assert shown.replace(notice, '').split() == page.split()
+    pymupdf = pytest.importorskip('pymupdf')
+    with pymupdf.open(stream=pdf, filetype='pdf') as doc:
+        assert doc.metadata['subject'] == notice
+
+
+def test_short_document_ends_early():
+    data = bench.synthetic_payload(sections=1, beats=1, sources=1)
+    pdf, preview = _preview(data, pages=50)
+    assert preview.shown_pages == page_count(pdf)
+    # the sources, left out of the preview, are still counted
+    assert preview.estimated_pages == page_count(generator.render_to_bytes(data)) == preview.shown_pages + 1
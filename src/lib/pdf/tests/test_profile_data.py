@@ -0,0 +1,80 @@
+import pytest
+
+import bench
+import generator
+from profile_data import MeetingGuideLegacy, MeetingGuideV3, ProfileData, payload_digest
+
+
+def test_parse(payload):
+    data = ProfileData.parse(payload)
+    assert data.donor_name == payload['donorName']
+    assert data.digest == payload_digest(payload)
+    assert [s.title for s in data.sections] == [s['title'] for s in payload['persuasionProfile']['sections']]
+    assert [s.url for s in data.sources] == [s['url'] for s in payload['sources']]
+    assert isinstance(data.meeting_guide, MeetingGuideV3)
+    assert len(data.meeting_guide.beats) == len(payload['meetingGuide']['beats'])
+    assert not hasattr(data, '__dict__')
+    assert ProfileData.of(data) is data
+
+
+def test_legacy_and_no_guide(legacy_payload):
+    assert isinstance(ProfileData.parse(legacy_payload).meeting_guide, MeetingGuideLegacy)
+    for guide in (None, {}, {'format': 'unknown'}, {'donorName': 'x'}):
+        assert ProfileData.parse({'donorName': 'A', 'meetingGuide': guide}).meeting_guide is None
+
+
+def test_defaults():
+    data = ProfileData.parse({'donorName': 'A', 'sources': [{'url': 'u'}],
+                              'meetingGuide': {'format': 'v3', 'beats': [{'number': 2}]}})
+    assert (data.prepared_for, data.date, data.source_count, data.sections, data.charts) == ('', '', 0, (), None)
+    assert data.sources[0].title is None
+    beat = data.meeting_guide.beats[0]
+    assert (beat.number, beat.title, beat.stay) == ('2', '', '')
+
+
+@pytest.mark.parametrize('payload, message', [
+    ([], 'payload must be an object, not list'),
+    ({}, 'payload.donorName is required'),
+    ({'donorName': 5}, 'payload.donorName must be a string, not int'),
+    ({'donorName': 'A', 'sourceCount': '3'}, 'payload.sourceCount must be a number, not str'),
+    ({'donorName': 'A', 'sourceCount': True}, 'payload.sourceCount must be a number, not bool'),
+    ({'donorName': 'A', 'sources': {}}, 'payload.sources must be a list, not dict'),
+    ({'donorName': 'A', 'sources': ['u']}, r'payload.sources\[0\] must be an object, not str'),
+    ({'donorName': 'A', 'persuasionProfile': {'sections': [{}]}},
+     r'payload.persuasionProfile.sections\[0\].title is required'),
+    ({'donorName': 'A', 'charts': {'dimensions': [{'score': 1}]}}, r'payload.charts.dimensions\[0\].label is required'),
+    ({'donorName': 'A', 'meetingGuide': {'format': 'v3', 'beats': [{'stay': ['x']}]}},
+     r'payload.meetingGuide.beats\[0\].stay must be a string, not list'),
+    ({'donorName': 'A', 'meetingGuide': {'lightsUp': [], 'meetingArc': {'moves': [{'title': 1}]}}},
+     r'payload.meetingGuide.meetingArc.moves\[0\].title must be a string, not int'),
+    ({'donorName': 'A', 'meetingGuide': {'donorRead': {'body': 'x'}}},
+     'payload.meetingGuide.donorRead.body must be a list, not str'),
+])
+def test_malformed(payload, message):
+    with pytest.raises(ValueError, match=message):
+        ProfileData.parse(payload)
+
+
+def test_markdown_payload(payload):
+    md = bench.synthetic_markdown(payload)
+    data = ProfileData.of(md, markdown=True, today='Today')
+    assert data.profile_markdown == md['profileMarkdown']
+    assert data.markdown
+    assert data.source_count == len(md['sources'])
+    assert data.date == (md.get('date') or 'Today')
+
+
+@pytest.mark.parametrize('legacy', [False, True], ids=['v3', 'legacy'])
+def test_render_parsed_or_raw(legacy):
+    raw = bench.synthetic_payload(legacy=legacy)
+    assert generator.render_to_bytes(ProfileData.parse(raw), deterministic=True) == \
+        generator.render_to_bytes(raw, deterministic=True)
+
+
+def test_parsed_markdown_keeps_its_mode(payload):
+    md = bench.synthetic_markdown(payload)
+    data = generator.parse_input(md, markdown=True)
+    assert data.markdown and not ProfileData.parse(payload).markdown
+    # the parsed model picks the builder, whatever flag comes with it
+    assert generator.render_to_bytes(data, deterministic=True) == \
+        generator.render_to_bytes(md, markdown=True, deterministic=True)
@@ -0,0 +1,35 @@
+import pytest
+
+import generator
+from conftest import pdf_pages_text
+from render_governor import RenderBudgetExceeded, RenderGovernor
+
+
+def test_no_fallbacks_within_budget(payload):
+    governor = RenderGovernor(time_budget=60, memory_budget=2**30)
+    generator.render_to_bytes(payload, governor=governor)
+    assert governor.fallbacks == []
+
+
+def test_exhausted_budget_raises(payload):
+    with pytest.raises(RenderBudgetExceeded, match='render budget exceeded'):
+        generator.render_to_bytes(payload, governor=RenderGovernor(time_budget=1e-6))
+
+
+def test_fallbacks_under_pressure(payload):
+    governor = RenderGovernor(time_budget=60, soft_threshold=0)
+    pdf = generator.render_to_bytes(payload, governor=governor)
+    assert sorted(governor.fallbacks) == ['flat-colours', 'truncated-sources']
+
+    sources_text = pdf_pages_text(pdf)[-1]
+    assert f'{generator.SOURCES_FALLBACK_LIMIT}.' in sources_text
+    assert f'{generator.SOURCES_FALLBACK_LIMIT + 1}.' not in sources_text
+    assert f'+ {len(payload["sources"]) - generator.SOURCES_FALLBACK_LIMIT} additional sources' in sources_text
+
+
+def test_degradation_is_sticky():
+    governor = RenderGovernor(time_budget=60, soft_threshold=0).start()
+    assert governor.degraded('flat-colours')
+    governor.soft_threshold = 1
+    assert governor.degraded('truncated-sources')
+    assert governor.fallbacks == ['flat-colours', 'truncated-sources']
@@ -0,0 +1,63 @@
+import re
+import threading
+import tracemalloc
+
+import pytest
+
+import generator
+from render_governor import RenderBudgetExceeded, RenderGovernor
+from render_profiler import RenderProfiler
+
+
+def _report(path):
+    with open(path + '.profile.txt') as f:
+        return f.read()
+
+
+def _sampler_running():
+    return any(t.name == 'pdf-profile-sampler' for t in threading.enumerate())
+
+
+class _Doc:
+    pageTemplates = ()
+
+    def handle_flowable(self, flowables):
+        if flowables[0] == 'big':
+            block = bytearray(8 * 2**20)
+            del block
+
+
+def test_peak_spans_all_flowables(tmp_path):
+    profiler = RenderProfiler(str(tmp_path / 'out.pdf'))
+    doc = _Doc()
+    profiler.instrument(doc)
+    profiler.start()
+    for kind in ('big', 'small', 'small'):
+        doc.handle_flowable([kind])
+    profiler.stop()
+    assert profiler._peak >= 8 * 2**20
+
+
+def test_profile_writes_report(payload, tmp_path):
+    output = str(tmp_path / 'out.pdf')
+    generator.generate_pdf(payload, output, profile=True)
+
+    for ext in ('.prof', '.collapsed', '.profile.txt'):
+        assert (tmp_path / ('out.pdf' + ext)).stat().st_size > 0
+    report = _report(output)
+    peak = int(re.search(r'traced peak\s+(\d+) KiB', report).group(1))
+    flowable_peaks = [float(kib) for kib in re.findall(r'^\s+([\d.]+) KiB\s+x', report, re.M)]
+    # the render's peak covers every flowable's, not just the last one's
+    assert flowable_peaks and peak >= max(flowable_peaks)
+    assert not tracemalloc.is_tracing()
+    assert not _sampler_running()
+
+
+def test_profile_written_when_render_fails(payload, tmp_path):
+    output = str(tmp_path / 'out.pdf')
+    with pytest.raises(RenderBudgetExceeded):
+        generator.generate_pdf(payload, output, profile=True, governor=RenderGovernor(time_budget=1e-6))
+
+    assert 'Render profile' in _report(output)
+    assert not tracemalloc.is_tracing()
+    assert not _sampler_running()
@@ -0,0 +1,86 @@
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import Counter
+
+import pytest
+
+import generator
+from conftest import pdf_pages_text
+
+RECIPIENTS = ['Alex Rivera', 'Sam Chen', 'Jordan Lee']
+
+
+def _words(text):
+    return Counter(re.findall(r'\w+', text))
+
+
+def test_copy_per_recipient(payload):
+    copies = generator.render_for_recipients(payload, RECIPIENTS)
+    assert list(copies) == RECIPIENTS
+
+    # the layout is shared; each copy only appends its overlay
+    bases = {pdf[:pdf.index(b'%%EOF\n') + 6] for pdf in copies.values()}
+    assert len(bases) == 1
+    for pdf in copies.values():
+        assert pdf.count(b'%%EOF') == 2
+
+
+def test_stamped_text(payload):
+    plain = pdf_pages_text(generator.render_to_bytes(dict(payload, preparedFor='')))
+    for recipient, pdf in generator.render_for_recipients(payload, RECIPIENTS).items():
+        pages = pdf_pages_text(pdf)
+        assert len(pages) == len(plain)
+        assert re.search(rf'Prepared for\s+{recipient}', pages[0])
+        assert payload['preparedFor'] not in pages[0]
+        mark = _words(f'CONFIDENTIAL · PREPARED FOR {recipient.upper()}')
+        for i, (stamped, original) in enumerate(zip(pages, plain)):
+            extra = _words(stamped) - _words(original)
+            if i == 0:
+                extra -= _words(f'Prepared for {recipient}')
+            # each page keeps its text and gains the watermark, nothing else
+            assert not _words(original) - _words(stamped), f'page {i + 1}'
+            assert extra == mark, f'page {i + 1}'
+
+
+def test_deterministic_copies(payload):
+    first = generator.render_for_recipients(payload, RECIPIENTS, deterministic=True)
+    again = generator.render_for_recipients(payload, RECIPIENTS, deterministic=True)
+    assert first == again
+    assert len(set(first.values())) == len(RECIPIENTS)
+
+
+def test_generate_recipient_pdfs(payload, tmp_path):
+    paths = generator.generate_recipient_pdfs(payload, str(tmp_path / 'profile.pdf'), ['Alex Rivera', 'Ana/../x'])
+    assert [os.path.basename(path) for path in paths] == ['profile_Alex_Rivera.pdf', 'profile_Anax.pdf']
+    assert all(os.path.dirname(path) == str(tmp_path) for path in paths)
+    assert 'Alex Rivera' in pdf_pages_text(open(paths[0], 'rb').read())[0]
+
+
+def test_recipient_file_names_distinct(payload, tmp_path):
+    recipients = ['A.B.', 'AB', 'ab', 'Æ Ø', '1', 'Élodie']
+    paths = generator.generate_recipient_pdfs(payload, str(tmp_path / 'profile.pdf'), recipients)
+    assert [os.path.basename(path) for path in paths] == [
+        'profile_AB.pdf', 'profile_AB_2.pdf', 'profile_ab_3.pdf', 'profile_4.pdf', 'profile_1.pdf',
+        'profile_lodie.pdf']
+    # no copy overwrote another
+    for recipient, path in zip(recipients, paths):
+        assert recipient in ' '.join(pdf_pages_text(open(path, 'rb').read())[0].split())
+    assert generator._recipient_file_names(['李', '1', ' 李 ']) == ['1', '1_2', '3']
+
+
+def test_duplicate_recipients_refused(payload):
+    with pytest.raises(ValueError, match='Sam Chen'):
+        generator.render_for_recipients(payload, ['Sam Chen', 'Alex Rivera', 'Sam Chen'])
+
+
+@pytest.mark.parametrize('flags', [['--linearize'], ['--page-map', 'map.json'], ['--time-budget', '5'],
+                                   ['--memory-budget', '100'], ['--recipient', 'A']])
+def test_cli_refuses_ignored_options(payload, tmp_path, flags):
+    (tmp_path / 'in.json').write_text(json.dumps(payload))
+    result = subprocess.run([sys.executable, generator.__file__, str(tmp_path / 'in.json'), str(tmp_path / 'out.pdf'),
+                             '--recipient', 'A', *flags], capture_output=True, text=True)
+    assert result.returncode == 2 and '--recipient' in result.stderr
+    assert not list(tmp_path.glob('*.pdf'))
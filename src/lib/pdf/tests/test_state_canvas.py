@@ -0,0 +1,77 @@
+import io
+
+import pytest
+from reportlab.lib.colors import black, red
+
+import bench
+import generator
+from state_canvas import StateCanvas
+
+
+@pytest.fixture
+def canv():
+    return StateCanvas(io.BytesIO())
+
+
+def test_repeats_dropped(canv):
+    start = len(canv._code)
+    canv.setFillColor(red)
+    canv.setFillColor(red)
+    canv.setLineWidth(2)
+    canv.setLineWidth(2)
+    canv.setFont('Helvetica', 9)
+    canv.setFont('Helvetica', 9)
+    assert len(canv._code) - start == 3
+    assert canv.skipped == 3
+
+
+def test_follows_save_and_restore(canv):
+    canv.setFillColor(red)
+    canv.saveState()
+    canv.setFillColor(red)        # still in effect inside q
+    canv.setFillColor(black)
+    canv.restoreState()
+    skipped = canv.skipped
+    canv.setFillColor(red)        # Q brought red back
+    assert canv.skipped == skipped + 1
+    canv.setFillColor(black)      # black ended with the Q
+    assert canv.skipped == skipped + 1
+
+
+def test_new_page_and_form_start_unknown(canv):
+    canv.setFillColor(red)
+    canv.showPage()
+    canv.setFillColor(red)
+    canv.beginForm('f')
+    canv.setFillColor(red)
+    canv.endForm()
+    canv.setFillColor(red)
+    assert canv.skipped == 1
+
+
+def test_text_object_colour_makes_state_unknown(canv):
+    canv.setFillColor(red)
+    text = canv.beginText(0, 0)
+    text.setFillColor(black)
+    text.textLine('x')
+    canv.drawText(text)
+    skipped = canv.skipped
+    canv.setFillColor(red)
+    assert canv.skipped == skipped
+
+
+def _pixels(pdf):
+    pymupdf = pytest.importorskip('pymupdf')
+    with pymupdf.open(stream=pdf, filetype='pdf') as doc:
+        return [page.get_pixmap(dpi=72).samples for page in doc]
+
+
+@pytest.mark.parametrize('legacy', [False, True], ids=['v3', 'legacy'])
+def test_pages_look_the_same(legacy, monkeypatch):
+    data = bench.synthetic_payload(legacy=legacy)
+    lean = generator.render_to_bytes(data, deterministic=True)
+    monkeypatch.setattr(StateCanvas, 'track', False)
+    monkeypatch.setattr(generator, 'draw_gradient_bar', bench._gradient_per_page)
+    full = generator.render_to_bytes(data, deterministic=True)
+    assert len(lean) < len(full)
+    assert _pixels(lean) == _pixels(full)
@@ -0,0 +1,100 @@
+"""Oversized content: titles, cards and callouts taller than a page, and a
+word wider than a line, must lay out with nothing cut off or lost."""
+
+import re
+
+import pytest
+from reportlab.platypus.frames import Frame
+
+import bench
+import generator
+
+FUZZ = 1e-6
+
+
+@pytest.fixture
+def placed(monkeypatch):
+    """(flowable type, width, height, frame width, available height) of every flowable placed.
+
+    Cards, callouts and section titles span the frame's full width by design,
+    while paragraphs keep to its padding, so widths are checked against the
+    frame width rather than the width left inside the padding.
+    """
+    placed = []
+    add = Frame.add
+
+    def recording_add(frame, flowable, canv, trySplit=0):
+        sizes = []
+        wrap = flowable.wrap
+
+        def recording_wrap(aW, aH):
+            size = wrap(aW, aH)
+            sizes.append((size, aW, aH))
+            return size
+
+        flowable.wrap = recording_wrap
+        try:
+            added = add(frame, flowable, canv, trySplit)
+        finally:
+            del flowable.wrap
+        if added and sizes:
+            (width, height), _, aH = sizes[-1]
+            placed.append((type(flowable).__name__, width, height, frame._width, aH))
+        return added
+
+    monkeypatch.setattr(Frame, 'add', recording_add)
+    return placed
+
+
+def _frame_text(pdf):
+    """Text inside the page margins, page by page; running footers and anything
+    drawn past the margins are left out."""
+    pymupdf = pytest.importorskip('pymupdf')
+    with pymupdf.open(stream=pdf, filetype='pdf') as doc:
+        return ''.join(page.get_text(clip=pymupdf.Rect(
+            generator.MARGIN - 1, generator.MARGIN - 1,
+            page.rect.width - generator.MARGIN + 1, page.rect.height - generator.MARGIN + 1))
+            for page in doc)
+
+
+def _squashed(text):
+    # line breaks may fall anywhere, including inside LONG_WORD
+    return re.sub(r'\s+', '', text.replace('’', "'")).lower()
+
+
+def _oversized_texts(data):
+    """The oversized and long-word fields of an oversized_payload."""
+    sections = data['persuasionProfile']['sections']
+    texts = [data['donorName'], sections[0]['paragraphs'][-1]['content'], sections[1]['paragraphs'][-1]['content']]
+    mg = data['meetingGuide']
+    if mg['format'] == 'legacy':
+        moves = mg['meetingArc']['moves']
+        texts += [moves[0]['moveText'], moves[1]['readText'], moves[2]['title'],
+                  mg['alignmentMap']['fightOrBuild'], *mg['readingRoom']['working']]
+    else:
+        texts += [mg['beats'][0]['stallingText'], *mg['beats'][1]['stay'].split('\n\n'),
+                  mg['beats'][2]['title'], mg['oneLine']]
+    return texts
+
+
+@pytest.mark.parametrize('legacy', [False, True], ids=['v3', 'legacy'])
+@pytest.mark.parametrize('scale', [1, 2])
+def test_oversized_content(placed, legacy, scale):
+    data = bench.oversized_payload(scale, legacy=legacy)
+    pdf = generator.render_to_bytes(data)
+
+    assert placed
+    for kind, width, height, frame_width, avail_height in placed:
+        assert width <= frame_width + FUZZ, f'{kind} is {width:.1f}pt wide in a {frame_width:.1f}pt frame'
+        assert height <= avail_height + FUZZ, f'{kind} is {height:.1f}pt tall with {avail_height:.1f}pt left'
+
+    text = _squashed(_frame_text(pdf))
+    for expected in _oversized_texts(data):
+        assert _squashed(expected) in text, f'missing: {expected[:60]}...'
+
+
+def test_long_word_is_broken_across_lines(payload):
+    payload['persuasionProfile']['sections'][0]['paragraphs'][0]['content'] = bench.LONG_WORD
+    text = _frame_text(generator.render_to_bytes(payload))
+    assert bench.LONG_WORD not in text
+    assert _squashed(bench.LONG_WORD) in _squashed(text)
@@ -0,0 +1,70 @@
+import pytest
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+import bench
+import generator
+import text_metrics
+
+TEXTS = [
+    '',
+    'Persuasion profile',
+    'Ünïcödé café – “quoted” naïveté… ½ €5',
+    'Nguyễn Thị Phương Thảo',     # past the Latin-1 part of every table
+    'Москва 北京 ∑ ∂ ★ ✓',          # past TABLE_LIMIT, and Symbol/ZapfDingbats for base-14
+    'W' * 300,
+    bench.LONG_WORD,
+]
+SIZES = [1, 7.5, 9, 10.5, 31]
+
+
+def _fonts():
+    generator.ensure_fonts()
+    return [pdfmetrics.getFont(name) for name in pdfmetrics.getRegisteredFontNames()]
+
+
+def test_every_font_accelerated():
+    assert all('stringWidth' in font.__dict__ for font in _fonts())
+    assert {type(font) for font in _fonts()} == {pdfmetrics.Font, TTFont}
+
+
+@pytest.mark.parametrize('text', TEXTS)
+def test_widths_equal_reportlab(text):
+    for font in _fonts():
+        for size in SIZES:
+            # the class method is ReportLab's own, unaccelerated stringWidth
+            expected = type(font).stringWidth(font, text, size)
+            assert font.stringWidth(text, size) == expected, (font.fontName, size)
+            assert font.stringWidth(text, size) == expected, 'cached'
+            assert pdfmetrics.stringWidth(text, font.fontName, size) == expected
+
+
+def test_bytes_input():
+    font = pdfmetrics.getFont('Helvetica')
+    assert font.stringWidth('café'.encode('utf8'), 10) == font.stringWidth('café', 10)
+
+
+def test_cache_bounded(monkeypatch):
+    monkeypatch.setattr(text_metrics, 'CACHE_SIZE', 3)
+    font = pdfmetrics.getFont('DMSans')
+    saved = font.__dict__['stringWidth']
+    try:
+        text_metrics.decelerate(font)
+        text_metrics.accelerate(font)
+        widths = [font.stringWidth(word, 10) for word in ('a', 'bb', 'ccc', 'dddd', 'a')]
+        assert widths == [TTFont.stringWidth(font, word, 10) for word in ('a', 'bb', 'ccc', 'dddd', 'a')]
+        cache = next(cell.cell_contents for cell in font.stringWidth.__closure__
+                     if isinstance(cell.cell_contents, dict))
+        assert len(cache) <= 3
+    finally:
+        font.stringWidth = saved
+
+
+def test_render_unchanged(payload):
+    fast = generator.render_to_bytes(payload, deterministic=True)
+    bench._set_fast_widths(False)
+    try:
+        slow = generator.render_to_bytes(payload, deterministic=True)
+    finally:
+        bench._set_fast_widths(True)
+    assert fast == slow
@@ -0,0 +1,18 @@
+import concurrent.futures
+import hashlib
+
+import bench
+import generator
+
+
+def _digest(data):
+    return hashlib.sha256(generator.render_to_bytes(data, deterministic=True)).hexdigest()
+
+
+def test_concurrent_renders_match_serial_ones():
+    corpus = [bench.synthetic_payload(sections=3, seed=i, legacy=i % 3 == 0) for i in range(8)]
+    corpus.append(dict(bench.synthetic_payload(sections=3, seed=8), charts=bench.synthetic_charts(8)))
+    expected = [_digest(data) for data in corpus]
+    with concurrent.futures.ThreadPoolExecutor(4) as pool:
+        for _ in range(2):
+            assert list(pool.map(_digest, corpus)) == expected
@@ -0,0 +1,114 @@
+"""Fast string widths for the registered TrueType fonts and the base-14 fonts.
+
+ReportLab measures TrueType text in pure Python, one dict lookup and one
+generator step per character (rl_accel has no C version of it), and line
+breaking measures every word of every paragraph that way, several times
+over when a paragraph is wrapped again after a split. Base-14 text is
+no better off without the C extension: every string is encoded, split
+into runs per substitution font and summed run by run.
+
+accelerate(font) replaces a font's stringWidth with one that
+
+  - looks each glyph advance up in a flat list indexed by code point,
+    built once from the font's width table, so a whole string is summed by
+    sum(map(...)) without a Python step per character; for a base-14 font
+    the list covers the characters of its encoding, and text with any
+    other character (drawn from Symbol or ZapfDingbats) is measured by
+    ReportLab as before;
+  - remembers the width of every string it has measured (words repeat a
+    lot), up to CACHE_SIZE entries per font.
+
+Everything that measures text goes through font.stringWidth, so Platypus
+line breaking, canvas.stringWidth and the custom flowables all pick it up
+without changes. Widths are summed and scaled in the same order from the
+same integers as ReportLab's own code, so results (and PDFs) are identical.
+"""
+
+from reportlab.lib.rl_accel import unicode2T1
+from reportlab.pdfbase.pdfmetrics import Font
+from reportlab.pdfbase.ttfonts import TTFont
+
+
+TABLE_LIMIT = 0x3000      # code points in the flat table (Latin to general punctuation)
+CACHE_SIZE = 50000        # measured strings remembered per font
+
+
+def _advance_table(face):
+    """Advance widths (1/1000 em) as a list indexed by code point."""
+    char_widths = face.charWidths
+    size = min(max(char_widths, default=0) + 1, TABLE_LIMIT)
+    table = [face.defaultWidth] * size
+    for code, width in char_widths.items():
+        if code < size:
+            table[code] = width
+    return table
+
+
+def _encoding_table(font):
+    """Widths (1/1000 em) of a base-14 font as a list indexed by code point;
+    None for characters its encoding does not have."""
+    encoded = {}
+    for byte in range(256):
+        try:
+            char = bytes([byte]).decode(font.encName)
+        except UnicodeDecodeError:
+            continue
+        if len(char) == 1 and char.encode(font.encName) == bytes([byte]):
+            encoded[ord(char)] = font.widths[byte]
+    table = [None] * (max(encoded) + 1)
+    for code, width in encoded.items():
+        table[code] = width
+    return table
+
+
+def accelerate(font):
+    """Give a TTFont or base-14 font the table-backed, caching stringWidth.
+    Returns the font."""
+    if 'stringWidth' in font.__dict__:
+        return font
+    if isinstance(font, TTFont):
+        face = font.face
+        table = _advance_table(face)
+        char_widths = face.charWidths.get
+        default = face.defaultWidth
+
+        def slow_units(text):
+            return sum(lookup(c) if c < size_limit else char_widths(c, default) for c in map(ord, text))
+    elif isinstance(font, Font) and font.encName:
+        table = _encoding_table(font)
+        fonts = [font] + font.substitutionFonts
+
+        def slow_units(text):
+            return sum(sum(map(f.widths.__getitem__, t)) for f, t in unicode2T1(text, fonts))
+    else:
+        return font
+    size_limit = len(table)
+    lookup = table.__getitem__
+    cache = {}
+    base14 = not isinstance(font, TTFont)     # ReportLab scales those as width * 0.001 * size
+
+    def units(text):
+        """Width of text in 1/1000 em."""
+        try:
+            return sum(map(lookup, map(ord, text)))
+        except (IndexError, TypeError):   # a code point past the table, or not in it
+            return slow_units(text)
+
+    def string_width(text, size, encoding='utf8'):
+        if not isinstance(text, str):
+            text = text.decode(encoding or 'utf8')
+        width = cache.get(text)
+        if width is None:
+            if len(cache) >= CACHE_SIZE:
+                cache.clear()
+            width = cache[text] = units(text)
+        return width * 0.001 * size if base14 else 0.001 * size * width
+
+    font.stringWidth = string_width
+    return font
+
+
+def decelerate(font):
+    """Restore ReportLab's own stringWidth (for benchmarks)."""
+    font.__dict__.pop('stringWidth', None)
+    return font